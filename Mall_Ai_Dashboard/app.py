@@ -10,7 +10,9 @@ from data_processor import compare_shops, merge_shops_to_tenant_list
 from scrape_and_clean import scrape_and_prepare
 from facebook_scraper import scrape_facebook_simple
 from instagram import scrape_instagram_simple
+from scrape_scheduler import build_scrape_jobs, run_scrape_jobs, combine_results, MAX_BROWSERS as SCRAPE_MAX_BROWSERS
 from excel_exporter import create_mall_excel_export
+from post_index import SINCE_LAST_RUN
 
 def _load_num_posts_to_scrape() -> int:
     """Load num_posts_to_scrape from shared input JSON. Returns default 20 if not found."""
@@ -157,6 +159,17 @@ with st.container():
 _prefilled_urls = _load_shared_urls()
 input_url = st.text_area("Mall Website URL(s), Facebook Page URL(s), or Instagram Profile URL(s)", value=_prefilled_urls, help="Enter one or more URLs separated by commas or new lines. Supports website URLs, Facebook page URLs, and Instagram profile URLs (e.g., https://example.com, https://www.facebook.com/Vishaal.Mall/, https://www.instagram.com/lulu_mall/)", height=100)
 
+# Which Facebook/Instagram posts to return (already-scraped posts are never scrolled past again)
+_since_options = {
+    "Latest posts (new + previously scraped)": None,
+    "Only posts new since the last scrape": SINCE_LAST_RUN,
+    "Posts since a date": "date",
+}
+_since_choice = st.selectbox("Social posts", list(_since_options), help="Facebook/Instagram scrapes stop scrolling at posts already scraped on an earlier run and fill in the rest from the local post index.")
+social_since = _since_options[_since_choice]
+if social_since == "date":
+    social_since = st.date_input("Posts since", help="Return only posts dated on or after this day")
+
 # -------------------------------------------------
 # File Uploads
 # -------------------------------------------------
@@ -351,7 +364,7 @@ if scrape_use_btn:
                         for i, url in enumerate(website_urls, 1):
                             st.write(f"🌐 Scraping website ({i}/{len(website_urls)}): {url}")
                             try:
-                                df_web, raw_count = scrape_and_prepare(url=url, source="Website Data")
+                                df_web, raw_count, text_file_path = scrape_and_prepare(url=url, source="Website Data")
                                 if df_web is not None and not df_web.empty:
                                     combined_data.append(df_web)
                                     # Use raw_count so this matches the OpenAI extracted count in logs
@@ -359,16 +372,8 @@ if scrape_use_btn:
                                 
                                 # Check if extracted text file was created
                                 import os
-                                if os.path.exists("last_extracted_text_path.txt"):
-                                    with open("last_extracted_text_path.txt", "r", encoding="utf-8") as f:
-                                        text_file_path = f.read().strip()
-                                        if text_file_path and os.path.exists(text_file_path):
-                                            extracted_text_files.append((url, text_file_path))
-                                            # Clean up the temp file
-                                            try:
-                                                os.remove("last_extracted_text_path.txt")
-                                            except:
-                                                pass
+                                if text_file_path and os.path.exists(text_file_path):
+                                    extracted_text_files.append((url, text_file_path))
                             except Exception as e:
                                 st.warning(f"❌ Failed scraping website {url}: {e}")
                     
@@ -379,7 +384,7 @@ if scrape_use_btn:
                             st.write(f"📘 Scraping Facebook ({i}/{len(facebook_urls)}): {url}")
                             try:
                                 # Scrape posts per Facebook page (using value from main UI)
-                                df_fb = scrape_facebook_simple(fb_url=url, target_count=num_posts)
+                                df_fb = scrape_facebook_simple(fb_url=url, target_count=num_posts, since=social_since)
                                 if df_fb is not None and not df_fb.empty:
                                     combined_data.append(df_fb)
                                     st.success(f"✅ Scraped {len(df_fb)} items from Facebook page")
@@ -404,7 +409,7 @@ if scrape_use_btn:
                             st.write(f"📷 Scraping Instagram ({i}/{len(instagram_urls)}): {url}")
                             try:
                                 # Scrape posts per Instagram profile (using value from main UI)
-                                df_ig = scrape_instagram_simple(ig_url=url, target_count=num_posts)
+                                df_ig = scrape_instagram_simple(ig_url=url, target_count=num_posts, since=social_since)
                                 if df_ig is not None and not df_ig.empty:
                                     combined_data.append(df_ig)
                                     st.success(f"✅ Scraped {len(df_ig)} items from Instagram profile (up to {num_posts} posts)")
@@ -605,80 +610,49 @@ if links_file and scrape_links_btn:
                         st.write(f"📋 Detected {len(instagram_urls)} Instagram URL(s): {', '.join(instagram_urls[:3])}{'...' if len(instagram_urls) > 3 else ''}")
                     if not website_urls and not facebook_urls and not instagram_urls:
                         st.warning("⚠️ URLs were found but none passed validation. Please check the URLs in your file.")
-                    combined = []
                     
                     # Load num_posts_to_scrape from shared input (used for Facebook and Instagram)
                     num_posts = _load_num_posts_to_scrape()
                     
-                    # Scrape website URLs
-                    if website_urls:
-                        st.info(f"Found {len(website_urls)} website URL(s) to scrape")
-                        for i, u in enumerate(website_urls, 1):
-                            st.write(f"🌐 Scraping website ({i}/{len(website_urls)}): {u}")
-                            try:
-                                dfc, raw_count = scrape_and_prepare(url=u, source="Website Data")
-                                if dfc is not None and not dfc.empty:
-                                    combined.append(dfc)
-                                    # Use raw_count so this matches the OpenAI extracted count in logs
-                                    st.success(f"✅ Scraped {raw_count} items from website")
-                            except Exception as e:
-                                st.warning(f"❌ Failed scraping website {u}: {e}")
-
-                    # Scrape Facebook URLs
-                    if facebook_urls:
-                        st.info(f"Found {len(facebook_urls)} Facebook page(s) to scrape")
-                        for i, u in enumerate(facebook_urls, 1):
-                            st.write(f"📘 Scraping Facebook ({i}/{len(facebook_urls)}): {u}")
-                            try:
-                                dfc = scrape_facebook_simple(fb_url=u, target_count=num_posts)
-                                if dfc is not None and not dfc.empty:
-                                    combined.append(dfc)
-                                    st.success(f"✅ Scraped {len(dfc)} items from Facebook")
-                                else:
-                                    st.warning(f"⚠️ No data extracted from Facebook page {u}")
-                            except Exception as e:
-                                error_msg = str(e)
-                                if "Chrome failed to start" in error_msg or "DevToolsActivePort" in error_msg:
-                                    st.error(f"❌ Chrome browser error when scraping Facebook {u}")
-                                    st.info("💡 **Troubleshooting tips:**\n"
-                                           "- Close all Chrome browser windows\n"
-                                           "- Update Google Chrome to the latest version\n"
-                                           "- Restart your computer if the issue persists\n"
-                                           "- Check if Chrome is installed correctly")
-                                else:
-                                    st.warning(f"❌ Failed scraping Facebook {u}: {error_msg}")
-
-                    # Scrape Instagram URLs
-                    if instagram_urls:
-                        # Add small delay to ensure previous Chrome instances are fully closed
-                        import time
-                        time.sleep(0.5)  # Reduced for faster startup
-                        st.info(f"Found {len(instagram_urls)} Instagram profile(s) to scrape (up to {num_posts} posts each)")
-                        for i, u in enumerate(instagram_urls, 1):
-                            st.write(f"📷 Scraping Instagram ({i}/{len(instagram_urls)}): {u}")
-                            try:
-                                # Scrape posts per Instagram profile (using value from main UI)
-                                dfc = scrape_instagram_simple(ig_url=u, target_count=num_posts)
-                                if dfc is not None and not dfc.empty:
-                                    combined.append(dfc)
-                                    st.success(f"✅ Scraped {len(dfc)} items from Instagram (up to {num_posts} posts)")
-                                else:
-                                    st.warning(f"⚠️ No data extracted from Instagram profile {u}")
-                            except Exception as e:
-                                error_msg = str(e)
-                                if "Chrome failed to start" in error_msg or "DevToolsActivePort" in error_msg:
-                                    st.error(f"❌ Chrome browser error when scraping Instagram {u}")
-                                    st.info("💡 **Troubleshooting tips:**\n"
-                                           "- Close all Chrome browser windows\n"
-                                           "- Update Google Chrome to the latest version\n"
-                                           "- Restart your computer if the issue persists\n"
-                                           "- Check if Chrome is installed correctly")
-                                else:
-                                    st.warning(f"❌ Failed scraping Instagram {u}: {error_msg}")
-
-                    # Combine all scraped data
-                    if combined:
-                        new_df = pd.concat(combined, ignore_index=True)
+                    # Scrape website, Facebook and Instagram URLs concurrently (bounded by
+                    # SCRAPE_MAX_BROWSERS, one browser per domain) and report each job as it finishes
+                    jobs = build_scrape_jobs(website_urls, facebook_urls, instagram_urls, num_posts=num_posts, since=social_since)
+                    st.info(f"Scraping {len(jobs)} URL(s) with up to {min(SCRAPE_MAX_BROWSERS, len(jobs))} browser(s) in parallel "
+                            f"(Facebook/Instagram: up to {num_posts} posts each)")
+                    labels = {"website": ("🌐", "website"), "facebook": ("📘", "Facebook"), "instagram": ("📷", "Instagram")}
+                    progress = st.progress(0.0)
+                    results = []
+                    for res in run_scrape_jobs(jobs):
+                        results.append(res)
+                        progress.progress(len(results) / len(jobs))
+                        icon, label = labels[res["kind"]]
+                        u = res["url"]
+                        prefix = f"{icon} ({len(results)}/{len(jobs)}, {res['elapsed']:.0f}s) {u}: "
+                        if res["error"]:
+                            error_msg = res["error"]
+                            if res["kind"] != "website" and ("Chrome failed to start" in error_msg or "DevToolsActivePort" in error_msg):
+                                st.error(f"❌ Chrome browser error when scraping {label} {u}")
+                                st.info("💡 **Troubleshooting tips:**\n"
+                                       "- Close all Chrome browser windows\n"
+                                       "- Update Google Chrome to the latest version\n"
+                                       "- Restart your computer if the issue persists\n"
+                                       "- Check if Chrome is installed correctly")
+                            else:
+                                st.warning(f"{prefix}❌ Failed scraping {label}: {error_msg}")
+                        elif res["df"] is not None and not res["df"].empty:
+                            # Website count is the raw AI-extracted count so it matches the OpenAI logs
+                            st.success(f"{prefix}✅ Scraped {res['count']} items from {label}")
+                        elif res["kind"] != "website":
+                            st.warning(f"{prefix}⚠️ No data extracted from {label}")
+                    # Each website job returns its own extracted text file (in URL order)
+                    extracted_text_files = [(r["url"], r["text_path"]) for r in sorted(results, key=lambda r: r["index"])
+                                            if r.get("text_path") and os.path.exists(r["text_path"])]
+                    st.session_state.extracted_text_files = extracted_text_files
+
+                    # Combine all scraped data (in URL order)
+                    new_df = combine_results(results)
+                    if new_df is not None:
+                        source_count = sum(1 for r in results if r["df"] is not None and not r["df"].empty)
                         
                         # Store URLs in session state for metadata
                         all_urls = website_urls + facebook_urls + instagram_urls
@@ -706,7 +680,7 @@ if links_file and scrape_links_btn:
                         else:
                             st.session_state.structured_data = None
                         st.session_state.new_cleaned_df = new_df
-                        st.success(f"✅ Successfully scraped and combined data from {len(combined)} source(s). Total items: {len(new_df)}")
+                        st.success(f"✅ Successfully scraped and combined data from {source_count} source(s). Total items: {len(new_df)}")
                     else:
                         st.error("No data scraped from provided URLs.")
                         st.session_state.scraped_preview_df = None
@@ -993,11 +967,14 @@ if structured_data:
             # ---------------- Export to Excel (comprehensive 4-tab format) ---------------- 
             # Download button outside the if/else blocks so it's always visible and doesn't close the report
             try:
+                # Coming-soon extraction reads the first website's text, as returned by its scrape job
+                text_files = st.session_state.get("extracted_text_files") or []
                 buffer = create_mall_excel_export(
                     scraped_df=st.session_state.get("new_cleaned_df"),
                     structured_data=structured_data,
                     llm_json=llm_json,
-                    input_url=input_url_to_use
+                    input_url=input_url_to_use,
+                    extracted_text_path=text_files[0][1] if text_files else None,
                 )
                 # Read buffer as bytes to avoid Streamlit media storage issues
                 excel_bytes = buffer.getvalue()
@@ -67,21 +67,21 @@ def _normalize_name(n: str) -> str:
     return re.sub(r"\s+", " ", (n or "").strip())
 
 
+_ADDRESS_INDICATORS = [
+    "road", "street", "avenue", "lane", "drive", "boulevard",
+    "madurai", "tamilnadu", "india", "tamil nadu",
+    "pin", "pincode", "postal", "zip",
+    r"\d{5,6}",  # 5-6 digit postal codes
+    r"no \d+",  # "No 31" pattern
+    "chokkikulam", "gokhale"
+]
+# One compiled alternation instead of a re.search per indicator
+_ADDRESS_RE = re.compile("|".join(f"(?:{p})" for p in _ADDRESS_INDICATORS))
+
+
 def _is_address(name: str) -> bool:
     """Check if name looks like an address."""
-    address_indicators = [
-        "road", "street", "avenue", "lane", "drive", "boulevard",
-        "madurai", "tamilnadu", "india", "tamil nadu",
-        "pin", "pincode", "postal", "zip",
-        r"\d{5,6}",  # 5-6 digit postal codes
-        "no \d+",  # "No 31" pattern
-        "chokkikulam", "gokhale"
-    ]
-    name_lower = name.lower()
-    for indicator in address_indicators:
-        if re.search(indicator, name_lower):
-            return True
-    return False
+    return bool(_ADDRESS_RE.search(name.lower()))
 
 
 def _is_navigation_item(name: str) -> bool:
@@ -234,15 +234,14 @@ def _normalize_for_dedup(name: str) -> str:
     return normalized
 
 
-def _are_similar_shops(name1: str, name2: str) -> bool:
-    """Check if two shop names are similar (fuzzy matching for deduplication)."""
-    if not name1 or not name2:
-        return False
-    
-    # Normalize both names
-    norm1 = _normalize_for_dedup(name1)
-    norm2 = _normalize_for_dedup(name2)
-    
+def _dedup_tokens(name: str):
+    """Return (normalized name, set of its words) used by the fuzzy duplicate checks."""
+    normalized = _normalize_for_dedup(name)
+    return normalized, frozenset(normalized.split())
+
+
+def _similar_normalized(norm1: str, words1, norm2: str, words2) -> bool:
+    """_are_similar_shops on names already passed through _dedup_tokens."""
     if not norm1 or not norm2:
         return False
     
@@ -250,15 +249,15 @@ def _are_similar_shops(name1: str, name2: str) -> bool:
     if norm1 == norm2:
         return True
     
-    # Extract key words (remove common words)
-    words1 = set(norm1.split())
-    words2 = set(norm2.split())
-    
     if not words1 or not words2:
         return False
     
     # Check if they share significant words
-    common_words = words1.intersection(words2)
+    common_words = words1 & words2
+    
+    # Every remaining rule needs at least one shared word
+    if not common_words:
+        return False
     
     # If they share at least 2 words, they might be the same shop
     if len(common_words) >= 2:
@@ -268,33 +267,62 @@ def _are_similar_shops(name1: str, name2: str) -> bool:
     unique1 = words1 - words2
     unique2 = words2 - words1
     
-    # Check if unique words are similar (same root, contains, or similar meaning)
     for u1 in unique1:
         for u2 in unique2:
-            # Check if words are similar (one contains the other or shares root)
+            # One word contains the other
             if u1 in u2 or u2 in u1:
-                # If they share at least one common word, consider them similar
-                if len(common_words) >= 1:
-                    return True
-            # Check if words share a common root (first 4+ characters)
-            if len(u1) > 4 and len(u2) > 4:
-                if u1[:4] == u2[:4] or u1[:5] == u2[:5]:
-                    if len(common_words) >= 1:
-                        return True
-    
-    # Special case: if one name contains all words from the other (with variations)
-    # Example: "vics popcorn" vs "corn vics popper" - "vics" is common, "popcorn" vs "popper" are similar
-    if len(common_words) >= 1:
-        # Check if remaining words are similar
-        for u1 in unique1:
-            for u2 in unique2:
-                # Check for similar words (popcorn/popper, corn/popcorn)
-                if (u1.startswith(u2[:3]) or u2.startswith(u1[:3])) and len(u1) > 3 and len(u2) > 3:
-                    return True
+                return True
+            # Words share a common root (first 4+ characters)
+            if len(u1) > 4 and len(u2) > 4 and u1[:4] == u2[:4]:
+                return True
+            # Example: "vics popcorn" vs "corn vics popper" - "popcorn" vs "popper" share a 3-letter prefix
+            if (u1.startswith(u2[:3]) or u2.startswith(u1[:3])) and len(u1) > 3 and len(u2) > 3:
+                return True
     
     return False
 
 
+def _are_similar_shops(name1: str, name2: str) -> bool:
+    """Check if two shop names are similar (fuzzy matching for deduplication)."""
+    if not name1 or not name2:
+        return False
+    norm1, words1 = _dedup_tokens(name1)
+    norm2, words2 = _dedup_tokens(name2)
+    return _similar_normalized(norm1, words1, norm2, words2)
+
+
+class _ShopDedupIndex:
+    """
+    Kept shops indexed for fuzzy duplicate lookups.
+
+    Shops are only compared when their phones are equal, and every similarity
+    rule in _similar_normalized needs at least one shared normalized word, so
+    a new name is compared only against kept shops found under
+    (phone, word) in the inverted index. Each name is normalized once.
+    """
+
+    def __init__(self):
+        self._entries = []    # (normalized name, words)
+        self._postings = {}   # (phone, word) -> [entry index]
+
+    def is_duplicate(self, tokens, phone: str) -> bool:
+        norm, words = tokens
+        candidates = set()
+        for word in words:
+            candidates.update(self._postings.get((phone, word), ()))
+        for i in candidates:
+            other_norm, other_words = self._entries[i]
+            if _similar_normalized(norm, words, other_norm, other_words):
+                return True
+        return False
+
+    def add(self, tokens, phone: str) -> None:
+        idx = len(self._entries)
+        self._entries.append(tokens)
+        for word in tokens[1]:
+            self._postings.setdefault((phone, word), []).append(idx)
+
+
 def _is_valid_shop(name: str, phone: str) -> bool:
     """Check if entry looks like a valid shop/kiosk."""
     # Must have a name
@@ -350,7 +378,7 @@ def clean_raw_file(input_file, output_file):
         shops.append(current_shop)
 
     seen = set()
-    seen_names = []  # Keep list of normalized names for fuzzy matching
+    dedup_index = _ShopDedupIndex()  # kept shops, indexed by phone + name word for fuzzy matching
     cleaned_rows = []
 
     for shop in shops:
@@ -402,20 +430,12 @@ def clean_raw_file(input_file, output_file):
             continue
         
         # Check for fuzzy matches with existing shops (same phone or no phone)
-        is_duplicate = False
-        normalized_name = _normalize_for_dedup(name)
-        for existing_name, existing_phone, existing_floor in seen_names:
-            # Only fuzzy match if phones match (or both have no phone)
-            phones_match = (phone == existing_phone) or (not phone and not existing_phone) or (phone == "-" and existing_phone == "-")
-            if phones_match and _are_similar_shops(name, existing_name):
-                is_duplicate = True
-                break
-        
-        if is_duplicate:
+        tokens = _dedup_tokens(name)
+        if dedup_index.is_duplicate(tokens, phone):
             continue
         
         seen.add(unique_key)
-        seen_names.append((name, phone, floor))
+        dedup_index.add(tokens, phone)
         cleaned_rows.append((name, phone, floor))
 
     # Write cleaned CSV
@@ -449,7 +469,7 @@ def clean_raw_text(text: str):
 
     rows = []
     seen = set()
-    seen_names = []  # Keep list of normalized names for fuzzy matching
+    dedup_index = _ShopDedupIndex()  # kept shops, indexed by phone + name word for fuzzy matching
     for shop in shops:
         raw_name = shop.get("shop_name", "")
         raw_phone = shop.get("phone", "")
@@ -490,20 +510,12 @@ def clean_raw_text(text: str):
             continue
         
         # Check for fuzzy matches with existing shops (same phone or no phone)
-        is_duplicate = False
-        normalized_name = _normalize_for_dedup(name)
-        for existing_name, existing_phone, existing_floor in seen_names:
-            # Only fuzzy match if phones match (or both have no phone)
-            phones_match = (phone == existing_phone) or (not phone and not existing_phone) or (phone == "-" and existing_phone == "-")
-            if phones_match and _are_similar_shops(name, existing_name):
-                is_duplicate = True
-                break
-        
-        if is_duplicate:
+        tokens = _dedup_tokens(name)
+        if dedup_index.is_duplicate(tokens, phone):
             continue
         
         seen.add(unique_key)
-        seen_names.append((name, phone, floor))
+        dedup_index.add(tokens, phone)
         rows.append({"shop_name": name, "phone": phone, "floor": floor})
 
     df = pd.DataFrame(rows, columns=["shop_name", "phone", "floor"]).astype(str)
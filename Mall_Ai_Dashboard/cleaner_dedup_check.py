@@ -0,0 +1,177 @@
+"""
+cleaner_dedup_check.py – Regression check for the indexed fuzzy dedup in cleaner.py.
+
+cleaner._ShopDedupIndex replaced a loop that compared every row with every kept
+shop. This check runs that original pairwise loop (kept verbatim below as the
+reference) and the index over FIXTURE_ROWS, and fails when either differs
+from the rows recorded in FIXTURE_KEPT. The rows cover the same name
+under another phone, "-" and empty phones, contained words, shared roots,
+popcorn/popper-style prefixes and names sharing only stop words.
+
+Usage:
+    python cleaner_dedup_check.py      # exit status 1 on any mismatch
+"""
+import sys
+
+from cleaner import _ShopDedupIndex, _dedup_tokens, _normalize_for_dedup
+
+# (name, phone) rows in scrape order
+FIXTURE_ROWS = [
+    ('Vics Popcorn', '98400 12345'),
+    ('Corn Vics Popper', '98400 12345'),
+    ('Vics Popcorn', '-'),
+    ('The Vics Popcorn', '-'),
+    ('Zara', '-'),
+    ('ZARA', '-'),
+    ('Zara Home', '-'),
+    ('Zara Kids', '044 2222 3333'),
+    ('Zara Kids Wear', '044 2222 3333'),
+    ('Chennai Silks', '0452 111222'),
+    ('The Chennai Silk House', '0452 111222'),
+    ('Pothys', '0452 111222'),
+    ('Sri Krishna Sweets', ''),
+    ('Krishna Sweet Stall', ''),
+    ('Krishna Bakery', ''),
+    ('Adyar Ananda Bhavan', ''),
+    ('Ananda Bhavan Sweets', '-'),
+    ('Food Court', ''),
+    ('Food Courtyard', ''),
+    ('Court Yard Cafe', ''),
+    ('Lifestyle', '-'),
+    ('Life Style', '-'),
+    ('Max Fashion', '-'),
+    ('Maxi Fashions', '-'),
+    ('Trends Footwear', '-'),
+    ('Trendz Foot', '-'),
+    ('Mobile Zone', '98765 43210'),
+    ('Mobiles Zone', '98765 43210'),
+    ('Mobile Planet', '98765 43211'),
+    ('Of The And', ''),
+    ('And The Of', ''),
+    ('Game Station', ''),
+    ('Gaming Station', ''),
+    ('Station Games', ''),
+    ('KFC', '-'),
+    ('K F C', '-'),
+    ('Cafe Coffee Day', '-'),
+    ('Coffee Day Express', '-'),
+    ('Coffee Bean', '-'),
+    ('Bata', '-'),
+    ('Batavia Shoes', '-'),
+    ('Baskin Robbins', ''),
+    ('Robbins Bask', ''),
+]
+
+# Rows the original pairwise loop keeps, in order
+FIXTURE_KEPT = [
+    ('Vics Popcorn', '98400 12345'),
+    ('Vics Popcorn', '-'),
+    ('Zara', '-'),
+    ('Zara Home', '-'),
+    ('Zara Kids', '044 2222 3333'),
+    ('Chennai Silks', '0452 111222'),
+    ('Pothys', '0452 111222'),
+    ('Sri Krishna Sweets', ''),
+    ('Krishna Bakery', ''),
+    ('Adyar Ananda Bhavan', ''),
+    ('Ananda Bhavan Sweets', '-'),
+    ('Food Court', ''),
+    ('Court Yard Cafe', ''),
+    ('Lifestyle', '-'),
+    ('Life Style', '-'),
+    ('Max Fashion', '-'),
+    ('Maxi Fashions', '-'),
+    ('Trends Footwear', '-'),
+    ('Trendz Foot', '-'),
+    ('Mobile Zone', '98765 43210'),
+    ('Mobile Planet', '98765 43211'),
+    ('Of The And', ''),
+    ('And The Of', ''),
+    ('Game Station', ''),
+    ('KFC', '-'),
+    ('K F C', '-'),
+    ('Cafe Coffee Day', '-'),
+    ('Coffee Bean', '-'),
+    ('Bata', '-'),
+    ('Batavia Shoes', '-'),
+    ('Baskin Robbins', ''),
+]
+
+
+def _reference_similar(name1: str, name2: str) -> bool:
+    """_are_similar_shops as it was before the index (pairwise, re-normalizing on every call)."""
+    if not name1 or not name2:
+        return False
+    norm1 = _normalize_for_dedup(name1)
+    norm2 = _normalize_for_dedup(name2)
+    if not norm1 or not norm2:
+        return False
+    if norm1 == norm2:
+        return True
+    words1 = set(norm1.split())
+    words2 = set(norm2.split())
+    if not words1 or not words2:
+        return False
+    common_words = words1.intersection(words2)
+    if len(common_words) >= 2:
+        return True
+    unique1 = words1 - words2
+    unique2 = words2 - words1
+    for u1 in unique1:
+        for u2 in unique2:
+            if u1 in u2 or u2 in u1:
+                if len(common_words) >= 1:
+                    return True
+            if len(u1) > 4 and len(u2) > 4:
+                if u1[:4] == u2[:4] or u1[:5] == u2[:5]:
+                    if len(common_words) >= 1:
+                        return True
+    if len(common_words) >= 1:
+        for u1 in unique1:
+            for u2 in unique2:
+                if (u1.startswith(u2[:3]) or u2.startswith(u1[:3])) and len(u1) > 3 and len(u2) > 3:
+                    return True
+    return False
+
+
+def reference_dedup(rows):
+    """Kept (name, phone) rows of the original pairwise loop."""
+    kept = []
+    for name, phone in rows:
+        if not any(phone == other_phone and _reference_similar(name, other) for other, other_phone in kept):
+            kept.append((name, phone))
+    return kept
+
+
+def indexed_dedup(rows):
+    """Kept (name, phone) rows of cleaner._ShopDedupIndex."""
+    index = _ShopDedupIndex()
+    kept = []
+    for name, phone in rows:
+        tokens = _dedup_tokens(name)
+        if not index.is_duplicate(tokens, phone):
+            index.add(tokens, phone)
+            kept.append((name, phone))
+    return kept
+
+
+def main() -> int:
+    failed = False
+    for label, kept in (("pairwise reference", reference_dedup(FIXTURE_ROWS)),
+                        ("_ShopDedupIndex", indexed_dedup(FIXTURE_ROWS))):
+        if kept == FIXTURE_KEPT:
+            print(f"[OK] {label}: {len(kept)} of {len(FIXTURE_ROWS)} rows kept, as recorded")
+        else:
+            failed = True
+            print(f"[FAIL] {label} differs from the fixture:")
+            for row in kept:
+                if row not in FIXTURE_KEPT:
+                    print(f"    unexpectedly kept: {row}")
+            for row in FIXTURE_KEPT:
+                if row not in kept:
+                    print(f"    unexpectedly dropped: {row}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
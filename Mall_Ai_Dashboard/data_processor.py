@@ -7,10 +7,16 @@ def normalize_text(value):
     return str(value).strip().lower()
 
 
-def _ensure_df(obj):
-    """If `obj` is a path (str), read CSV; if it's already a DataFrame, return it."""
+def _normalize_series(series):
+    """Vectorized normalize_text for a whole column."""
+    values = series.astype(object)
+    return values.where(values.notna(), "").astype(str).str.strip().str.lower()
+
+
+def _ensure_df(obj, copy=True):
+    """If `obj` is a path (str), read CSV; if it's already a DataFrame, return it (copied unless copy=False)."""
     if isinstance(obj, pd.DataFrame):
-        df = obj.copy()
+        df = obj.copy() if copy else obj
     elif isinstance(obj, str):
         df = pd.read_csv(obj)
     else:
@@ -19,82 +25,156 @@ def _ensure_df(obj):
     return df
 
 
+# Columns that identify a unit inside a floor; when present in both lists they are used to pair duplicate shop names
+_SUITE_COLUMNS = ("suite", "unit", "unit_no", "shop_no")
+_RECORD_COLUMNS = ("shop_name", "phone", "floor")
+
+
+def _is_website_source(source):
+    s = str(source).lower()
+    return "website" in s or "web" in s
+
+
+def _key_frame(df, cols, suite_col=None):
+    """Normalized comparison keys for `df` (one small frame: pos, key, floor[, suite][, source])."""
+    keys = pd.DataFrame({
+        "pos": range(len(df)),
+        "key": _normalize_series(df[cols["shop_name"]]).to_numpy(),
+        "floor": _normalize_series(df[cols["floor"]]).to_numpy(),
+    })
+    if suite_col:
+        keys["suite"] = _normalize_series(df[cols[suite_col]]).to_numpy()
+    if "source" in cols:
+        keys["source"] = df[cols["source"]].to_numpy()
+    return keys
+
+
+def _match_rows(old_keys, new_keys, tiers):
+    """
+    Pair old and new rows one-to-one by shop key.
+
+    Rows are matched tier by tier (e.g. key+floor+suite, then key+floor, then
+    key alone); within a tier the n-th old row of a group pairs with the n-th
+    new row, and matched rows are not reused by later tiers. A shop listed
+    twice on one side therefore matches at most twice, instead of producing
+    every old×new combination. Returns a DataFrame of (pos_old, pos_new).
+    """
+    pairs = []
+    old_left, new_left = old_keys, new_keys
+    for cols in tiers:
+        if old_left.empty or new_left.empty:
+            break
+        on = list(cols) + ["_n"]
+        o = old_left[list(cols) + ["pos"]].assign(_n=old_left.groupby(list(cols), sort=False).cumcount())
+        n = new_left[list(cols) + ["pos"]].assign(_n=new_left.groupby(list(cols), sort=False).cumcount())
+        m = o.merge(n, on=on, suffixes=("_old", "_new"))
+        if m.empty:
+            continue
+        pairs.append(m[["pos_old", "pos_new"]])
+        old_left = old_left[~old_left["pos"].isin(m["pos_old"])]
+        new_left = new_left[~new_left["pos"].isin(m["pos_new"])]
+    if not pairs:
+        return pd.DataFrame({"pos_old": pd.Series(dtype="int64"), "pos_new": pd.Series(dtype="int64")})
+    return pd.concat(pairs, ignore_index=True).sort_values(["pos_old", "pos_new"], kind="stable")
+
+
+def _records(df, cols, positions):
+    """shop_name/phone/floor records for the rows of `df` at `positions` (in order)."""
+    if len(positions) == 0:
+        return []
+    columns = [df[cols[c]].iloc[positions].tolist() for c in _RECORD_COLUMNS]
+    return [dict(zip(_RECORD_COLUMNS, row)) for row in zip(*columns)]
+
+
+def _diff(old_df, old_cols, old_keys, new_df, new_cols, new_keys, tiers):
+    """New / vacated / still-existing / shifted rows of new_keys against old_keys (positions index the full frames)."""
+    pairs = _match_rows(old_keys, new_keys, tiers)
+    matched_new = new_keys["pos"].isin(pairs["pos_new"]).to_numpy()
+    matched_old = old_keys["pos"].isin(pairs["pos_old"]).to_numpy()
+
+    new_pos = new_keys["pos"].to_numpy()
+    old_pos = old_keys["pos"].to_numpy()
+
+    floor_old = old_keys.set_index("pos")["floor"].reindex(pairs["pos_old"]).to_numpy()
+    floor_new = new_keys.set_index("pos")["floor"].reindex(pairs["pos_new"]).to_numpy()
+    shifted = pairs[floor_old != floor_new]
+    shifted_records = []
+    if not shifted.empty:
+        pos_old = shifted["pos_old"].to_numpy()
+        pos_new = shifted["pos_new"].to_numpy()
+        shifted_records = [
+            {"shop_name": name, "floor_old": f_old, "floor_new": f_new}
+            for name, f_old, f_new in zip(
+                old_df[old_cols["shop_name"]].iloc[pos_old].tolist(),
+                old_df[old_cols["floor"]].iloc[pos_old].tolist(),
+                new_df[new_cols["floor"]].iloc[pos_new].tolist(),
+            )
+        ]
+
+    return {
+        "new_shops": _records(new_df, new_cols, new_pos[~matched_new]),
+        "vacated_shops": _records(old_df, old_cols, old_pos[~matched_old]),
+        "shifted_shops": shifted_records,
+        "still_existing": _records(new_df, new_cols, new_pos[matched_new]),
+    }
+
+
 def compare_shops(old_csv, new_csv, preserve_source=False, website_only=False):
-    old_df = _ensure_df(old_csv)
-    new_df = _ensure_df(new_csv)
+    """
+    Diff an old and a new shop list.
 
-    # Normalize column names
-    old_df.columns = old_df.columns.str.lower()
-    new_df.columns = new_df.columns.str.lower()
+    Shop names are compared case- and whitespace-insensitively. A shop that
+    appears several times (e.g. two outlets) is matched one-to-one, preferring
+    rows on the same floor (and suite/unit, when both lists have such a
+    column); a matched pair on different floors is reported as shifted.
+    Normalized keys are computed once and reused for the overall diff and for
+    every per-source view in "by_source".
+    """
+    old_df = _ensure_df(old_csv, copy=False)
+    new_df = _ensure_df(new_csv, copy=False)
+
+    # Case-insensitive column lookup (frames are not copied or renamed)
+    old_cols = {str(c).lower(): c for c in old_df.columns}
+    new_cols = {str(c).lower(): c for c in new_df.columns}
 
     # Check if source column exists in new_df
-    has_source = preserve_source and 'source' in new_df.columns
-    
-    # Keep original new_df for source-specific comparisons
-    original_new_df = new_df.copy()
-    
-    # If website_only is True, filter BOTH old_df and new_df to only include website data
+    has_source = preserve_source and 'source' in new_cols
+
+    suite_col = next((c for c in _SUITE_COLUMNS if c in old_cols and c in new_cols), None)
+    tiers = ([("key", "floor", "suite")] if suite_col else []) + [("key", "floor"), ("key",)]
+
+    old_keys = _key_frame(old_df, old_cols, suite_col)
+    all_new_keys = _key_frame(new_df, new_cols, suite_col)
+    new_keys = all_new_keys
+
+    # If website_only is True, filter BOTH old and new to only include website data
     # This ensures vacated shops = website tenants from OLD that are no longer in website NEW
     # Facebook and Instagram are post data, not shop/tenant data — exclude from comparison
     if website_only:
         if has_source:
-            website_sources = [s for s in original_new_df['source'].unique() if 'website' in str(s).lower() or 'web' in str(s).lower()]
+            website_sources = [s for s in pd.unique(all_new_keys['source']) if _is_website_source(s)]
             if website_sources:
-                new_df = original_new_df[original_new_df['source'].isin(website_sources)].copy()
-        # Also filter old_df to website-only if it has source (e.g. from previous merged export)
-        if 'source' in old_df.columns:
-            old_website_sources = [s for s in old_df['source'].unique() if s and ('website' in str(s).lower() or 'web' in str(s).lower())]
+                new_keys = all_new_keys[all_new_keys['source'].isin(website_sources)]
+        # Also filter old to website-only if it has source (e.g. from previous merged export)
+        if 'source' in old_cols:
+            old_website_sources = [s for s in pd.unique(old_keys['source']) if s and _is_website_source(s)]
             if old_website_sources:
-                old_df = old_df[old_df['source'].isin(old_website_sources)].copy()
-    
-    # Normalize shop names for comparison
-    old_df["shop_key"] = old_df["shop_name"].apply(normalize_text)
-    new_df["shop_key"] = new_df["shop_name"].apply(normalize_text)
-    # Also normalize original_new_df for source-specific comparisons
-    if has_source:
-        original_new_df["shop_key"] = original_new_df["shop_name"].apply(normalize_text)
+                old_keys = old_keys[old_keys['source'].isin(old_website_sources)]
 
     # --------------------
     # Overall comparison (website data only if website_only=True)
     # --------------------
-    new_shops = new_df[
-        ~new_df["shop_key"].isin(old_df["shop_key"])
-    ]
-
-    vacated_shops = old_df[
-        ~old_df["shop_key"].isin(new_df["shop_key"])
-    ]
-
-    still_existing = new_df[
-        new_df["shop_key"].isin(old_df["shop_key"])
-    ]
-
-    merged = pd.merge(
-        old_df,
-        new_df,
-        on="shop_key",
-        suffixes=("_old", "_new")
-    )
-
-    shifted_shops = merged[
-        merged["floor_old"] != merged["floor_new"]
-    ][
-        ["shop_name_old", "floor_old", "floor_new"]
-    ].rename(columns={"shop_name_old": "shop_name"})
-
+    overall = _diff(old_df, old_cols, old_keys, new_df, new_cols, new_keys, tiers)
     result = {
         "stats": {
-            "old_count": len(old_df),
-            "new_count": len(new_df),
-            "new_shops": len(new_shops),
-            "vacated_shops": len(vacated_shops),
-            "shifted_shops": len(shifted_shops),
-            "still_existing": len(still_existing)
+            "old_count": len(old_keys),
+            "new_count": len(new_keys),
+            "new_shops": len(overall["new_shops"]),
+            "vacated_shops": len(overall["vacated_shops"]),
+            "shifted_shops": len(overall["shifted_shops"]),
+            "still_existing": len(overall["still_existing"])
         },
-        "new_shops": new_shops[["shop_name", "phone", "floor"]].to_dict("records") if not new_shops.empty else [],
-        "vacated_shops": vacated_shops[["shop_name", "phone", "floor"]].to_dict("records") if not vacated_shops.empty else [],
-        "shifted_shops": shifted_shops.to_dict("records") if not shifted_shops.empty else [],
-        "still_existing": still_existing[["shop_name", "phone", "floor"]].to_dict("records") if not still_existing.empty else []
+        **overall,
     }
 
     # --------------------
@@ -102,58 +182,36 @@ def compare_shops(old_csv, new_csv, preserve_source=False, website_only=False):
     # --------------------
     if has_source:
         source_comparisons = {}
-        # Use original_new_df to get all sources for display purposes
-        sources = original_new_df['source'].unique()
-        
-        # Only include Website Data for tenant analysis
-        # Facebook and Instagram are post data, not tenant data
-        website_sources = [s for s in sources if 'website' in str(s).lower() or 'web' in str(s).lower()]
-        
-        for source in sources:
-            source_new_df = original_new_df[original_new_df['source'] == source]
-            
+        # Use all new rows to get all sources for display purposes
+        source_groups = all_new_keys.groupby("source", sort=False).indices
+
+        for source in pd.unique(all_new_keys['source']):
             # For tenant analysis, only process Website sources
-            # Facebook/Instagram are kept for display but not used in tenant comparison
-            if website_only and source.lower() not in [s.lower() for s in website_sources]:
-                # Skip Facebook/Instagram for tenant analysis
+            # Facebook/Instagram are post data, not tenant data
+            if website_only and not _is_website_source(source):
                 continue
-            
-            source_new_shops = source_new_df[
-                ~source_new_df["shop_key"].isin(old_df["shop_key"])
-            ]
-            
-            source_still_existing = source_new_df[
-                source_new_df["shop_key"].isin(old_df["shop_key"])
-            ]
-            
-            source_merged = pd.merge(
-                old_df,
-                source_new_df,
-                on="shop_key",
-                suffixes=("_old", "_new")
-            )
-            
-            source_shifted = source_merged[
-                source_merged["floor_old"] != source_merged["floor_new"]
-            ][
-                ["shop_name_old", "floor_old", "floor_new"]
-            ].rename(columns={"shop_name_old": "shop_name"}) if not source_merged.empty else pd.DataFrame()
-            
+
+            source_new_keys = all_new_keys.iloc[source_groups.get(source, [])]
+            if len(source_new_keys) == len(new_keys) and (source_new_keys["pos"].to_numpy() == new_keys["pos"].to_numpy()).all():
+                source_diff = overall  # same rows as the overall comparison (e.g. a single website source)
+            else:
+                source_diff = _diff(old_df, old_cols, old_keys, new_df, new_cols, source_new_keys, tiers)
+
             source_comparisons[source] = {
                 "stats": {
-                    "old_count": len(old_df),
-                    "new_count": len(source_new_df),
-                    "new_shops": len(source_new_shops),
+                    "old_count": len(old_keys),
+                    "new_count": len(source_new_keys),
+                    "new_shops": len(source_diff["new_shops"]),
                     "vacated_shops": 0,  # Vacated shops are from old data, not source-specific
-                    "shifted_shops": len(source_shifted),
-                    "still_existing": len(source_still_existing)
+                    "shifted_shops": len(source_diff["shifted_shops"]),
+                    "still_existing": len(source_diff["still_existing"])
                 },
-                "new_shops": source_new_shops[["shop_name", "phone", "floor"]].to_dict("records") if not source_new_shops.empty else [],
+                "new_shops": source_diff["new_shops"],
                 "vacated_shops": [],  # Vacated shops are from old data
-                "shifted_shops": source_shifted.to_dict("records") if not source_shifted.empty else [],
-                "still_existing": source_still_existing[["shop_name", "phone", "floor"]].to_dict("records") if not source_still_existing.empty else []
+                "shifted_shops": source_diff["shifted_shops"],
+                "still_existing": source_diff["still_existing"]
             }
-        
+
         result["by_source"] = source_comparisons
 
     return result
@@ -192,8 +250,8 @@ def merge_shops_to_tenant_list(existing_tenant_list, newly_extracted_shops):
         raise ValueError("Newly extracted shops must have 'shop_name' column")
     
     # Normalize shop names for duplicate detection
-    existing_df["shop_key"] = existing_df["shop_name"].apply(normalize_text)
-    new_df["shop_key"] = new_df["shop_name"].apply(normalize_text)
+    existing_df["shop_key"] = _normalize_series(existing_df["shop_name"])
+    new_df["shop_key"] = _normalize_series(new_df["shop_name"])
     
     # Find shops that are truly new (not in existing list)
     new_shops_only = new_df[~new_df["shop_key"].isin(existing_df["shop_key"])].copy()
@@ -208,7 +266,7 @@ def merge_shops_to_tenant_list(existing_tenant_list, newly_extracted_shops):
     merged_df = pd.concat([existing_df, new_shops_only], ignore_index=True)
     
     # Remove any duplicate shop names (case-insensitive) that might have been created
-    merged_df["shop_key"] = merged_df["shop_name"].apply(normalize_text)
+    merged_df["shop_key"] = _normalize_series(merged_df["shop_name"])
     merged_df = merged_df.drop_duplicates(subset=['shop_key'], keep='first')
     merged_df = merged_df.drop(columns=['shop_key'])
     
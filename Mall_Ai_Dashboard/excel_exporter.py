@@ -1,10 +1,18 @@
 import pandas as pd
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.utils import column_index_from_string, range_boundaries
 from datetime import datetime
 from urllib.parse import urlparse
 import re
+from abc import ABC, abstractmethod
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    xlsxwriter = None
+    XLSXWRITER_AVAILABLE = False
 
 
 def create_mall_excel_export(
@@ -12,7 +20,8 @@ def create_mall_excel_export(
     structured_data=None,
     llm_json=None,
     input_url="",
-    output_buffer=None
+    output_buffer=None,
+    extracted_text_path=None,
 ):
     """
     Create an Excel file with 7 tabs:
@@ -23,22 +32,24 @@ def create_mall_excel_export(
     5. AI Analysis Report
     6. Facebook Scratch
     7. Instagram Scratch
-    
+
+    Sheets are streamed row by row (xlsxwriter constant_memory when installed,
+    else openpyxl) with shared named styles, so large malls export quickly.
+
     Args:
         scraped_df: DataFrame with scraped tenant data
         structured_data: Comparison data structure
         llm_json: LLM analysis results
         input_url: URL(s) used for scraping
         output_buffer: BytesIO buffer to write to (if None, creates new)
+        extracted_text_path: Extracted page text of the website scrape (scrape_and_prepare's
+            text_path), read for the Coming Soon tab
     """
     from io import BytesIO
     
     if output_buffer is None:
         output_buffer = BytesIO()
     
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove default sheet
-    
     # Extract metadata - first try from llm_json, then from input_url
     metadata = _extract_metadata(input_url, llm_json)
 
@@ -66,8 +77,6 @@ def create_mall_excel_export(
             
             # Extract website URL from input_url (not Facebook/Instagram)
             if input_url:
-                import re
-                from urllib.parse import urlparse
                 url_pattern = re.compile(r"https?://[^\s,\n]+")
                 urls = url_pattern.findall(input_url)
                 for url in urls:
@@ -76,21 +85,18 @@ def create_mall_excel_export(
                         website_url = url
                         break
             
-            # Try to read from last_extracted_text_path.txt
-            if os.path.exists("last_extracted_text_path.txt"):
-                with open("last_extracted_text_path.txt", "r", encoding="utf-8") as f:
-                    text_file_path = f.read().strip()
-                    if os.path.exists(text_file_path):
-                        with open(text_file_path, "r", encoding="utf-8") as text_file:
-                            # Skip header lines and get the actual text content
-                            lines = text_file.readlines()
-                            # Find the separator line (=====)
-                            start_idx = 0
-                            for i, line in enumerate(lines):
-                                if "=" * 80 in line or "=" * 40 in line:
-                                    start_idx = i + 1
-                                    break
-                            extracted_text = "\n".join(lines[start_idx:])
+            # Read the website scrape's extracted text file
+            if extracted_text_path and os.path.exists(extracted_text_path):
+                with open(extracted_text_path, "r", encoding="utf-8") as text_file:
+                    # Skip header lines and get the actual text content
+                    lines = text_file.readlines()
+                    # Find the separator line (=====)
+                    start_idx = 0
+                    for i, line in enumerate(lines):
+                        if "=" * 80 in line or "=" * 40 in line:
+                            start_idx = i + 1
+                            break
+                    extracted_text = "\n".join(lines[start_idx:])
             
             # If we have extracted text, use AI to extract coming soon shops
             if extracted_text and len(extracted_text.strip()) > 50:
@@ -112,8 +118,7 @@ def create_mall_excel_export(
                 scraped_df["source"].astype(str).str.lower().str.contains("website", na=False)
             ]
         seen_normalized = {s.strip().lower() for s in coming_soon_shops}
-        for _, row in website_df.iterrows():
-            name = row.get("shop_name")
+        for name in website_df["shop_name"].tolist():
             if pd.isna(name) or not isinstance(name, str):
                 continue
             if "coming soon" not in name.lower() and "opening soon" not in name.lower():
@@ -159,16 +164,17 @@ def create_mall_excel_export(
         pass
 
     # Create tabs
-    _create_meta_data_tab(wb, metadata)
-    _create_existing_tenants_tab(wb, scraped_df, structured_data, google_search_results=google_search_results)
-    _create_coming_soon_tab(wb, structured_data, coming_soon_shops=coming_soon_shops)
-    _create_vacated_shops_tab(wb, structured_data)
-    _create_ai_analysis_tab(wb, llm_json, structured_data)
-    _create_facebook_scratch_tab(wb, scraped_df)
-    _create_instagram_scratch_tab(wb, scraped_df)
-    _create_serp_scratch_tab(wb, google_search_results)
-    
-    wb.save(output_buffer)
+    book = _ExportBook(output_buffer)
+    _create_meta_data_tab(book, metadata)
+    _create_existing_tenants_tab(book, scraped_df, structured_data, google_search_results=google_search_results)
+    _create_coming_soon_tab(book, structured_data, coming_soon_shops=coming_soon_shops)
+    _create_vacated_shops_tab(book, structured_data)
+    _create_ai_analysis_tab(book, llm_json, structured_data)
+    _create_facebook_scratch_tab(book, scraped_df)
+    _create_instagram_scratch_tab(book, scraped_df)
+    _create_serp_scratch_tab(book, google_search_results)
+
+    book.close()
     output_buffer.seek(0)
     return output_buffer
 
@@ -187,8 +193,6 @@ def create_existing_tenant_research_only_export(
     if output_buffer is None:
         output_buffer = BytesIO()
 
-    wb = Workbook()
-    wb.remove(wb.active)
     # For existing-tenant-only export, fetch SERP so column L/M can be filled
     google_search_results = []
     try:
@@ -215,12 +219,17 @@ def create_existing_tenant_research_only_export(
             google_search_results = fetch_mall_news(mall_name, address, max_results=15)
     except Exception:
         pass
-    _create_existing_tenants_tab(wb, scraped_df, structured_data, google_search_results=google_search_results)
-    wb.save(output_buffer)
+    book = _ExportBook(output_buffer)
+    _create_existing_tenants_tab(book, scraped_df, structured_data, google_search_results=google_search_results)
+    book.close()
     output_buffer.seek(0)
     return output_buffer
 
 
+# Generic words ignored when matching tenant names against posts
+_MATCH_STOPWORDS = ("the", "and", "or", "for", "with", "mall", "store", "shop")
+
+
 def _score_post_for_tenant(post_text: str, tenant_name: str) -> int:
     """
     Score how strongly a Facebook/Instagram post matches a tenant name.
@@ -243,7 +252,7 @@ def _score_post_for_tenant(post_text: str, tenant_name: str) -> int:
     tenant_words = [
         w
         for w in tenant_lower.split()
-        if len(w) > 2 and w not in ["the", "and", "or", "for", "with", "mall", "store", "shop"]
+        if len(w) > 2 and w not in _MATCH_STOPWORDS
     ]
     if not tenant_words:
         tenant_words = [tenant_lower]
@@ -515,35 +524,227 @@ def _extract_metadata(input_url, llm_json=None):
     return metadata
 
 
-def _create_meta_data_tab(wb, metadata):
+# Cell styles shared by every sheet. Each is registered once per workbook (an
+# xlsxwriter Format or an openpyxl NamedStyle) and cells refer to it by name,
+# instead of building Font/Fill/Border objects per cell.
+_STYLES = {
+    "meta_header": {"bold": True, "fill": "90EE90", "align": "center", "valign": "center", "border": True},
+    "header": {"bold": True, "color": "FFFFFF", "fill": "800000", "align": "center", "valign": "center"},
+    "header_wrap": {"bold": True, "color": "FFFFFF", "fill": "800000", "align": "center", "valign": "center",
+                    "wrap": True},
+    "header_border": {"bold": True, "color": "FFFFFF", "fill": "800000", "align": "center", "valign": "center",
+                      "border": True},
+    "center_wrap": {"align": "center", "valign": "center", "wrap": True},
+    "wrap_top": {"align": "left", "valign": "top", "wrap": True},
+    "border": {"border": True},
+    "border_center": {"align": "center", "valign": "center", "border": True},
+    "border_top": {"align": "left", "valign": "top", "border": True},
+    "border_wrap_top": {"align": "left", "valign": "top", "wrap": True, "border": True},
+}
+
+
+def _xlsxwriter_format(spec):
+    fmt = {"font_size": 11}
+    if spec.get("bold"):
+        fmt["bold"] = True
+    if spec.get("color"):
+        fmt["font_color"] = "#" + spec["color"]
+    if spec.get("fill"):
+        fmt["bg_color"] = "#" + spec["fill"]
+        fmt["pattern"] = 1
+    if spec.get("align"):
+        fmt["align"] = spec["align"]
+    if spec.get("valign"):
+        fmt["valign"] = "vcenter" if spec["valign"] == "center" else spec["valign"]
+    if spec.get("wrap"):
+        fmt["text_wrap"] = True
+    if spec.get("border"):
+        fmt["border"] = 1
+    return fmt
+
+
+def _openpyxl_style(name, spec):
+    style = NamedStyle(name=f"mall_{name}")
+    style.font = Font(bold=spec.get("bold", False), color=spec.get("color"), size=11)
+    if spec.get("fill"):
+        style.fill = PatternFill(start_color=spec["fill"], end_color=spec["fill"], fill_type="solid")
+    style.alignment = Alignment(horizontal=spec.get("align"), vertical=spec.get("valign"),
+                                wrap_text=spec.get("wrap", False))
+    if spec.get("border"):
+        thin = Side(style='thin')
+        style.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    return style
+
+
+def _cell_value(value):
+    """Plain Python value for a cell; None (nothing written) for missing values and NaN."""
+    if value is None:
+        return None
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        value = value.item()  # numpy scalar
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+class _ExportSheet(ABC):
+    """
+    One sheet written strictly top to bottom with append(), like a report printer.
+
+    merge() declares a merged range and must be called before the range's first
+    row is appended; the top-left cell holds the value and style, covered cells
+    stay empty.
+    """
+
+    def __init__(self, book, ws):
+        self.book = book
+        self.ws = ws
+        self.row = 0  # last row written (1-based)
+        self._merges = []
+        self._covered = {}  # row -> [(col, (anchor row, anchor col))]
+        self._anchor_styles = {}  # (anchor row, anchor col) -> style
+
+    def merge(self, cell_range):
+        min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+        self._merges.append((min_row, min_col, max_row, max_col))
+        self._anchor_styles[(min_row, min_col)] = None
+        for r in range(min_row, max_row + 1):
+            for c in range(min_col, max_col + 1):
+                if (r, c) != (min_row, min_col):
+                    self._covered.setdefault(r, []).append((c, (min_row, min_col)))
+
+    def append(self, values=(), styles=None):
+        """Write the next row. `styles` is one style name for the whole row or a list per cell."""
+        self.row += 1
+        r = self.row
+        self._start_row(r, [m for m in self._merges if m[0] == r])
+        covered = dict(self._covered.pop(r, ()))
+        for col, value in enumerate(values, start=1):
+            value = _cell_value(value)
+            if col in covered or value is None:
+                continue
+            style = styles if styles is None or isinstance(styles, str) else styles[col - 1]
+            if (r, col) in self._anchor_styles:
+                self._anchor_styles[(r, col)] = style
+            self._write(r, col, value, style)
+        for col, anchor in covered.items():
+            self._write_covered(r, col, self._anchor_styles[anchor])
+
+    def widths(self, widths):
+        """Set column widths from {"A": 40, ...}."""
+        for letter, width in widths.items():
+            self._width(letter, width)
+
+    # Backend hooks
+    def _start_row(self, r, merges):
+        pass
+
+    @abstractmethod
+    def _write(self, r, col, value, style):
+        """Write one value cell."""
+
+    def _write_covered(self, r, col, style):
+        pass
+
+    @abstractmethod
+    def _width(self, letter, width):
+        """Set one column's width."""
+
+
+class _XlsxWriterSheet(_ExportSheet):
+    def _start_row(self, r, merges):
+        # constant_memory flushes a row as soon as a later one is touched, so merges are
+        # registered while their first row is current, without xlsxwriter's blank padding
+        # (padding the lower rows of a vertical merge would flush this row early)
+        for first_row, first_col, last_row, last_col in merges:
+            self.ws.merge_range(first_row - 1, first_col - 1, last_row - 1, last_col - 1, "")
+
+    def _write(self, r, col, value, style):
+        fmt = self.book.formats.get(style)
+        if isinstance(value, bool):
+            self.ws.write_boolean(r - 1, col - 1, value, fmt)
+        elif isinstance(value, (int, float)):
+            self.ws.write_number(r - 1, col - 1, value, fmt)
+        else:
+            self.ws.write_string(r - 1, col - 1, str(value), fmt)
+
+    def _write_covered(self, r, col, style):
+        if style:
+            self.ws.write_blank(r - 1, col - 1, None, self.book.formats[style])
+
+    def _width(self, letter, width):
+        idx = column_index_from_string(letter) - 1
+        self.ws.set_column(idx, idx, width)
+
+
+class _OpenpyxlSheet(_ExportSheet):
+    def _write(self, r, col, value, style):
+        cell = self.ws.cell(row=r, column=col, value=value)
+        if style:
+            cell.style = f"mall_{style}"
+
+    def _width(self, letter, width):
+        self.ws.column_dimensions[letter].width = width
+
+    def close(self):
+        for first_row, first_col, last_row, last_col in self._merges:
+            self.ws.merge_cells(start_row=first_row, start_column=first_col, end_row=last_row, end_column=last_col)
+
+
+class _ExportBook:
+    """
+    Workbook written row by row into `output_buffer`.
+
+    Uses xlsxwriter in constant_memory mode when it is installed, so each row is
+    flushed to a temp file as soon as the next one starts and memory stays flat
+    however many tenants and posts there are. Falls back to openpyxl (which
+    cannot merge cells in write-only mode) with the same named styles.
+    """
+
+    def __init__(self, output_buffer):
+        self.sheets = []
+        if XLSXWRITER_AVAILABLE:
+            self.wb = xlsxwriter.Workbook(output_buffer, {"constant_memory": True})
+            self.formats = {name: self.wb.add_format(_xlsxwriter_format(spec)) for name, spec in _STYLES.items()}
+        else:
+            self.output_buffer = output_buffer
+            self.wb = Workbook()
+            self.wb.remove(self.wb.active)  # Remove default sheet
+            for name, spec in _STYLES.items():
+                self.wb.add_named_style(_openpyxl_style(name, spec))
+
+    def sheet(self, title):
+        if XLSXWRITER_AVAILABLE:
+            sheet = _XlsxWriterSheet(self, self.wb.add_worksheet(title))
+        else:
+            sheet = _OpenpyxlSheet(self, self.wb.create_sheet(title))
+        self.sheets.append(sheet)
+        return sheet
+
+    def close(self):
+        if XLSXWRITER_AVAILABLE:
+            self.wb.close()
+        else:
+            for sheet in self.sheets:
+                sheet.close()
+            self.wb.save(self.output_buffer)
+
+
+def _column(df, name, default=None):
+    """Values of column `name` as a list (`default` per row when the column is missing)."""
+    if name in df.columns:
+        return df[name].tolist()
+    return [default] * len(df)
+
+
+def _create_meta_data_tab(book, metadata):
     """Create Mall Meta Data tab"""
-    ws = wb.create_sheet("Mall Meta Data")
-    
-    # Header style
-    header_fill = PatternFill(start_color="90EE90", end_color="90EE90", fill_type="solid")
-    header_font = Font(bold=True, size=11)
-    
-    # Border style
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    center_align = Alignment(horizontal="center", vertical="center")
-    
+    ws = book.sheet("Mall Meta Data")
+
     # Headers
-    ws["A2"] = "Meta Data"
-    ws["B2"] = "Value"
-    ws["A2"].fill = header_fill
-    ws["B2"].fill = header_fill
-    ws["A2"].font = header_font
-    ws["B2"].font = header_font
-    ws["A2"].alignment = center_align
-    ws["B2"].alignment = center_align
-    ws["A2"].border = thin_border
-    ws["B2"].border = thin_border
-    
+    ws.append([])
+    ws.append(["Meta Data", "Value"], "meta_header")
+
     # Data rows
     rows = [
         ("Mall Name", metadata.get("mall_name", "Not Available")),
@@ -566,122 +767,113 @@ def _create_meta_data_tab(wb, metadata):
         ])
 
     rows.extend(scrape_stats)
-    
-    start_row = 3
-    for i, (key, value) in enumerate(rows):
-        row_num = start_row + i
-        
+
+    for key, value in rows:
         # Robustly handle list inputs (e.g. LLM returns list of hashtags)
         if isinstance(value, list):
             value = " ".join(str(v) for v in value)
-        
-        c1 = ws.cell(row=row_num, column=1, value=key)
-        c2 = ws.cell(row=row_num, column=2, value=value)
-        c1.border = thin_border
-        c2.border = thin_border
-    
+        ws.append([key, value], "border")
+
     # Auto-adjust column widths
-    ws.column_dimensions['A'].width = 40
-    ws.column_dimensions['B'].width = 60
+    ws.widths({'A': 40, 'B': 60})
 
 
-def _create_existing_tenants_tab(wb, scraped_df, structured_data, google_search_results=None):
+def _tenant_match_keys(tenant_data):
+    """
+    (index, name, compact name, words) per named tenant. _score_post_for_tenant is only
+    positive when the compact name occurs in the post (spaces removed) or one of the words
+    occurs in it, so these substring checks skip the regex scoring for most tenants.
+    """
+    keys = []
+    for tenant_idx, tenant in enumerate(tenant_data):
+        tenant_name = tenant.get('name', '')
+        if not tenant_name:
+            continue
+        tenant_lower = str(tenant_name).lower().strip()
+        if not tenant_lower:
+            continue
+        words = [w for w in tenant_lower.split() if len(w) > 2 and w not in _MATCH_STOPWORDS] or [tenant_lower]
+        keys.append((tenant_idx, tenant_name, tenant_lower.replace(" ", ""), words))
+    return keys
+
+
+def _best_tenant_for_post(post_text, tenant_keys):
+    """Index of the tenant whose name best matches `post_text`, or None."""
+    post_lower = str(post_text).lower().strip()
+    post_compact = post_lower.replace(" ", "")
+    best_idx = None
+    best_score = 0
+    for tenant_idx, tenant_name, compact, words in tenant_keys:
+        if compact not in post_compact and not any(w in post_lower for w in words):
+            continue
+        score = _score_post_for_tenant(post_text, tenant_name)
+        if score > best_score:
+            best_score = score
+            best_idx = tenant_idx
+    return best_idx
+
+
+def _create_existing_tenants_tab(book, scraped_df, structured_data, google_search_results=None):
     """Create Existing Tennent Research tab with tenant-matched Facebook/Instagram posts.
     google_search_results: list of dicts from SERP (news/blogs) to fill column L and M for first row.
     """
     if google_search_results is None:
         google_search_results = []
-    ws = wb.create_sheet("Existing Tennent Research")
-    
-    # Header style (dark maroon background)
-    header_fill = PatternFill(start_color="800000", end_color="800000", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    
-    # Create headers (added column M: News/Blog URL)
-    headers = [
-        ["Si", "Proposed Floor Number", "Proposed Shop Number", "Tennent Name", 
+    ws = book.sheet("Existing Tennent Research")
+
+    # Row 1: group headers over B:C and D:E; the source columns (F-M) are merged over rows 1-2
+    ws.merge('B1:C1')
+    ws.merge('D1:E1')
+    for letter in "FGHIJKLM":
+        ws.merge(f'{letter}1:{letter}2')
+    ws.append(
+        [
+            None,
+            "Official Mall Directory List / Tennent Scrapping", None,
+            "Mall Directory List / Tennent Scrapping", None,
+            "Facebook Scrapping\nInformation from Facebook",
+            "Facebook Post URL\nURL of Facebook Post",
+            "Facebook Date/Time\nPost Date and Time",
+            "Instagram Scrapping\nInformation from Instagram",
+            "Instagram Post URL\nURL of Instagram Post",
+            "Instagram Date/Time\nPost Date and Time",
+            "Google API Search\nGeneral Information from Internet",
+            "News/Blog URL\nURL of News or Blog",
+        ],
+        [None, "header", None, "header", None] + ["center_wrap"] * 8,
+    )
+
+    # Row 2: column headers (added column M: News/Blog URL)
+    ws.append(
+        ["Si", "Proposed Floor Number", "Proposed Shop Number", "Tennent Name",
          "Information from Mall Website", "Facebook Scrapping", "Facebook Post URL", "Facebook Date/Time",
-         "Instagram Scrapping", "Instagram Post URL", "Instagram Date/Time", "Google API Search", "News/Blog URL"]
-    ]
-    
-    # Write headers
-    for col_idx, header in enumerate(headers[0], start=1):
-        cell = ws.cell(row=2, column=col_idx, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    
-    # Merge headers for source columns
-    ws.merge_cells('F1:F2')  # Facebook Scrapping
-    ws.merge_cells('G1:G2')  # Facebook Post URL
-    ws.merge_cells('H1:H2')  # Facebook Date/Time
-    ws.merge_cells('I1:I2')  # Instagram Scrapping
-    ws.merge_cells('J1:J2')  # Instagram Post URL
-    ws.merge_cells('K1:K2')  # Instagram Date/Time
-    ws.merge_cells('L1:L2')  # Google API Search
-    ws.merge_cells('M1:M2')  # News/Blog URL
-    
-    # Write main header
-    ws['B1'] = "Official Mall Directory List / Tennent Scrapping"
-    ws.merge_cells('B1:C1')
-    ws['B1'].fill = header_fill
-    ws['B1'].font = header_font
-    ws['B1'].alignment = Alignment(horizontal="center", vertical="center")
-    
-    ws['D1'] = "Mall Directory List / Tennent Scrapping"
-    ws.merge_cells('D1:E1')
-    ws['D1'].fill = header_fill
-    ws['D1'].font = header_font
-    ws['D1'].alignment = Alignment(horizontal="center", vertical="center")
-    
-    ws['F1'] = "Facebook Scrapping\nInformation from Facebook"
-    ws['F1'].alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    
-    ws['G1'] = "Facebook Post URL\nURL of Facebook Post"
-    ws['G1'].alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    
-    ws['H1'] = "Facebook Date/Time\nPost Date and Time"
-    ws['H1'].alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    
-    ws['I1'] = "Instagram Scrapping\nInformation from Instagram"
-    ws['I1'].alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    
-    ws['J1'] = "Instagram Post URL\nURL of Instagram Post"
-    ws['J1'].alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    
-    ws['K1'] = "Instagram Date/Time\nPost Date and Time"
-    ws['K1'].alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    
-    ws['L1'] = "Google API Search\nGeneral Information from Internet"
-    ws['L1'].alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    
-    ws['M1'] = "News/Blog URL\nURL of News or Blog"
-    ws['M1'].alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    
+         "Instagram Scrapping", "Instagram Post URL", "Instagram Date/Time", "Google API Search", "News/Blog URL"],
+        "header_wrap",
+    )
+
     # Prepare tenant data - website data in column E, Facebook data in column F, Instagram data in column G
     tenant_data = []
+    facebook_df = instagram_df = pd.DataFrame()
     if scraped_df is not None and not scraped_df.empty:
         # Separate website, Facebook, and Instagram data
         if 'source' in scraped_df.columns:
-            website_df = scraped_df[scraped_df['source'].str.lower().str.contains('website', na=False)]
-            facebook_df = scraped_df[scraped_df['source'].str.lower().str.contains('facebook', na=False)]
-            instagram_df = scraped_df[scraped_df['source'].str.lower().str.contains('instagram', na=False)]
+            source = scraped_df['source'].str.lower()
+            website_df = scraped_df[source.str.contains('website', na=False)]
+            facebook_df = scraped_df[source.str.contains('facebook', na=False)]
+            instagram_df = scraped_df[source.str.contains('instagram', na=False)]
         else:
             website_df = pd.DataFrame()
-            facebook_df = pd.DataFrame()
-            instagram_df = pd.DataFrame()
-        
+
         # Process website data - put in website column (E)
-        for idx, (_, row) in enumerate(website_df.iterrows(), start=1):
+        floors = _column(website_df, 'floor', '-')
+        names = _column(website_df, 'shop_name', '')
+        for idx, (floor, name) in enumerate(zip(floors, names), start=1):
             tenant_data.append({
                 'si': idx,
-                'floor': row.get('floor', '-'),
+                'floor': floor,
                 'shop_number': '-',
-                'name': row.get('shop_name', ''),
+                'name': name,
                 'website_info': 'Found',
-                'facebook_info': '',
-                'instagram_info': '',
-                'instagram_datetime': '',
                 'google_info': '',
                 'google_url': ''
             })
@@ -689,23 +881,23 @@ def _create_existing_tenants_tab(wb, scraped_df, structured_data, google_search_
         # Fallback: if no website rows, populate Existing Tenant Research from all scraped rows
         # so the sheet is never empty when there is scraped data (e.g. Facebook/Instagram only).
         if not tenant_data:
-            for idx, (_, row) in enumerate(scraped_df.iterrows(), start=1):
-                src = str(row.get('source', '')).lower()
-                is_web = 'website' in src
-                name = row.get('shop_name', '') or row.get('post_text', '') or row.get('full_text', '') or '-'
+            columns = zip(
+                _column(scraped_df, 'source', ''), _column(scraped_df, 'floor', '-'),
+                _column(scraped_df, 'shop_name', ''), _column(scraped_df, 'post_text', ''),
+                _column(scraped_df, 'full_text', ''),
+            )
+            for idx, (src, floor, shop_name, post_text, full_text) in enumerate(columns, start=1):
+                is_web = 'website' in str(src).lower()
                 tenant_data.append({
                     'si': idx,
-                    'floor': row.get('floor', '-'),
+                    'floor': floor,
                     'shop_number': '-',
-                    'name': name,
+                    'name': shop_name or post_text or full_text or '-',
                     'website_info': 'Found' if is_web else '',
-                    'facebook_info': '',
-                    'instagram_info': '',
-                    'instagram_datetime': '',
                     'google_info': '',
                     'google_url': ''
                 })
-    
+
     # Assign SERP news/blog results to tenant rows (AI extraction + tenant match, else score-based)
     serp_per_tenant = []  # list of (google_info, google_url) per tenant
     if google_search_results and tenant_data:
@@ -717,256 +909,156 @@ def _create_existing_tenants_tab(wb, scraped_df, structured_data, google_search_
                     tenant_data[idx]["google_url"] = urls
         except Exception:
             pass
-    
-    # Common alignment for text cells (wrap and top-align so long text goes to next line)
-    wrapped_top_align = Alignment(horizontal="left", vertical="top", wrap_text=True)
-
-    # Write website data first (columns A-E)
-    current_row = 3
-    for tenant in tenant_data:
-        ws.cell(row=current_row, column=1, value=tenant['si'])  # Si
-        ws.cell(row=current_row, column=2, value=tenant['floor'])  # Proposed Floor Number
-        ws.cell(row=current_row, column=3, value=tenant['shop_number'])  # Proposed Shop Number
-
-        # Tennent Name and info cells use wrapped alignment so text doesn't run horizontally forever
-        name_cell = ws.cell(row=current_row, column=4, value=tenant['name'])  # Tennent Name
-        name_cell.alignment = wrapped_top_align
-
-        web_cell = ws.cell(row=current_row, column=5, value=tenant['website_info'])  # Information from Mall Website
-        web_cell.alignment = wrapped_top_align
-
-        fb_cell = ws.cell(row=current_row, column=6, value=tenant['facebook_info'])  # Facebook Scrapping (initially empty)
-        fb_cell.alignment = wrapped_top_align
-
-        ig_cell = ws.cell(row=current_row, column=9, value=tenant['instagram_info'])  # Instagram Scrapping
-        ig_cell.alignment = wrapped_top_align
-
-        ws.cell(row=current_row, column=7, value='')  # Facebook Post URL (initially empty)
-        ws.cell(row=current_row, column=8, value='')  # Facebook Date/Time (initially empty)
-        ws.cell(row=current_row, column=10, value='')  # Instagram Post URL (initially empty)
-        ws.cell(row=current_row, column=11, value='')  # Instagram Date/Time (initially empty)
-        # Google API Search (L) and News/Blog URL (M): tenant-matched SERP data (like Facebook/Instagram)
-        ws.cell(row=current_row, column=12, value=tenant['google_info'])
-        ws.cell(row=current_row, column=13, value=tenant.get('google_url', ''))
-        ws.cell(row=current_row, column=12).alignment = wrapped_top_align
-        ws.cell(row=current_row, column=13).alignment = wrapped_top_align
-        current_row += 1
-    
-    # Match Facebook posts to tenant rows (choose BEST matching tenant per post)
-    if scraped_df is not None and not scraped_df.empty:
-        if 'source' in scraped_df.columns:
-            facebook_df = scraped_df[scraped_df['source'].str.lower().str.contains('facebook', na=False)]
 
-            for _, row in facebook_df.iterrows():
-                # Prefer post_text, then shop_name for matching
-                post_text = row.get('post_text', '') or row.get('shop_name', '')
-                if not post_text:
-                    continue
-
-                best_idx = None
-                best_score = 0
-                for tenant_idx, tenant in enumerate(tenant_data):
-                    tenant_name = tenant.get('name', '')
-                    if not tenant_name:
-                        continue
-                    score = _score_post_for_tenant(post_text, tenant_name)
-                    if score > best_score:
-                        best_score = score
-                        best_idx = tenant_idx
-
-                if best_idx is not None and best_score > 0:
-                    tenant_row = best_idx + 3  # +3 because first 2 rows are headers
-                    existing_fb = ws.cell(row=tenant_row, column=6).value or ''
-                    if existing_fb:
-                        new_content = f"{existing_fb}\n\n---\n\n{post_text}"
-                    else:
-                        new_content = post_text
-                    fb_cell = ws.cell(row=tenant_row, column=6, value=new_content)
-                    fb_cell.alignment = wrapped_top_align
-                    
-                    # Add Facebook post URL
-                    post_url = row.get('post_url', '') or ''
-                    existing_fb_url = ws.cell(row=tenant_row, column=7).value or ''  # Column G: Facebook Post URL
-                    if post_url:
-                        if existing_fb_url:
-                            new_url = f"{existing_fb_url}\n\n{post_url}"
-                        else:
-                            new_url = post_url
-                        fb_url_cell = ws.cell(row=tenant_row, column=7, value=new_url)
-                        fb_url_cell.alignment = wrapped_top_align
-                    
-                    # Add Facebook Date/Time (similar to Instagram)
-                    post_date = row.get('post_date', '') or ''
-                    if post_date:
-                        # Format the date/time for display
-                        date_time_display = post_date
-                        try:
-                            # Try to parse ISO format timestamp
-                            if 'T' in post_date or post_date.endswith('Z'):
-                                dt = datetime.fromisoformat(post_date.replace('Z', '+00:00'))
-                                date_time_display = dt.strftime('%Y-%m-%d %H:%M:%S')
-                            # If it's already a readable format, use it as-is
-                        except Exception:
-                            # If parsing fails, use the original value
-                            pass
-                        
-                        existing_fb_date = ws.cell(row=tenant_row, column=8).value or ''  # Column H: Facebook Date/Time
-                        if existing_fb_date:
-                            new_date = f"{existing_fb_date}\n\n{date_time_display}"
-                        else:
-                            new_date = date_time_display
-                        fb_date_cell = ws.cell(row=tenant_row, column=8, value=new_date)
-                        fb_date_cell.alignment = wrapped_top_align
-                
-    # Match Instagram posts to tenant rows (choose BEST matching tenant per post)
-    if scraped_df is not None and not scraped_df.empty:
-        if 'source' in scraped_df.columns:
-            instagram_df = scraped_df[scraped_df['source'].str.lower().str.contains('instagram', na=False)]
+    # Rows are written once, in order, so the Facebook/Instagram columns are collected per tenant first
+    n = len(tenant_data)
+    fb_text, fb_url, fb_date = [''] * n, [''] * n, [''] * n
+    ig_text, ig_url, ig_date = [''] * n, [''] * n, [''] * n
 
-            for _, row in instagram_df.iterrows():
-                # Prefer full_text, then shop_name
-                post_text = row.get('full_text', '') or row.get('shop_name', '')
-                if not post_text:
-                    continue
+    tenant_keys = _tenant_match_keys(tenant_data)
 
-                time_text = row.get('time', '')
-                datetime_val = row.get('datetime', '')
+    # Match Facebook posts to tenant rows (choose BEST matching tenant per post)
+    columns = zip(_column(facebook_df, 'post_text', ''), _column(facebook_df, 'shop_name', ''),
+                  _column(facebook_df, 'post_url', ''), _column(facebook_df, 'post_date', ''))
+    for post_text, shop_name, post_url, post_date in columns:
+        # Prefer post_text, then shop_name for matching
+        post_text = post_text or shop_name
+        if not post_text:
+            continue
+        best_idx = _best_tenant_for_post(post_text, tenant_keys)
+        if best_idx is None:
+            continue
+        existing_fb = fb_text[best_idx] or ''
+        fb_text[best_idx] = f"{existing_fb}\n\n---\n\n{post_text}" if existing_fb else post_text
+
+        # Add Facebook post URL
+        post_url = post_url or ''
+        if post_url:
+            existing_fb_url = fb_url[best_idx] or ''
+            fb_url[best_idx] = f"{existing_fb_url}\n\n{post_url}" if existing_fb_url else post_url
+
+        # Add Facebook Date/Time (similar to Instagram)
+        post_date = post_date or ''
+        if post_date:
+            # Format the date/time for display
+            date_time_display = post_date
+            try:
+                # Try to parse ISO format timestamp
+                if 'T' in post_date or post_date.endswith('Z'):
+                    dt = datetime.fromisoformat(post_date.replace('Z', '+00:00'))
+                    date_time_display = dt.strftime('%Y-%m-%d %H:%M:%S')
+                # If it's already a readable format, use it as-is
+            except Exception:
+                # If parsing fails, use the original value
+                pass
+            existing_fb_date = fb_date[best_idx] or ''
+            fb_date[best_idx] = f"{existing_fb_date}\n\n{date_time_display}" if existing_fb_date else date_time_display
 
-                # Format date/time
-                date_time_display = ''
-                if datetime_val:
-                    try:
-                        dt = datetime.fromisoformat(datetime_val.replace('Z', '+00:00'))
-                        date_time_display = dt.strftime('%Y-%m-%d %H:%M:%S')
-                        if time_text:
-                            date_time_display += f' ({time_text})'
-                    except Exception:
-                        if time_text and datetime_val:
-                            date_time_display = f"{time_text} | {datetime_val}"
-                        elif datetime_val:
-                            date_time_display = datetime_val
-                        elif time_text:
-                            date_time_display = time_text
+    # Match Instagram posts to tenant rows (choose BEST matching tenant per post)
+    columns = zip(_column(instagram_df, 'full_text', ''), _column(instagram_df, 'shop_name', ''),
+                  _column(instagram_df, 'post_url', ''), _column(instagram_df, 'time', ''),
+                  _column(instagram_df, 'datetime', ''))
+    for post_text, shop_name, post_url, time_text, datetime_val in columns:
+        # Prefer full_text, then shop_name
+        post_text = post_text or shop_name
+        if not post_text:
+            continue
+
+        # Format date/time
+        date_time_display = ''
+        if datetime_val:
+            try:
+                dt = datetime.fromisoformat(datetime_val.replace('Z', '+00:00'))
+                date_time_display = dt.strftime('%Y-%m-%d %H:%M:%S')
+                if time_text:
+                    date_time_display += f' ({time_text})'
+            except Exception:
+                if time_text and datetime_val:
+                    date_time_display = f"{time_text} | {datetime_val}"
+                elif datetime_val:
+                    date_time_display = datetime_val
                 elif time_text:
                     date_time_display = time_text
+        elif time_text:
+            date_time_display = time_text
+
+        best_idx = _best_tenant_for_post(post_text, tenant_keys)
+        if best_idx is None:
+            continue
+        existing_ig = ig_text[best_idx] or ''
+        ig_text[best_idx] = f"{existing_ig}\n\n---\n\n{post_text}" if existing_ig else post_text
+
+        # Add Instagram post URL
+        post_url = post_url or ''
+        if post_url:
+            existing_ig_url = ig_url[best_idx] or ''
+            ig_url[best_idx] = f"{existing_ig_url}\n\n{post_url}" if existing_ig_url else post_url
+
+        existing_dt = ig_date[best_idx] or ''
+        if existing_dt and date_time_display:
+            ig_date[best_idx] = f"{existing_dt}\n{date_time_display}"
+        elif date_time_display:
+            ig_date[best_idx] = date_time_display
+
+    # Tennent Name and info cells use wrapped, top-aligned text so long text goes to the next line
+    for i, tenant in enumerate(tenant_data):
+        ws.append(
+            [tenant['si'], tenant['floor'], tenant['shop_number'], tenant['name'], tenant['website_info'],
+             fb_text[i], fb_url[i], fb_date[i], ig_text[i], ig_url[i], ig_date[i],
+             tenant['google_info'], tenant.get('google_url', '')],
+            [None, None, None, "wrap_top", "wrap_top",
+             "wrap_top", "wrap_top" if fb_url[i] else None, "wrap_top" if fb_date[i] else None,
+             "wrap_top", "wrap_top" if ig_url[i] else None, None,
+             "wrap_top", "wrap_top"],
+        )
 
-                best_idx = None
-                best_score = 0
-                for tenant_idx, tenant in enumerate(tenant_data):
-                    tenant_name = tenant.get('name', '')
-                    if not tenant_name:
-                        continue
-                    score = _score_post_for_tenant(post_text, tenant_name)
-                    if score > best_score:
-                        best_score = score
-                        best_idx = tenant_idx
-
-                if best_idx is not None and best_score > 0:
-                    tenant_row = best_idx + 3
-                    existing_ig = ws.cell(row=tenant_row, column=9).value or ''  # Column I: Instagram Scrapping
-                    if existing_ig:
-                        new_content = f"{existing_ig}\n\n---\n\n{post_text}"
-                    else:
-                        new_content = post_text
-                    ig_cell = ws.cell(row=tenant_row, column=9, value=new_content)  # Column I: Instagram Scrapping
-                    ig_cell.alignment = wrapped_top_align
-
-                    # Add Instagram post URL
-                    post_url = row.get('post_url', '') or ''
-                    existing_ig_url = ws.cell(row=tenant_row, column=10).value or ''  # Column J: Instagram Post URL
-                    if post_url:
-                        if existing_ig_url:
-                            new_url = f"{existing_ig_url}\n\n{post_url}"
-                        else:
-                            new_url = post_url
-                        ig_url_cell = ws.cell(row=tenant_row, column=10, value=new_url)
-                        ig_url_cell.alignment = wrapped_top_align
-
-                    existing_dt = ws.cell(row=tenant_row, column=11).value or ''  # Column K: Instagram Date/Time
-                    if existing_dt and date_time_display:
-                        ws.cell(row=tenant_row, column=11, value=f"{existing_dt}\n{date_time_display}")
-                    elif date_time_display:
-                        ws.cell(row=tenant_row, column=11, value=date_time_display)
-    
     # Auto-adjust column widths
-    ws.column_dimensions['A'].width = 5
-    ws.column_dimensions['B'].width = 20
-    ws.column_dimensions['C'].width = 20
-    ws.column_dimensions['D'].width = 30
-    ws.column_dimensions['E'].width = 40
-    ws.column_dimensions['F'].width = 30  # Facebook Scrapping
-    ws.column_dimensions['G'].width = 50  # Facebook Post URL
-    ws.column_dimensions['H'].width = 30  # Facebook Date/Time
-    ws.column_dimensions['I'].width = 30  # Instagram Scrapping
-    ws.column_dimensions['J'].width = 50  # Instagram Post URL
-    ws.column_dimensions['K'].width = 25  # Instagram Date/Time
-    ws.column_dimensions['L'].width = 40  # Google API Search
-    ws.column_dimensions['M'].width = 50  # News/Blog URL
-
-
-def _create_coming_soon_tab(wb, structured_data, coming_soon_shops=None):
+    ws.widths({
+        'A': 5,
+        'B': 20,
+        'C': 20,
+        'D': 30,
+        'E': 40,
+        'F': 30,  # Facebook Scrapping
+        'G': 50,  # Facebook Post URL
+        'H': 30,  # Facebook Date/Time
+        'I': 30,  # Instagram Scrapping
+        'J': 50,  # Instagram Post URL
+        'K': 25,  # Instagram Date/Time
+        'L': 40,  # Google API Search
+        'M': 50,  # News/Blog URL
+    })
+
+
+def _create_coming_soon_tab(book, structured_data, coming_soon_shops=None):
     """Create Coming Soon Tennent Research tab with real data extracted from website.
-    
+
     Args:
-        wb: Workbook object
+        book: _ExportBook being written
         structured_data: Comparison data structure (not used for coming soon)
         coming_soon_shops: List of shop names that are coming soon (extracted from website)
     """
-    ws = wb.create_sheet("Coming Soon Tennent Research")
-    
-    # Header style (dark maroon background)
-    header_fill = PatternFill(start_color="800000", end_color="800000", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    
+    ws = book.sheet("Coming Soon Tennent Research")
+
     # Simple header - just "Coming Soon" column
-    ws.merge_cells('A1:B1')
-    cell = ws.cell(row=1, column=1, value="Coming Soon Shops")
-    cell.fill = header_fill
-    cell.font = header_font
-    cell.alignment = Alignment(horizontal="center", vertical="center")
-    
+    ws.merge('A1:B1')
+    ws.append(["Coming Soon Shops"], "header")
+
     # Column headers
-    ws.cell(row=2, column=1, value="Si")
-    ws.cell(row=2, column=2, value="Coming Soon")
-    
-    # Style header row
-    for col in [1, 2]:
-        cell = ws.cell(row=2, column=col)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-    
-    # Add borders
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
+    ws.append(["Si", "Coming Soon"], "header")
+
     # Use real coming soon shops if provided, otherwise show message
     if coming_soon_shops and len(coming_soon_shops) > 0:
         # Write real coming soon shops data
         for idx, shop_name in enumerate(coming_soon_shops, start=1):
-            row = idx + 2
-            ws.cell(row=row, column=1, value=idx)  # Si
-            ws.cell(row=row, column=2, value=shop_name)  # Coming Soon
-            
-            # Add borders
-            for col in [1, 2]:
-                cell = ws.cell(row=row, column=col)
-                cell.border = thin_border
+            ws.append([idx, shop_name], "border")
     else:
         # No coming soon shops found - show message
-        row = 3
-        ws.merge_cells(f'A{row}:B{row}')
-        cell = ws.cell(row=row, column=1, value="No coming soon shops found on the website.")
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = thin_border
-    
+        ws.merge('A3:B3')
+        ws.append(["No coming soon shops found on the website."], "border_center")
+
     # Auto-adjust column widths
-    ws.column_dimensions['A'].width = 10
-    ws.column_dimensions['B'].width = 50
+    ws.widths({'A': 10, 'B': 50})
 
 
 def _is_likely_tenant_name(name):
@@ -992,38 +1084,18 @@ def _is_likely_tenant_name(name):
     return True
 
 
-def _create_vacated_shops_tab(wb, structured_data):
+def _create_vacated_shops_tab(book, structured_data):
     """Create Vacated Shops tab showing shops that were in old data but missing in new data.
     Uses ONLY website/directory tenant data for comparison — Facebook and Instagram are excluded."""
-    ws = wb.create_sheet("Vacated Shops")
-    
-    # Header style (dark maroon background)
-    header_fill = PatternFill(start_color="800000", end_color="800000", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    
+    ws = book.sheet("Vacated Shops")
+
     # Header - vacated shops based on website tenant list only
-    ws.merge_cells('A1:D1')
-    cell = ws.cell(row=1, column=1, value="Vacated Shops (Website directory only — shops in old data but missing from current website tenant list. Facebook/Instagram not used.)")
-    cell.fill = header_fill
-    cell.font = header_font
-    cell.alignment = Alignment(horizontal="center", vertical="center")
-    
+    ws.merge('A1:D1')
+    ws.append(["Vacated Shops (Website directory only — shops in old data but missing from current website tenant list. Facebook/Instagram not used.)"], "header")
+
     # Column headers
-    headers = ["Si", "Shop Name", "Phone", "Floor"]
-    for col_idx, header in enumerate(headers, start=1):
-        cell = ws.cell(row=2, column=col_idx, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-    
-    # Add borders
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
+    ws.append(["Si", "Shop Name", "Phone", "Floor"], "header")
+
     # Extract vacated shops from structured_data (website-only comparison)
     # vacated_shops at top level come from compare_shops(old_df, website_df, website_only=True)
     vacated_shops = []
@@ -1031,7 +1103,7 @@ def _create_vacated_shops_tab(wb, structured_data):
         raw = structured_data.get("vacated_shops", [])
         # First filter: exclude obvious Facebook/Instagram content (post captions, URLs, etc.)
         vacated_shops = [s for s in raw if _is_likely_tenant_name(s.get("shop_name", ""))]
-    
+
     # Validate shop names using AI to filter out non-shop entries (Facebook/Instagram post text, etc.)
     validated_vacated_shops = []
     if vacated_shops:
@@ -1039,15 +1111,15 @@ def _create_vacated_shops_tab(wb, structured_data):
             from llm_engine import validate_shop_names
             # Extract shop names for validation
             shop_names = [shop.get("shop_name", "") for shop in vacated_shops if shop.get("shop_name")]
-            
+
             if shop_names:
                 print(f"Validating {len(shop_names)} vacated shop names using AI...")
                 validated_names = validate_shop_names(shop_names)
                 print(f"AI validated {len(validated_names)} real shop names out of {len(shop_names)} entries")
-                
+
                 # Create a set of validated names for quick lookup
                 validated_set = {name.lower().strip() for name in validated_names}
-                
+
                 # Keep only shops with validated names
                 for shop in vacated_shops:
                     shop_name = shop.get("shop_name", "").strip()
@@ -1057,191 +1129,80 @@ def _create_vacated_shops_tab(wb, structured_data):
             print(f"Warning: Failed to validate shop names with AI: {e}, using all shops")
             # Fallback: use all shops if validation fails
             validated_vacated_shops = vacated_shops
-    
+
     # Use validated shops
     vacated_shops = validated_vacated_shops
-    
+
     # If no vacated shops, show a message
     if not vacated_shops:
-        row = 3
-        ws.merge_cells(f'A{row}:D{row}')
-        cell = ws.cell(row=row, column=1, value="No vacated shops found. All shops from old data are still present in the website directory.")
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = thin_border
+        ws.merge('A3:D3')
+        ws.append(["No vacated shops found. All shops from old data are still present in the website directory."], "border_center")
     else:
-        # Write validated vacated shops data
+        # Write validated vacated shops data (Si, Shop Name, Phone, Floor)
         for idx, shop in enumerate(vacated_shops, start=1):
-            row = idx + 2
-            ws.cell(row=row, column=1, value=idx)  # Si (serial number)
-            ws.cell(row=row, column=2, value=shop.get("shop_name", ""))  # Shop Name
-            ws.cell(row=row, column=3, value=shop.get("phone", ""))  # Phone
-            ws.cell(row=row, column=4, value=shop.get("floor", ""))  # Floor
-            
-            # Add borders to all cells
-            for col in [1, 2, 3, 4]:
-                cell = ws.cell(row=row, column=col)
-                cell.border = thin_border
-    
+            ws.append([idx, shop.get("shop_name", ""), shop.get("phone", ""), shop.get("floor", "")], "border")
+
     # Auto-adjust column widths
-    ws.column_dimensions['A'].width = 10
-    ws.column_dimensions['B'].width = 50
-    ws.column_dimensions['C'].width = 20
-    ws.column_dimensions['D'].width = 20
+    ws.widths({'A': 10, 'B': 50, 'C': 20, 'D': 20})
 
 
-def _create_ai_analysis_tab(wb, llm_json, structured_data=None):
+def _create_ai_analysis_tab(book, llm_json, structured_data=None):
     """Create AI Analysis Report tab"""
-    ws = wb.create_sheet("AI Analysis Report")
-    
-    # Header style (dark maroon background)
-    header_fill = PatternFill(start_color="800000", end_color="800000", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    
-    row = 1
-    
+    ws = book.sheet("AI Analysis Report")
+
     if not llm_json:
-        ws.cell(row=row, column=1, value="No AI analysis available")
+        ws.append(["No AI analysis available"])
         return
-    
-    # Facebook Data Report
-    if "facebook" in llm_json:
-        fb_data = llm_json["facebook"]
-        
-        # Header
-        ws.merge_cells(f'A{row}:B{row}')
-        cell = ws.cell(row=row, column=1, value="FACEBOOK DATA REPORT")
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        row += 1
-        
-        # Data rows
-        ws.cell(row=row, column=1, value="Occupancy Trend")
-        ws.cell(row=row, column=2, value=str(fb_data.get("occupancy_trend", "")))
-        row += 1
-        
-        ws.cell(row=row, column=1, value="New Shops")
-        new_shops = fb_data.get("new_shops", "")
-        ws.cell(row=row, column=2, value=str(new_shops) if new_shops else "")
-        row += 1
-        
-        ws.cell(row=row, column=1, value="Vacancy Changes")
-        vacancy = fb_data.get("vacancy_changes", "")
-        ws.cell(row=row, column=2, value=str(vacancy) if isinstance(vacancy, bool) else str(vacancy))
-        row += 1
-        
-        ws.cell(row=row, column=1, value="Business Insights")
-        insights = fb_data.get("business_insights", [])
-        if insights:
-            insights_text = "• " + "\n• ".join(insights) if isinstance(insights, list) else str(insights)
-        else:
-            insights_text = ""
-        ws.cell(row=row, column=2, value=insights_text)
-        row += 1
-        
-        row += 1  # Blank row
-    
-    # Website Data Report
-    if "website" in llm_json:
-        web_data = llm_json["website"]
-        
-        # Header
-        ws.merge_cells(f'A{row}:B{row}')
-        cell = ws.cell(row=row, column=1, value="WEBSITE DATA REPORT")
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        row += 1
-        
-        # Data rows
-        ws.cell(row=row, column=1, value="Occupancy Trend")
-        ws.cell(row=row, column=2, value=str(web_data.get("occupancy_trend", "")))
-        row += 1
-        
-        ws.cell(row=row, column=1, value="New Shops")
-        new_shops = web_data.get("new_shops", "")
-        ws.cell(row=row, column=2, value=str(new_shops) if new_shops else "")
-        row += 1
-        
-        ws.cell(row=row, column=1, value="Vacancy Changes")
-        vacancy = web_data.get("vacancy_changes", "")
-        ws.cell(row=row, column=2, value=str(vacancy) if isinstance(vacancy, bool) else str(vacancy))
-        row += 1
-        
-        ws.cell(row=row, column=1, value="Business Insights")
-        insights = web_data.get("business_insights", [])
-        if insights:
-            insights_text = "• " + "\n• ".join(insights) if isinstance(insights, list) else str(insights)
-        else:
-            insights_text = ""
-        ws.cell(row=row, column=2, value=insights_text)
-        row += 1
-        
-        row += 1  # Blank row
-    
-    # Instagram Data Report
-    if "instagram" in llm_json:
-        ig_data = llm_json["instagram"]
-        
+
+    # Facebook, Website and Instagram Data Reports
+    for source, title in (("facebook", "FACEBOOK DATA REPORT"),
+                          ("website", "WEBSITE DATA REPORT"),
+                          ("instagram", "INSTAGRAM DATA REPORT")):
+        if source not in llm_json:
+            continue
+        data = llm_json[source]
+
         # Header
-        ws.merge_cells(f'A{row}:B{row}')
-        cell = ws.cell(row=row, column=1, value="INSTAGRAM DATA REPORT")
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        row += 1
-        
+        ws.merge(f'A{ws.row + 1}:B{ws.row + 1}')
+        ws.append([title], "header")
+
         # Data rows
-        ws.cell(row=row, column=1, value="Occupancy Trend")
-        ws.cell(row=row, column=2, value=str(ig_data.get("occupancy_trend", "")))
-        row += 1
-        
-        ws.cell(row=row, column=1, value="New Shops")
-        new_shops = ig_data.get("new_shops", "")
-        ws.cell(row=row, column=2, value=str(new_shops) if new_shops else "")
-        row += 1
-        
-        ws.cell(row=row, column=1, value="Vacancy Changes")
-        vacancy = ig_data.get("vacancy_changes", "")
-        ws.cell(row=row, column=2, value=str(vacancy) if isinstance(vacancy, bool) else str(vacancy))
-        row += 1
-        
-        ws.cell(row=row, column=1, value="Business Insights")
-        insights = ig_data.get("business_insights", [])
+        ws.append(["Occupancy Trend", str(data.get("occupancy_trend", ""))])
+
+        new_shops = data.get("new_shops", "")
+        ws.append(["New Shops", str(new_shops) if new_shops else ""])
+
+        vacancy = data.get("vacancy_changes", "")
+        ws.append(["Vacancy Changes", str(vacancy)])
+
+        insights = data.get("business_insights", [])
         if insights:
             insights_text = "• " + "\n• ".join(insights) if isinstance(insights, list) else str(insights)
         else:
             insights_text = ""
-        ws.cell(row=row, column=2, value=insights_text)
-        row += 1
-        
-        row += 1  # Blank row
-    
+        ws.append(["Business Insights", insights_text])
+
+        ws.append([])  # Blank row
+
     # Add New Shops List Section if structured_data is available
     if structured_data and 'new_shops' in structured_data:
         new_shops = structured_data.get('new_shops', [])
         if new_shops:
-            row += 2  # Add blank rows
-            
+            ws.append([])  # Add blank rows
+            ws.append([])
+
             # Header for New Shops List
-            ws.merge_cells(f'A{row}:B{row}')
-            cell = ws.cell(row=row, column=1, value="NEW SHOPS LIST")
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            row += 1
-            
-            # List new shops (tenant name only)
+            ws.merge(f'A{ws.row + 1}:B{ws.row + 1}')
+            ws.append(["NEW SHOPS LIST"], "header")
+
+            # List new shops (tenant name only), each followed by a blank row
             for shop in new_shops:
                 shop_name = shop.get('shop_name', '') or ''
-                ws.cell(row=row, column=1, value="•")
-                ws.cell(row=row, column=2, value=shop_name)
-                row += 1
-                row += 1
-    
+                ws.append(["•", shop_name])
+                ws.append([])
+
     # Auto-adjust column widths
-    ws.column_dimensions['A'].width = 20
-    ws.column_dimensions['B'].width = 80
+    ws.widths({'A': 20, 'B': 80})
 
 
 def _parse_post_date_for_sort(date_str):
@@ -1261,51 +1222,43 @@ def _parse_post_date_for_sort(date_str):
         return datetime.min
 
 
-def _create_facebook_scratch_tab(wb, scraped_df):
+def _write_posts(ws, posts, empty_message):
+    """Write post rows (SN re-numbered 1, 2, 3... after sorting) or the empty-sheet message."""
+    if posts:
+        for sn, post in enumerate(posts, start=1):
+            ws.append([sn, post['date'], post['post'], post['url']],
+                      ["border_center", "border_top", "border_wrap_top", "border_top"])
+    else:
+        ws.merge('A2:D2')
+        ws.append([empty_message], "border_center")
+
+
+def _create_facebook_scratch_tab(book, scraped_df):
     """Create Facebook Scratch tab with all Facebook posts (SN, Date, Post, URL). Sorted by date, latest first."""
-    ws = wb.create_sheet("Facebook Scratch")
-    
-    # Header style (dark maroon background)
-    header_fill = PatternFill(start_color="800000", end_color="800000", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    
-    # Border style
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    center_align = Alignment(horizontal="center", vertical="center")
-    
+    ws = book.sheet("Facebook Scratch")
+
     # Headers
-    headers = ["SN", "Date", "Post", "Post URL"]
-    for col_idx, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = center_align
-        cell.border = thin_border
-    
+    ws.append(["SN", "Date", "Post", "Post URL"], "header_border")
+
     # Extract Facebook posts from scraped_df
     facebook_posts = []
     if scraped_df is not None and not scraped_df.empty:
         if 'source' in scraped_df.columns:
             facebook_df = scraped_df[scraped_df['source'].str.lower().str.contains('facebook', na=False)]
-            
-            for idx, (_, row) in enumerate(facebook_df.iterrows(), start=1):
+            has_shop_name = 'shop_name' in facebook_df.columns
+            columns = zip(_column(facebook_df, 'post_text'), _column(facebook_df, 'shop_name'),
+                          _column(facebook_df, 'post_date'), _column(facebook_df, 'post_url'),
+                          _column(facebook_df, 'phone'))
+
+            for idx, (raw_text, shop_name, raw_date, raw_url, phone) in enumerate(columns, start=1):
                 # Get post text - prefer 'post_text' column, fallback to 'shop_name'
-                post_text = ''
-                if 'post_text' in row and pd.notna(row.get('post_text')):
-                    post_text = str(row.get('post_text', ''))
-                if not post_text and 'shop_name' in row:
-                    post_text = str(row.get('shop_name', ''))
-                
+                post_text = str(raw_text) if pd.notna(raw_text) else ''
+                if not post_text and has_shop_name:
+                    post_text = str(shop_name)
+
                 # Get post date - prefer 'post_date' column, fallback to empty
-                post_date = ''
-                if 'post_date' in row and pd.notna(row.get('post_date')):
-                    post_date = str(row.get('post_date', ''))
-                
+                post_date = str(raw_date) if pd.notna(raw_date) else ''
+
                 # Format date if it's an ISO timestamp
                 if post_date and post_date.strip() and post_date != 'nan':
                     try:
@@ -1325,14 +1278,13 @@ def _create_facebook_scratch_tab(wb, scraped_df):
 
                 # Get post URL - prefer explicit 'post_url' column, fallback to phone if it looks like a URL
                 post_url = ''
-                if 'post_url' in row and pd.notna(row.get('post_url')):
-                    post_url = str(row.get('post_url', ''))
-                elif 'phone' in row and pd.notna(row.get('phone')):
-                    possible_url = str(row.get('phone', ''))
+                if pd.notna(raw_url):
+                    post_url = str(raw_url)
+                elif pd.notna(phone):
+                    possible_url = str(phone)
                     if 'http' in possible_url or 'facebook.com' in possible_url or possible_url.startswith('www.'):
                         post_url = possible_url
 
-                raw_date = row.get('post_date', '')
                 facebook_posts.append({
                     'sn': idx,
                     'date': post_date if post_date else '-',
@@ -1340,99 +1292,50 @@ def _create_facebook_scratch_tab(wb, scraped_df):
                     'url': post_url if post_url else '-',
                     '_sort_key': _parse_post_date_for_sort(raw_date if pd.notna(raw_date) else '')
                 })
-    
+
     # Sort by date, latest first
-    if facebook_posts:
-        facebook_posts.sort(key=lambda p: p['_sort_key'], reverse=True)
-    
-    # Write data rows (already sorted latest first)
-    if facebook_posts:
-        for row_idx, post in enumerate(facebook_posts, start=2):
-            # SN (re-number 1, 2, 3... after sort)
-            cell_sn = ws.cell(row=row_idx, column=1, value=row_idx - 1)
-            cell_sn.border = thin_border
-            cell_sn.alignment = center_align
-            
-            # Date
-            cell_date = ws.cell(row=row_idx, column=2, value=post['date'])
-            cell_date.border = thin_border
-            cell_date.alignment = Alignment(horizontal="left", vertical="top")
-            
-            # Post
-            cell_post = ws.cell(row=row_idx, column=3, value=post['post'])
-            cell_post.border = thin_border
-            cell_post.alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
-
-            # Post URL
-            cell_url = ws.cell(row=row_idx, column=4, value=post['url'])
-            cell_url.border = thin_border
-            cell_url.alignment = Alignment(horizontal="left", vertical="top")
-    else:
-        # No Facebook posts found
-        ws.cell(row=2, column=1, value="No Facebook posts found")
-        ws.merge_cells('A2:D2')
-        cell = ws.cell(row=2, column=1)
-        cell.alignment = center_align
-        cell.border = thin_border
-    
+    facebook_posts.sort(key=lambda p: p['_sort_key'], reverse=True)
+    _write_posts(ws, facebook_posts, "No Facebook posts found")
+
     # Auto-adjust column widths
-    ws.column_dimensions['A'].width = 10  # SN
-    ws.column_dimensions['B'].width = 20  # Date
-    ws.column_dimensions['C'].width = 80  # Post
-    ws.column_dimensions['D'].width = 60  # Post URL
+    ws.widths({
+        'A': 10,  # SN
+        'B': 20,  # Date
+        'C': 80,  # Post
+        'D': 60,  # Post URL
+    })
 
 
-def _create_instagram_scratch_tab(wb, scraped_df):
+def _create_instagram_scratch_tab(book, scraped_df):
     """Create Instagram Scratch tab with all Instagram posts (SN, Date/Time, Post, URL). Sorted by date, latest first."""
-    ws = wb.create_sheet("Instagram Scratch")
-
-    # Header style (dark maroon background)
-    header_fill = PatternFill(start_color="800000", end_color="800000", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-
-    # Border style
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    center_align = Alignment(horizontal="center", vertical="center")
+    ws = book.sheet("Instagram Scratch")
 
     # Headers
-    headers = ["SN", "Date/Time", "Post", "Post URL"]
-    for col_idx, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = center_align
-        cell.border = thin_border
+    ws.append(["SN", "Date/Time", "Post", "Post URL"], "header_border")
 
     instagram_posts = []
     if scraped_df is not None and not scraped_df.empty:
         if 'source' in scraped_df.columns:
             instagram_df = scraped_df[scraped_df['source'].str.lower().str.contains('instagram', na=False)]
+            has_shop_name = 'shop_name' in instagram_df.columns
+            columns = zip(_column(instagram_df, 'full_text'), _column(instagram_df, 'shop_name'),
+                          _column(instagram_df, 'datetime'), _column(instagram_df, 'time'),
+                          _column(instagram_df, 'post_date'), _column(instagram_df, 'post_url'),
+                          _column(instagram_df, 'phone'))
 
-            for idx, (_, row) in enumerate(instagram_df.iterrows(), start=1):
+            for idx, (raw_text, shop_name, raw_datetime, raw_time, raw_date, raw_url, phone) in enumerate(columns, start=1):
                 # Post text - prefer full_text, then shop_name
-                post_text = ''
-                if 'full_text' in row and pd.notna(row.get('full_text')):
-                    post_text = str(row.get('full_text', ''))
-                if not post_text and 'shop_name' in row:
-                    post_text = str(row.get('shop_name', ''))
+                post_text = str(raw_text) if pd.notna(raw_text) else ''
+                if not post_text and has_shop_name:
+                    post_text = str(shop_name)
 
                 # Date/time - prefer datetime, then time, then post_date
                 post_dt = ''
-                raw_date_for_sort = ''
-                if 'datetime' in row and pd.notna(row.get('datetime')):
-                    post_dt = str(row.get('datetime', ''))
-                    raw_date_for_sort = post_dt
-                elif 'time' in row and pd.notna(row.get('time')):
-                    post_dt = str(row.get('time', ''))
-                    raw_date_for_sort = post_dt
-                elif 'post_date' in row and pd.notna(row.get('post_date')):
-                    post_dt = str(row.get('post_date', ''))
-                    raw_date_for_sort = post_dt
+                for value in (raw_datetime, raw_time, raw_date):
+                    if pd.notna(value):
+                        post_dt = str(value)
+                        break
+                raw_date_for_sort = post_dt
 
                 # Format datetime if ISO
                 if post_dt and post_dt.strip() and post_dt != 'nan':
@@ -1447,10 +1350,10 @@ def _create_instagram_scratch_tab(wb, scraped_df):
 
                 # Post URL - prefer post_url, then phone if it's a URL
                 post_url = ''
-                if 'post_url' in row and pd.notna(row.get('post_url')):
-                    post_url = str(row.get('post_url', ''))
-                elif 'phone' in row and pd.notna(row.get('phone')):
-                    possible_url = str(row.get('phone', ''))
+                if pd.notna(raw_url):
+                    post_url = str(raw_url)
+                elif pd.notna(phone):
+                    possible_url = str(phone)
                     if 'http' in possible_url or 'instagram.com' in possible_url or possible_url.startswith('www.'):
                         post_url = possible_url
 
@@ -1463,90 +1366,41 @@ def _create_instagram_scratch_tab(wb, scraped_df):
                 })
 
     # Sort by date, latest first
-    if instagram_posts:
-        instagram_posts.sort(key=lambda p: p['_sort_key'], reverse=True)
-
-    # Write data rows (already sorted latest first)
-    if instagram_posts:
-        for row_idx, post in enumerate(instagram_posts, start=2):
-            # SN (re-number 1, 2, 3... after sort)
-            cell_sn = ws.cell(row=row_idx, column=1, value=row_idx - 1)
-            cell_sn.border = thin_border
-            cell_sn.alignment = center_align
-
-            # Date/Time
-            cell_date = ws.cell(row=row_idx, column=2, value=post['date'])
-            cell_date.border = thin_border
-            cell_date.alignment = Alignment(horizontal="left", vertical="top")
-
-            # Post
-            cell_post = ws.cell(row=row_idx, column=3, value=post['post'])
-            cell_post.border = thin_border
-            cell_post.alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
-
-            # Post URL
-            cell_url = ws.cell(row=row_idx, column=4, value=post['url'])
-            cell_url.border = thin_border
-            cell_url.alignment = Alignment(horizontal="left", vertical="top")
-    else:
-        ws.cell(row=2, column=1, value="No Instagram posts found")
-        ws.merge_cells('A2:D2')
-        cell = ws.cell(row=2, column=1)
-        cell.alignment = center_align
-        cell.border = thin_border
+    instagram_posts.sort(key=lambda p: p['_sort_key'], reverse=True)
+    _write_posts(ws, instagram_posts, "No Instagram posts found")
 
     # Auto-adjust column widths
-    ws.column_dimensions['A'].width = 10  # SN
-    ws.column_dimensions['B'].width = 25  # Date/Time
-    ws.column_dimensions['C'].width = 80  # Post
-    ws.column_dimensions['D'].width = 60  # Post URL
+    ws.widths({
+        'A': 10,  # SN
+        'B': 25,  # Date/Time
+        'C': 80,  # Post
+        'D': 60,  # Post URL
+    })
 
 
-def _create_serp_scratch_tab(wb, google_search_results):
+def _create_serp_scratch_tab(book, google_search_results):
     """Create Google SERP Scratch tab with all SERP API results (same structure as terminal output).
     Columns: SN, Title, General Information (snippet), URL, Source, Date.
     """
-    ws = wb.create_sheet("Google SERP Scratch")
-    header_fill = PatternFill(start_color="800000", end_color="800000", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    thin_border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    center_align = Alignment(horizontal="center", vertical="center")
+    ws = book.sheet("Google SERP Scratch")
 
-    headers = ["SN", "Title", "General Information", "URL", "Source", "Date"]
-    for col_idx, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = center_align
-        cell.border = thin_border
+    ws.append(["SN", "Title", "General Information", "URL", "Source", "Date"], "header_border")
 
     if google_search_results:
-        for row_idx, item in enumerate(google_search_results, start=2):
-            ws.cell(row=row_idx, column=1, value=row_idx - 1)
-            ws.cell(row=row_idx, column=2, value=(item.get("title") or "").strip())
-            ws.cell(row=row_idx, column=3, value=(item.get("snippet") or "").strip())
-            ws.cell(row=row_idx, column=4, value=(item.get("link") or "").strip())
-            ws.cell(row=row_idx, column=5, value=(item.get("source") or "").strip())
-            ws.cell(row=row_idx, column=6, value=(item.get("date") or "").strip())
-            for c in range(1, 7):
-                cell = ws.cell(row=row_idx, column=c)
-                cell.border = thin_border
-                cell.alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
+        for sn, item in enumerate(google_search_results, start=1):
+            ws.append(
+                [sn] + [(item.get(key) or "").strip() for key in ("title", "snippet", "link", "source", "date")],
+                "border_wrap_top",
+            )
     else:
-        ws.cell(row=2, column=1, value="No SERP API data found")
-        ws.merge_cells('A2:F2')
-        cell = ws.cell(row=2, column=1)
-        cell.alignment = center_align
-        cell.border = thin_border
-
-    ws.column_dimensions['A'].width = 8   # SN
-    ws.column_dimensions['B'].width = 35  # Title
-    ws.column_dimensions['C'].width = 60  # General Information
-    ws.column_dimensions['D'].width = 55  # URL
-    ws.column_dimensions['E'].width = 20  # Source
-    ws.column_dimensions['F'].width = 18  # Date
+        ws.merge('A2:F2')
+        ws.append(["No SERP API data found"], "border_center")
+
+    ws.widths({
+        'A': 8,   # SN
+        'B': 35,  # Title
+        'C': 60,  # General Information
+        'D': 55,  # URL
+        'E': 20,  # Source
+        'F': 18,  # Date
+    })
@@ -4,11 +4,10 @@ Adapted for integration with the mall AI dashboard.
 """
 import os
 import sys
-import time
 import pickle
 import re
-from datetime import datetime
-from typing import List, Dict, Optional
+from datetime import datetime, timedelta
+from typing import Callable, List, Dict, Optional
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -24,6 +23,14 @@ import pandas as pd
 import requests
 import json
 
+# Project root holds the shared chrome_helper / chrome_pool / http_client modules
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+import http_client
+import post_index
+from chrome_pool import DESKTOP_USER_AGENT, acquire_for, release_driver
+
 # Load environment variables
 load_dotenv()
 
@@ -99,34 +106,6 @@ def load_cookies(driver):
     return True
 
 
-def create_driver(headless: bool = True):
-    """Create and configure Chrome driver using shared chrome_helper."""
-    # Add parent directory so chrome_helper can be imported
-    _root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    if _root not in sys.path:
-        sys.path.insert(0, _root)
-    from chrome_helper import make_chrome_driver
-
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            driver = make_chrome_driver(
-                headless=headless,
-                user_agent=(
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/131.0.0.0 Safari/537.36"
-                ),
-            )
-            return driver
-        except Exception as e:
-            if attempt < max_retries - 1:
-                print(f"Chrome driver creation failed (attempt {attempt + 1}/{max_retries}), retrying...")
-                time.sleep(2)
-            else:
-                raise Exception(f"Failed to create Chrome driver after {max_retries} attempts: {e}")
-
-
 def is_noise_line(line: str) -> bool:
     """Check if a line is noise/metadata (page info, not post content)."""
     s = line.strip().lower()
@@ -1048,7 +1027,7 @@ Return ONLY the solved timestamp (no explanations, no markdown, just the timesta
             "max_tokens": 256,
         }
 
-        response = requests.post(
+        response = http_client.post(
             f"{OPENAI_BASE_URL}/chat/completions",
             headers=headers,
             json=body,
@@ -1121,6 +1100,72 @@ Return ONLY the solved timestamp (no explanations, no markdown, just the timesta
         return None
 
 
+
+def solve_jumbled_timestamps_batch(jumbled_texts: List[str]) -> List[Optional[str]]:
+    """Solve several jumbled timestamps with a single OpenAI call.
+
+    Same prompt rules and validation as solve_jumbled_timestamp_with_gemini(), but
+    all leftovers of a page go out as one numbered list instead of one call each.
+
+    Returns one solved timestamp (or None) per input, in input order.
+    """
+    results: List[Optional[str]] = [None] * len(jumbled_texts)
+    cleaned = {}
+    for i, text in enumerate(jumbled_texts):
+        c = clean_timestamp_noise(text) if text and len(text.strip()) >= 5 else ""
+        if c:
+            cleaned[i] = c
+    if not cleaned:
+        return results
+
+    numbered = "\n".join(f"{n}. {text}" for n, text in enumerate(cleaned.values(), 1))
+    prompt = f"""You are an expert at solving jumbled and obfuscated text. Each numbered line below holds the characters of one Facebook post timestamp that have been:
+- Split into multiple groups by CSS order values
+- Characters within each group may still be scrambled
+- May contain noise characters that need to be removed
+
+Jumbled timestamps:
+{numbered}
+
+For every line, reorder the characters into a valid, readable timestamp and drop noise. Facebook timestamp formats are typically:
+   - "12 January at 14:30"
+   - "5 Jan at 8:45 AM"
+   - "January 18 at 8:19 AM"
+   - "Yesterday at 7:07 PM"
+   - "Mon at 9:41 AM"
+   - "12/01/2024 at 14:30"
+   - "3h", "2d", "1w"
+Use "N/A" for a line you cannot reconstruct.
+
+Return ONLY a JSON object of the form {{"timestamps": ["...", "..."]}} with exactly {len(cleaned)} strings, in line order."""
+
+    from llm_engine import _call_openai_chat
+    raw = _call_openai_chat(
+        prompt,
+        temperature=0.1,
+        max_tokens=64 + 32 * len(cleaned),
+        response_format="json_object",
+        timeout_seconds=60,
+    )
+    if not raw:
+        return results
+    try:
+        solved_list = json.loads(raw).get("timestamps") or []
+    except (ValueError, AttributeError) as e:
+        print(f"Warning: Could not parse solved timestamps from OpenAI: {e}")
+        return results
+
+    for i, solved in zip(cleaned, solved_list):
+        solved = str(solved or "").strip().strip('"\'')
+        if solved.lower() in ['n/a', 'na', 'none', 'null', '']:
+            continue
+        has_time = bool(re.search(r'\d{1,2}:\d{2}', solved))
+        has_date = bool(re.search(r'\d', solved)) and any(month in solved.lower() for month in _TIMESTAMP_MONTHS)
+        if has_time or has_date or parse_facebook_timestamp(solved):
+            results[i] = solved
+    print(f"✅ OpenAI solved {sum(r is not None for r in results)}/{len(cleaned)} timestamps in one call")
+    return results
+
 def extract_post_timestamp(el, driver=None):
     """Extract timestamp from post element."""
     try:
@@ -1280,8 +1325,431 @@ def extract_post_timestamp(el, driver=None):
     return None
 
 
+_POST_URL_TOKENS = [
+    "/posts/",
+    "/photos/",
+    "/photo/",
+    "/videos/",
+    "/video/",
+    "/reel/",
+    "/permalink/",
+    "story_fbid",
+    "fbid="
+]
+_TIMESTAMP_MONTHS = ['jan','feb','mar','apr','may','jun','jul','aug','sep','oct','nov','dec']
+
+# Expands every "See more" in the first arguments[1] post elements matching XPath arguments[0],
+# waits arguments[2] ms once, then returns per post: the element, its main text, link hrefs and
+# the attributes extract_post_timestamp() reads (methods 1–4 and the final text fallback).
+# For obfuscated timestamps it also returns every character span of the tightest container
+# holding 6+ one/two-character leaf spans, with computed order, visibility and on-screen
+# position, so decode_timestamp_spans() can rebuild the visible string without more calls.
+_BULK_POSTS_JS = r"""
+const [xpath, limit, waitMs] = arguments;
+const done = arguments[arguments.length - 1];
+const snap = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const posts = [];
+for (let i = 0; i < snap.snapshotLength && posts.length < limit; i++) posts.push(snap.snapshotItem(i));
+
+const norm = (s) => (s || '').trim().split(/\s+/).filter(Boolean).join(' ');
+const visible = (e) => !!(e.offsetWidth || e.offsetHeight || e.getClientRects().length);
+let clicked = 0;
+for (const el of posts) {
+  for (const b of el.querySelectorAll("a, span, div, [role='button']")) {
+    const t = norm(b.textContent);
+    const isSeeMore = t === 'See more' || (b.getAttribute('role') === 'button' && t.includes('See more'));
+    if (isSeeMore && visible(b)) {
+      try { b.click(); clicked++; } catch (e) {}
+    }
+  }
+}
+
+const tsSpans = (el) => {
+  const leaves = Array.from(el.querySelectorAll('span')).filter((s) => {
+    const n = norm(s.textContent).length;
+    return !s.firstElementChild && n > 0 && n <= 2;
+  });
+  if (leaves.length < 6) return [];
+  const counts = new Map();
+  for (const s of leaves) {
+    for (let p = s.parentElement; p && p !== el; p = p.parentElement) counts.set(p, (counts.get(p) || 0) + 1);
+  }
+  let box = null;
+  for (const [node, n] of counts) {
+    if (n >= 6 && (!box || (node.textContent || '').length < (box.textContent || '').length)) box = node;
+  }
+  if (!box) return [];
+  const out = [];
+  for (const s of box.querySelectorAll('span')) {
+    if (s.firstElementChild) continue;
+    const text = (s.textContent || '').replace(/\u00a0/g, ' ');
+    if (!text) continue;
+    const cs = getComputedStyle(s);
+    const r = s.getBoundingClientRect();
+    const hidden = cs.display === 'none' || cs.visibility !== 'visible' || parseFloat(cs.opacity) === 0 ||
+                   parseFloat(cs.fontSize) === 0 || r.width === 0 || r.height === 0 ||
+                   (cs.position === 'absolute' && (r.right < 0 || r.bottom < 0));
+    out.push({c: text, order: parseInt(cs.order, 10) || 0, hidden: hidden, x: r.left, y: r.top});
+  }
+  return out;
+};
+
+const collect = () => posts.map((el) => {
+  let raw = '';
+  const divs = el.querySelectorAll("div[dir='auto']");
+  if (divs.length) {
+    let best = divs[0];
+    for (const d of divs) if ((d.innerText || '').length > (best.innerText || '').length) best = d;
+    raw = best.innerText || '';
+  } else {
+    raw = el.innerText || '';
+  }
+  const abbrUtime = el.querySelector('abbr[data-utime]');
+  const timeEl = el.querySelector('time[datetime]');
+  const abbrTitle = el.querySelector('abbr[title]');
+  const labels = [];
+  for (const e of el.querySelectorAll('[aria-label], [title]')) {
+    const a = e.getAttribute('aria-label') || '', t = e.getAttribute('title') || '';
+    if ((a && a.length < 100) || (t && t.length < 100)) labels.push([a, t]);
+  }
+  const textCandidates = [];
+  const it = document.evaluate(".//*[contains(text(),'at') or contains(text(),',')]", el, null,
+                               XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  for (let k = 0; k < it.snapshotLength; k++) {
+    const t = norm(it.snapshotItem(k).textContent);
+    if (t && t.length < 100) textCandidates.push(t);
+  }
+  const anchors = Array.from(el.querySelectorAll('a[href]'));
+  return {
+    element: el,
+    raw: raw,
+    hrefs: anchors.map((a) => a.href || a.getAttribute('href') || ''),
+    link_texts: anchors.map((a) => { const t = norm(a.textContent); return t.length <= 40 ? t : ''; }),
+    utime: abbrUtime ? abbrUtime.getAttribute('data-utime') : null,
+    datetime: timeEl ? timeEl.getAttribute('datetime') : null,
+    abbr_title: abbrTitle ? abbrTitle.getAttribute('title') : null,
+    labels: labels,
+    text_candidates: textCandidates,
+    ts_spans: tsSpans(el),
+  };
+});
+if (clicked) setTimeout(() => done(collect()), waitMs); else done(collect());
+"""
+
+
+def _post_from_raw_text(raw: str) -> Optional[Dict]:
+    """filter_post_text() on a post's raw text, with the permissive fallback so real posts are not dropped."""
+    raw = re.sub(r"(?i)see more(?:\.{0,3})", "", raw or "")
+    
+    # Clean raw text - remove only the most obvious UI noise but otherwise keep it
+    raw_clean = re.sub(r"(?i)(notificationsallunreadnew|see all unread|see all notifications)", "", raw)
+    # Keep original newlines for possible future use, but also have a compact version
+    raw_compact = re.sub(r"\s+", " ", raw_clean).strip()
+    
+    processed = filter_post_text(raw)
+    if processed:
+        return processed
+    
+    # Very permissive fallback: as long as there is some reasonable-length text,
+    # treat this element as a post so it appears in the output.
+    base_text = raw_compact or raw_clean.strip()
+    if not base_text or len(base_text) < 10:
+        return None
+    return {
+        'caption': base_text[:200],
+        'hashtags': [],
+        'urls': [],
+        'mentions': [],
+        'raw': base_text
+    }
+
+
+def _pick_post_url(hrefs: List[str]) -> str:
+    """Best-guess post permalink among the links inside a post element."""
+    for href in hrefs:
+        href = href or ""
+        href_low = href.lower()
+        if "facebook.com" not in href_low:
+            continue
+        if any(token in href_low for token in _POST_URL_TOKENS):
+            return href
+    return ""
+
+
+def _post_dedup_key(processed: Dict) -> Optional[str]:
+    """Lenient dedup key from the first 60 chars of the caption (None when too short to be a post)."""
+    caption = processed.get('caption', '')
+    raw_text = processed.get('raw', '')
+    key_text = caption[:60] if caption else raw_text[:60]
+    # Allow shorter keys so we don't drop short-but-real posts
+    if not key_text or len(key_text.strip()) < 5:
+        return None
+    # Normalize the key (remove extra spaces, lowercase)
+    return re.sub(r"\s+", " ", key_text.lower()).strip()
+
+
+def _timestamp_from_attributes(info: Dict) -> Optional[str]:
+    """extract_post_timestamp() methods 1–4 applied to attributes collected by _BULK_POSTS_JS."""
+    dt_attr = info.get("utime")
+    if dt_attr and dt_attr.isdigit():
+        return datetime.fromtimestamp(int(dt_attr)).isoformat()
+    dt = info.get("datetime")
+    if dt:
+        try:
+            return datetime.fromisoformat(dt).isoformat()
+        except Exception:
+            return dt
+    if info.get("abbr_title"):
+        return info["abbr_title"]
+    for aria_label, title_attr in info.get("labels") or []:
+        for text in [aria_label, title_attr]:
+            if text and len(text) < 100:
+                if any(month in text.lower() for month in _TIMESTAMP_MONTHS):
+                    return text
+                if any(pattern in text.lower() for pattern in ['ago', 'hour', 'day', 'week', 'month', 'year', 'minute']):
+                    return text
+    return None
+
+
+def _timestamp_from_text_candidates(candidates: List[str]) -> Optional[str]:
+    """extract_post_timestamp()'s last-resort text fallback on texts collected by _BULK_POSTS_JS."""
+    for txt in candidates or []:
+        if len(txt) < 100 and txt:
+            if any(month in txt.lower() for month in _TIMESTAMP_MONTHS):
+                return txt
+            if any(pattern in txt.lower() for pattern in ['ago', 'hour', 'day', 'week', 'month', 'year', 'minute', 'second']):
+                return txt
+            if re.search(r'\d{1,2}:\d{2}', txt):
+                return txt
+    return None
+
+
+
+_WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+# Full names or exact abbreviations only, so "sat" in "satisfied" is not a weekday
+_WEEKDAY_RE = (r'\b(monday|tuesday|wednesday|thursday|friday|saturday|sunday'
+               r'|mon|tue|tues|wed|thu|thur|thurs|fri|sat|sun)\b\.?')
+# Relative-age units Facebook uses ("5m", "3h", "2d", "1w", "4 hrs", "2 months ago"), as timedelta kwargs
+_RELATIVE_UNITS = {
+    's': ('seconds', 1), 'sec': ('seconds', 1), 'secs': ('seconds', 1), 'second': ('seconds', 1), 'seconds': ('seconds', 1),
+    'm': ('minutes', 1), 'min': ('minutes', 1), 'mins': ('minutes', 1), 'minute': ('minutes', 1), 'minutes': ('minutes', 1),
+    'h': ('hours', 1), 'hr': ('hours', 1), 'hrs': ('hours', 1), 'hour': ('hours', 1), 'hours': ('hours', 1),
+    'd': ('days', 1), 'day': ('days', 1), 'days': ('days', 1),
+    'w': ('weeks', 1), 'wk': ('weeks', 1), 'wks': ('weeks', 1), 'week': ('weeks', 1), 'weeks': ('weeks', 1),
+    'mo': ('days', 30), 'mos': ('days', 30), 'month': ('days', 30), 'months': ('days', 30),
+    'y': ('days', 365), 'yr': ('days', 365), 'yrs': ('days', 365), 'year': ('days', 365), 'years': ('days', 365),
+}
+# Likewise for months: "market" or "decor" must not read as March or December
+_MONTH_RE = (r'(january|february|march|april|may|june|july|august|september|october|november|december'
+             r'|jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec)\b\.?')
+_RELATIVE_RE = re.compile(
+    r'(?<![\w:/])(\d+|an?(?=\s)|one(?=\s))\s*(' + '|'.join(sorted(_RELATIVE_UNITS, key=len, reverse=True)) + r')\b(?:\s+ago)?'
+)
+
+
+def _parse_clock(text: str):
+    """(hour, minute) of the first "8:19", "8:19 PM" or "14:30" in text, or None."""
+    m = re.search(r'\b(\d{1,2}):(\d{2})(?:\s*([ap])\.?\s*m\b\.?)?', text)
+    if not m:
+        return None
+    hour, minute = int(m.group(1)), int(m.group(2))
+    if m.group(3):
+        if hour > 12:
+            return None
+        hour = hour % 12 + (12 if m.group(3) == 'p' else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def parse_facebook_timestamp(text: str, now: Optional[datetime] = None) -> Optional[str]:
+    """Parse a Facebook timestamp into an ISO datetime string (None when it is not one).
+
+    Handles relative ages ("3h", "2d", "5 mins ago", "Just now"), "Yesterday/Today at 7:07 PM",
+    weekdays ("Mon at 9:41 AM"), month-name dates with optional year and time
+    ("January 18 at 8:19 AM", "12 January 2024 at 14:30", "Mar 3, 2023"),
+    unambiguous numeric dates ("25/01/2024 at 14:30", "01/25/2024"; None for "12/01/2024",
+    which may be either order) and ISO strings. Relative and year-less dates are resolved
+    against `now`.
+    """
+    if not text:
+        return None
+    now = (now or datetime.now()).replace(microsecond=0)
+    raw = str(text).strip()
+    if re.match(r'^\d{4}-\d{2}-\d{2}', raw):
+        try:
+            return datetime.fromisoformat(raw.replace('Z', '+00:00')).isoformat()
+        except ValueError:
+            pass
+
+    t = re.sub(r'\s+', ' ', raw.replace('\u00A0', ' ').lower()).strip(' ·•|')
+    clock = _parse_clock(t)
+    hour, minute = clock if clock else (0, 0)
+
+    try:
+        if re.search(r'\b(just now|a moment ago)\b', t):
+            return now.isoformat()
+
+        m = re.search(r'\b(yesterday|today)\b', t)
+        if m:
+            day = now - timedelta(days=1) if m.group(1) == 'yesterday' else now
+            return day.replace(hour=hour, minute=minute, second=0).isoformat()
+
+        day_month = re.search(r'\b(\d{1,2})(?:st|nd|rd|th)?\s+' + _MONTH_RE + r'(?:,?\s+(\d{4}))?', t)
+        month_day = re.search(r'\b' + _MONTH_RE + r'\s+(\d{1,2})(?:st|nd|rd|th)?\b(?:,?\s+(\d{4}))?', t)
+        if day_month or month_day:
+            if day_month:
+                day, month_name, year = int(day_month.group(1)), day_month.group(2), day_month.group(3)
+            else:
+                month_name, day, year = month_day.group(1), int(month_day.group(2)), month_day.group(3)
+            month = _TIMESTAMP_MONTHS.index(month_name[:3]) + 1
+            parsed = datetime(int(year) if year else now.year, month, day, hour, minute)
+            if not year and parsed > now + timedelta(days=1):
+                parsed = parsed.replace(year=now.year - 1)
+            return parsed.isoformat()
+
+        m = re.search(r'\b(\d{1,2})/(\d{1,2})/(\d{2,4})\b', t)
+        if m:
+            first, second, year = int(m.group(1)), int(m.group(2)), int(m.group(3))
+            if first <= 12 and second <= 12 and first != second:
+                # Day/month order is a page locale setting we can't see
+                return None
+            month, day = (second, first) if first > 12 else (first, second)
+            return datetime(year + 2000 if year < 100 else year, month, day, hour, minute).isoformat()
+
+        m = re.search(_WEEKDAY_RE, t)
+        if m and clock:
+            back = (now.weekday() - _WEEKDAYS.index(m.group(1)[:3])) % 7
+            parsed = (now - timedelta(days=back)).replace(hour=hour, minute=minute, second=0)
+            if parsed > now:
+                parsed -= timedelta(days=7)
+            return parsed.isoformat()
+
+        m = _RELATIVE_RE.search(t)
+        if m:
+            count = int(m.group(1)) if m.group(1).isdigit() else 1
+            unit, factor = _RELATIVE_UNITS[m.group(2)]
+            return (now - timedelta(**{unit: count * factor})).isoformat()
+    except ValueError:
+        # Impossible dates such as "31 February"
+        return None
+    return None
+
+
+def decode_timestamp_spans(spans: List[Dict]) -> str:
+    """Rebuild the visible text of an obfuscated timestamp from spans collected by _BULK_POSTS_JS.
+
+    Hidden decoys (display/visibility/opacity/zero size/off-screen) are dropped. The
+    rest is read in on-screen order (left to right, line by line), which is what the
+    reader sees whatever CSS order or DOM shuffling was used; when the browser gave
+    no usable positions, the CSS order value (then DOM order) is used instead.
+    """
+    shown = [(i, s) for i, s in enumerate(spans or []) if not s.get("hidden")]
+    if not shown:
+        return ""
+    if len({round(float(s.get("x") or 0)) for _, s in shown}) > 1:
+        ys = [float(s.get("y") or 0) for _, s in shown]
+        multiline = max(ys) - min(ys) > 20
+        shown.sort(key=lambda item: (round(float(item[1].get("y") or 0) / 10) if multiline else 0,
+                                     float(item[1].get("x") or 0), item[0]))
+    else:
+        shown.sort(key=lambda item: (item[1].get("order") or 0, item[0]))
+    text = "".join(str(s.get("c") or "") for _, s in shown)
+    return re.sub(r'\s+', ' ', text).strip(' ·•|')
+
+
+def _order_grouped_text(spans: List[Dict]) -> str:
+    """extract_jumbled_timestamp_text()'s order-grouped string, built from collected spans (LLM input)."""
+    groups: Dict[int, List[str]] = {}
+    for s in spans or []:
+        char = str(s.get("c") or "").strip()
+        if char and not s.get("hidden") and (s.get("order") or 0) > 0:
+            groups.setdefault(s["order"], []).append(char)
+    return "".join("".join(groups[order]) for order in sorted(groups))
+
+
+def _timestamp_from_link_texts(hrefs: List[str], link_texts: List[str]) -> Optional[str]:
+    """Plain-text timestamp link ("3h", "January 18 at 8:19 AM") pointing at the post permalink."""
+    for href, text in zip(hrefs or [], link_texts or []):
+        if text and any(token in (href or "").lower() for token in _POST_URL_TOKENS):
+            if parse_facebook_timestamp(text):
+                return text
+    return None
+
+
+def _extract_posts_bulk(driver, max_posts: int, see_more_wait_ms: int = 600) -> List[Dict]:
+    """
+    Bulk version of the per-element loop: one execute_async_script call expands all
+    "See more" buttons, waits once and returns text, links, timestamp attributes and
+    timestamp character spans for every candidate post.
+
+    Timestamps are resolved without further browser calls: attributes, then the
+    permalink text, then the locally decoded span string. Posts still without one
+    are sent to the LLM together in a single batched call. Parsable timestamps are
+    stored as ISO datetimes.
+    """
+    limit = max_posts * 3  # Check up to 3x max_posts to account for filtering (some may be page metadata)
+    driver.set_script_timeout(max(30, limit))
+    items = driver.execute_async_script(_BULK_POSTS_JS, POST_XPATH, limit, see_more_wait_ms) or []
+
+    texts = []
+    infos = []
+    seen = set()
+    leftovers = []  # (processed, jumbled text for the LLM)
+    for info in items:
+        if len(texts) >= max_posts:
+            break
+        processed = _post_from_raw_text(info.get("raw") or "")
+        if not processed:
+            continue
+        key = _post_dedup_key(processed)
+        # Only skip if it's an exact match (very lenient)
+        if not key or key in seen:
+            continue
+
+        ts = _timestamp_from_attributes(info) or _timestamp_from_link_texts(info.get("hrefs"), info.get("link_texts"))
+        if ts is None and info.get("ts_spans"):
+            decoded = decode_timestamp_spans(info["ts_spans"])
+            if parse_facebook_timestamp(decoded):
+                ts = decoded
+            else:
+                jumbled = decoded if len(decoded) >= 5 else _order_grouped_text(info["ts_spans"])
+                if jumbled:
+                    leftovers.append((processed, jumbled))
+        processed['timestamp'] = ts
+        processed["post_url"] = _pick_post_url(info.get("hrefs") or [])
+
+        seen.add(key)
+        texts.append(processed)
+        infos.append(info)
+
+    if leftovers:
+        print(f"Solving {len(leftovers)} undecoded timestamp(s) in one LLM call")
+        for (processed, _), solved in zip(leftovers, solve_jumbled_timestamps_batch([j for _, j in leftovers])):
+            processed['timestamp'] = solved
+    for processed, info in zip(texts, infos):
+        ts = processed['timestamp'] or _timestamp_from_text_candidates(info.get("text_candidates"))
+        processed['timestamp'] = (parse_facebook_timestamp(ts) or ts) if ts else None
+    return texts
+
 def extract_html_div_text(driver, max_posts=20) -> List[Dict]:
-    """Extract text from post html-div elements - limit to max_posts for speed."""
+    """Extract text from post html-div elements - limit to max_posts for speed.
+
+    Uses one in-browser pass over all posts (_extract_posts_bulk); falls back to
+    per-element WebDriver calls if the script fails.
+    """
+    try:
+        start = time.time()
+        texts = _extract_posts_bulk(driver, max_posts)
+        print(f"Bulk-extracted {len(texts)} posts in {time.time() - start:.1f}s")
+        return texts
+    except Exception as e:
+        print(f"Warning: Bulk post extraction failed ({e}), falling back to per-element extraction")
+        return _extract_html_div_text_per_element(driver, max_posts=max_posts)
+
+
+def _extract_html_div_text_per_element(driver, max_posts=20) -> List[Dict]:
+    """Per-element extraction (several WebDriver calls per post)."""
     texts = []
     xpath = POST_XPATH
     # Get elements once at the start
@@ -1296,9 +1764,8 @@ def extract_html_div_text(driver, max_posts=20) -> List[Dict]:
         if len(texts) >= max_posts:
             break
         
-        element_processed = False
         retries = 2
-        while retries > 0 and not element_processed:
+        while retries > 0:
             try:
                 el = elements[index]
 
@@ -1336,95 +1803,26 @@ def extract_html_div_text(driver, max_posts=20) -> List[Dict]:
                     # Fallback to original method if something goes wrong
                     raw = el.get_attribute("innerText") or el.text or ''
                 
-                raw = re.sub(r"(?i)see more(?:\.{0,3})", "", raw)
-                
-                # Clean raw text - remove only the most obvious UI noise but otherwise keep it
-                raw_clean = re.sub(r"(?i)(notificationsallunreadnew|see all unread|see all notifications)", "", raw)
-                # Keep original newlines for possible future use, but also have a compact version
-                raw_compact = re.sub(r"\s+", " ", raw_clean).strip()
-                
-                # Try to filter, but if it fails, fall back to using the raw text so we don't drop posts
-                processed = filter_post_text(raw)
-                
+                processed = _post_from_raw_text(raw)
                 if not processed:
-                    # Very permissive fallback: as long as there is some reasonable-length text,
-                    # treat this element as a post so it appears in the output.
-                    base_text = raw_compact or raw_clean.strip()
-                    if not base_text or len(base_text) < 10:
-                        # Too short to be meaningful, skip this element and move to next
-                        element_processed = True
-                        break
-                    
-                    processed = {
-                        'caption': base_text[:200],
-                        'hashtags': [],
-                        'urls': [],
-                        'mentions': [],
-                        'raw': base_text
-                    }
+                    # Too short to be meaningful, skip this element and move to next
+                    break
                 
-                if processed:
-                    # Extract timestamp (pass driver for span reconstruction)
-                    ts = extract_post_timestamp(el, driver=driver)
-                    processed['timestamp'] = ts
-
-                    # Extract a best-guess post URL from links inside this post element
-                    post_url = ""
-                    try:
-                        link_elems = el.find_elements(By.XPATH, ".//a[@href]")
-                        for a in link_elems:
-                            href = a.get_attribute("href") or ""
-                            href_low = href.lower()
-                            if "facebook.com" not in href_low:
-                                continue
-                            # Heuristics for post permalinks
-                            if any(token in href_low for token in [
-                                "/posts/",
-                                "/photos/",
-                                "/photo/",
-                                "/videos/",
-                                "/video/",
-                                "/reel/",
-                                "/permalink/",
-                                "story_fbid",
-                                "fbid="
-                            ]):
-                                post_url = href
-                                break
-                    except Exception:
-                        post_url = ""
+                # Extract timestamp (pass driver for span reconstruction)
+                processed['timestamp'] = extract_post_timestamp(el, driver=driver)
 
-                    processed["post_url"] = post_url
+                # Extract a best-guess post URL from links inside this post element
+                try:
+                    hrefs = [a.get_attribute("href") or "" for a in el.find_elements(By.XPATH, ".//a[@href]")]
+                    processed["post_url"] = _pick_post_url(hrefs)
+                except Exception:
+                    processed["post_url"] = ""
 
-                    # Use a shorter, more lenient key for deduplication
-                    # Use first 60 chars to allow slight variations
-                    caption = processed.get('caption', '')
-                    raw_text = processed.get('raw', '')
-                    
-                    # Create a simple key from first part of text
-                    key_text = caption[:60] if caption else raw_text[:60]
-                    # Allow shorter keys so we don't drop short-but-real posts
-                    if not key_text or len(key_text.strip()) < 5:
-                        # Text too short, skip this element and move to next
-                        element_processed = True
-                        break
-                    
-                    # Normalize the key (remove extra spaces, lowercase)
-                    key = re.sub(r"\s+", " ", key_text.lower()).strip()
-                    
-                    # Only skip if it's an exact match (very lenient)
-                    if key and key not in seen:
-                        seen.add(key)
-                        texts.append(processed)
-                        element_processed = True  # Successfully added, move to next element
-                        break
-                    else:
-                        # Duplicate post, skip it
-                        element_processed = True
-                        break
-                
-                # If we get here, element was processed (either added or skipped)
-                element_processed = True
+                key = _post_dedup_key(processed)
+                # Only skip if it's an exact match (very lenient)
+                if key and key not in seen:
+                    seen.add(key)
+                    texts.append(processed)
                 break
                 
             except StaleElementReferenceException:
@@ -1434,20 +1832,56 @@ def extract_html_div_text(driver, max_posts=20) -> List[Dict]:
                     # Refresh elements list
                     elements = driver.find_elements(By.XPATH, xpath)
                     continue
-                else:
-                    # Out of retries, skip this element
-                    element_processed = True
-                    break
+                # Out of retries, skip this element
+                break
             except Exception as e:
                 # Error processing this element, skip it and move to next
-                element_processed = True
                 break
 
     return texts
 
 
-def scroll_to_load_all(driver, xpath=POST_XPATH, max_scrolls=100, pause=2.5, stable_threshold=3, target_count=None):
-    """Scroll page to load all posts."""
+# Link hrefs and main text of every loaded post element (no clicking), for watermark checks while scrolling
+_LOADED_POSTS_JS = r"""
+const snap = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const out = [];
+for (let i = 0; i < snap.snapshotLength; i++) {
+  const el = snap.snapshotItem(i);
+  let best = null;
+  for (const d of el.querySelectorAll("div[dir='auto']")) if (!best || (d.innerText || '').length > (best.innerText || '').length) best = d;
+  out.push([Array.from(el.querySelectorAll('a[href]'), (a) => a.href || ''), (best || el).innerText || '']);
+}
+return out;
+"""
+
+
+def _post_display_text(post: Dict) -> str:
+    """Caption (or raw text) plus hashtags, as stored in the post_text column."""
+    caption = post.get('caption', '') or ''
+    display_text = caption or post.get('raw', '') or ''
+    hashtags = post.get('hashtags', []) or []
+    if hashtags:
+        display_text = f"{display_text} {' '.join(hashtags)}".strip()
+    return display_text
+
+
+def _loaded_post_keys(driver, xpath=POST_XPATH) -> List[Optional[str]]:
+    """post_index keys of the post elements currently loaded on the page."""
+    keys = []
+    for hrefs, raw in driver.execute_script(_LOADED_POSTS_JS, xpath) or []:
+        processed = _post_from_raw_text(raw)
+        if processed:
+            keys.append(post_index.post_key(_pick_post_url(hrefs), _post_display_text(processed)))
+    return keys
+
+
+def scroll_to_load_all(driver, xpath=POST_XPATH, max_scrolls=100, pause=2.5, stable_threshold=3, target_count=None,
+                       stop_check: Optional[Callable[[], bool]] = None):
+    """Scroll page to load all posts.
+
+    `stop_check` is called whenever new posts have loaded; scrolling stops as soon as it
+    returns True (used to stop at already-scraped posts).
+    """
     last_count = 0
     stable = 0
     # Optimize: reduce pause time for faster scrolling
@@ -1469,6 +1903,14 @@ def scroll_to_load_all(driver, xpath=POST_XPATH, max_scrolls=100, pause=2.5, sta
             # If we have enough elements and target_count is specified, stop early
             if target_count and count >= target_count * 2:  # Get 2x to account for filtering
                 break
+            if stop_check is not None:
+                try:
+                    if stop_check():
+                        print(f"Reached already-scraped posts after {i + 1} scroll(s); stopping")
+                        break
+                except Exception as e:
+                    print(f"Warning: watermark check failed ({e}), continuing to scroll")
+                    stop_check = None
         else:
             stable += 1
             if stable >= stable_threshold:
@@ -1492,7 +1934,7 @@ def scrape_facebook_page(fb_url: str, target_count: int = 30, headless: bool = F
     """
     driver = None
     try:
-        driver = create_driver(headless=True)
+        driver = acquire_for(headless=True, user_agent=DESKTOP_USER_AGENT)
         wait = WebDriverWait(driver, 30)
 
         # Navigate to Facebook login page
@@ -1584,16 +2026,18 @@ def scrape_facebook_page(fb_url: str, target_count: int = 30, headless: bool = F
         return pd.DataFrame(columns=['shop_name', 'phone', 'floor', 'source'])
     finally:
         if driver:
-            try:
-                driver.quit()
-            except Exception:
-                pass
+            release_driver(driver)
 
 
-def scrape_facebook_simple(fb_url: str, target_count: int = 20) -> pd.DataFrame:
+def scrape_facebook_simple(fb_url: str, target_count: int = 20, since=None, incremental: bool = True) -> pd.DataFrame:
     """
     Scrape Facebook page with automatic login using credentials from .env file.
     For use in Streamlit app.
+
+    With `incremental` (and POST_INDEX_ENABLED), scrolling stops once already-scraped
+    posts are loaded and the result is the new posts plus the cached history of this
+    page; `since` narrows it to post_index.SINCE_LAST_RUN ("last_run": only posts new
+    in this run) or to posts dated at/after a date, datetime or ISO string.
     """
     driver = None
     try:
@@ -1605,7 +2049,7 @@ def scrape_facebook_simple(fb_url: str, target_count: int = 20) -> pd.DataFrame:
             print("Error: FB_LOGIN and FB_PASSWORD must be set in .env file")
             return pd.DataFrame(columns=['shop_name', 'phone', 'floor', 'source'])
         
-        driver = create_driver(headless=True)
+        driver = acquire_for(headless=True, user_agent=DESKTOP_USER_AGENT)
         wait = WebDriverWait(driver, 30)
 
         # Navigate to Facebook login page (skip waiting for full load - start immediately)
@@ -1915,8 +2359,13 @@ def scrape_facebook_simple(fb_url: str, target_count: int = 20) -> pd.DataFrame:
         max_scrolls = max(100, target_count * 5)  # Scroll more for higher target counts
         pause = 2.0  # Slightly longer pause to ensure posts load
         stable_threshold = 4  # Wait a bit longer before stopping
+        known = post_index.known_keys("facebook", fb_url) if incremental else set()
+        stop_check = None
+        if known:
+            stop_check = lambda: post_index.count_known(_loaded_post_keys(driver), known) >= post_index.POST_INDEX_STOP_AFTER
         print(f"Scrolling to load posts (target: {target_count}, max {max_scrolls} scrolls)...")
-        final_count = scroll_to_load_all(driver, xpath=POST_XPATH, max_scrolls=max_scrolls, pause=pause, stable_threshold=stable_threshold, target_count=target_count)
+        final_count = scroll_to_load_all(driver, xpath=POST_XPATH, max_scrolls=max_scrolls, pause=pause, stable_threshold=stable_threshold, target_count=target_count,
+                                         stop_check=stop_check)
         print(f"Finished scrolling; {final_count} post elements present. Extracting posts...")
 
         # Extract posts. Ask extractor for more than we finally need so that
@@ -1963,16 +2412,10 @@ def scrape_facebook_simple(fb_url: str, target_count: int = 20) -> pd.DataFrame:
         #     - Existing Tennent Research tab can still use the text for matching
         rows = []
         for post in collected:
-            caption = post.get('caption', '') or ''
-            raw_text = post.get('raw', '') or caption
             timestamp = post.get('timestamp', '')  # Get timestamp if available
-            hashtags = post.get('hashtags', []) or []
-            hashtags_str = " ".join(hashtags) if hashtags else ""
 
             # Build display text = caption + hashtags (so #tags are visible in Excel)
-            display_text = caption or raw_text or ''
-            if hashtags_str:
-                display_text = f"{display_text} {hashtags_str}".strip()
+            display_text = _post_display_text(post)
             
             # If we somehow still don't have any meaningful text, skip this one
             if not display_text.strip():
@@ -1996,6 +2439,13 @@ def scrape_facebook_simple(fb_url: str, target_count: int = 20) -> pd.DataFrame:
             if len(rows) >= target_count:
                 break
 
+        # New posts plus cached history of this page (or only what matches `since`)
+        if incremental:
+            rows = post_index.merge_with_history(
+                "facebook", fb_url, rows, url_field='post_url', text_field='post_text', date_field='post_date',
+                limit=target_count, since=since,
+            )
+
         # Create DataFrame with all columns
         df = pd.DataFrame(rows)
         
@@ -2020,8 +2470,5 @@ def scrape_facebook_simple(fb_url: str, target_count: int = 20) -> pd.DataFrame:
         return pd.DataFrame(columns=['shop_name', 'phone', 'floor', 'source', 'post_text', 'post_date'])
     finally:
         if driver:
-            try:
-                driver.quit()
-            except Exception:
-                pass
+            release_driver(driver)
 
@@ -4,6 +4,8 @@ import sys
 import traceback
 import json
 import pickle
+import queue
+import threading
 from pathlib import Path
 from typing import Optional
 from selenium import webdriver
@@ -18,6 +20,14 @@ import shutil
 from dotenv import load_dotenv
 import pandas as pd
 
+# Project root holds the shared chrome_helper / chrome_pool modules
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+import post_index
+from chrome_pool import DESKTOP_USER_AGENT, acquire_for, release_driver
+from rate_limit import RateLimiter
+
 # Load environment variables
 load_dotenv()
 
@@ -44,6 +54,12 @@ BASE_DIR = os.path.dirname(__file__)
 COOKIE_FILE = os.path.join(BASE_DIR, "ig_cookies.pkl")
 # Use persistent profile directory (not temp) so cookies persist
 CHROME_PROFILE_DIR = os.environ.get("CHROME_PROFILE_DIR", os.path.join(BASE_DIR, "chrome_profile_ig"))
+# Post pages are fetched by this many pooled drivers sharing the login cookies
+IG_FETCH_WORKERS = int(os.environ.get("IG_FETCH_WORKERS", "3"))
+# Cap on post page loads per minute across all workers (0 disables the cap)
+IG_POSTS_PER_MINUTE = int(os.environ.get("IG_POSTS_PER_MINUTE", "30"))
+# Longest wait for a post's caption/time element before reading whatever has rendered
+IG_POST_WAIT_SECONDS = float(os.environ.get("IG_POST_WAIT_SECONDS", "10"))
 
 # ================= COOKIE MANAGEMENT (OPTIONAL - NOT USED FOR LOGIN) =================
 # Cookies are saved after successful login as an optimization, but login always uses username/password
@@ -100,6 +116,7 @@ def create_driver(headless: bool = True):
             else:
                 raise Exception(f"Failed to create Chrome driver after {max_retries} attempts: {error_msg}")
 
+
 # ================= LOGIN =================
 def instagram_login(driver, username: Optional[str] = None, password: Optional[str] = None, headless: bool = True):
     """Login to Instagram using provided credentials or environment variables."""
@@ -299,8 +316,12 @@ def instagram_login(driver, username: Optional[str] = None, password: Optional[s
             pass
 
 # ================= LOAD POSTS / REELS / VIDEOS =================
-def load_post_links(driver, max_posts):
-    """Load links for posts, reels, and videos (with safety limits, minimal console output)."""
+def load_post_links(driver, max_posts, known=None):
+    """Load links for posts, reels, and videos (with safety limits, minimal console output).
+
+    With `known` (post_index keys of already-scraped posts), scrolling stops once
+    POST_INDEX_STOP_AFTER of them are among the loaded links.
+    """
     links = set()
     time.sleep(5)
 
@@ -325,6 +346,10 @@ def load_post_links(driver, max_posts):
             except Exception:
                 continue
 
+        if known and post_index.count_known((post_index.post_key(l) for l in links), known) >= post_index.POST_INDEX_STOP_AFTER:
+            print(f"[INFO] Reached already-scraped posts after {scroll_count + 1} scroll(s); stopping")
+            break
+
         if len(links) == last_link_count:
             stable_count += 1
             if stable_count >= 5:
@@ -344,12 +369,32 @@ def load_post_links(driver, max_posts):
     return list(links)[:max_posts]
 
 # ================= EXTRACT TEXT (POST / REEL / VIDEO) =================
-def extract_post_data(driver, post_url):
+# Present once a post page has rendered its caption or timestamp (or the "not available" notice)
+_POST_READY_XPATH = (
+    '//span[@style="line-height: 18px;"] | //time | '
+    "//*[contains(text(), \"Sorry, this page isn't available\")]"
+)
+
+
+def wait_for_post_content(driver, timeout: float = IG_POST_WAIT_SECONDS) -> bool:
+    """Wait until the caption/time element of the loaded post page is present (False on timeout)."""
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+            EC.presence_of_element_located((By.XPATH, _POST_READY_XPATH))
+        )
+        return True
+    except TimeoutException:
+        return False
+
+
+def extract_post_data(driver, post_url, wait_timeout: Optional[float] = None):
     """Extract data from Instagram post, reel, or video.
     Matches the exact logic from the provided code.
+    Waits for the caption/time element (up to IG_POST_WAIT_SECONDS) instead of a fixed sleep.
     """
     driver.get(post_url)
-    time.sleep(5)
+    if not wait_for_post_content(driver, IG_POST_WAIT_SECONDS if wait_timeout is None else wait_timeout):
+        print(f"[WARN] Post content did not appear within the wait: {post_url[:60]}")
 
     collected_text = set()
     time_text = ""
@@ -407,8 +452,93 @@ def extract_post_data(driver, post_url):
         "datetime": datetime_val
     }
 
+# ================= CONCURRENT POST FETCH =================
+def _authenticate_with_cookies(driver, cookies) -> bool:
+    """Put the logged-in session cookies into a fresh pooled driver."""
+    try:
+        driver.get("https://www.instagram.com/")
+        for cookie in cookies:
+            driver.add_cookie(cookie)
+        return True
+    except Exception as e:
+        print(f"[WARN] Could not load Instagram cookies into worker driver: {e}")
+        return False
+
+
+def fetch_posts_concurrently(driver, post_links, workers: Optional[int] = None,
+                             posts_per_minute: Optional[int] = None, headless: bool = True):
+    """
+    Extract `post_links` with several logged-in drivers at once.
+
+    `driver` is the already logged-in driver; up to `workers` - 1 more are leased
+    from the shared pool and given its session cookies (falling back to ig_cookies.pkl).
+    Page loads across all workers are capped at `posts_per_minute`. Returns the
+    extract_post_data() results in post_links order; failed posts are skipped.
+    """
+    workers = max(1, min(IG_FETCH_WORKERS if workers is None else workers, len(post_links)))
+    limiter = RateLimiter(IG_POSTS_PER_MINUTE if posts_per_minute is None else posts_per_minute)
+
+    cookies = []
+    try:
+        cookies = driver.get_cookies()
+    except Exception:
+        pass
+    if not cookies and os.path.exists(COOKIE_FILE):
+        try:
+            with open(COOKIE_FILE, "rb") as f:
+                cookies = pickle.load(f)
+        except Exception as e:
+            print(f"[WARN] Failed to load Instagram cookies: {e}")
+
+    drivers = [driver]
+    extra = []
+    if cookies:
+        for _ in range(workers - 1):
+            try:
+                d = acquire_for(headless=headless, user_agent=DESKTOP_USER_AGENT, timeout=5, retries=1)
+            except Exception as e:
+                print(f"[INFO] Using {len(drivers)} Instagram worker(s): {e}")
+                break
+            extra.append(d)
+            if _authenticate_with_cookies(d, cookies):
+                drivers.append(d)
+
+    todo = queue.Queue()
+    for item in enumerate(post_links):
+        todo.put(item)
+    results = {}
+    total = len(post_links)
+
+    def work(d):
+        while True:
+            try:
+                i, link = todo.get_nowait()
+            except queue.Empty:
+                return
+            limiter.wait()
+            try:
+                print(f"[INFO] Extracting post {i + 1}/{total}: {link[:50]}...")
+                post_data = extract_post_data(d, link)
+                if post_data:
+                    results[i] = post_data
+            except Exception as e:
+                print(f"[WARN] Failed to extract data from {link}: {e}")
+
+    start = time.time()
+    try:
+        threads = [threading.Thread(target=work, args=(d,), daemon=True) for d in drivers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        for d in extra:
+            release_driver(d)
+    print(f"[INFO] Extracted {len(results)}/{total} posts with {len(drivers)} worker(s) in {time.time() - start:.1f}s")
+    return [results[i] for i in sorted(results)]
+
 # ================= MAIN =================
-def scrape_instagram_simple(ig_url: str, target_count: int = 20) -> pd.DataFrame:
+def scrape_instagram_simple(ig_url: str, target_count: int = 20, since=None, incremental: bool = True) -> pd.DataFrame:
     """
     Scrape Instagram profile/page posts and return DataFrame.
     Similar to scrape_facebook_simple for integration with Streamlit app.
@@ -416,6 +546,9 @@ def scrape_instagram_simple(ig_url: str, target_count: int = 20) -> pd.DataFrame
     Args:
         ig_url: Instagram URL (e.g., https://www.instagram.com/username/) or username
         target_count: Maximum number of posts to scrape (default: 5)
+        since: post_index.SINCE_LAST_RUN ("last_run") for only posts new in this run, or a
+               date/datetime/ISO string for posts dated at or after it (None: new + cached history)
+        incremental: Stop scrolling at already-scraped posts and only open new ones (post_index)
     
     Returns:
         DataFrame with columns: ['shop_name', 'phone', 'floor', 'source']
@@ -442,7 +575,7 @@ def scrape_instagram_simple(ig_url: str, target_count: int = 20) -> pd.DataFrame
         print(f"[INFO] Scraping Instagram profile: {username}")
         
         # Use headless mode (hardcoded like Facebook scraper)
-        driver = create_driver(headless=True)
+        driver = acquire_for(headless=True, user_agent=DESKTOP_USER_AGENT)
         
         # Always try username/password login first (from .env file)
         print("[INFO] Attempting login with username and password from .env file...")
@@ -527,7 +660,8 @@ def scrape_instagram_simple(ig_url: str, target_count: int = 20) -> pd.DataFrame
 
         # Load post links
         print(f"[INFO] Loading post links (target: {target_count})...")
-        post_links = load_post_links(driver, target_count)
+        known = post_index.known_keys("instagram", profile_url) if incremental else set()
+        post_links = load_post_links(driver, target_count, known=known)
         print(f"[INFO] Found {len(post_links)} post links")
 
         if not post_links:
@@ -538,17 +672,10 @@ def scrape_instagram_simple(ig_url: str, target_count: int = 20) -> pd.DataFrame
             print(f"[DEBUG] Current URL: {driver.current_url}")
             return pd.DataFrame(columns=['shop_name', 'phone', 'floor', 'source'])
 
-        results = []
-        for i, link in enumerate(post_links, 1):
-            try:
-                print(f"[INFO] Extracting post {i}/{len(post_links)}: {link[:50]}...")
-                post_data = extract_post_data(driver, link)
-                if post_data:
-                    results.append(post_data)
-                time.sleep(2)
-            except Exception as e:
-                print(f"[WARN] Failed to extract data from {link}: {e}")
-                continue
+        new_links = [l for l in post_links if post_index.post_key(l) not in known]
+        if len(new_links) < len(post_links):
+            print(f"[INFO] {len(post_links) - len(new_links)} post(s) already scraped, opening {len(new_links)} new")
+        results = fetch_posts_concurrently(driver, new_links, headless=True) if new_links else []
 
         # Convert to DataFrame format compatible with shop data
         # Store full Instagram data including post_url, content_type, text, time, datetime
@@ -584,6 +711,13 @@ def scrape_instagram_simple(ig_url: str, target_count: int = 20) -> pd.DataFrame
                 'datetime': datetime_val  # ISO datetime
             })
 
+        # New posts plus cached history of this profile (or only what matches `since`)
+        if incremental:
+            rows = post_index.merge_with_history(
+                "instagram", profile_url, rows, url_field='post_url', text_field='full_text', date_field='datetime',
+                limit=target_count, since=since,
+            )
+
         # Create DataFrame with all columns
         df = pd.DataFrame(rows)
         
@@ -602,10 +736,7 @@ def scrape_instagram_simple(ig_url: str, target_count: int = 20) -> pd.DataFrame
         return pd.DataFrame(columns=['shop_name', 'phone', 'floor', 'source'])
     finally:
         if driver:
-            try:
-                driver.quit()
-            except Exception:
-                pass
+            release_driver(driver)
 
 
 def main():
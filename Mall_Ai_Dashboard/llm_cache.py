@@ -0,0 +1,169 @@
+"""
+Content-addressed on-disk cache for LLM responses.
+
+Entries are keyed by a SHA-256 of everything that determines the answer
+(model, endpoint, prompt and sampling parameters), so re-scraping a page whose
+cleaned text has not changed reuses the previous response instead of paying
+for another 30–120s API call.
+
+Storage is a single SQLite file. Entries expire after LLM_CACHE_TTL_HOURS and
+the least recently used entries are evicted once the stored responses exceed
+LLM_CACHE_MAX_MB. Set LLM_CACHE_ENABLED=0 to bypass the cache entirely.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(BASE_DIR, "llm_cache.sqlite"))
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", str(7 * 24)))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "200"))
+
+_lock = threading.Lock()
+_initialized = False
+_stats = {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "evicted": 0}
+
+
+def make_cache_key(**params) -> str:
+    """Stable hash of the request parameters (order-independent)."""
+    payload = json.dumps(params, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    conn = sqlite3.connect(LLM_CACHE_PATH, timeout=30)
+    if not _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " model TEXT,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache(last_access)")
+        conn.commit()
+        _initialized = True
+    return conn
+
+
+def cache_get(key: str) -> Optional[str]:
+    """Return the cached response for `key`, or None on miss/expiry/disabled cache."""
+    if not LLM_CACHE_ENABLED:
+        return None
+    now = time.time()
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                row = conn.execute("SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    _stats["misses"] += 1
+                    return None
+                response, created_at = row
+                if LLM_CACHE_TTL_HOURS > 0 and now - created_at > LLM_CACHE_TTL_HOURS * 3600:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    conn.commit()
+                    _stats["expired"] += 1
+                    _stats["misses"] += 1
+                    return None
+                conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+                conn.commit()
+                _stats["hits"] += 1
+                return response
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: LLM cache read failed: {e}")
+        return None
+
+
+def cache_put(key: str, response: str, model: str = "") -> None:
+    """Store `response` under `key`, then evict least-recently-used entries over the size limit."""
+    if not LLM_CACHE_ENABLED or response is None:
+        return
+    now = time.time()
+    size = len(response.encode("utf-8"))
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, response, model, size, created_at, last_access)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, response, model, size, now, now),
+                )
+                _stats["stores"] += 1
+                _evict(conn)
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: LLM cache write failed: {e}")
+
+
+def _evict(conn: sqlite3.Connection) -> None:
+    """Drop expired entries, then LRU entries until the cache is under 90% of LLM_CACHE_MAX_MB."""
+    if LLM_CACHE_TTL_HOURS > 0:
+        cur = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - LLM_CACHE_TTL_HOURS * 3600,))
+        _stats["expired"] += cur.rowcount or 0
+    if LLM_CACHE_MAX_MB <= 0:
+        return
+    max_bytes = LLM_CACHE_MAX_MB * 1024 * 1024
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+    if total <= max_bytes:
+        return
+    target = max_bytes * 0.9
+    doomed = []
+    for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC"):
+        if total <= target:
+            break
+        doomed.append((key,))
+        total -= size
+    conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+    _stats["evicted"] += len(doomed)
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters for this process plus current entry count and size on disk."""
+    stats = dict(_stats)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = (stats["hits"] / lookups) if lookups else 0.0
+    stats["enabled"] = LLM_CACHE_ENABLED
+    stats["entries"], stats["bytes"] = 0, 0
+    if LLM_CACHE_ENABLED and os.path.exists(LLM_CACHE_PATH):
+        try:
+            with _lock:
+                conn = _connect()
+                try:
+                    stats["entries"], stats["bytes"] = conn.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+                    ).fetchone()
+                finally:
+                    conn.close()
+        except sqlite3.Error:
+            pass
+    return stats
+
+
+def cache_clear() -> None:
+    """Delete every cached response."""
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.execute("DELETE FROM llm_cache")
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: LLM cache clear failed: {e}")
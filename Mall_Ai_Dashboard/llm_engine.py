@@ -1,4 +1,5 @@
 import os
+import sys
 import requests
 import json
 import re
@@ -28,6 +29,16 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "").strip()
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4.1-mini").strip()
 OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").strip()
 
+# Sibling modules must import even when loaded as Mall_Ai_Dashboard.llm_engine (Map scrapping),
+# and the project root holds the shared http_client
+_HERE = os.path.dirname(os.path.abspath(__file__))
+for _path in (_HERE, os.path.dirname(_HERE)):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+from llm_cache import make_cache_key, cache_get, cache_put
+import http_client
+from text_compact import compact_text, describe_stats
+
 
 def _call_openai_chat(
     prompt: str,
@@ -35,16 +46,21 @@ def _call_openai_chat(
     max_tokens: int = 2048,
     response_format: str | None = None,
     timeout_seconds: int = 120,
+    use_cache: bool = True,
 ) -> str | None:
     """
     Helper to call OpenAI chat completions API with a single user prompt.
 
+    Identical requests (same model, endpoint, prompt and parameters) are served
+    from the on-disk llm_cache unless `use_cache` is False or LLM_CACHE_ENABLED=0.
+
     Args:
         prompt: Full prompt text to send as the user message.
         temperature: Sampling temperature.
         max_tokens: Max tokens in the response.
         response_format: If "json_object", request JSON-mode; otherwise plain text.
         timeout_seconds: Request timeout.
+        use_cache: Read/write the LLM response cache for this call.
 
     Returns:
         Response text (message content) or None on failure.
@@ -53,6 +69,20 @@ def _call_openai_chat(
         print("Warning: OPENAI_API_KEY is not set. Please add it to your environment or .env file.")
         return None
 
+    cache_key = make_cache_key(
+        model=OPENAI_MODEL,
+        base_url=OPENAI_BASE_URL,
+        prompt=prompt,
+        temperature=float(temperature),
+        max_tokens=int(max_tokens),
+        response_format=response_format,
+    )
+    if use_cache:
+        cached = cache_get(cache_key)
+        if cached is not None:
+            print(f"LLM cache hit ({len(cached)} chars, model={OPENAI_MODEL})")
+            return cached
+
     headers = {
         "Authorization": f"Bearer {OPENAI_API_KEY}",
         "Content-Type": "application/json",
@@ -74,7 +104,7 @@ def _call_openai_chat(
         body["response_format"] = {"type": "json_object"}
 
     try:
-        r = requests.post(
+        r = http_client.post(
             f"{OPENAI_BASE_URL}/chat/completions",
             headers=headers,
             json=body,
@@ -99,7 +129,13 @@ def _call_openai_chat(
             return None
         message = choices[0].get("message") or {}
         content = message.get("content", "")
-        return content.strip() if isinstance(content, str) else None
+        if not isinstance(content, str):
+            return None
+        content = content.strip()
+        # Don't cache truncated answers; a retry with more tokens should hit the API
+        if use_cache and content and choices[0].get("finish_reason") != "length":
+            cache_put(cache_key, content, model=OPENAI_MODEL)
+        return content
     except Exception as e:
         print(f"Warning: Failed to parse OpenAI response: {e}")
         return None
@@ -207,33 +243,37 @@ Return ONLY the JSON array, no markdown or explanation."""
     return [{**item, "matched_tenant": None} for item in serp_items]
 
 
-def extract_shops_from_text(cleaned_text: str, url: str = "") -> list:
-    """Extract shop names and details from cleaned website text using LLM.
-    
-    Args:
-        cleaned_text: Clean text extracted from website HTML (no HTML tags)
-        url: Optional URL for context
-    
-    Returns:
-        List of dictionaries with shop_name, phone, floor, image_url
-    """
-    if not cleaned_text or len(cleaned_text.strip()) < 50:
-        return []
-    
-    # Truncate text if too long (Gemini 1.5 Flash can handle up to 1M tokens, but we'll limit to 100K chars for safety)
-    original_length = len(cleaned_text)
-    max_text_length = 100000  # Gemini can handle much more text
-    
-    if len(cleaned_text) > max_text_length:
-        cleaned_text = cleaned_text[:max_text_length] + "\n... (text truncated)"
-        print(f"Text truncated to {max_text_length} characters (original: {original_length} chars)")
-    
-    prompt = f"""You are an expert data extraction assistant specializing in extracting shop/store information from mall website text.
+# Chunked extraction: large directory pages are split on line boundaries and
+# extracted concurrently, so recall no longer depends on page length and latency
+# is bounded by the slowest chunk instead of one huge prompt.
+LLM_EXTRACTION_CHUNKING = os.getenv("LLM_EXTRACTION_CHUNKING", "1").strip().lower() not in ("0", "false", "no", "off")
+LLM_CHUNK_CHARS = int(os.getenv("LLM_CHUNK_CHARS", "20000"))
+LLM_CHUNK_OVERLAP_LINES = int(os.getenv("LLM_CHUNK_OVERLAP_LINES", "6"))
+LLM_CHUNK_CONCURRENCY = int(os.getenv("LLM_CHUNK_CONCURRENCY", "4"))
+# Extra attempts for a chunk whose LLM call fails. A chunk that still fails fails the whole
+# chunked extraction: a merged list with a chunk missing would be saved as the page's snapshot.
+LLM_CHUNK_RETRIES = int(os.getenv("LLM_CHUNK_RETRIES", "1"))
+# Token budget for page text sent in a single request (extraction without chunking, coming-soon
+# extraction). Repeated boilerplate is collapsed first; over budget, the least useful lines are left out.
+LLM_TEXT_TOKEN_BUDGET = int(os.getenv("LLM_TEXT_TOKEN_BUDGET", "25000"))
+
+
+def _compact_for_llm(text: str, token_budget: int | None = None) -> str:
+    """Collapse duplicate/boilerplate lines and pack `text` into `token_budget` tokens (no limit if None)."""
+    compacted, stats = compact_text(text, token_budget=token_budget, model=OPENAI_MODEL)
+    if stats["tokens_after"] < stats["tokens_before"]:
+        print(describe_stats(stats))
+    return compacted
+
+
+def _build_shop_extraction_prompt(cleaned_text: str, url: str = "", part_note: str = "") -> str:
+    """Prompt for extract_shops_from_text (one call per page, or per chunk in chunked mode)."""
+    return f"""You are an expert data extraction assistant specializing in extracting shop/store information from mall website text.
 
 TASK: Extract ALL shop names, stores, retailers, and businesses from the following mall website text. Be thorough and comprehensive.
 
 Website URL (for context): {url}
-
+{part_note}
 Text from website:
 {cleaned_text}
 
@@ -291,6 +331,171 @@ CRITICAL:
 - Do NOT add headers or labels.
 - Return ONLY the list of shops, one per line, using the exact pipe format."""
 
+
+def _parse_shop_lines(raw: str) -> list:
+    """Parse 'Shop Name | Phone | Floor | ImageURL' lines into shop dicts (duplicates kept)."""
+    shops = []
+    lines = [ln.strip() for ln in raw.splitlines() if ln.strip()]
+    for line in lines:
+        # Skip obvious non-data lines if the model misbehaves
+        if "|" not in line:
+            continue
+        parts = [p.strip() for p in line.split("|")]
+        if not parts:
+            continue
+        name = parts[0]
+        if not name or len(name) < 2:
+            continue
+
+        phone = parts[1] if len(parts) > 1 else ""
+        floor = parts[2] if len(parts) > 2 else ""
+        image_url = parts[3] if len(parts) > 3 else ""
+
+        shops.append({
+            "shop_name": name,
+            "phone": phone,
+            "floor": floor,
+            "image_url": image_url,
+        })
+    return shops
+
+
+def _is_section_boundary(line: str) -> bool:
+    """Heuristic for a good place to start a new chunk: A–Z index letters and short headings."""
+    s = line.strip()
+    if len(s) == 1 and s.isalpha():
+        return True
+    return 3 <= len(s) <= 40 and s.isupper() and not any(c.isdigit() for c in s)
+
+
+def _split_text_into_chunks(text: str, max_chars: int = LLM_CHUNK_CHARS, overlap_lines: int = LLM_CHUNK_OVERLAP_LINES) -> list:
+    """
+    Split `text` on line boundaries into chunks of at most ~max_chars.
+
+    A chunk is cut before a section-like line (index letter / heading) when one is
+    found in its last quarter. Each chunk after the first repeats the last
+    `overlap_lines` lines of the previous one so entries straddling the cut are
+    seen whole. Returns a list of (overlap_lines_list, body_lines_list).
+    """
+    lines = [ln for ln in text.split("\n") if ln.strip()]
+    chunks = []
+    i = 0
+    n = len(lines)
+    while i < n:
+        size = 0
+        j = i
+        while j < n and (j == i or size + len(lines[j]) + 1 <= max_chars):
+            size += len(lines[j]) + 1
+            j += 1
+        if j < n:
+            # Prefer to cut at a section boundary in the last quarter of the chunk
+            floor_idx = i + max(1, (j - i) * 3 // 4)
+            for k in range(j - 1, floor_idx - 1, -1):
+                if _is_section_boundary(lines[k]):
+                    j = k
+                    break
+        overlap = lines[max(0, i - overlap_lines):i] if chunks else []
+        chunks.append((overlap, lines[i:j]))
+        i = j
+    return chunks
+
+
+def _drop_overlap_duplicates(shops: list, overlap: list, body: list) -> list:
+    """
+    Remove rows a chunk extracted from its overlap prefix (the previous chunk owns
+    those lines) while keeping one row per occurrence in the chunk's own lines.
+    """
+    if not overlap:
+        return shops
+    overlap_lower = [ln.lower() for ln in overlap]
+    body_lower = [ln.lower() for ln in body]
+    by_name = {}
+    for shop in shops:
+        by_name.setdefault(shop["shop_name"].strip().lower(), []).append(shop)
+
+    keep_ids = set()
+    for key, rows in by_name.items():
+        in_overlap = sum(1 for ln in overlap_lower if key in ln)
+        if in_overlap == 0:
+            keep_ids.update(id(r) for r in rows)  # not from the overlap (or name normalized by the model)
+            continue
+        in_body = sum(1 for ln in body_lower if key in ln)
+        keep = 0 if in_body == 0 else max(1, len(rows) - in_overlap)
+        keep_ids.update(id(r) for r in rows[-keep:] if keep)
+    return [s for s in shops if id(s) in keep_ids]
+
+
+def _extract_shops_chunked(cleaned_text: str, url: str = "") -> list:
+    """Map-reduce extraction: one LLM call per chunk (concurrently), merged in page order.
+
+    Raises RuntimeError when a chunk's LLM call still fails after LLM_CHUNK_RETRIES retries.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    chunks = _split_text_into_chunks(cleaned_text)
+    total = len(chunks)
+    print(f"Chunked extraction: {len(cleaned_text)} chars -> {total} chunk(s), up to {LLM_CHUNK_CONCURRENCY} in parallel")
+
+    def run(idx):
+        overlap, body = chunks[idx]
+        part_note = (
+            f"\nNOTE: This is part {idx + 1} of {total} of the page text (the page was split because it is long). "
+            "Extract every shop that appears in THIS part; other parts are handled separately.\n"
+        )
+        prompt = _build_shop_extraction_prompt("\n".join(overlap + body), url=url, part_note=part_note)
+        for attempt in range(1 + max(0, LLM_CHUNK_RETRIES)):
+            raw = _call_openai_chat(
+                prompt,
+                temperature=0.1,
+                max_tokens=8192,
+                response_format=None,
+                timeout_seconds=120,
+            )
+            if raw:
+                break
+            print(f"Warning: Empty response from LLM for chunk {idx + 1}/{total} (attempt {attempt + 1})")
+        else:
+            raise RuntimeError(f"no LLM response for chunk {idx + 1}/{total}")
+        return _drop_overlap_duplicates(_parse_shop_lines(raw), overlap, body)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(LLM_CHUNK_CONCURRENCY, total))) as executor:
+        results = list(executor.map(run, range(total)))
+
+    shops = [shop for chunk_shops in results for shop in chunk_shops]
+    print(f"Chunked extraction merged {len(shops)} shop rows from {total} chunk(s)")
+    return shops
+
+
+def extract_shops_from_text(cleaned_text: str, url: str = "", chunked: bool | None = None) -> list:
+    """Extract shop names and details from cleaned website text using LLM.
+    
+    Args:
+        cleaned_text: Clean text extracted from website HTML (no HTML tags)
+        url: Optional URL for context
+        chunked: Split the text into chunks extracted concurrently. None (default)
+                 enables it automatically for text longer than LLM_CHUNK_CHARS.
+    
+    Returns:
+        List of dictionaries with shop_name, phone, floor, image_url
+    """
+    if not cleaned_text or len(cleaned_text.strip()) < 50:
+        return []
+
+    # Chunks are sized after compaction, so boilerplate does not cost extra calls
+    compacted = _compact_for_llm(cleaned_text)
+    if chunked is None:
+        chunked = LLM_EXTRACTION_CHUNKING and len(compacted) > LLM_CHUNK_CHARS
+    if chunked:
+        try:
+            return _extract_shops_chunked(compacted, url=url)
+        except Exception as e:
+            print(f"Warning: Chunked extraction failed ({e}), falling back to single request")
+    
+    # One request: keep the most useful lines within the token budget instead of cutting off the tail
+    cleaned_text = _compact_for_llm(compacted, LLM_TEXT_TOKEN_BUDGET)
+    
+    prompt = _build_shop_extraction_prompt(cleaned_text, url=url)
+
     # Call OpenAI (plain text response)
     raw = _call_openai_chat(
         prompt,
@@ -307,32 +512,7 @@ CRITICAL:
     try:
         # Parse plain-text pipe-separated lines into shop dicts.
         # IMPORTANT: do NOT remove duplicates – return exactly what the AI extracted.
-        shops = []
-        lines = [ln.strip() for ln in raw.splitlines() if ln.strip()]
-        for line in lines:
-            # Skip obvious non-data lines if the model misbehaves
-            if "|" not in line:
-                continue
-            parts = [p.strip() for p in line.split("|")]
-            if not parts:
-                continue
-            name = parts[0]
-            if not name or len(name) < 2:
-                continue
-
-            phone = parts[1] if len(parts) > 1 else ""
-            floor = parts[2] if len(parts) > 2 else ""
-            image_url = parts[3] if len(parts) > 3 else ""
-
-            shops.append({
-                "shop_name": name,
-                "phone": phone,
-                "floor": floor,
-                "image_url": image_url,
-            })
-        
-        # Return raw list with possible duplicates, as requested.
-        return shops
+        return _parse_shop_lines(raw)
 
     except Exception as e:
         print(f"Warning: Error extracting shops from text using LLM: {str(e)}")
@@ -352,12 +532,8 @@ def extract_coming_soon_shops_from_text(cleaned_text: str, url: str = "") -> lis
     if not cleaned_text or len(cleaned_text.strip()) < 50:
         return []
     
-    # Truncate text if too long
-    original_length = len(cleaned_text)
-    max_text_length = 100000
-    if len(cleaned_text) > max_text_length:
-        cleaned_text = cleaned_text[:max_text_length] + "\n... (text truncated)"
-        print(f"Text truncated to {max_text_length} characters for coming soon extraction")
+    # Collapse boilerplate and keep "coming soon"/opening lines first within the token budget
+    cleaned_text = _compact_for_llm(cleaned_text, LLM_TEXT_TOKEN_BUDGET)
     
     prompt = f"""You are an expert data extraction assistant specializing in identifying "coming soon" shops, kiosks, and businesses from mall website text.
 
@@ -1046,31 +1222,28 @@ Generate a CLEAR, UNDERSTANDABLE report from the actual data provided.
         return json.dumps({"error": str(e)})
 
 
-def extract_shops_from_image_via_llm(image_path: str, mall_url: str = "") -> list:
-    """
-    Core function for Vision AI mode.
-    Takes a screenshot of a mall map and uses LLM Vision to extract tenant listings.
-    """
-    import base64
+# Vision extraction: each floor capture is cut into overlapping tiles (vision_tiles.py) that
+# are read concurrently; a tenant seen in several tiles is merged by name, floor and position.
+VISION_CONCURRENCY = int(os.getenv("VISION_CONCURRENCY", "4"))
+# Same name on the same floor within this many capture pixels is one tenant (tile overlap)
+VISION_MERGE_DISTANCE = int(os.getenv("VISION_MERGE_DISTANCE", "200"))
 
-    if not os.path.exists(image_path):
-        print(f"Error: Image not found at {image_path}")
-        return []
+try:
+    from vision_tiles import TileDeduper, tile_image, describe_stats as describe_tile_stats
+    VISION_TILES_AVAILABLE = True
+except ImportError:  # Pillow not installed: whole screenshots are sent as before
+    VISION_TILES_AVAILABLE = False
 
-    # Encode image to base64
-    try:
-        with open(image_path, "rb") as image_file:
-            base64_image = base64.b64encode(image_file.read()).decode('utf-8')
-    except Exception as e:
-        print(f"Error encoding image: {e}")
-        return []
 
-    prompt = f"""You are an expert map analyst. Analyze this mall map image (URL: {mall_url}) and extract ALL tenant/shop names listed.
-    
+def _build_vision_prompt(mall_url: str = "", tile_note: str = "") -> str:
+    """Prompt for one vision request (a whole map image, or one tile of it)."""
+    return f"""You are an expert map analyst. Analyze this mall map image (URL: {mall_url}) and extract ALL tenant/shop names listed.
+    {tile_note}
     INSTRUCTIONS:
     1. Look for the legend, directory, or text on the map itself.
     2. Extract EVERY shop/store/restaurant/brand name you find.
-    3. For each shop, provide: name, floor (if identifiable), and a brief description/category.
+    3. For each shop, provide: name, floor (if identifiable), a brief description/category,
+       and the position of its label in this image as x and y from 0 (left/top) to 1000 (right/bottom).
     
     Return ONLY valid JSON in this format:
     {{
@@ -1079,7 +1252,9 @@ def extract_shops_from_image_via_llm(image_path: str, mall_url: str = "") -> lis
           "name": "Shop Name",
           "floor": "L1",
           "description": "Fashion Retailer",
-          "location_id": "Optional shop number"
+          "location_id": "Optional shop number",
+          "x": 500,
+          "y": 500
         }}
       ]
     }}
@@ -1090,61 +1265,179 @@ def extract_shops_from_image_via_llm(image_path: str, mall_url: str = "") -> lis
     - Accuracy is critical.
     """
 
-    # Call OpenAI with vision support
-    if not OPENAI_API_KEY:
-        print("Error: OPENAI_API_KEY not set.")
-        return []
-
-    headers = {
-        "Authorization": f"Bearer {OPENAI_API_KEY}",
-        "Content-Type": "application/json",
-    }
 
-    payload = {
-        "model": OPENAI_MODEL,  # Should be gpt-4o or similar for vision
-        "messages": [
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:image/png;base64,{base64_image}"}
-                    }
-                ]
-            }
-        ],
-        "max_tokens": 4096,
-        "response_format": {"type": "json_object"}
-    }
+def _call_openai_vision(prompt: str, data_url: str, timeout_seconds: int = 180) -> list:
+    """One vision request; returns the "tenants" list (cached on disk like _call_openai_chat)."""
+    import hashlib
 
-    try:
-        r = requests.post(
+    cache_key = make_cache_key(
+        model=OPENAI_MODEL,
+        base_url=OPENAI_BASE_URL,
+        prompt=prompt,
+        image_sha256=hashlib.sha256(data_url.encode("ascii")).hexdigest(),
+        kind="vision",
+    )
+    raw_content = cache_get(cache_key)
+    if raw_content is None:
+        headers = {
+            "Authorization": f"Bearer {OPENAI_API_KEY}",
+            "Content-Type": "application/json",
+        }
+        payload = {
+            "model": OPENAI_MODEL,  # Should be gpt-4o or similar for vision
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt},
+                        {"type": "image_url", "image_url": {"url": data_url, "detail": "high"}},
+                    ]
+                }
+            ],
+            "max_tokens": 4096,
+            "response_format": {"type": "json_object"}
+        }
+        r = http_client.post(
             f"{OPENAI_BASE_URL}/chat/completions",
             headers=headers,
             json=payload,
-            timeout=180
+            timeout=timeout_seconds
         )
         r.raise_for_status()
-        resp = r.json()
-        raw_content = resp['choices'][0]['message']['content']
-        data = json.loads(raw_content)
-        
-        tenants = data.get("tenants", [])
-        # Ensure standard fields
+        choice = r.json()['choices'][0]
+        raw_content = choice['message']['content']
+        if choice.get("finish_reason") != "length":
+            cache_put(cache_key, raw_content, model=OPENAI_MODEL)
+    tenants = json.loads(raw_content).get("tenants", [])
+    return [t for t in tenants if isinstance(t, dict)]
+
+
+def _vision_jobs(captures: list) -> list:
+    """(floor, box, data_url, tile_note) per request: the tiles of each capture, or whole images without Pillow."""
+    import base64
+
+    jobs = []
+    dedupe = TileDeduper() if VISION_TILES_AVAILABLE else None
+    for floor, path in captures:
+        if not os.path.exists(path):
+            print(f"Error: Image not found at {path}")
+            continue
+        label = floor or os.path.basename(path)
+        try:
+            if VISION_TILES_AVAILABLE:
+                tiles, stats = tile_image(path, dedupe=dedupe)
+                print(describe_tile_stats(stats, label))
+            else:
+                with open(path, "rb") as image_file:
+                    encoded = base64.b64encode(image_file.read()).decode('utf-8')
+                mime = "image/jpeg" if path.lower().endswith((".jpg", ".jpeg")) else "image/png"
+                tiles = [{"box": None, "data_url": f"data:{mime};base64,{encoded}"}]
+        except Exception as e:
+            print(f"Error encoding image: {e}")
+            continue
+        for i, tile in enumerate(tiles, start=1):
+            notes = []
+            if floor:
+                notes.append(f"This map shows the floor \"{floor}\".")
+            if len(tiles) > 1:
+                notes.append(
+                    f"The image is tile {i} of {len(tiles)} cut from a larger map; neighbouring tiles overlap. "
+                    "Extract every label that is readable in THIS tile; skip text cut off at the edge."
+                )
+            jobs.append((floor, tile["box"], tile["data_url"], " ".join(notes)))
+    return jobs
+
+
+def _merge_vision_tenants(found: list) -> list:
+    """
+    Merge (tenant, position) rows from all tiles in tile order. Rows with the same name
+    on the same floor are one tenant when they lie within VISION_MERGE_DISTANCE px (the
+    overlap between tiles) or either has no position; further apart they stay separate.
+    """
+    merged = []
+    by_key = {}
+    for tenant, pos in found:
+        key = (re.sub(r"\W+", " ", str(tenant["name"])).strip().lower(), str(tenant["floor"]).strip().lower())
+        if not key[0]:
+            continue
+        twin = None
+        for other, other_pos in by_key.get(key, []):
+            if pos is None or other_pos is None or \
+                    ((pos[0] - other_pos[0]) ** 2 + (pos[1] - other_pos[1]) ** 2) ** 0.5 <= VISION_MERGE_DISTANCE:
+                twin = other
+                break
+        if twin is None:
+            by_key.setdefault(key, []).append((tenant, pos))
+            merged.append(tenant)
+            continue
+        # Keep whichever tile read the details
+        if not twin['location_id'] and tenant['location_id']:
+            twin['location_id'] = tenant['location_id']
+        if twin['description'] == "Mall Tenant" and tenant['description'] != "Mall Tenant":
+            twin['description'] = tenant['description']
+    return merged
+
+
+def extract_shops_from_image_via_llm(image_path, mall_url: str = "") -> list:
+    """
+    Core function for Vision AI mode.
+    Takes screenshots of a mall map and uses LLM Vision to extract tenant listings.
+
+    `image_path` is one image, or a list of (floor_label, image_path) with one capture
+    per floor (floor_label None lets the model read the floor). Each capture is split
+    into overlapping, re-encoded tiles (duplicates across floors skipped) that are read
+    VISION_CONCURRENCY at a time, then tenants are merged by name, floor and position.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    captures = [(None, image_path)] if isinstance(image_path, str) else list(image_path)
+
+    # Call OpenAI with vision support
+    if not OPENAI_API_KEY:
+        print("Error: OPENAI_API_KEY not set.")
+        return []
+
+    jobs = _vision_jobs(captures)
+    if not jobs:
+        return []
+    print(f"Vision extraction: {len(jobs)} request(s) for {len(captures)} capture(s), up to {VISION_CONCURRENCY} in parallel")
+
+    def run(job):
+        floor, box, data_url, tile_note = job
+        try:
+            tenants = _call_openai_vision(_build_vision_prompt(mall_url, tile_note), data_url)
+        except Exception as e:
+            print(f"Vision Error: {e}")
+            return []
+        rows = []
         for t in tenants:
-            if 'name' not in t: t['name'] = "Unknown"
+            # Ensure standard fields
+            if not t.get('name'): continue
             if 'description' not in t: t['description'] = "Mall Tenant"
             if 'location_id' not in t: t['location_id'] = ""
-            if 'floor' not in t: t['floor'] = "Level 1"
+            if floor: t['floor'] = floor
+            elif 'floor' not in t: t['floor'] = "Level 1"
+            # Label position in capture pixels, for merging tiles
+            pos = None
+            try:
+                if box is not None and t.get('x') is not None and t.get('y') is not None:
+                    pos = (box[0] + float(t['x']) / 1000 * (box[2] - box[0]),
+                           box[1] + float(t['y']) / 1000 * (box[3] - box[1]))
+            except (TypeError, ValueError):
+                pass
+            t.pop('x', None)
+            t.pop('y', None)
             # Add placeholders for map data
             t['hours'] = "Not Available"
             t['latitude'] = None
             t['longitude'] = None
-            
-        return tenants
+            rows.append((t, pos))
+        return rows
 
-    except Exception as e:
-        print(f"Vision Error: {e}")
-        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(VISION_CONCURRENCY, len(jobs)))) as executor:
+        results = list(executor.map(run, jobs))
 
+    found = [row for rows in results for row in rows]
+    tenants = _merge_vision_tenants(found)
+    print(f"Vision extraction merged {len(found)} rows into {len(tenants)} tenants")
+    return tenants
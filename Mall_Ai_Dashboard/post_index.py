@@ -0,0 +1,225 @@
+"""
+Watermark index of social posts already scraped (Facebook pages, Instagram profiles).
+
+For every page URL the index keeps one row per post, keyed by its canonical
+permalink (or, when no permalink was found, a hash of its opening text), with
+the DataFrame row the scraper produced for it. Scrapers use it to:
+
+  - stop scrolling once POST_INDEX_STOP_AFTER already-seen posts are on screen
+    (newest posts come first, so everything below them was scraped before;
+    more than one is required because pinned posts are old but sit on top)
+  - fetch/parse only the posts that are new
+  - return those plus the cached history, or only posts "since" a point in
+    time (see merge_with_history)
+
+Storage is a single SQLite file beside this module (POST_INDEX_PATH). Set
+POST_INDEX_ENABLED=0 to always scrape the newest posts from scratch.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Set, Union
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from snapshot_store import normalize_url
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+POST_INDEX_ENABLED = os.getenv("POST_INDEX_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+POST_INDEX_PATH = os.getenv("POST_INDEX_PATH", os.path.join(BASE_DIR, "post_index.sqlite"))
+# Already-seen posts that must be loaded before a scraper stops scrolling
+POST_INDEX_STOP_AFTER = int(os.getenv("POST_INDEX_STOP_AFTER", "4"))
+
+# Query parameters that identify a post; everything else (__cft__, __tn__, igsh, ...) is per-session noise
+_ID_PARAMS = ("story_fbid", "fbid", "id", "v")
+
+SINCE_LAST_RUN = "last_run"
+
+_lock = threading.Lock()
+_initialized = False
+
+
+def canonical_post_url(url: str) -> str:
+    """Permalink without host prefix variants, trailing slash or session/tracking query parameters."""
+    parsed = urlparse((url or "").strip())
+    host = parsed.netloc.lower()
+    for prefix in ("www.", "m.", "web."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    query = sorted((k, v) for k, v in parse_qsl(parsed.query) if k.lower() in _ID_PARAMS)
+    return urlunparse(("https", host, parsed.path.rstrip("/"), "", urlencode(query), ""))
+
+
+def post_key(post_url: str = "", text: str = "") -> Optional[str]:
+    """Index key of a post: its canonical permalink, else a hash of its first 60 normalized characters."""
+    if post_url and post_url.strip() not in ("", "-"):
+        return "url:" + canonical_post_url(post_url)
+    norm = re.sub(r"\s+", " ", (text or "").lower()).strip()[:60].strip()
+    if len(norm) < 5:
+        return None
+    return "txt:" + hashlib.sha256(norm.encode("utf-8")).hexdigest()
+
+
+def parse_since(since: Union[None, str, date, datetime]) -> Union[None, str, datetime]:
+    """Normalize a "since" argument: None, SINCE_LAST_RUN, or a naive datetime."""
+    if since is None or since == "":
+        return None
+    if since == SINCE_LAST_RUN:
+        return SINCE_LAST_RUN
+    if isinstance(since, datetime):
+        return since.replace(tzinfo=None)
+    if isinstance(since, date):
+        return datetime(since.year, since.month, since.day)
+    return datetime.fromisoformat(str(since).strip()).replace(tzinfo=None)
+
+
+def _parse_posted_at(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).strip().replace("Z", "+00:00")).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    conn = sqlite3.connect(POST_INDEX_PATH, timeout=30)
+    if not _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_posts ("
+            " platform TEXT NOT NULL,"
+            " page_key TEXT NOT NULL,"
+            " post_key TEXT NOT NULL,"
+            " row TEXT NOT NULL,"
+            " posted_at TEXT,"
+            " first_seen REAL NOT NULL,"
+            " last_seen REAL NOT NULL,"
+            " PRIMARY KEY (platform, page_key, post_key))"
+        )
+        conn.commit()
+        _initialized = True
+    return conn
+
+
+def known_keys(platform: str, page_url: str) -> Set[str]:
+    """Keys of every post indexed for `page_url` (empty when the index is disabled or unreadable)."""
+    if not POST_INDEX_ENABLED:
+        return set()
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                rows = conn.execute(
+                    "SELECT post_key FROM seen_posts WHERE platform = ? AND page_key = ?",
+                    (platform, normalize_url(page_url)),
+                ).fetchall()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: post index read failed: {e}")
+        return set()
+    return {r[0] for r in rows}
+
+
+def count_known(keys: Iterable[Optional[str]], known: Set[str]) -> int:
+    """How many of `keys` are already indexed."""
+    return sum(1 for k in keys if k and k in known)
+
+
+def merge_with_history(
+    platform: str,
+    page_url: str,
+    rows: List[Dict],
+    url_field: str,
+    text_field: str,
+    date_field: str,
+    limit: int,
+    since: Union[None, str, date, datetime] = None,
+) -> List[Dict]:
+    """
+    Index the rows scraped this run and return what the caller should output.
+
+    `rows` are the scraper's output rows, newest first; `url_field`, `text_field`
+    and `date_field` name the permalink, text and ISO date columns used for the
+    key and for "since" filtering. Returns, newest first and at most `limit` rows:
+        since=None          – this run's rows, then indexed rows not seen this run
+        since="last_run"    – only rows that were not in the index before this run
+        since=<date/ISO>    – rows posted at or after that time (the first-seen time
+                              stands in for posts without a parsable date)
+    """
+    since = parse_since(since)
+    if not POST_INDEX_ENABLED:
+        return rows[:limit]
+
+    now = time.time()
+    page_key = normalize_url(page_url)
+    current = []
+    for row in rows:
+        key = post_key(str(row.get(url_field) or ""), str(row.get(text_field) or ""))
+        if key:
+            current.append((key, row))
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                stored = {
+                    r[0]: (r[1], r[2], r[3])
+                    for r in conn.execute(
+                        "SELECT post_key, row, posted_at, first_seen FROM seen_posts"
+                        " WHERE platform = ? AND page_key = ?",
+                        (platform, page_key),
+                    )
+                }
+                conn.executemany(
+                    "INSERT INTO seen_posts (platform, page_key, post_key, row, posted_at, first_seen, last_seen)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (platform, page_key, post_key) DO UPDATE SET"
+                    " row = excluded.row, posted_at = COALESCE(excluded.posted_at, posted_at),"
+                    " last_seen = excluded.last_seen",
+                    [
+                        (platform, page_key, key, json.dumps(row, ensure_ascii=False, default=str),
+                         str(row.get(date_field) or "") or None, now, now)
+                        for key, row in current
+                    ],
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: post index update failed: {e}")
+        return rows[:limit]
+
+    new_count = sum(1 for key, _ in current if key not in stored)
+    print(f"[INFO] Post index: {new_count} new of {len(current)} scraped, {len(stored)} previously indexed")
+
+    # (row, posted_at, first_seen, is_new) for this run's rows, then the cached history
+    entries = []
+    this_run = set()
+    for key, row in current:
+        if key in this_run:
+            continue
+        this_run.add(key)
+        first_seen = stored[key][2] if key in stored else now
+        entries.append((row, _parse_posted_at(row.get(date_field)), first_seen, key not in stored))
+    history = [
+        (json.loads(row_json), _parse_posted_at(posted_at), first_seen, False)
+        for key, (row_json, posted_at, first_seen) in stored.items()
+        if key not in this_run
+    ]
+    history.sort(key=lambda e: (e[1] or datetime.fromtimestamp(e[2])), reverse=True)
+
+    if since == SINCE_LAST_RUN:
+        selected = [e for e in entries if e[3]]
+    elif since is not None:
+        selected = [e for e in entries + history if (e[1] or datetime.fromtimestamp(e[2])) >= since]
+    else:
+        selected = entries + history
+    return [e[0] for e in selected[:limit]]
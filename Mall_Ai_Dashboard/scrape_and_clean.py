@@ -5,19 +5,21 @@ import pandas as pd
 
 def scrape_and_prepare(url: str, source: str = "Official Website"):
     """Scrape `url` and return a pandas DataFrame built DIRECTLY from AI-extracted shops
-    (no de-duplication), plus the raw extracted count.
+    (no de-duplication), plus the raw extracted count and the extracted page text file.
 
     This bypasses the legacy text cleaner so you get exactly what the AI extracted.
 
     Returns:
-        tuple[pd.DataFrame, int]: (df_with_possible_duplicates, raw_extracted_count)
+        tuple[pd.DataFrame, int, str | None]: (df_with_possible_duplicates, raw_extracted_count,
+        path of the page text saved under extracted_texts/, or None)
     """
     if not url:
         raise ValueError("url is required for scraping")
 
     # Scrape in-memory (do not write files) - reduced initial wait for faster startup
     try:
-        shops, labeled_text = scrape_url(url, write_files=False, wait_seconds=1.0)  # Reduced from 3.0 to 1.0
+        shops, labeled_text, text_path = scrape_url(url, write_files=False, wait_seconds=1.0,  # Reduced from 3.0 to 1.0
+                                                    return_text_path=True)
     except Exception as scrape_err:
         raise Exception(f"Failed to scrape URL {url}: {str(scrape_err)}") from scrape_err
 
@@ -42,4 +44,4 @@ def scrape_and_prepare(url: str, source: str = "Official Website"):
         df = pd.DataFrame(columns=["shop_name", "phone", "floor", "source"])
         df["source"] = None
 
-    return df, raw_count
+    return df, raw_count, text_path
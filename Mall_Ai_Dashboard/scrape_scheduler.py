@@ -0,0 +1,130 @@
+"""
+Bounded-concurrency scheduler for multi-URL scraping (website, Facebook, Instagram).
+
+Jobs run on a thread pool (each job drives its own Chrome process, so the work
+scales with cores while Python threads mostly wait on the browser). Two limits
+keep it polite and within memory:
+  - a global cap on concurrently running browser jobs (SCRAPE_MAX_BROWSERS), and
+  - a per-domain cap (SCRAPE_PER_DOMAIN) so one site is never hit by several
+    browsers at once. Facebook and Instagram jobs share one login account each,
+    so they are keyed by platform rather than by page.
+
+Results are yielded in completion order from the calling thread, which lets
+Streamlit update the page as each job finishes (st.* calls must not happen in
+worker threads).
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from scrape_and_clean import scrape_and_prepare
+from facebook_scraper import scrape_facebook_simple
+from instagram import scrape_instagram_simple
+
+MAX_BROWSERS = int(os.getenv("SCRAPE_MAX_BROWSERS", str(min(4, os.cpu_count() or 1))))
+PER_DOMAIN_LIMIT = int(os.getenv("SCRAPE_PER_DOMAIN", "1"))
+
+
+def _domain_key(kind: str, url: str) -> str:
+    """Politeness key for a job: the platform for social jobs, the host for websites."""
+    if kind in ("facebook", "instagram"):
+        return kind
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def build_scrape_jobs(
+    website_urls: List[str],
+    facebook_urls: List[str],
+    instagram_urls: List[str],
+    num_posts: int = 20,
+    since=None,
+) -> List[Dict]:
+    """Return one job dict per URL: {'kind', 'url', 'index'} in website → Facebook → Instagram order.
+
+    `since` is passed to the Facebook/Instagram scrapers (see post_index.merge_with_history).
+    """
+    jobs = []
+    for kind, urls in (("website", website_urls), ("facebook", facebook_urls), ("instagram", instagram_urls)):
+        for u in urls:
+            jobs.append({"kind": kind, "url": u, "num_posts": num_posts, "since": since, "index": len(jobs)})
+    return jobs
+
+
+def _run_job(job: Dict) -> Dict:
+    """Run a single scrape job and normalize its output to {'df', 'count', 'text_path'}."""
+    kind, url = job["kind"], job["url"]
+    if kind == "website":
+        df, raw_count, text_path = scrape_and_prepare(url=url, source="Website Data")
+        return {"df": df, "count": raw_count, "text_path": text_path}
+    if kind == "facebook":
+        df = scrape_facebook_simple(fb_url=url, target_count=job["num_posts"], since=job.get("since"))
+    else:
+        df = scrape_instagram_simple(ig_url=url, target_count=job["num_posts"], since=job.get("since"))
+    return {"df": df, "count": 0 if df is None else len(df), "text_path": None}
+
+
+def run_scrape_jobs(
+    jobs: List[Dict],
+    max_browsers: Optional[int] = None,
+    per_domain_limit: Optional[int] = None,
+) -> Iterator[Dict]:
+    """
+    Run `jobs` concurrently and yield a result per job as soon as it finishes.
+
+    Each result is the job dict plus:
+        df       – scraped DataFrame (None on failure)
+        count    – items scraped (website: raw AI-extracted count)
+        text_path – website jobs: this page's extracted text file (None otherwise), so
+                    concurrent jobs never share a "last extracted text" pointer
+        error    – exception message, or None
+        elapsed  – seconds spent in the scraper (excluding queueing)
+    """
+    if not jobs:
+        return
+    max_browsers = max(1, max_browsers or MAX_BROWSERS)
+    per_domain_limit = max(1, per_domain_limit or PER_DOMAIN_LIMIT)
+
+    def worker(job: Dict) -> Dict:
+        start = time.time()
+        try:
+            out = _run_job(job)
+            return {**job, **out, "error": None, "elapsed": time.time() - start}
+        except Exception as e:
+            return {**job, "df": None, "count": 0, "text_path": None, "error": str(e), "elapsed": time.time() - start}
+
+    pending = list(jobs)
+    running = {}  # future -> domain key
+    active_per_domain: Dict[str, int] = {}
+
+    with ThreadPoolExecutor(max_workers=min(max_browsers, len(jobs)), thread_name_prefix="scrape") as executor:
+        while pending or running:
+            # Dispatch every queued job whose domain still has a free slot, up to the browser cap.
+            for job in list(pending):
+                if len(running) >= max_browsers:
+                    break
+                key = _domain_key(job["kind"], job["url"])
+                if active_per_domain.get(key, 0) >= per_domain_limit:
+                    continue
+                pending.remove(job)
+                active_per_domain[key] = active_per_domain.get(key, 0) + 1
+                running[executor.submit(worker, job)] = key
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                key = running.pop(fut)
+                active_per_domain[key] -= 1
+                yield fut.result()
+
+
+def combine_results(results: List[Dict]) -> Optional[pd.DataFrame]:
+    """Concatenate successful result DataFrames in original job order (None if nothing was scraped)."""
+    frames = [r["df"] for r in sorted(results, key=lambda r: r["index"])
+              if r.get("df") is not None and not r["df"].empty]
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True)
@@ -21,16 +21,53 @@ from selenium import webdriver
 _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if _ROOT not in sys.path:
     sys.path.insert(0, _ROOT)
-from chrome_helper import make_chrome_driver
+from chrome_helper import scroll_until_stable, wait_for_page_settle
+from chrome_pool import get_pool
+import http_client
+from html_clean import MARKUP_TAGS, clean_html, make_profile
+from snapshot_store import load_fetch_tier, load_snapshot, merge_partial, plan_incremental, save_fetch_tier, save_snapshot
+from structured_data import extract_structured_shops, is_complete as structured_is_complete
 
 # Config
 DEFAULT_OUTPUT_CSV = "mall_shops.csv"
 DEFAULT_OUTPUT_TEXT = "mall_shops.txt"
 HEADLESS = os.getenv("HEADLESS", "1") == "1"
+# Try a plain HTTP GET before launching Chrome; escalate only when the page does not look like a full directory
+FETCH_TIERS_ENABLED = os.getenv("FETCH_TIERS_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+# Tenant-like lines (outside nav/header/footer) an HTTP-fetched page needs to count as a complete directory
+# when it has no SUITE lines or embedded store data; filters, categories and hours of a JS app shell are
+# tenant-like too, so the count must also reach FETCH_TIER_LINES_FACTOR x the shops of the last scrape
+FETCH_TIER_MIN_LINES = int(os.getenv("FETCH_TIER_MIN_LINES", "40"))
+FETCH_TIER_LINES_FACTOR = float(os.getenv("FETCH_TIER_LINES_FACTOR", "1.5"))
+# An HTTP-tier extraction with fewer than this share of the last scrape's shops is redone in Chrome
+FETCH_TIER_REVALIDATE_RATIO = float(os.getenv("FETCH_TIER_REVALIDATE_RATIO", "0.5"))
+HTTP_FETCH_TIMEOUT = float(os.getenv("HTTP_FETCH_TIMEOUT", "15"))
 
+HTTP_FETCH_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
 
-def create_driver():
-    return make_chrome_driver(headless=HEADLESS)
+# Noise dropped before text goes to the LLM: markup only, navigation is kept (the LLM decides)
+_LLM_CLEAN_PROFILE = make_profile(tags=MARKUP_TAGS)
+# scrape_html_and_extract_text: also site chrome, embeds and popup/ad/promo containers
+_TEXT_CLEAN_PROFILE = make_profile(
+    tags=MARKUP_TAGS + ("iframe", "embed", "object", "svg", "canvas", "nav", "header", "footer", "aside"),
+    class_substrings=(
+        "cookie", "popup", "modal", "overlay", "notification", "alert", "navigation", "menu", "header",
+        "footer", "sidebar", "ad", "advertisement", "social", "share", "banner", "promo", "promotion",
+    ),
+    id_substrings=("cookie", "popup", "modal", "overlay", "notification", "alert"),
+)
+
+
+def _driver_pool():
+    """Shared pool of warm drivers used by the scrape functions below."""
+    return get_pool(headless=HEADLESS)
 
 
 def _strip_base64_and_noise_lines(text):
@@ -80,84 +117,6 @@ def _parse_suite_location_lines(text):
 
 
 
-def _extract_shop_names_from_attributes(soup):
-    """
-    Extract shop/store names from img alt, aria-label, and title attributes.
-    Mall directories often render shop names as logos (images) or in these
-    attributes, which soup.get_text() does not capture.
-    Returns a list of unique strings to append to the text sent to the LLM.
-    """
-    import re
-    seen = set()
-    collected = []
-    skip_prefixes = ("http", "www.", "data:", "javascript:", "button", "link", "close", "menu", "search")
-    skip_words = ("logo", "icon", "image", "photo", "thumbnail", "placeholder")
-
-    def _is_domain(val: str) -> bool:
-        """Check if value looks like a domain/URL.
-        
-        Conservative filtering - only filters CLEAR domains, not shop names with .com branding.
-        """
-        if not val:
-            return False
-        
-        val_lower = val.lower().strip()
-        val_original = val.strip()
-        
-        # Skip if it starts with http:// or https:// (clear URL)
-        if val_lower.startswith(('http://', 'https://')):
-            return True
-        
-        # Skip if it starts with www. (clear domain)
-        if val_lower.startswith('www.'):
-            return True
-        
-        # Only filter domains that are clearly NOT shop names:
-        # 1. Must contain a dot (for TLD)
-        # 2. Must NOT contain spaces (domains don't have spaces)
-        # 3. Must be all lowercase (shop names with .com branding usually have capitals)
-        # 4. Must end with a TLD pattern
-        if '.' in val_lower and ' ' not in val_lower:
-            # Check if it ends with a TLD
-            tld_pattern = r'\.[a-z]{2,}$'
-            if re.search(tld_pattern, val_lower):
-                # Only filter if it's all lowercase (domains are lowercase)
-                # Shop names with .com branding usually have capitals (e.g., "Shop.com", "Store.com")
-                if val_original == val_lower:
-                    # All lowercase with TLD = likely a domain
-                    # But check if it's very short (might be a shop name like "a.com")
-                    if len(val_lower) > 8:  # Domains are usually longer
-                        return True
-                    # Very short names might be shop names, so be conservative
-                    return False
-                # Has capitals = likely a shop name with .com branding, keep it
-                return False
-        
-        return False
-
-    for elem in soup.find_all(True):
-        for attr in ("alt", "aria-label", "title", "data-store-name", "data-name", "data-title"):
-            val = elem.get(attr)
-            if not val or not isinstance(val, str):
-                continue
-            val = val.strip()
-            if len(val) < 3 or len(val) > 80:
-                continue
-            if val.lower().startswith(skip_prefixes):
-                continue
-            if any(w in val.lower() for w in skip_words) and len(val) < 15:
-                continue
-            # Skip domains/URLs
-            if _is_domain(val):
-                continue
-            key = val.lower()
-            if key not in seen:
-                seen.add(key)
-                collected.append(val)
-
-    return collected
-
-
 def extract_category_links_from_soup(soup, base_url=""):
     """Extract category links from action-card elements.
     
@@ -1125,8 +1084,148 @@ def extract_shops_from_soup(soup, is_category_page=False):
     return shops
 
 
+def _clean_text_from_html(html):
+    """Clean `html` in one pass and return (clean_text, page) as sent to the LLM.
+
+    Scripts, styles and comments are dropped; navigation is kept, so the text is
+    every visible line plus shop names found in alt/aria-label/title.
+    `page` is the html_clean.clean_html() result (nav/header/footer lines in
+    page["chrome_lines"]).
+    """
+    page = clean_html(html, _LLM_CLEAN_PROFILE, collect_attr_names=True)
+    # Extract text with sensible newlines, but keep all lines;
+    # let the LLM decide what is noise vs. useful content.
+    clean_text = page["text"]
+    # Also add shop names from img alt, aria-label, title, etc.
+    # (many mall directories render shop names as logos or in attributes)
+    if page["attr_names"]:
+        clean_text += "\n\nStore names from page (alt/aria-label/title):\n" + "\n".join(page["attr_names"])
+    # Normalize excessive whitespace but keep even short lines,
+    # because some shop names or codes can be short.
+    lines = [line.strip() for line in clean_text.split("\n")]
+    clean_text = "\n".join(line for line in lines if line)
+    return clean_text, page
+
+
+_TENANT_LINE_RE = re.compile(r"^[A-Za-z0-9&][^\n]{1,59}$")
+
+
+def _directory_score(page, clean_text, structured_shops):
+    """
+    Score how completely a fetched page already lists its tenants.
+
+    Returns {"score", "tenant_lines", "suite_hits", "structured"}: short name-like
+    lines outside nav/header/footer, "SUITE NNN ... location" hits, and shops in
+    embedded JSON (`structured_shops`, from structured_data). score is the largest of the three.
+    """
+    chrome_lines = page["chrome_lines"]
+    tenant_lines = 0
+    for line in clean_text.split("\n"):
+        if line in chrome_lines or not _TENANT_LINE_RE.match(line):
+            continue
+        if len(line.split()) <= 6 and not re.fullmatch(r"[\d\s\-\+\(\)\.:,/]+", line):
+            tenant_lines += 1
+    suite_hits = len(_parse_suite_location_lines(clean_text))
+    structured = len(structured_shops)
+    return {
+        "score": max(tenant_lines, suite_hits, structured),
+        "tenant_lines": tenant_lines,
+        "suite_hits": suite_hits,
+        "structured": structured,
+    }
+
+
+def _http_fetch_html(url):
+    """GET `url` through the pooled HTTP client; returns the decoded HTML or None."""
+    try:
+        r = http_client.get(url, headers=HTTP_FETCH_HEADERS, timeout=HTTP_FETCH_TIMEOUT, max_retries=1)
+        r.raise_for_status()
+    except Exception as e:
+        print(f"HTTP fetch failed for {url}: {e}")
+        return None
+    if "html" not in r.headers.get("Content-Type", "html").lower():
+        return None
+    if "charset" not in r.headers.get("Content-Type", "").lower():
+        r.encoding = r.apparent_encoding or "utf-8"
+    return r.text
+
+
+def _browser_fetch_html(url, wait_seconds):
+    """Render `url` in a pooled Chrome, scroll until lazy content stops loading, return page_source."""
+    pool = _driver_pool()
+    driver = pool.acquire()
+    try:
+        driver.get(url)
+        wait_for_page_settle(driver, timeout=wait_seconds)
+
+        # Scroll to load all content (lazy-loaded content); stops as soon as the page is quiescent
+        print("Scrolling to load all content...")
+        scroll_until_stable(driver, max_scrolls=30)
+        return driver.page_source
+    finally:
+        pool.release(driver)
+
+
+def _http_tier_short(tier, shops, known_shops):
+    """Whether an HTTP-tier page produced far fewer shops than the last scrape (its tier must be re-validated)."""
+    return tier == "http" and known_shops > 0 and len(shops) < FETCH_TIER_REVALIDATE_RATIO * known_shops
+
+
+def fetch_directory_page(url, wait_seconds: float = 3.0, known_shops: int = 0, force_browser: bool = False):
+    """
+    Fetch a directory page with the cheapest tier that yields a complete listing.
+
+    Tier "http": pooled GET + single-pass lxml clean, accepted on real listing
+    evidence: 10+ SUITE lines, a complete structured store list, or, when the
+    last scrape found `known_shops` shops, at least FETCH_TIER_MIN_LINES and
+    FETCH_TIER_LINES_FACTOR x known_shops tenant-like lines (without a baseline,
+    tenant-like lines alone never skip the browser). Otherwise, with
+    `force_browser`, or when the page is remembered as needing a browser, tier
+    "browser": Chrome render + scroll. The tier used and its timings are stored per URL
+    (snapshot_store.save_fetch_tier), so repeat runs skip the tier that failed.
+
+    Returns (html, clean_text, tier, structured), where structured is the
+    extract_structured_shops(html) result for the returned page.
+    """
+    remembered = load_fetch_tier(url) if FETCH_TIERS_ENABLED else None
+    http_seconds = None
+    if FETCH_TIERS_ENABLED and not force_browser and not (remembered and remembered["tier"] == "browser"):
+        start = time.time()
+        html = _http_fetch_html(url)
+        if html:
+            clean_text, page = _clean_text_from_html(html)
+            structured = extract_structured_shops(html)
+            score = _directory_score(page, clean_text, structured[0])
+            http_seconds = time.time() - start
+            lines_needed = max(FETCH_TIER_MIN_LINES, FETCH_TIER_LINES_FACTOR * known_shops) if known_shops else None
+            if (score["suite_hits"] >= 10 or structured_is_complete(structured[0])
+                    or (lines_needed and score["tenant_lines"] >= lines_needed)):
+                print(f"HTTP tier: complete directory in {http_seconds:.1f}s "
+                      f"({score['tenant_lines']} tenant-like lines, {score['suite_hits']} SUITE lines, "
+                      f"{score['structured']} structured entries) - no browser needed")
+                save_fetch_tier(url, "http", score["score"], http_seconds=http_seconds)
+                return html, clean_text, "http", structured
+            print(f"HTTP tier: no SUITE or structured listing and {score['tenant_lines']} tenant-like lines "
+                  f"({f'need {lines_needed:.0f}' if lines_needed else 'no earlier scrape to compare with'}), "
+                  f"escalating to browser")
+        else:
+            http_seconds = time.time() - start
+    elif remembered and not force_browser:
+        print(f"Fetch tier for {url} remembered as browser, skipping HTTP probe")
+
+    start = time.time()
+    html = _browser_fetch_html(url, wait_seconds)
+    browser_seconds = time.time() - start
+    clean_text, page = _clean_text_from_html(html)
+    structured = extract_structured_shops(html)
+    if FETCH_TIERS_ENABLED:
+        score = _directory_score(page, clean_text, structured[0])["score"]
+        save_fetch_tier(url, "browser", score, http_seconds=http_seconds, browser_seconds=browser_seconds)
+    return html, clean_text, "browser", structured
+
+
 def scrape_html_and_extract_text(url, headless: bool = HEADLESS, wait_seconds: float = 3.0, save_to_file: bool = True):
-    """Scrape HTML from URL and extract clean text using BeautifulSoup.
+    """Scrape HTML from URL and extract clean text (single-pass html_clean).
     
     Args:
         url: URL to scrape
@@ -1140,78 +1239,23 @@ def scrape_html_and_extract_text(url, headless: bool = HEADLESS, wait_seconds: f
     if not url:
         raise ValueError("url is required for scraping")
 
-    driver = create_driver()
+    pool = _driver_pool()
+    driver = pool.acquire()
     clean_text = ""
     
     try:
         driver.get(url)
         
-        # Wait for initial page load
-        time.sleep(wait_seconds)
-        
-        # Scroll to load lazy-loaded content
-        last_height = 0
-        scroll_attempts = 0
-        max_scroll_attempts = 30
-        stable_count = 0
-        stable_threshold = 3
+        # Wait for initial render (returns early once the page is quiet; wait_seconds at most)
+        wait_for_page_settle(driver, timeout=wait_seconds)
         
+        # Scroll to load lazy-loaded content until height/DOM stop changing
         print("Scrolling to load all content...")
-        while scroll_attempts < max_scroll_attempts:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1.5)
-            
-            current_height = driver.execute_script("return document.body.scrollHeight")
-            
-            if current_height == last_height:
-                stable_count += 1
-                if stable_count >= stable_threshold:
-                    break
-            else:
-                stable_count = 0
-                last_height = current_height
-            
-            scroll_attempts += 1
+        scroll_until_stable(driver, max_scrolls=30)
         
-        # Additional scrolls to ensure everything is loaded
-        for _ in range(3):
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(0.5)
-        
-        # Get page source and parse with BeautifulSoup
+        # Get page source and drop scripts, site chrome, popups, ads etc. in one pass
         html = driver.page_source
-        soup = BeautifulSoup(html, _BS_PARSER)
-        
-        # Enhanced HTML cleaning - Remove noise elements
-        # Remove script, style, and metadata elements
-        for element in soup(["script", "style", "noscript", "meta", "link", 
-                             "iframe", "embed", "object", "svg", "canvas"]):
-            element.decompose()
-        
-        # Remove navigation and UI elements
-        for element in soup(["nav", "header", "footer", "aside"]):
-            element.decompose()
-        
-        # Remove elements with common noise classes/IDs (popups, ads, etc.)
-        noise_selectors = [
-            "[class*='cookie']", "[class*='popup']", "[class*='modal']",
-            "[class*='overlay']", "[class*='notification']", "[class*='alert']",
-            "[id*='cookie']", "[id*='popup']", "[id*='modal']",
-            "[id*='overlay']", "[id*='notification']", "[id*='alert']",
-            "[class*='navigation']", "[class*='menu']", "[class*='header']",
-            "[class*='footer']", "[class*='sidebar']", "[class*='ad']",
-            "[class*='advertisement']", "[class*='social']", "[class*='share']",
-            "[class*='banner']", "[class*='promo']", "[class*='promotion']"
-        ]
-        for selector in noise_selectors:
-            try:
-                for element in soup.select(selector):
-                    element.decompose()
-            except Exception:
-                pass  # Skip if selector is invalid
-        
-        # Get text content with better separator
-        text = soup.get_text(separator="\n", strip=True)
+        text = clean_html(html, _TEXT_CLEAN_PROFILE)["text"]
         
         # Enhanced text cleaning - filter out noise
         lines = []
@@ -1260,7 +1304,7 @@ def scrape_html_and_extract_text(url, headless: bool = HEADLESS, wait_seconds: f
             if re.match(r'^[\d\s\-\+\(\)]+$', line) and len(line) > 7:
                 continue
             
-                lines.append(line)
+            lines.append(line)
         
         clean_text = "\n".join(lines)
         
@@ -1298,102 +1342,46 @@ def scrape_html_and_extract_text(url, headless: bool = HEADLESS, wait_seconds: f
             print(f"Saved extracted text to: {filepath}")
         
     finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
+        pool.release(driver)
     
     return clean_text, filepath
 
 
-def scrape_url(url, output_csv: str = DEFAULT_OUTPUT_CSV, output_text: str = DEFAULT_OUTPUT_TEXT, headless: bool = HEADLESS, wait_seconds: float = 3.0, write_files: bool = True, use_llm_extraction: bool = True):
+def scrape_url(url, output_csv: str = DEFAULT_OUTPUT_CSV, output_text: str = DEFAULT_OUTPUT_TEXT, headless: bool = HEADLESS, wait_seconds: float = 3.0, write_files: bool = True, use_llm_extraction: bool = True, incremental: bool = True, force_browser: bool = False, return_text_path: bool = False):
     """Scrape `url` and either write files (CSV + labeled text) or return data in-memory.
 
     If `write_files` is True (default), writes `output_csv` and `output_text` and returns their paths.
     If `write_files` is False, returns a tuple `(shops, labeled_text)` and does not write to disk.
+    With `return_text_path`, the in-memory tuple also carries the path of the extracted page text
+    saved under extracted_texts/ (None for the legacy method): `(shops, labeled_text, text_path)`.
     
     Args:
         use_llm_extraction: If True, uses LLM to extract shop names from cleaned text (new method).
                            If False, uses the old parsing logic (legacy method).
+        incremental: Compare the cleaned text with the last snapshot of this URL (snapshot_store)
+                     and reuse the previous extraction for unchanged text / unchanged lines.
+        force_browser: Render the page in Chrome even when a plain HTTP fetch would do.
     """
     if not url:
         raise ValueError("url is required for scraping")
 
-    # Always clear any stale last_extracted_text_path.txt at the start of a new scrape
-    # so the UI never shows a previous site's text file for the current URL.
-    try:
-        import os
-        if os.path.exists("last_extracted_text_path.txt"):
-            os.remove("last_extracted_text_path.txt")
-    except Exception:
-        # Non-fatal – continue even if cleanup fails
-        pass
+    # Returned to the caller (never shared through a file: concurrent scrapes would overwrite it)
+    extracted_text_filepath = None
 
     # UNIVERSAL METHOD: Extract all HTML, clean with BeautifulSoup, and use OpenAI
     if use_llm_extraction:
         print(f"Using universal HTML extraction with OpenAI for {url}")
         shops = []
-        driver = create_driver()
         try:
-            driver.get(url)
-            time.sleep(wait_seconds)
-            
-            # Scroll to load all content (lazy-loaded content)
-            last_height = 0
-            scroll_attempts = 0
-            max_scroll_attempts = 30
-            stable_count = 0
-            stable_threshold = 3
-            
-            print("Scrolling to load all content...")
-            while scroll_attempts < max_scroll_attempts:
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1.5)
-                current_height = driver.execute_script("return document.body.scrollHeight")
-                if current_height == last_height:
-                    stable_count += 1
-                    if stable_count >= stable_threshold:
-                        break
-                else:
-                    stable_count = 0
-                    last_height = current_height
-                scroll_attempts += 1
-            
-            # Additional scrolls to ensure all content is loaded
-            for _ in range(3):
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(0.5)
-            
-            # Get all HTML
-            html = driver.page_source
-            
-            # Clean HTML using BeautifulSoup - remove only obvious non-content elements
-            print("Cleaning HTML with BeautifulSoup...")
-            soup = BeautifulSoup(html, _BS_PARSER)
-            
-            # Remove script and style elements
-            for script in soup(["script", "style", "noscript", "meta", "link"]):
-                script.decompose()
-            
-            # Remove comments
-            from bs4 import Comment
-            comments = soup.find_all(string=lambda text: isinstance(text, Comment))
-            for comment in comments:
-                comment.extract()
+            # Last snapshot of this page: the baseline for the fetch tier and for incremental extraction
+            from llm_engine import OPENAI_MODEL
+            last_snapshot = load_snapshot(url)
+            known_shops = len(last_snapshot["shops"]) if last_snapshot else 0
+
+            # Plain HTTP first; Chrome only when the page needs rendering (tier remembered per URL)
+            html, clean_text, tier, (structured_shops, structured_source) = fetch_directory_page(
+                url, wait_seconds=wait_seconds, known_shops=known_shops, force_browser=force_browser)
             
-            # Get clean text from the cleaned HTML
-            # Extract text with sensible newlines, but keep all lines;
-            # let the LLM decide what is noise vs. useful content.
-            clean_text = soup.get_text(separator="\n", strip=True)
-            # Also extract shop names from img alt, aria-label, title, etc.
-            # (many mall directories render shop names as logos or in attributes)
-            attr_names = _extract_shop_names_from_attributes(soup)
-            if attr_names:
-                clean_text += "\n\nStore names from page (alt/aria-label/title):\n" + "\n".join(attr_names)
-            # Normalize excessive whitespace but keep even short lines,
-            # because some shop names or codes can be short.
-            lines = [line.strip() for line in clean_text.split("\n")]
-            clean_text = "\n".join(line for line in lines if line)
             # Strip base64/noise lines so more store content fits within LLM token limit
             clean_text_for_llm = _strip_base64_and_noise_lines(clean_text)
             if len(clean_text_for_llm) < len(clean_text):
@@ -1401,107 +1389,109 @@ def scrape_url(url, output_csv: str = DEFAULT_OUTPUT_CSV, output_text: str = DEF
             
             print(f"Extracted {len(clean_text)} characters of clean text from {url}")
             
+            # Compare with the last snapshot of this page (unchanged text → reuse previous extraction)
+            snapshot = last_snapshot if incremental else None
+            plan = plan_incremental(snapshot, clean_text_for_llm, model=OPENAI_MODEL)
+            
             # Save extracted text to file for debugging/review.
             # IMPORTANT: We always create this text file (even when write_files=False)
             # so that the Streamlit UI can show the correct file for each URL.
-            from datetime import datetime
-            os.makedirs("extracted_texts", exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            url_safe = url.replace("https://", "").replace("http://", "").replace("/", "_").replace("?", "_").replace("&", "_")[:100]
-            extracted_text_filepath = f"extracted_texts/{url_safe}_{timestamp}.txt"
-            with open(extracted_text_filepath, "w", encoding="utf-8") as f:
-                f.write(clean_text)
-            print(f"Saved extracted text to: {extracted_text_filepath}")
+            # An unchanged page reuses the file saved for its snapshot.
+            if plan["mode"] == "unchanged" and snapshot.get("text_path") and os.path.exists(snapshot["text_path"]):
+                extracted_text_filepath = snapshot["text_path"]
+                print(f"Page text unchanged since last scrape, reusing: {extracted_text_filepath}")
+            else:
+                from datetime import datetime
+                os.makedirs("extracted_texts", exist_ok=True)
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                url_safe = url.replace("https://", "").replace("http://", "").replace("/", "_").replace("?", "_").replace("&", "_")[:100]
+                extracted_text_filepath = f"extracted_texts/{url_safe}_{timestamp}.txt"
+                with open(extracted_text_filepath, "w", encoding="utf-8") as f:
+                    f.write(clean_text)
+                print(f"Saved extracted text to: {extracted_text_filepath}")
             
             # Try structured "SUITE NNN Shop Name location" pattern first (e.g. Tanger) for full list
             suite_shops = _parse_suite_location_lines(clean_text)
+            # Tenant list embedded as data (__NEXT_DATA__, JSON-LD, var arrStore, ...) needs no LLM either;
+            # structured_shops was extracted once by fetch_directory_page
             if len(suite_shops) >= 10:
                 shops = suite_shops
                 print(f"✅ Extracted {len(shops)} shops from SUITE ... location lines (no LLM needed)")
-                if extracted_text_filepath:
-                    with open("last_extracted_text_path.txt", "w", encoding="utf-8") as f:
-                        f.write(extracted_text_filepath)
+            elif structured_is_complete(structured_shops):
+                shops = structured_shops
+                print(f"✅ Extracted {len(shops)} shops from embedded {structured_source} data (no LLM needed)")
             elif not clean_text_for_llm or len(clean_text_for_llm.strip()) < 50:
                 print(f"Warning: Insufficient text extracted from {url}")
                 shops = suite_shops if suite_shops else []
             else:
                 # Use OpenAI to extract shop names from the clean text (with base64 stripped)
                 from llm_engine import extract_shops_from_text
-                print(f"Extracting shop names using OpenAI from {len(clean_text_for_llm)} characters of text...")
-                shops = extract_shops_from_text(clean_text_for_llm, url=url)
+                if plan["mode"] == "unchanged":
+                    shops = list(plan["shops"])
+                    print(f"✅ Reusing {len(shops)} shops from the last snapshot (text unchanged, no LLM call)")
+                elif plan["mode"] == "partial":
+                    print(f"Page {plan['changed_ratio']:.0%} changed since last scrape: extracting "
+                          f"{len(plan['changed_ranges'])} changed section(s), {len(plan['changed_text'])} characters...")
+                    has_changed_text = bool(plan["changed_text"].strip())
+                    changed_shops = extract_shops_from_text(plan["changed_text"], url=url) if has_changed_text else []
+                    if has_changed_text and not changed_shops:
+                        # Usually a failed LLM call, not removed tenants: saving the snapshot now would mark
+                        # the changed sections as done and lose their shops for good
+                        print("No shops extracted from the changed sections, re-extracting the full page...")
+                        shops = extract_shops_from_text(clean_text_for_llm, url=url)
+                        if shops and not _http_tier_short(tier, shops, known_shops):
+                            save_snapshot(url, clean_text_for_llm, shops, model=OPENAI_MODEL, text_path=extracted_text_filepath)
+                    else:
+                        shops = merge_partial(plan, changed_shops, clean_text_for_llm)
+                        if not _http_tier_short(tier, shops, known_shops):
+                            save_snapshot(url, clean_text_for_llm, shops, model=OPENAI_MODEL, text_path=extracted_text_filepath)
+                else:
+                    print(f"Extracting shop names using OpenAI from {len(clean_text_for_llm)} characters of text...")
+                    shops = extract_shops_from_text(clean_text_for_llm, url=url)
+                    if shops and incremental and not _http_tier_short(tier, shops, known_shops):
+                        save_snapshot(url, clean_text_for_llm, shops, model=OPENAI_MODEL, text_path=extracted_text_filepath)
                 # If we got few from LLM but had some from SUITE lines, merge (avoid losing stores)
                 if suite_shops and len(shops) < len(suite_shops):
                     shops = suite_shops
                     print(f"✅ Using {len(shops)} shops from SUITE ... location lines (more than LLM)")
                 else:
                     print(f"✅ OpenAI extracted {len(shops)} shops from {url}")
-                
-                # Store the extracted text filepath for later download.
-                # This is used by the Streamlit app to show "Download Extracted Text Files"
-                # with the correct mapping between URL and text file.
-                if extracted_text_filepath:
-                    with open("last_extracted_text_path.txt", "w", encoding="utf-8") as f:
-                        f.write(extracted_text_filepath)
+
+
+            # The HTTP page was probably a JS shell: redo this scrape in Chrome (which re-remembers the tier)
+            if _http_tier_short(tier, shops, known_shops):
+                print(f"HTTP tier gave {len(shops)} shops, far fewer than the {known_shops} of the last scrape; "
+                      f"re-fetching {url} in Chrome")
+                return scrape_url(url, output_csv=output_csv, output_text=output_text, headless=headless,
+                                  wait_seconds=wait_seconds, write_files=write_files,
+                                  use_llm_extraction=use_llm_extraction, incremental=incremental, force_browser=True,
+                                  return_text_path=return_text_path)
         except Exception as e:
             print(f"Error in universal extraction: {e}")
             import traceback
             traceback.print_exc()
             print("Falling back to legacy parsing method...")
             use_llm_extraction = False  # Fall back to old method
-        finally:
-            try:
-                driver.quit()
-            except Exception:
-                pass
     
     # LEGACY METHOD: Use old parsing logic (only if LLM extraction failed or was disabled)
     if not use_llm_extraction:
         print(f"Using legacy parsing method for {url}")
-        driver = create_driver()
+        # Reuses a warm pooled driver instead of starting a new Chrome
+        pool = _driver_pool()
+        driver = pool.acquire()
         shops = []
         html = ""
         try:
             driver.get(url)
 
-            # Minimal wait - start scrolling immediately (faster startup)
-            time.sleep(0.5)  # Reduced from wait_seconds - start immediately
-
-            # More aggressive scrolling to load all lazy-loaded content
-            # Scroll gradually and check if content is still loading
-            last_height = 0
-            scroll_attempts = 0
-            max_scroll_attempts = 50  # Increase max scroll attempts
-            stable_count = 0
-            stable_threshold = 3
-            
+            # More aggressive scrolling to load all lazy-loaded content; each step
+            # waits only until DOM mutations and fetch/XHR activity have stopped
             print("Scrolling to load all content...")
-            while scroll_attempts < max_scroll_attempts:
-                # Scroll to bottom
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1.5)  # Wait for lazy loading
-                
-                # Check current height
-                current_height = driver.execute_script("return document.body.scrollHeight")
-                
-                if current_height == last_height:
-                    stable_count += 1
-                    if stable_count >= stable_threshold:
-                        # Height hasn't changed for several scrolls, likely all content loaded
-                        break
-                else:
-                    stable_count = 0
-                    last_height = current_height
-                
-                scroll_attempts += 1
+            scroll_attempts = scroll_until_stable(driver, max_scrolls=50)
             
-            # Additional scrolls to ensure everything is loaded
-            for _ in range(5):
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(0.5)
-            
-            # Scroll back to top gradually
+            # Scroll back to top and let any re-render finish
             driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
+            wait_for_page_settle(driver, quiet_ms=300, timeout=1.0)
             
             print(f"Finished scrolling after {scroll_attempts} attempts")
 
@@ -1538,33 +1528,9 @@ def scrape_url(url, output_csv: str = DEFAULT_OUTPUT_CSV, output_text: str = DEF
                                 print(f"  Scraping category: {category_name} ({category_url})")
                                 driver.get(category_url)
                                 
-                                # Wait for page to load
-                                time.sleep(wait_seconds)
-                                
-                                # More aggressive scrolling for category pages
-                                last_height = 0
-                                scroll_attempts = 0
-                                max_scroll_attempts = 50
-                                stable_count = 0
-                                
-                                while scroll_attempts < max_scroll_attempts:
-                                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                                    time.sleep(1.5)
-                                    current_height = driver.execute_script("return document.body.scrollHeight")
-                                    
-                                    if current_height == last_height:
-                                        stable_count += 1
-                                        if stable_count >= 3:
-                                            break
-                                    else:
-                                        stable_count = 0
-                                        last_height = current_height
-                                    scroll_attempts += 1
-                                
-                                # Additional scrolls
-                                for _ in range(5):
-                                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                                    time.sleep(0.5)
+                                # Wait for page to load, then scroll until lazy loading stops
+                                wait_for_page_settle(driver, timeout=wait_seconds)
+                                scroll_until_stable(driver, max_scrolls=50)
                                 
                                 category_html = driver.page_source
                                 category_soup = BeautifulSoup(category_html, _BS_PARSER)
@@ -1594,13 +1560,9 @@ def scrape_url(url, output_csv: str = DEFAULT_OUTPUT_CSV, output_text: str = DEF
                             print(f"  Scraping category: {category_name} ({category_url})")
                             driver.get(category_url)
                             
-                            # Wait for page to load
-                            time.sleep(wait_seconds)
-                            
-                            # Scroll to trigger lazy loading
-                            for _ in range(3):
-                                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                                time.sleep(1)
+                            # Wait for page to load, then scroll to trigger lazy loading
+                            wait_for_page_settle(driver, timeout=wait_seconds)
+                            scroll_until_stable(driver, max_scrolls=3)
                             
                             category_html = driver.page_source
                             category_soup = BeautifulSoup(category_html, _BS_PARSER)
@@ -1642,10 +1604,7 @@ def scrape_url(url, output_csv: str = DEFAULT_OUTPUT_CSV, output_text: str = DEF
             print(f"Error in legacy scraping method: {e}")
             shops = []
         finally:
-            try:
-                driver.quit()
-            except Exception:
-                pass
+            pool.release(driver)
 
     # Build labeled text (works for both LLM and legacy methods)
     lines = []
@@ -1657,7 +1616,7 @@ def scrape_url(url, output_csv: str = DEFAULT_OUTPUT_CSV, output_text: str = DEF
     labeled_text = "\n".join(lines)
 
     if not write_files:
-        return shops, labeled_text
+        return (shops, labeled_text, extracted_text_filepath) if return_text_path else (shops, labeled_text)
 
     # write CSV
     with open(output_csv, "w", newline="", encoding="utf-8") as f:
@@ -11,6 +11,12 @@ from pathlib import Path
 import requests
 from typing import List, Dict, Any, Optional
 
+# Project root holds the shared http_client (pooled sessions + retries)
+_ROOT = str(Path(__file__).resolve().parent.parent)
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+import http_client
+
 try:
     from serp_config import SERP_API_KEY
 except ImportError:
@@ -116,7 +122,7 @@ def fetch_mall_news(mall_name: str, address: str, max_results: int = 15) -> List
                     "num": min(max_results, 10),
                     "so": "1",  # sort by date (latest first)
                 }
-                resp = requests.get("https://serpapi.com/search", params=params, timeout=30)
+                resp = http_client.get("https://serpapi.com/search", params=params, timeout=30)
                 resp.raise_for_status()
                 data = resp.json()
                 news = data.get("news_results") or []
@@ -145,7 +151,7 @@ def fetch_mall_news(mall_name: str, address: str, max_results: int = 15) -> List
                 "num": min(max_results, 10),
                 "tbs": TBS_PAST_WEEK,  # past 7 days only – no old data
             }
-            resp = requests.get("https://serpapi.com/search", params=params, timeout=30)
+            resp = http_client.get("https://serpapi.com/search", params=params, timeout=30)
             resp.raise_for_status()
             data = resp.json()
             organic = data.get("organic_results") or []
@@ -174,7 +180,7 @@ def fetch_mall_news(mall_name: str, address: str, max_results: int = 15) -> List
                 "num": 5,
                 "tbs": TBS_PAST_DAY,  # past 24 hours
             }
-            resp = requests.get("https://serpapi.com/search", params=params, timeout=30)
+            resp = http_client.get("https://serpapi.com/search", params=params, timeout=30)
             resp.raise_for_status()
             data = resp.json()
             organic = data.get("organic_results") or []
@@ -202,7 +208,7 @@ def fetch_mall_news(mall_name: str, address: str, max_results: int = 15) -> List
                 "hl": "en",
                 "num": 3,
             }
-            resp = requests.get("https://serpapi.com/search", params=params, timeout=30)
+            resp = http_client.get("https://serpapi.com/search", params=params, timeout=30)
             resp.raise_for_status()
             data = resp.json()
             kg = data.get("knowledge_graph") or {}
@@ -236,7 +242,7 @@ def fetch_mall_news(mall_name: str, address: str, max_results: int = 15) -> List
                     "num": max_results,
                     "tbs": "qdr:y",  # past year – broader, only used as fallback
                 }
-                resp = requests.get("https://serpapi.com/search", params=params, timeout=30)
+                resp = http_client.get("https://serpapi.com/search", params=params, timeout=30)
                 resp.raise_for_status()
                 data = resp.json()
                 organic = data.get("organic_results") or []
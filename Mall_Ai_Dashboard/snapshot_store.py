@@ -0,0 +1,317 @@
+"""
+Snapshot store for incremental re-scraping of mall directory pages.
+
+For every page (keyed by normalized URL) the store keeps the last cleaned text,
+its SHA-256, the shops the LLM extracted from it and the saved text file. On
+re-scrape, scraper.scrape_url asks plan_incremental() what to do:
+
+  - unchanged text  → reuse the stored shop list, no LLM call, no new text file
+  - partly changed  → keep stored shops whose names sit on unchanged lines,
+                      send only the changed line ranges (plus a little
+                      context) to the LLM, and merge both in page order
+  - mostly changed  → full extraction, as before
+
+Storage is a single SQLite file beside this module (SNAPSHOT_PATH). Set
+SNAPSHOT_ENABLED=0 to always extract from scratch.
+
+The same file remembers which fetch tier (plain HTTP or browser) produced a
+usable directory for each page, with its timings (load_fetch_tier /
+save_fetch_tier), so scraper.scrape_url can go straight to that tier.
+"""
+import difflib
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", os.path.join(BASE_DIR, "snapshots.sqlite"))
+# Above this share of changed lines a full extraction is cheaper and safer than patching
+SNAPSHOT_MAX_CHANGED_RATIO = float(os.getenv("SNAPSHOT_MAX_CHANGED_RATIO", "0.5"))
+# Unchanged lines sent around each changed range so the LLM sees floor headings etc.
+SNAPSHOT_CONTEXT_LINES = int(os.getenv("SNAPSHOT_CONTEXT_LINES", "3"))
+
+_TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid")
+
+_lock = threading.Lock()
+_initialized = False
+
+
+def normalize_url(url: str) -> str:
+    """Canonical key for a page: lowercase host without www., no fragment/trailing slash, sorted query without tracking params."""
+    parsed = urlparse((url or "").strip())
+    scheme = (parsed.scheme or "https").lower()
+    if scheme == "http":
+        scheme = "https"
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parsed.path.rstrip("/")
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if not k.lower().startswith(_TRACKING_PARAMS)
+    )
+    return urlunparse((scheme, host, path, "", urlencode(query), ""))
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    conn = sqlite3.connect(SNAPSHOT_PATH, timeout=30)
+    if not _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS page_snapshots ("
+            " url_key TEXT PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " text TEXT NOT NULL,"
+            " shops TEXT NOT NULL,"
+            " model TEXT,"
+            " text_path TEXT,"
+            " updated_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS page_fetch_tiers ("
+            " url_key TEXT PRIMARY KEY,"
+            " tier TEXT NOT NULL,"
+            " score INTEGER,"
+            " http_seconds REAL,"
+            " browser_seconds REAL,"
+            " updated_at REAL NOT NULL)"
+        )
+        conn.commit()
+        _initialized = True
+    return conn
+
+
+def load_snapshot(url: str) -> Optional[Dict]:
+    """Return the stored snapshot for `url` ({url, content_hash, text, shops, model, text_path, updated_at}) or None."""
+    if not SNAPSHOT_ENABLED:
+        return None
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                row = conn.execute(
+                    "SELECT url, content_hash, text, shops, model, text_path, updated_at"
+                    " FROM page_snapshots WHERE url_key = ?",
+                    (normalize_url(url),),
+                ).fetchone()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: snapshot read failed: {e}")
+        return None
+    if row is None:
+        return None
+    return {
+        "url": row[0],
+        "content_hash": row[1],
+        "text": row[2],
+        "shops": json.loads(row[3]),
+        "model": row[4] or "",
+        "text_path": row[5],
+        "updated_at": row[6],
+    }
+
+
+def save_snapshot(url: str, text: str, shops: List[Dict], model: str = "", text_path: Optional[str] = None) -> None:
+    """Store `text` and the shops extracted from it as the latest snapshot of `url`."""
+    if not SNAPSHOT_ENABLED:
+        return
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO page_snapshots"
+                    " (url_key, url, content_hash, text, shops, model, text_path, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (normalize_url(url), url, content_hash(text), text,
+                     json.dumps(shops, ensure_ascii=False), model, text_path, time.time()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: snapshot write failed: {e}")
+
+
+def load_fetch_tier(url: str) -> Optional[Dict]:
+    """Return the remembered fetch tier of `url` ({tier, score, http_seconds, browser_seconds, updated_at}) or None."""
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                row = conn.execute(
+                    "SELECT tier, score, http_seconds, browser_seconds, updated_at"
+                    " FROM page_fetch_tiers WHERE url_key = ?",
+                    (normalize_url(url),),
+                ).fetchone()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: fetch tier read failed: {e}")
+        return None
+    if row is None:
+        return None
+    return {"tier": row[0], "score": row[1], "http_seconds": row[2], "browser_seconds": row[3], "updated_at": row[4]}
+
+
+def save_fetch_tier(url: str, tier: str, score: Optional[int] = None,
+                    http_seconds: Optional[float] = None, browser_seconds: Optional[float] = None) -> None:
+    """Remember that `tier` ("http" or "browser") gave a usable page for `url`; None timings keep the stored value."""
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.execute(
+                    "INSERT INTO page_fetch_tiers (url_key, tier, score, http_seconds, browser_seconds, updated_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (url_key) DO UPDATE SET tier = excluded.tier, score = excluded.score,"
+                    " http_seconds = COALESCE(excluded.http_seconds, http_seconds),"
+                    " browser_seconds = COALESCE(excluded.browser_seconds, browser_seconds),"
+                    " updated_at = excluded.updated_at",
+                    (normalize_url(url), tier, score, http_seconds, browser_seconds, time.time()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: fetch tier write failed: {e}")
+
+
+def _anchor_shops(shops: List[Dict], lines: List[str]) -> List[Optional[int]]:
+    """
+    Line index each shop was most likely read from (None when its name is not on any line).
+
+    Repeated names take successive matching lines, so two outlets of one brand
+    anchor to two different lines.
+    """
+    lowered = [ln.lower() for ln in lines]
+    exact: Dict[str, List[int]] = {}
+    for i, ln in enumerate(lowered):
+        exact.setdefault(ln.strip(), []).append(i)
+    used = set()
+    anchors: List[Optional[int]] = []
+    for shop in shops:
+        name = str(shop.get("shop_name") or "").strip().lower()
+        anchor = None
+        if name:
+            for i in exact.get(name, ()):
+                if i not in used:
+                    anchor = i
+                    break
+            if anchor is None:
+                for i, ln in enumerate(lowered):
+                    if i not in used and name in ln:
+                        anchor = i
+                        break
+        if anchor is not None:
+            used.add(anchor)
+        anchors.append(anchor)
+    return anchors
+
+
+def plan_incremental(snapshot: Optional[Dict], text: str, model: str = "") -> Dict:
+    """
+    Decide how to extract shops from `text` given the previous snapshot.
+
+    Returns {"mode": ...} where mode is:
+        "full"      – no usable snapshot, or too much changed
+        "unchanged" – plus "shops": the stored list to reuse
+        "partial"   – plus "kept": [(new line index or None, shop)] from unchanged lines,
+                      "changed_text": the changed line ranges to send to the LLM,
+                      "changed_ranges": [(start, end)] in new-text line indices,
+                      "changed_ratio": share of changed lines
+    """
+    if not snapshot or (model and snapshot.get("model") and snapshot["model"] != model):
+        return {"mode": "full"}
+    if snapshot["content_hash"] == content_hash(text):
+        return {"mode": "unchanged", "shops": snapshot["shops"]}
+
+    old_lines = snapshot["text"].split("\n")
+    new_lines = text.split("\n")
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    old_to_new: Dict[int, int] = {}
+    changed: List[Tuple[int, int]] = []
+    changed_count = 0
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            for k in range(i2 - i1):
+                old_to_new[i1 + k] = j1 + k
+        else:
+            changed_count += max(i2 - i1, j2 - j1)
+            if j2 > j1:
+                changed.append((j1, j2))
+    ratio = changed_count / max(1, len(old_lines), len(new_lines))
+    if ratio > SNAPSHOT_MAX_CHANGED_RATIO:
+        return {"mode": "full", "changed_ratio": ratio}
+
+    # Stored shops read from lines that are still on the page are kept; shops whose line
+    # was removed or edited are dropped (edited lines are re-extracted below). Shops whose
+    # name is on no line at all are kept, since nothing shows they are gone.
+    kept = []
+    for anchor, shop in zip(_anchor_shops(snapshot["shops"], old_lines), snapshot["shops"]):
+        if anchor is None:
+            kept.append((None, shop))
+        elif anchor in old_to_new:
+            kept.append((old_to_new[anchor], shop))
+
+    # Changed ranges widened by context lines, overlapping ranges merged. A very small
+    # change gets more context, since the LLM extractor ignores text under 50 characters.
+    context = SNAPSHOT_CONTEXT_LINES
+    while True:
+        ranges: List[Tuple[int, int]] = []
+        for j1, j2 in changed:
+            start = max(0, j1 - context)
+            end = min(len(new_lines), j2 + context)
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+            else:
+                ranges.append((start, end))
+        changed_text = "\n...\n".join("\n".join(new_lines[s:e]) for s, e in ranges)
+        if not changed or len(changed_text) >= 200 or context >= len(new_lines):
+            break
+        context = max(1, context) * 2
+    return {
+        "mode": "partial",
+        "kept": kept,
+        "changed_text": changed_text,
+        "changed_ranges": ranges,
+        "changed_ratio": ratio,
+    }
+
+
+def merge_partial(plan: Dict, new_shops: List[Dict], text: str) -> List[Dict]:
+    """
+    Combine kept shops with shops extracted from the changed ranges, in page order.
+
+    Extracted shops that match a kept shop on a context line (same name, anchored
+    to that line) are the context echoing back and are not added twice.
+    """
+    lines = text.split("\n")
+    ranges = plan["changed_ranges"]
+    # Anchor new shops only within the changed ranges, so they land next to their section
+    window = [i for s, e in ranges for i in range(s, e)]
+    anchors = _anchor_shops(new_shops, [lines[i] for i in window])
+    kept_keys = {(a, str(s.get("shop_name") or "").strip().lower()) for a, s in plan["kept"] if a is not None}
+    merged = list(plan["kept"])
+    for anchor, shop in zip(anchors, new_shops):
+        line = window[anchor] if anchor is not None else None
+        if line is not None and (line, str(shop.get("shop_name") or "").strip().lower()) in kept_keys:
+            continue
+        merged.append((line, shop))
+    end = len(lines)
+    merged.sort(key=lambda item: end if item[0] is None else item[0])
+    return [shop for _, shop in merged]
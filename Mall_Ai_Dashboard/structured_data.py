@@ -0,0 +1,276 @@
+"""
+Structured tenant data embedded in mall directory pages.
+
+Many directories ship their whole tenant list as data next to the markup:
+Next.js `__NEXT_DATA__`, Nuxt `window.__NUXT__` (JSON form), other
+`window.__*_STATE__` blobs, JSON-LD `Store`/`LocalBusiness` entries, or plain
+script variables such as Brookefields' `var arrStore = {...}`, and Mappedin venue
+`locations` of type tenant. This module finds
+those payloads in the raw HTML (before scraper.py strips `<script>` tags) and maps
+them to the shop schema used everywhere else: shop_name, phone, floor, image_url.
+
+Each framework is an adapter: a function html -> list of shop dicts, registered
+with @register_adapter. extract_structured_shops() runs all of them and keeps
+the largest result; when it holds at least STRUCTURED_MIN_SHOPS shops,
+scraper.scrape_url uses it and skips the LLM extraction.
+"""
+import html as html_lib
+import json
+import os
+import re
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Shops a payload must yield before it is trusted as the complete list (and the LLM is skipped)
+STRUCTURED_MIN_SHOPS = int(os.getenv("STRUCTURED_MIN_SHOPS", "10"))
+
+_NAME_KEYS = ("name", "storeName", "store_name", "shopName", "shop_name", "tenantName", "brandName", "title")
+_PHONE_KEYS = ("telephone", "phone", "phoneNumber", "phone_number", "contactNumber", "contact_number", "mobile", "contact")
+_FLOOR_KEYS = ("floor", "floorName", "floor_name", "level", "levelName", "unit", "unitNumber", "shopNo", "shop_no",
+               "shopNumber", "suite", "location")
+_IMAGE_KEYS = ("logo", "logoUrl", "logo_url", "image", "imageUrl", "image_url", "thumbnail", "icon")
+# A list of objects only counts as tenants when its items have a key containing one of these words
+# (storeId, shopName, unitNumber, phone, floorName, ...). Generic keys such as title, category,
+# location or opening hours are shared by offers, events and blog lists, so they do not count.
+_STORE_HINTS = frozenset(("store", "shop", "tenant", "unit", "suite", "phone", "telephone", "floor", "level"))
+# A list reached through a variable or key named after stores (arrStore, stores, tenantList, allShops,
+# storesById, ...) is store evidence by itself, so its items only need a name. Only the key's last
+# word counts once generic suffixes are dropped: storeCategories or shopHours are not store lists.
+_STORE_CONTAINER_HINTS = frozenset(("store", "shop", "tenant", "retailer", "brand"))
+_CONTAINER_SUFFIXES = frozenset(("list", "lists", "data", "items", "array", "arr", "map", "by", "id", "ids", "all"))
+_JSON_LD_STORE_TYPES = re.compile(r"(Store|LocalBusiness|Restaurant|FoodEstablishment|CafeOrCoffeeShop|BarOrPub)$")
+
+_adapters: List[Tuple[str, Callable[[str], List[Dict]]]] = []
+
+
+def register_adapter(name: str):
+    """Decorator registering `fn(html) -> [shop dicts]` as a structured-data adapter."""
+    def decorator(fn):
+        _adapters.append((name, fn))
+        return fn
+    return decorator
+
+
+def _decode_json_at(text: str, start: int) -> Optional[Any]:
+    """Decode the JSON value that starts at the first '{' or '[' at/after `start` (None if it is not JSON)."""
+    m = re.compile(r"\s*([\[{])").match(text, start)
+    if not m:
+        return None
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text, m.start(1))
+        return value
+    except ValueError:
+        return None
+
+
+def _script_bodies(html: str, attr_pattern: str) -> Iterator[str]:
+    """Bodies of <script> tags whose attributes match `attr_pattern`."""
+    for m in re.finditer(r"<script\b([^>]*)>(.*?)</script>", html, re.S | re.I):
+        if re.search(attr_pattern, m.group(1), re.I):
+            yield m.group(2)
+
+
+def _text(value: Any) -> str:
+    """A display string from a scalar, or from {"name"/"url"/...} / [first] for nested values."""
+    if isinstance(value, list):
+        value = value[0] if value else ""
+    if isinstance(value, dict):
+        for key in ("url", "src", "name", "value", "label", "title", "number", "@id"):
+            if isinstance(value.get(key), (str, int, float)):
+                value = value[key]
+                break
+        else:
+            return ""
+    if value is None or isinstance(value, bool):
+        return ""
+    return re.sub(r"\s+", " ", html_lib.unescape(str(value))).strip()
+
+
+def _first(item: Dict, keys) -> str:
+    lowered = {k.lower(): v for k, v in item.items() if isinstance(k, str)}
+    for key in keys:
+        v = _text(lowered.get(key.lower()))
+        if v:
+            return v
+    return ""
+
+
+def _to_shop(item: Dict) -> Optional[Dict]:
+    name = _first(item, _NAME_KEYS)
+    if not name or len(name) > 120 or not re.search(r"[A-Za-z0-9]", name):
+        return None
+    image = _first(item, _IMAGE_KEYS)
+    return {
+        "shop_name": name,
+        "phone": _first(item, _PHONE_KEYS),
+        "floor": _first(item, _FLOOR_KEYS),
+        "image_url": image if image.startswith(("http", "/")) else "",
+    }
+
+
+def _key_words(key: str) -> List[str]:
+    """Words of a camelCase / snake_case key: "storeId" -> ["store", "id"]."""
+    return re.findall(r"[a-z]+", re.sub(r"([a-z])([A-Z])", r"\1 \2", key).lower())
+
+
+def _is_store_container(key: str) -> bool:
+    """Whether a variable / key name says it holds stores: "arrStore", "stores", "tenantList" -> True."""
+    words = _key_words(key or "")
+    while words and words[-1] in _CONTAINER_SUFFIXES:
+        words.pop()
+    return bool(words) and (words[-1] in _STORE_CONTAINER_HINTS or words[-1].rstrip("s") in _STORE_CONTAINER_HINTS)
+
+
+def _looks_like_store(item: Any, in_store_container: bool = False) -> bool:
+    if not isinstance(item, dict) or not _first(item, _NAME_KEYS):
+        return False
+    if in_store_container:
+        return True
+    return any(w in _STORE_HINTS for k in item if isinstance(k, str) for w in _key_words(k))
+
+
+def _candidate_lists(obj: Any, key: str = "", depth: int = 0) -> Iterator[Tuple[List[Dict], str]]:
+    """Every list of objects (or id -> object mapping) inside `obj`, with the key it was found under."""
+    if depth > 25:
+        return
+    if isinstance(obj, list):
+        dicts = [x for x in obj if isinstance(x, dict)]
+        if len(dicts) >= 2:
+            yield dicts, key
+        for x in obj:
+            if isinstance(x, (dict, list)):
+                yield from _candidate_lists(x, key, depth + 1)
+    elif isinstance(obj, dict):
+        values = list(obj.values())
+        if len(values) >= 3 and all(isinstance(v, dict) for v in values):
+            yield values, key
+        for k, v in obj.items():
+            if isinstance(v, (dict, list)):
+                yield from _candidate_lists(v, str(k), depth + 1)
+
+
+def shops_from_json(obj: Any, name: str = "") -> List[Dict]:
+    """Shops from the largest store-like list of objects anywhere in a decoded payload.
+
+    `name` is the variable the payload was assigned to (e.g. "arrStore"), if any.
+    """
+    best: List[Dict] = []
+    for items, key in _candidate_lists(obj, name):
+        in_store_container = _is_store_container(key)
+        stores = [x for x in items if _looks_like_store(x, in_store_container)]
+        # Most of the list must look like stores, so menus and mixed lists are not picked up
+        if len(stores) < max(2, len(items) // 2) or len(stores) <= len(best):
+            continue
+        best = stores
+    return _dedupe([s for s in (_to_shop(x) for x in best) if s])
+
+
+def _dedupe(shops: List[Dict]) -> List[Dict]:
+    seen = set()
+    out = []
+    for s in shops:
+        key = (s["shop_name"].lower(), s["floor"].lower())
+        if key not in seen:
+            seen.add(key)
+            out.append(s)
+    return out
+
+
+@register_adapter("next_data")
+def _next_data(html: str) -> List[Dict]:
+    for body in _script_bodies(html, r"""id=["']__NEXT_DATA__["']"""):
+        data = _decode_json_at(body, 0)
+        if data is not None:
+            return shops_from_json(data)
+    return []
+
+
+# Script variables holding app state or tenant arrays, in the JSON (not function-call) form
+_STATE_ASSIGN_RE = re.compile(
+    r"(?:window\.(__NUXT__|__INITIAL_STATE__|__PRELOADED_STATE__|__APOLLO_STATE__|__APP_DATA__)"
+    r"|\bvar\s+(arrStore|stores|storeList|shops|tenants)\b)\s*=\s*"
+)
+
+
+@register_adapter("js_state")
+def _js_state(html: str) -> List[Dict]:
+    best: List[Dict] = []
+    for m in _STATE_ASSIGN_RE.finditer(html):
+        data = _decode_json_at(html, m.end())
+        if data is None:
+            continue
+        shops = shops_from_json(data, m.group(1) or m.group(2) or "")
+        if len(shops) > len(best):
+            best = shops
+    return best
+
+
+# Mappedin venue data embedded in the page: a "locations" array whose tenants have type "tenant"
+_MAPPEDIN_LOCATIONS_RE = re.compile(r'"locations"\s*:\s*(?=\[)')
+
+
+@register_adapter("mappedin")
+def _mappedin(html: str) -> List[Dict]:
+    if "mappedin" not in html.lower():
+        return []
+    best: List[Dict] = []
+    for m in _MAPPEDIN_LOCATIONS_RE.finditer(html):
+        data = _decode_json_at(html, m.end())
+        if not isinstance(data, list):
+            continue
+        tenants = [x for x in data if isinstance(x, dict) and str(x.get("type", "")).lower() == "tenant"]
+        shops = _dedupe([s for s in (_to_shop(x) for x in tenants) if s])
+        if len(shops) > len(best):
+            best = shops
+    return best
+
+
+def _json_ld_nodes(obj: Any) -> Iterator[Dict]:
+    if isinstance(obj, list):
+        for x in obj:
+            yield from _json_ld_nodes(x)
+    elif isinstance(obj, dict):
+        yield obj
+        for key in ("@graph", "itemListElement", "item", "containsPlace", "department", "subOrganization"):
+            if key in obj:
+                yield from _json_ld_nodes(obj[key])
+
+
+@register_adapter("json_ld")
+def _json_ld(html: str) -> List[Dict]:
+    shops = []
+    for body in _script_bodies(html, r"""type=["']application/ld\+json["']"""):
+        data = _decode_json_at(body, 0)
+        for node in _json_ld_nodes(data):
+            types = node.get("@type")
+            types = types if isinstance(types, list) else [types]
+            if any(isinstance(t, str) and _JSON_LD_STORE_TYPES.search(t) for t in types):
+                shop = _to_shop(node)
+                if shop:
+                    shops.append(shop)
+    return _dedupe(shops)
+
+
+def extract_structured_shops(html: str) -> Tuple[List[Dict], str]:
+    """
+    Run every adapter on `html` and return (shops, adapter name) for the largest result.
+
+    Returns ([], "") when no payload maps to shops. An adapter that raises is skipped.
+    """
+    best: List[Dict] = []
+    best_name = ""
+    if not html:
+        return best, best_name
+    for name, adapter in _adapters:
+        try:
+            shops = adapter(html)
+        except Exception as e:
+            print(f"Warning: structured data adapter {name} failed: {e}")
+            continue
+        if len(shops) > len(best):
+            best, best_name = shops, name
+    return best, best_name
+
+
+def is_complete(shops: List[Dict]) -> bool:
+    """Whether a structured result is trusted as the full tenant list."""
+    return len(shops) >= STRUCTURED_MIN_SHOPS
@@ -0,0 +1,79 @@
+"""
+structured_data_check.py – Regression check for the adapters in structured_data.py.
+
+Runs extract_structured_shops over small HTML fixtures modelled on real mall
+pages and fails when an adapter or shop count differs from the one recorded:
+Brookefields' `var arrStore = {id: {name, top, left}}` (no store-like item
+keys, only the variable name says these are stores), a Next.js page with
+props.pageProps.stores, a Mappedin `locations` payload, and a page whose only
+list is offers {title, category, location}, which must not be taken for shops.
+
+Usage:
+    python structured_data_check.py      # exit status 1 on any mismatch
+"""
+import json
+import sys
+
+from structured_data import extract_structured_shops
+
+_NAMES = ["Zara", "H&M", "Lifestyle", "Max Fashion", "Pothys", "Chennai Silks", "KFC",
+          "Cafe Coffee Day", "Bata", "Baskin Robbins", "Trends Footwear", "Mobile Zone"]
+
+ARR_STORE_HTML = (
+    "<html><body><div id='map'></div><script>\n"
+    "var arrStore = "
+    + json.dumps({str(10 + i): {"name": n, "top": 100 + 7 * i, "left": 40 + 11 * i} for i, n in enumerate(_NAMES)})
+    + ";\nfunction showStore(id) { return arrStore[id]; }\n</script></body></html>"
+)
+
+NEXT_DATA_HTML = (
+    '<html><body><script id="__NEXT_DATA__" type="application/json">'
+    + json.dumps({"props": {"pageProps": {
+        "mall": {"name": "Sample Mall", "city": "Chennai"},
+        "stores": [{"id": i, "name": n, "slug": n.lower().replace(" ", "-"),
+                    "logo": f"/logos/{i}.png", "category": "Fashion"} for i, n in enumerate(_NAMES)],
+    }}, "page": "/stores"})
+    + "</script></body></html>"
+)
+
+MAPPEDIN_HTML = (
+    "<html><body><script src='https://cdn.mappedin.com/web/sdk.js'></script><script>\n"
+    "window.venueData = "
+    + json.dumps({"locations": [{"id": f"t{i}", "name": n, "type": "tenant", "phone": {"number": f"044 2000 {i:04d}"}}
+                                for i, n in enumerate(_NAMES)]
+                  + [{"id": "a1", "name": "Restroom", "type": "amenities"},
+                     {"id": "a2", "name": "ATM", "type": "amenities"}]})
+    + ";\n</script></body></html>"
+)
+
+OFFERS_HTML = (
+    "<html><body><script>\n"
+    "window.__INITIAL_STATE__ = "
+    + json.dumps({"offers": [{"title": f"{n} sale", "category": "Deals", "location": "Ground floor"} for n in _NAMES]})
+    + ";\n</script></body></html>"
+)
+
+# (label, html, adapter expected, shop count expected)
+FIXTURES = [
+    ("arrStore", ARR_STORE_HTML, "js_state", len(_NAMES)),
+    ("Next.js pageProps.stores", NEXT_DATA_HTML, "next_data", len(_NAMES)),
+    ("Mappedin locations", MAPPEDIN_HTML, "mappedin", len(_NAMES)),
+    ("offers only", OFFERS_HTML, "", 0),
+]
+
+
+def main() -> int:
+    failed = False
+    for label, html, adapter, count in FIXTURES:
+        shops, name = extract_structured_shops(html)
+        if name == adapter and len(shops) == count:
+            print(f"[OK] {label}: {count} shops from {adapter or 'no adapter'}, as recorded")
+        else:
+            failed = True
+            print(f"[FAIL] {label}: got {len(shops)} shops from {name or 'no adapter'}, "
+                  f"expected {count} from {adapter or 'no adapter'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+vision_tiles.py – Tiling and compact encoding of mall map screenshots for vision LLM calls.
+
+A whole-window screenshot sent as one PNG is downscaled by the model to ~768 px on
+its short side, so the small shop labels of a dense map become unreadable, and the
+lossless PNG costs megabytes of base64 per request. tile_image() instead:
+
+  1. downscales very large captures so a floor never needs more than
+     VISION_MAX_TILES tiles (bounded latency and cost)
+  2. cuts the image into VISION_TILE_SIZE squares overlapping by
+     VISION_TILE_OVERLAP px, so a label cut by one tile edge is whole in a neighbour
+  3. skips blank tiles (flat colour), tiles whose pixels exactly match a tile
+     already kept for any floor (the same legend panel on every floor), and
+     tiles of the same capture whose perceptual hash (16x16 dHash) is within
+     VISION_HASH_DISTANCE bits of one already kept. Near-duplicates are not
+     matched across floors: floors share the building outline and differ
+     only in their labels, which a perceptual hash does not see
+  4. re-encodes each tile as WebP (JPEG when Pillow lacks WebP) at VISION_IMAGE_QUALITY
+
+Usage:
+    from vision_tiles import TileDeduper, tile_image
+
+    dedupe = TileDeduper()            # share one across floors
+    tiles, stats = tile_image("map_capture_l1.png", dedupe=dedupe)
+    tiles[0]["box"]        # (left, top, right, bottom) in the capture's pixels
+    tiles[0]["data_url"]   # "data:image/webp;base64,..."
+"""
+import base64
+import hashlib
+import io
+import math
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+from PIL import Image, ImageStat, features
+
+# Tile edge in px; 1024 keeps labels legible after the model's own downscale to 768
+VISION_TILE_SIZE = int(os.getenv("VISION_TILE_SIZE", "1024"))
+VISION_TILE_OVERLAP = int(os.getenv("VISION_TILE_OVERLAP", "160"))
+VISION_MAX_TILES = int(os.getenv("VISION_MAX_TILES", "12"))
+VISION_IMAGE_FORMAT = os.getenv("VISION_IMAGE_FORMAT", "webp").strip().lower()
+VISION_IMAGE_QUALITY = int(os.getenv("VISION_IMAGE_QUALITY", "80"))
+# Max differing dHash bits (of 256) for two tiles of one capture to count as the same picture
+VISION_HASH_DISTANCE = int(os.getenv("VISION_HASH_DISTANCE", "10"))
+# Grayscale standard deviation below which a tile is treated as blank
+VISION_BLANK_STDDEV = float(os.getenv("VISION_BLANK_STDDEV", "4"))
+
+
+def dhash(image: Image.Image, size: int = 16) -> int:
+    """size*size-bit difference hash: brighter/darker bits between neighbouring pixels of a tiny grayscale copy."""
+    small = image.convert("L").resize((size + 1, size), Image.BILINEAR)
+    px = list(small.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = px[row * (size + 1) + col]
+            bits = (bits << 1) | (left > px[row * (size + 1) + col + 1])
+    return bits
+
+
+class TileDeduper:
+    """
+    Remembers the tiles already kept; share one instance across all floors of a mall.
+
+    Exact pixel matches (sha256) are duplicates across every capture; perceptual
+    near-matches only within the current capture (see start_capture).
+    """
+
+    def __init__(self, max_distance: int = VISION_HASH_DISTANCE):
+        self.max_distance = max_distance
+        self.digests: Set[str] = set()
+        self.hashes: List[int] = []
+
+    def start_capture(self) -> None:
+        """Forget the perceptual hashes of the previous capture (floor); exact digests are kept."""
+        self.hashes = []
+
+    def seen(self, tile_hash: int, digest: str) -> bool:
+        """True if this tile was kept before, else remember it and return False."""
+        if digest in self.digests:
+            return True
+        if any(bin(tile_hash ^ h).count("1") <= self.max_distance for h in self.hashes):
+            return True
+        self.digests.add(digest)
+        self.hashes.append(tile_hash)
+        return False
+
+
+def _starts(length: int, tile: int, overlap: int) -> List[int]:
+    """Tile offsets along one axis; the last tile is aligned to the far edge."""
+    if length <= tile:
+        return [0]
+    step = max(1, tile - overlap)
+    count = math.ceil((length - tile) / step) + 1
+    return sorted({min(i * step, length - tile) for i in range(count)})
+
+
+def _tile_count(width: int, height: int, tile: int, overlap: int) -> int:
+    return len(_starts(width, tile, overlap)) * len(_starts(height, tile, overlap))
+
+
+def _encode(image: Image.Image, fmt: str, quality: int) -> Tuple[str, bytes]:
+    fmt = "webp" if fmt == "webp" and features.check("webp") else "jpeg"
+    buf = io.BytesIO()
+    image.convert("RGB").save(buf, format=fmt.upper(), quality=quality)
+    return f"image/{fmt}", buf.getvalue()
+
+
+def tile_image(
+    image,
+    tile_size: int = VISION_TILE_SIZE,
+    overlap: int = VISION_TILE_OVERLAP,
+    max_tiles: int = VISION_MAX_TILES,
+    fmt: str = VISION_IMAGE_FORMAT,
+    quality: int = VISION_IMAGE_QUALITY,
+    dedupe: Optional[TileDeduper] = None,
+) -> Tuple[List[Dict], Dict]:
+    """
+    Split `image` (a path or PIL image) into encoded tiles.
+
+    Returns (tiles, stats). Each tile has box (left, top, right, bottom in the
+    original image's pixels), data_url, bytes and hash. stats has width, height,
+    scale (applied to fit `max_tiles`), tiles, blank, duplicate and bytes.
+    """
+    if not isinstance(image, Image.Image):
+        with Image.open(image) as opened:
+            image = opened.convert("RGB")
+    width, height = image.size
+    overlap = min(overlap, tile_size // 2)
+
+    # Shrink until the grid fits max_tiles; labels get smaller but latency stays bounded
+    scale = 1.0
+    while _tile_count(int(width * scale), int(height * scale), tile_size, overlap) > max_tiles and scale > 0.1:
+        scale *= 0.9
+    if scale < 1.0:
+        image = image.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.LANCZOS)
+
+    if dedupe is not None:
+        dedupe.start_capture()
+    stats = {"width": width, "height": height, "scale": round(scale, 3),
+             "tiles": 0, "blank": 0, "duplicate": 0, "bytes": 0}
+    tiles: List[Dict] = []
+    w, h = image.size
+    for top in _starts(h, tile_size, overlap):
+        for left in _starts(w, tile_size, overlap):
+            box = (left, top, min(left + tile_size, w), min(top + tile_size, h))
+            tile = image.crop(box)
+            if ImageStat.Stat(tile.convert("L")).stddev[0] < VISION_BLANK_STDDEV:
+                stats["blank"] += 1
+                continue
+            tile_hash = dhash(tile)
+            digest = hashlib.sha256(tile.tobytes()).hexdigest()
+            if dedupe is not None and dedupe.seen(tile_hash, digest):
+                stats["duplicate"] += 1
+                continue
+            mime, data = _encode(tile, fmt, quality)
+            tiles.append({
+                "box": tuple(int(round(v / scale)) for v in box),
+                "data_url": f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}",
+                "bytes": len(data),
+                "hash": tile_hash,
+            })
+            stats["bytes"] += len(data)
+    stats["tiles"] = len(tiles)
+    return tiles, stats
+
+
+def describe_stats(stats: Dict, label: str = "") -> str:
+    """One-line summary of a tile_image() result for logs."""
+    msg = (f"Vision tiles{f' ({label})' if label else ''}: {stats['width']}x{stats['height']} -> "
+           f"{stats['tiles']} tile(s), {stats['bytes'] // 1024} KB")
+    if stats["scale"] < 1.0:
+        msg += f", downscaled x{stats['scale']}"
+    if stats["blank"] or stats["duplicate"]:
+        msg += f", skipped {stats['blank']} blank / {stats['duplicate']} duplicate"
+    return msg
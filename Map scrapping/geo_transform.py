@@ -0,0 +1,129 @@
+"""
+geo_transform.py – Map pixel -> latitude/longitude transforms for Mappedin maps.
+
+Every Mappedin map carries georeference control points, each pairing a map
+position (control x/y) with a geographic one (target x = latitude,
+y = longitude). fit_georeference() fits the transform by least squares over all
+of them rather than solving exactly through the first three, so one sloppy
+control point no longer skews the whole floor. As in
+mall_analysis_app.solve_latlon_to_pixel, both point sets are first normalized
+to zero mean and unit spread, which keeps pixel- and degree-scale values
+equally well conditioned.
+
+  affine      6 parameters, 3+ points (default)
+  homography  8 parameters (DLT), 4+ points; GEO_TRANSFORM=homography for
+              maps rendered in perspective. Falls back to affine below 4 points.
+
+georeference_nodes() then projects every node of every floor through its
+map's 3x3 matrix in a single einsum.
+
+Usage:
+    from geo_transform import georeference_nodes
+
+    coords = georeference_nodes(maps_res, nodes_res)   # {node_id: (lat, lon)}
+"""
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+GEO_TRANSFORM = os.getenv("GEO_TRANSFORM", "affine").strip().lower()
+
+
+def normalization(pts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(normalized points, 3x3 matrix T) with [normalized, 1] = T @ [pt, 1]: zero mean, unit std per axis."""
+    mean = np.mean(pts, axis=0)
+    std = np.std(pts, axis=0) + 1e-9
+    T = np.array([[1 / std[0], 0, -mean[0] / std[0]],
+                  [0, 1 / std[1], -mean[1] / std[1]],
+                  [0, 0, 1]])
+    return (pts - mean) / std, T
+
+
+def fit_affine(src: np.ndarray, dst: np.ndarray) -> Optional[np.ndarray]:
+    """Least-squares affine transform src -> dst as a 3x3 matrix; None for fewer than 3 or collinear points."""
+    if len(src) < 3:
+        return None
+    src_norm, T_src = normalization(src)
+    dst_norm, T_dst = normalization(dst)
+    A = np.column_stack([src_norm, np.ones(len(src))])
+    coeffs, _, rank, _ = np.linalg.lstsq(A, dst_norm, rcond=None)
+    if rank < 3:
+        return None
+    H_norm = np.vstack([coeffs.T, [0, 0, 1]])
+    return np.linalg.inv(T_dst) @ H_norm @ T_src
+
+
+def fit_homography(src: np.ndarray, dst: np.ndarray) -> Optional[np.ndarray]:
+    """Least-squares (DLT) homography src -> dst as a 3x3 matrix; affine fit below 4 points."""
+    if len(src) < 4:
+        return fit_affine(src, dst)
+    src_norm, T_src = normalization(src)
+    dst_norm, T_dst = normalization(dst)
+    x, y = src_norm[:, 0], src_norm[:, 1]
+    u, v = dst_norm[:, 0], dst_norm[:, 1]
+    zeros, ones = np.zeros(len(src)), np.ones(len(src))
+    A = np.vstack([
+        np.column_stack([x, y, ones, zeros, zeros, zeros, -u * x, -u * y, -u]),
+        np.column_stack([zeros, zeros, zeros, x, y, ones, -v * x, -v * y, -v]),
+    ])
+    _, s, vt = np.linalg.svd(A)
+    if s[min(7, len(s) - 1)] < 1e-10:
+        return fit_affine(src, dst)
+    H = np.linalg.inv(T_dst) @ vt[-1].reshape(3, 3) @ T_src
+    if abs(H[2, 2]) < 1e-12:
+        return fit_affine(src, dst)
+    return H / H[2, 2]
+
+
+def _control_points(georeference: Iterable[dict]) -> Tuple[np.ndarray, np.ndarray]:
+    src, dst = [], []
+    for p in georeference or []:
+        try:
+            src.append((float(p['control']['x']), float(p['control']['y'])))
+            dst.append((float(p['target']['x']), float(p['target']['y'])))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return np.array(src, dtype=np.float64).reshape(-1, 2), np.array(dst, dtype=np.float64).reshape(-1, 2)
+
+
+def fit_georeference(georeference: Iterable[dict], method: str = GEO_TRANSFORM) -> Optional[np.ndarray]:
+    """3x3 matrix taking [x, y, 1] map coordinates to [lat, lon, 1] (up to scale), or None when unusable."""
+    src, dst = _control_points(georeference)
+    if method == "homography":
+        return fit_homography(src, dst)
+    return fit_affine(src, dst)
+
+
+def project_points(H: np.ndarray, xy: np.ndarray) -> np.ndarray:
+    """Apply one 3x3 matrix, or one per point (N, 3, 3), to (N, 2) points; returns (N, 2)."""
+    xy1 = np.column_stack([xy, np.ones(len(xy))])
+    out = np.einsum('nij,nj->ni', H, xy1) if H.ndim == 3 else xy1 @ H.T
+    return out[:, :2] / out[:, 2:3]
+
+
+def georeference_nodes(maps: List[dict], nodes: List[dict], method: str = GEO_TRANSFORM) -> Dict[str, Tuple[float, float]]:
+    """{node id: (latitude, longitude)} for every node on a map with a usable georeference."""
+    transforms = {}
+    for m in maps:
+        H = fit_georeference(m.get('georeference'), method)
+        if H is not None:
+            transforms[m['id']] = H
+    if not transforms:
+        return {}
+
+    map_index = {map_id: i for i, map_id in enumerate(transforms)}
+    stack = np.stack(list(transforms.values()))
+    ids, xy, which = [], [], []
+    for n in nodes:
+        i = map_index.get(n.get('map'))
+        if i is None or n.get('x') is None or n.get('y') is None:
+            continue
+        ids.append(n['id'])
+        xy.append((n['x'], n['y']))
+        which.append(i)
+    if not ids:
+        return {}
+
+    latlon = project_points(stack[np.array(which)], np.array(xy, dtype=np.float64))
+    return {node_id: (float(lat), float(lon)) for node_id, (lat, lon) in zip(ids, latlon)}
@@ -5,8 +5,6 @@ from PIL import Image, ImageOps, ImageEnhance
 import numpy as np
 import os
 from pathlib import Path
-# import easyocr
-# from sentence_transformers import SentenceTransformer, util
 import pandas as pd
 try:
     import cv2
@@ -26,10 +24,11 @@ if sys.platform.startswith("win"):
 
 from collections import Counter
 from scrape_pipeline import scrape_mall_data 
+from geo_transform import normalization
+import tenant_store
 import gc
 
 # Configuration
-JSON_DATA_PATH = os.path.join(os.path.expanduser("~"), "Downloads", "tenants_detailed.json")
 # Use current user's Downloads so it works on any machine (no hardcoded usernames)
 IMAGES_DIR = os.path.join(os.path.expanduser("~"), "Downloads", "mall_analysis_reports")
 
@@ -50,49 +49,9 @@ def _load_shared_map_url() -> str:
         return ""
 
 
-# @st.cache_resource
-# def load_models():
-#     # Load OCR and Improved SBERT models
-#     # ENABLE QUANTIZATION to fix memory error
-#     reader = easyocr.Reader(['en'], gpu=False, verbose=False, quantize=True)
-#     # Using 'all-MiniLM-L6-v2' for efficiency and accuracy in semantic matching
-#     model = SentenceTransformer('all-MiniLM-L6-v2') 
-#     return reader, model
-
-def load_json_data():
-    if not os.path.exists(JSON_DATA_PATH):
-        return None
-    try:
-        with open(JSON_DATA_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        st.error(f"Error loading JSON: {e}")
-        return None
-
-def preprocess_image(image_path):
-    """
-    Enhances image for better OCR accuracy while maintaining enough resolution.
-    Falls back to basic PIL processing if cv2 is not available.
-    """
-    img = Image.open(image_path).convert("RGB")
-
-    if _CV2_AVAILABLE:
-        # Advanced Enhancement Pipeline
-        img_gray = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2GRAY)
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        img_gray = clahe.apply(img_gray)
-        kernel = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
-        img_sharpened = cv2.filter2D(img_gray, -1, kernel)
-        img = Image.fromarray(cv2.cvtColor(img_sharpened, cv2.COLOR_GRAY2RGB))
-
-    # Increase resolution (3000px for extreme detail)
-    max_dim = 3000
-    w, h = img.size
-    if w > max_dim or h > max_dim:
-        scale = max_dim / max(w, h)
-        img = img.resize((int(w * scale), int(h * scale)), Image.Resampling.LANCZOS)
-
-    return img
+def load_stored_tenants(mall_url=None):
+    """Tenants saved for `mall_url` by an earlier scrape, else those of the most recently scraped mall."""
+    return (tenant_store.load_tenants(mall_url) if mall_url else []) or tenant_store.load_tenants() or None
 
 def solve_latlon_to_pixel(valid_pts):
     """
@@ -107,21 +66,14 @@ def solve_latlon_to_pixel(valid_pts):
     src_pts = np.array([[p['lon'], p['lat']] for p in valid_pts], dtype=np.float64)
     dst_pts = np.array([[p['x'], p['y']] for p in valid_pts], dtype=np.float64)
 
-    src_mean = np.mean(src_pts, axis=0)
-    dst_mean = np.mean(dst_pts, axis=0)
-    src_std = np.std(src_pts, axis=0) + 1e-9
-    dst_std = np.std(dst_pts, axis=0) + 1e-9
-
-    src_norm = (src_pts - src_mean) / src_std
-    dst_norm = (dst_pts - dst_mean) / dst_std
+    src_norm, T_src = normalization(src_pts)
+    dst_norm, T_dst = normalization(dst_pts)
 
     if len(valid_pts) >= 4:
         H_norm, mask = cv2.findHomography(src_norm, dst_norm, cv2.RANSAC, 1.0)
         if H_norm is None:
             return None, None, None
-        T_src = np.array([[1/src_std[0], 0, -src_mean[0]/src_std[0]], [0, 1/src_std[1], -src_mean[1]/src_std[1]], [0, 0, 1]])
-        T_dst_inv = np.array([[dst_std[0], 0, dst_mean[0]], [0, dst_std[1], dst_mean[1]], [0, 0, 1]])
-        H = T_dst_inv @ H_norm @ T_src
+        H = np.linalg.inv(T_dst) @ H_norm @ T_src
         return H, "homography", mask
     else:
         M, mask = cv2.estimateAffine2D(src_pts, dst_pts, method=cv2.LMEDS)
@@ -164,9 +116,6 @@ def main():
     """, unsafe_allow_html=True)
 
     st.title("🏙️ Mall Tenant Analysis & Vision Pipeline")
-    
-    # reader, sbert_model = load_models()
-    reader, sbert_model = None, None
 
     # --- Data Management ---
     if 'tenants' not in st.session_state:
@@ -246,9 +195,9 @@ def main():
                             st.error("Failed to extract data from image.")
 
             # Optional: Allow loading from disk if it exists, but keep it hidden/secondary
-            if os.path.exists(JSON_DATA_PATH) and st.session_state.tenants is None:
+            if st.session_state.tenants is None and tenant_store.list_venues():
                 if st.button("📂 Restore from Disk", use_container_width=True, help="Load previous scrape result from local storage"):
-                    st.session_state.tenants = load_json_data()
+                    st.session_state.tenants = load_stored_tenants(mall_url)
                     st.rerun()
 
         with st.expander("2. Analysis Settings", expanded=True):
@@ -0,0 +1,215 @@
+"""
+model_service.py – Shared OCR reader and sentence-embedding model for map screenshot analysis.
+
+Building an easyocr.Reader and a SentenceTransformer takes longer than OCR-ing
+a few screenshots, and the tenant list is the same from run to run. This
+module therefore:
+
+  1. loads each model lazily, once per process, on first use
+  2. caches tenant-name embeddings on disk, keyed by a hash of the model name
+     and the name list, so an unchanged tenant list is never re-encoded
+  3. encodes OCR text in one batch of unique strings (encode_texts), so labels
+     repeated across screenshots are embedded once
+
+Embeddings are L2-normalized, so cosine similarity is a plain dot product
+(best_matches).
+
+Usage:
+    import model_service
+
+    name_emb = model_service.encode_names(names)          # disk-cached
+    texts = model_service.read_text(image)                # OCR strings above OCR_MIN_CONFIDENCE
+    text_emb = model_service.encode_texts(texts)
+    scores, idx = model_service.best_matches(name_emb, text_emb)
+"""
+import hashlib
+import importlib.util
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2
+    _CV2_AVAILABLE = True
+except ImportError:
+    cv2 = None
+    _CV2_AVAILABLE = False
+
+# Both checked without importing. easyocr loads torch, which apps that only import this module for
+# matching or preprocessing never need; get_reader() imports it on first use. sentence-transformers
+# loads transformers and friends, which the OCR worker processes of ocr_batch never need;
+# get_embedder() imports it on first use.
+EASYOCR_AVAILABLE = importlib.util.find_spec("easyocr") is not None
+SBERT_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+OCR_LANGUAGES = [lang.strip() for lang in os.getenv("OCR_LANGUAGES", "en").split(",") if lang.strip()]
+OCR_GPU = os.getenv("OCR_GPU", "0").strip().lower() in ("1", "true", "yes", "on")
+# OCR detections below this confidence are ignored
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", "0.3"))
+# Longest side preprocess_image() leaves a screenshot at
+OCR_MAX_DIM = int(os.getenv("OCR_MAX_DIM", "3000"))
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join(BASE_DIR, "embedding_cache"))
+
+_lock = threading.Lock()
+_reader = None
+_embedder = None
+_name_embeddings: Dict[str, np.ndarray] = {}
+
+
+def get_reader():
+    """The process-wide easyocr.Reader, created on first call; None when easyocr is not installed."""
+    global _reader
+    if _reader is None:
+        if not EASYOCR_AVAILABLE:
+            print("Warning: easyocr is not installed; OCR is unavailable")
+            return None
+        with _lock:
+            if _reader is None:
+                import easyocr
+                print(f"[INFO] Loading OCR reader ({', '.join(OCR_LANGUAGES)}, gpu={OCR_GPU})...")
+                _reader = easyocr.Reader(OCR_LANGUAGES, gpu=OCR_GPU, verbose=False)
+    return _reader
+
+
+def get_embedder():
+    """The process-wide SentenceTransformer, created on first call; None when it is not installed."""
+    global _embedder
+    if _embedder is None:
+        if not SBERT_AVAILABLE:
+            print("Warning: sentence-transformers is not installed; text matching is unavailable")
+            return None
+        with _lock:
+            if _embedder is None:
+                from sentence_transformers import SentenceTransformer
+                print(f"[INFO] Loading embedding model {EMBEDDING_MODEL}...")
+                _embedder = SentenceTransformer(EMBEDDING_MODEL)
+    return _embedder
+
+
+def _encode(texts: Sequence[str]) -> np.ndarray:
+    model = get_embedder()
+    if model is None:
+        raise RuntimeError("sentence-transformers is not installed")
+    if not texts:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+    return model.encode(
+        list(texts), batch_size=EMBEDDING_BATCH_SIZE, convert_to_numpy=True,
+        normalize_embeddings=True, show_progress_bar=False,
+    ).astype(np.float32)
+
+
+def names_hash(names: Sequence[str]) -> str:
+    """Cache key of a tenant name list for the configured embedding model."""
+    payload = EMBEDDING_MODEL + "\0" + "\0".join(names)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def encode_names(names: Sequence[str]) -> np.ndarray:
+    """Normalized embeddings of `names` (one row each), from memory, the disk cache, or the model."""
+    key = names_hash(names)
+    cached = _name_embeddings.get(key)
+    if cached is not None:
+        return cached
+
+    path = os.path.join(EMBEDDING_CACHE_DIR, f"{key}.npy")
+    if EMBEDDING_CACHE_ENABLED and os.path.exists(path):
+        try:
+            cached = np.load(path)
+            if len(cached) == len(names):
+                _name_embeddings[key] = cached
+                return cached
+        except (OSError, ValueError) as e:
+            print(f"Warning: embedding cache read failed: {e}")
+
+    embeddings = _encode(names)
+    _name_embeddings[key] = embeddings
+    if EMBEDDING_CACHE_ENABLED:
+        try:
+            os.makedirs(EMBEDDING_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, embeddings)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Warning: embedding cache write failed: {e}")
+    return embeddings
+
+
+def encode_texts(texts: Sequence[str]) -> np.ndarray:
+    """Normalized embeddings of `texts`, encoding each distinct string only once."""
+    unique = list(dict.fromkeys(texts))
+    embeddings = _encode(unique)
+    index = {text: i for i, text in enumerate(unique)}
+    return embeddings[[index[t] for t in texts]] if len(unique) != len(texts) else embeddings
+
+
+def preprocess_image(image_path, max_dim: int = OCR_MAX_DIM) -> Image.Image:
+    """
+    Enhances image for better OCR accuracy while maintaining enough resolution.
+    Falls back to basic PIL processing if cv2 is not available.
+    """
+    img = Image.open(image_path).convert("RGB")
+
+    if _CV2_AVAILABLE:
+        # Advanced Enhancement Pipeline
+        img_gray = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2GRAY)
+        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        img_gray = clahe.apply(img_gray)
+        kernel = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
+        img_sharpened = cv2.filter2D(img_gray, -1, kernel)
+        img = Image.fromarray(cv2.cvtColor(img_sharpened, cv2.COLOR_GRAY2RGB))
+
+    # Cap resolution (3000px keeps extreme detail while bounding OCR time)
+    w, h = img.size
+    if w > max_dim or h > max_dim:
+        scale = max_dim / max(w, h)
+        img = img.resize((int(w * scale), int(h * scale)), Image.Resampling.LANCZOS)
+
+    return img
+
+
+def read_detections(image):
+    """(text, confidence) of every OCR detection in `image` (path, PIL image or array)."""
+    reader = get_reader()
+    if reader is None:
+        raise RuntimeError("easyocr is not installed")
+    if not isinstance(image, (str, np.ndarray)):
+        image = np.array(image.convert("RGB"))
+    return [(text, float(conf)) for _, text, conf in reader.readtext(image)]
+
+
+def read_text(image, min_confidence: float = OCR_MIN_CONFIDENCE) -> List[str]:
+    """Text of every OCR detection in `image` (path, PIL image or array) above `min_confidence`."""
+    return [text for text, conf in read_detections(image) if conf > min_confidence]
+
+
+def best_matches(name_embeddings: np.ndarray, text_embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per name, the best cosine score against `text_embeddings` and that text's index."""
+    if not len(name_embeddings) or not len(text_embeddings):
+        empty = np.zeros(len(name_embeddings))
+        return empty, empty.astype(int)
+    scores = name_embeddings @ text_embeddings.T
+    best = scores.argmax(axis=1)
+    return scores[np.arange(len(best)), best], best
+
+
+def matches_for(
+    names: Sequence[str],
+    name_embeddings: np.ndarray,
+    texts: Sequence[str],
+    text_embeddings: Optional[np.ndarray] = None,
+    threshold: float = 0.6,
+) -> List[Tuple[str, str, float]]:
+    """(name, best matching text, score) for every name whose best score exceeds `threshold`."""
+    if text_embeddings is None:
+        text_embeddings = encode_texts(texts)
+    scores, idx = best_matches(name_embeddings, text_embeddings)
+    return [(name, texts[int(i)], float(s)) for name, s, i in zip(names, scores, idx) if s > threshold]
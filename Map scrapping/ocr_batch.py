@@ -0,0 +1,227 @@
+"""
+ocr_batch.py – Parallel, cached OCR over a folder of map screenshots.
+
+easyocr reads one image at a time and leaves most cores idle on a CPU box, so
+ocr_images():
+
+  1. hashes every image file and takes the detections of unchanged screenshots
+     from the OCR cache (keyed by image hash and OCR settings)
+  2. OCRs the rest in a process pool of OCR_WORKERS workers, each loading its
+     own reader once and limiting torch to its share of the cores so the
+     workers do not oversubscribe the CPU
+  3. optionally runs model_service.preprocess_image first (contrast
+     enhancement, longest side capped at OCR_MAX_DIM), which makes OCR of very
+     large captures much cheaper
+
+Storage is a single SQLite file beside this module (OCR_CACHE_PATH). Set
+OCR_CACHE_ENABLED=0 to always re-OCR.
+
+Usage:
+    from ocr_batch import ocr_images
+
+    results = ocr_images(paths, workers=4, preprocess=True)
+    results[path]   # {"detections": [(text, conf), ...], "ocr_seconds": 1.8, "cached": False, "error": None}
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import model_service
+from model_service import OCR_LANGUAGES, OCR_MAX_DIM
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Each worker holds its own reader (a few hundred MB), so the default stays modest
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, min(4, (os.cpu_count() or 1) // 2)))))
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", os.path.join(BASE_DIR, "ocr_cache.sqlite"))
+
+_lock = threading.Lock()
+_initialized = False
+
+
+def image_hash(path: str) -> str:
+    """sha256 of the image file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def settings_key(preprocess: bool, max_dim: int) -> str:
+    """Everything besides the image that changes OCR output."""
+    return f"{','.join(OCR_LANGUAGES)}|preprocess={max_dim if preprocess else 0}"
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    conn = sqlite3.connect(OCR_CACHE_PATH, timeout=30)
+    if not _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_results ("
+            " image_hash TEXT NOT NULL,"
+            " settings TEXT NOT NULL,"
+            " detections TEXT NOT NULL,"
+            " ocr_seconds REAL NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (image_hash, settings))"
+        )
+        conn.commit()
+        _initialized = True
+    return conn
+
+
+def _cache_get(hashes: Sequence[str], settings: str) -> Dict[str, Tuple[List, float]]:
+    if not OCR_CACHE_ENABLED or not hashes:
+        return {}
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                found = {}
+                for h in hashes:
+                    row = conn.execute(
+                        "SELECT detections, ocr_seconds FROM ocr_results WHERE image_hash = ? AND settings = ?",
+                        (h, settings),
+                    ).fetchone()
+                    if row:
+                        found[h] = ([tuple(d) for d in json.loads(row[0])], row[1])
+                return found
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: OCR cache read failed: {e}")
+        return {}
+
+
+def _cache_put(h: str, settings: str, detections: List, seconds: float) -> None:
+    if not OCR_CACHE_ENABLED:
+        return
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO ocr_results (image_hash, settings, detections, ocr_seconds, created_at)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (h, settings, json.dumps(detections, ensure_ascii=False), seconds, time.time()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: OCR cache update failed: {e}")
+
+
+def _init_worker(torch_threads: int) -> None:
+    """Pool initializer: cap torch's threads and load this worker's reader before the first image."""
+    try:
+        import torch
+        torch.set_num_threads(max(1, torch_threads))
+    except ImportError:
+        pass
+    model_service.get_reader()
+
+
+def _ocr_file(path: str, preprocess: bool, max_dim: int) -> Tuple[List[Tuple[str, float]], float]:
+    """OCR one image (runs in a worker process); returns (detections, seconds)."""
+    start = time.perf_counter()
+    image = model_service.preprocess_image(path, max_dim) if preprocess else path
+    detections = model_service.read_detections(image)
+    return detections, time.perf_counter() - start
+
+
+def ocr_images(
+    paths: Sequence[str],
+    workers: Optional[int] = None,
+    preprocess: bool = False,
+    max_dim: int = OCR_MAX_DIM,
+    use_cache: bool = True,
+) -> Dict[str, Dict]:
+    """
+    OCR every image in `paths`, in parallel and skipping cached ones.
+
+    Returns {path: result}; each result has detections ([(text, confidence)]),
+    ocr_seconds (time of the original OCR for cached images), cached and error
+    (None, or the message when the image could not be read).
+    """
+    workers = max(1, OCR_WORKERS if workers is None else workers)
+    settings = settings_key(preprocess, max_dim)
+    results: Dict[str, Dict] = {}
+    total = len(paths)
+
+    hashes = {}
+    for path in paths:
+        try:
+            hashes[path] = image_hash(path)
+        except OSError as e:
+            print(f"Error processing {path}: {e}")
+            results[path] = {"detections": [], "ocr_seconds": 0.0, "cached": False, "error": str(e)}
+
+    cached = _cache_get(list(hashes.values()), settings) if use_cache else {}
+    todo = []
+    for path, h in hashes.items():
+        if h in cached:
+            detections, seconds = cached[h]
+            results[path] = {"detections": detections, "ocr_seconds": seconds, "cached": True, "error": None}
+        else:
+            todo.append(path)
+    if cached:
+        print(f"[INFO] OCR cache: {total - len(todo)} of {total} images unchanged")
+
+    def record(path, detections, seconds, error=None):
+        results[path] = {"detections": detections, "ocr_seconds": seconds, "cached": False, "error": error}
+        if error:
+            print(f"Error processing {path}: {error}")
+        else:
+            _cache_put(hashes[path], settings, detections, seconds)
+            print(f"  [{len(results)}/{total}] {os.path.basename(path)}: "
+                  f"{len(detections)} text regions ({seconds:.1f}s)", flush=True)
+
+    pool = None
+    if workers > 1 and len(todo) > 1:
+        workers = min(workers, len(todo))
+        try:
+            # spawn: forking a parent that already initialised torch can deadlock its thread pools
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=((os.cpu_count() or workers) // workers,),
+            )
+        except (OSError, NotImplementedError) as e:
+            print(f"[OCR] Process pool unavailable, running in-process: {e}")
+
+    if pool is not None:
+        print(f"[INFO] OCR of {len(todo)} images on {workers} worker processes...", flush=True)
+        try:
+            with pool:
+                futures = {pool.submit(_ocr_file, path, preprocess, max_dim): path for path in todo}
+                for future in as_completed(futures):
+                    path = futures[future]
+                    try:
+                        record(path, *future.result())
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        record(path, [], 0.0, str(e))
+        except BrokenProcessPool as e:
+            print(f"[OCR] Worker process pool broke, continuing in-process: {e}")
+        todo = [path for path in todo if path not in results]
+
+    for path in todo:
+        try:
+            record(path, *_ocr_file(path, preprocess, max_dim))
+        except Exception as e:
+            record(path, [], 0.0, str(e))
+
+    return {path: results[path] for path in paths}
@@ -1,81 +1,107 @@
 import os
 import glob
-import json
-import numpy as np
-import cv2
-import easyocr
+import argparse
+import time
 import pandas as pd
-from PIL import Image
-from sentence_transformers import SentenceTransformer, util
+
+import model_service
+import tenant_store
+from model_service import OCR_MAX_DIM, OCR_MIN_CONFIDENCE
+from ocr_batch import OCR_WORKERS, ocr_images
 
 # Configuration
-JSON_DATA_PATH = os.path.join(os.path.expanduser("~"), "Downloads", "tenants_detailed.json")
 IMAGES_DIR = "C:/Users/srira/Downloads/mall_img"
+DEFAULT_OUTPUT_CSV = "verified_tenants.csv"
+MATCH_THRESHOLD = 0.6
+
+def write_results(rows, output_path):
+    """Write per-image verified tenants as CSV, or Parquet for a .parquet path (CSV when pyarrow is missing)."""
+    df = pd.DataFrame(rows, columns=["image", "tenant", "matched_text", "score", "text_regions", "ocr_seconds", "cached"])
+    if output_path.lower().endswith(".parquet"):
+        try:
+            df.to_parquet(output_path, index=False)
+            return output_path
+        except ImportError as e:
+            print(f"Warning: Parquet output unavailable ({e}), writing CSV instead")
+            output_path = os.path.splitext(output_path)[0] + ".csv"
+    df.to_csv(output_path, index=False)
+    return output_path
 
 def main():
+    parser = argparse.ArgumentParser(description="Verify scraped tenants against OCR of mall map screenshots")
+    parser.add_argument("images_dir", nargs="?", default=IMAGES_DIR, help="Folder of PNG screenshots")
+    parser.add_argument("--workers", type=int, default=OCR_WORKERS, help="OCR worker processes (1 = in-process)")
+    parser.add_argument("--preprocess", action="store_true", help="Enhance and downscale images before OCR")
+    parser.add_argument("--max-dim", type=int, default=OCR_MAX_DIM, help="Longest side after --preprocess")
+    parser.add_argument("--no-cache", action="store_true", help="Re-OCR images even when unchanged")
+    parser.add_argument("--threshold", type=float, default=MATCH_THRESHOLD, help="Minimum match score")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_CSV, help="CSV (or .parquet) of verified tenants per image")
+    args = parser.parse_args()
+
     print("--- CLI Mall Analysis Runner ---")
-    
-    # 1. Load Data
-    if not os.path.exists(JSON_DATA_PATH):
-        print(f"Error: JSON data file not found at {JSON_DATA_PATH}")
+    start = time.perf_counter()
+
+    # 1. Load Data (most recently scraped mall)
+    tenants = tenant_store.load_tenants()
+    if not tenants:
+        print(f"Error: No scraped tenants found in {tenant_store.TENANT_STORE_PATH}")
         return
-    with open(JSON_DATA_PATH, 'r', encoding='utf-8') as f:
-        tenants = json.load(f)
-    print(f"Loaded {len(tenants)} tenants from JSON.")
+    print(f"Loaded {len(tenants)} tenants from the tenant store.")
 
     # 2. Load Images
-    image_files = glob.glob(os.path.join(IMAGES_DIR, "*.png"))
+    image_files = sorted(glob.glob(os.path.join(args.images_dir, "*.png")))
     if not image_files:
-        print(f"No PNG images found in {IMAGES_DIR}")
+        print(f"No PNG images found in {args.images_dir}")
         return
     print(f"Found {len(image_files)} images to analyze.")
 
-    # 3. Load Models
-    print("Loading models (this may take a moment)...")
-    reader = easyocr.Reader(['en'], gpu=False, verbose=False) # GPU=False and verbose=False to be safe
-    sbert_model = SentenceTransformer('all-MiniLM-L6-v2')
-
-    # 4. Analyze
     json_names = [t['name'] for t in tenants if t['name']]
     if not json_names:
         print("No valid tenant names in JSON.")
         return
 
-    json_embeddings = sbert_model.encode(json_names, convert_to_tensor=True)
+    # 3. OCR every image (worker processes, unchanged images from the cache)
+    ocr_results = ocr_images(
+        image_files, workers=args.workers, preprocess=args.preprocess,
+        max_dim=args.max_dim, use_cache=not args.no_cache,
+    )
+    ocr_texts = {
+        path: [text for text, conf in res["detections"] if conf > OCR_MIN_CONFIDENCE]
+        for path, res in ocr_results.items()
+    }
 
+    # 4. Tenant name embeddings (cached on disk), then all detected text in one batch
+    json_embeddings = model_service.encode_names(json_names)
+    all_texts = [text for texts in ocr_texts.values() for text in texts]
+    all_embeddings = model_service.encode_texts(all_texts)
+
+    # 5. Compare
+    rows = []
+    offset = 0
     for img_path in image_files:
-        print(f"\nAnalyzing: {os.path.basename(img_path)}")
-        try:
-            image = Image.open(img_path).convert("RGB")
-            img_np = np.array(image)
-            
-            # OCR
-            results = reader.readtext(img_np)
-            ocr_texts = [res[1] for res in results if res[2] > 0.3]
-            print(f"  > Detected {len(ocr_texts)} text regions.")
-            
-            if not ocr_texts:
-                continue
+        res, texts = ocr_results[img_path], ocr_texts[img_path]
+        ocr_embeddings = all_embeddings[offset:offset + len(texts)]
+        offset += len(texts)
+        if res["error"]:
+            continue
 
-            # Compare
-            ocr_embeddings = sbert_model.encode(ocr_texts, convert_to_tensor=True)
-            cosine_scores = util.cos_sim(json_embeddings, ocr_embeddings)
-            
-            verified_count = 0
-            print("  > Verified Tenants:")
-            for i, name in enumerate(json_names):
-                best_score = float(cosine_scores[i].max())
-                best_idx = int(cosine_scores[i].argmax())
-                best_match = ocr_texts[best_idx]
-                
-                if best_score > 0.6:
-                    print(f"    [OK] {name} (Match: '{best_match}', Score: {best_score:.2f})")
-                    verified_count += 1
-            
-            print(f"  > Total Verified in this image: {verified_count}")
+        print(f"\nVerified Tenants in {os.path.basename(img_path)}:")
+        verified = model_service.matches_for(json_names, json_embeddings, texts, ocr_embeddings, threshold=args.threshold) if texts else []
+        for name, best_match, best_score in verified:
+            print(f"    [OK] {name} (Match: '{best_match}', Score: {best_score:.2f})")
+            rows.append((os.path.basename(img_path), name, best_match, round(best_score, 4),
+                         len(texts), round(res["ocr_seconds"], 2), res["cached"]))
+        if not verified:
+            # Keep a row per image so its timing is still reported
+            rows.append((os.path.basename(img_path), "", "", None, len(texts), round(res["ocr_seconds"], 2), res["cached"]))
+        print(f"  > Total Verified in this image: {len(verified)}")
 
-        except Exception as e:
-            print(f"Error processing {img_path}: {e}")
+    output_path = write_results(rows, args.output)
+    cached_count = sum(1 for res in ocr_results.values() if res["cached"])
+    ocr_seconds = sum(res["ocr_seconds"] for res in ocr_results.values() if not res["cached"])
+    print(f"\nSaved results to {output_path}")
+    print(f"Done in {time.perf_counter() - start:.1f}s "
+          f"({len(image_files) - cached_count} images OCR'd, {ocr_seconds:.1f}s of OCR; {cached_count} from cache)")
 
 if __name__ == "__main__":
     main()
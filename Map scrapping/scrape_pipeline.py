@@ -2,6 +2,7 @@ import json
 import os
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import numpy as np
 from selenium.webdriver.common.by import By
@@ -13,49 +14,57 @@ from selenium.webdriver.support import expected_conditions as EC
 _ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if _ROOT not in sys.path:
     sys.path.insert(0, _ROOT)
-from chrome_helper import make_chrome_driver
+from chrome_pool import get_pool
+import http_client
+import tenant_store
+import venue_cache
+from geo_transform import georeference_nodes
 
 # Configuration
-OUTPUT_FILE = os.path.join(os.path.expanduser("~"), "Downloads", "tenants_detailed.json")
 CHROME_PROFILE_DIR = os.path.join(os.getcwd(), "chrome_profile")
 
+# Mappedin public API; the three collections scrape_mall_data needs, fetched in parallel
+MAPPEDIN_API_BASE = "https://api-gateway.mappedin.com/public/1"
+_MAPPEDIN_ENDPOINTS = {
+    "maps": "map/{}?fields=id,name,georeference,elevation,shortName",
+    "locations": "location/{}?fields=name,description,externalId,type,nodes,operationHours",
+    "nodes": "node/{}?fields=id,x,y,map",
+}
+
+# Vision capture: window size for map screenshots (tiled before the LLM reads them),
+# floors captured at most, and seconds to wait for the map to render / redraw after a floor switch
+VISION_WINDOW_SIZE = tuple(int(v) for v in os.getenv("VISION_WINDOW_SIZE", "2048x1536").lower().split("x"))
+VISION_MAX_FLOORS = int(os.getenv("VISION_MAX_FLOORS", "8"))
+VISION_RENDER_TIMEOUT = int(os.getenv("VISION_RENDER_TIMEOUT", "20"))
+VISION_FLOOR_SETTLE = float(os.getenv("VISION_FLOOR_SETTLE", "3"))
+
+# Visible floor selector labels: "Level 2", "L1", "Ground Floor", "2nd Floor", "Plan 1", "B1"...
+_FLOOR_LABEL_RE = (
+    r"^(?:level|floor|lvl|plan|etage|niveau|l)\s*-?\d+$"
+    r"|^(?:lower |upper )?(?:ground|basement|mezzanine|first|second|third|fourth|fifth)(?: floor| level)?$"
+    r"|^\d+(?:st|nd|rd|th)?\s*(?:floor|level|sal)$"
+    r"|^(?:g|lg|ug|gf|m|b\d)$"
+)
+
 
 def create_driver(headless=True):
     """
-    Create Chrome driver using shared chrome_helper.
+    Lease a Chrome driver (with performance logs) from the shared chrome_pool.
     Previously used seleniumwire.undetected_chromedriver which tried to download
     a patched ChromeDriver at runtime — that always fails in Railway containers.
+    Return it with release_driver() so the warm browser is reused next run.
     """
     try:
-        return make_chrome_driver(headless=headless, enable_network_logs=True)
+        return get_pool(headless=headless, enable_network_logs=True).acquire()
     except Exception as e:
         print(f"Fatal: Could not initialize driver: {e}")
         return None
 
 
-def solve_affine(pts):
-    """
-    Solves for affine transform coefficients (a*x + b*y + c = target)
-    using 3 control points (Cramer's Rule for 3x3 system).
-    """
-    x = [p['control']['x'] for p in pts]
-    y = [p['control']['y'] for p in pts]
-    lat = [p['target']['x'] for p in pts]
-    lon = [p['target']['y'] for p in pts]
-
-    def get_coeffs(targets):
-        # Matrix: [x1 y1 1], [x2 y2 1], [x3 y3 1]
-        det = (x[0] * (y[1] - y[2]) - y[0] * (x[1] - x[2]) + (x[1] * y[2] - x[2] * y[1]))
-        if abs(det) < 1e-10: return [0, 0, 0]
-        
-        a = ((y[1] - y[2]) * targets[0] - (y[0] - y[2]) * targets[1] + (y[0] - y[1]) * targets[2]) / det
-        b = (-(x[1] - x[2]) * targets[0] + (x[0] - x[2]) * targets[1] - (x[0] - x[1]) * targets[2]) / det
-        c = ((x[1] * y[2] - x[2] * y[1]) * targets[0] - (x[0] * y[2] - x[2] * y[0]) * targets[1] + (x[0] * y[1] - x[1] * y[0]) * targets[2]) / det
-        return a, b, c
+def release_driver(driver, headless=True):
+    """Return a driver from create_driver() to the pool (state and logs are reset)."""
+    get_pool(headless=headless, enable_network_logs=True).release(driver)
 
-    a, b, c = get_coeffs(lat)
-    d, e, f = get_coeffs(lon)
-    return (a, b, c), (d, e, f)
 
 def scrape_brookefields(url):
     """
@@ -82,7 +91,7 @@ def scrape_brookefields(url):
 
     print("Fetching global shop list for details...", flush=True)
     try:
-        r_shops = requests.get("https://brookefields.com/shops", headers=headers, timeout=15)
+        r_shops = http_client.get("https://brookefields.com/shops", headers=headers, timeout=15)
         # Extract name, shop number and phone
         matches = re.finditer(r'<h4>(.*?)</h4>.*?<p>Shop No: (.*?)</p>.*?<p>Phone: (.*?)</p>', r_shops.text, re.S)
         for m in matches:
@@ -97,7 +106,7 @@ def scrape_brookefields(url):
         floor_url = f"https://brookefields.com/mall-locator/{floor}"
         print(f"Processing {floor}...", flush=True)
         try:
-            r = requests.get(floor_url, headers=headers, timeout=15)
+            r = http_client.get(floor_url, headers=headers, timeout=15)
             # Extract the store mapping from the JS variable
             m = re.search(r'var arrStore = (\{.*?\});', r.text)
             if m:
@@ -274,10 +283,106 @@ def prepare_map_state(driver):
 
 
 
+def wait_for_map_render(driver, timeout=VISION_RENDER_TIMEOUT):
+    """
+    Wait until the page has loaded and a map surface (canvas, svg or map image) is
+    drawn, instead of a fixed sleep. Returns after `timeout` seconds at the latest.
+    """
+    try:
+        WebDriverWait(driver, timeout).until(
+            lambda d: d.execute_script("return document.readyState") == "complete"
+        )
+        WebDriverWait(driver, timeout).until(lambda d: d.execute_script("""
+            for (const el of document.querySelectorAll('canvas, svg, img')) {
+                const r = el.getBoundingClientRect();
+                if (r.width >= 300 && r.height >= 200) return true;
+            }
+            return false;
+        """))
+    except Exception:
+        print("  > Map surface not detected before timeout, capturing anyway", flush=True)
+    time.sleep(2)  # let tiles/labels finish drawing
+
+
+def find_floor_controls(driver):
+    """
+    Labels of the visible floor selector buttons/tabs (e.g. ["Level 1", "Level 2"]),
+    in page order. Read in one script call, so large directories stay fast.
+    """
+    try:
+        labels = driver.execute_script("""
+            const re = new RegExp(arguments[0], 'i');
+            const out = [];
+            for (const el of document.querySelectorAll('button, a, li, option, [role="tab"], [role="button"], [role="option"]')) {
+                const text = (el.innerText || el.textContent || '').trim().replace(/\\s+/g, ' ');
+                if (!text || text.length > 25 || !re.test(text) || out.includes(text)) continue;
+                const r = el.getBoundingClientRect();
+                if (el.tagName !== 'OPTION' && (r.width < 5 || r.height < 5)) continue;
+                out.push(text);
+            }
+            return out;
+        """, _FLOOR_LABEL_RE)
+        return list(labels or [])[:VISION_MAX_FLOORS]
+    except Exception as e:
+        print(f"  > Floor selector lookup failed: {e}", flush=True)
+        return []
+
+
+def select_floor(driver, label):
+    """Click the floor control whose text is `label` (select options are chosen). Returns True if found."""
+    try:
+        return bool(driver.execute_script("""
+            const label = arguments[0];
+            for (const el of document.querySelectorAll('button, a, li, option, [role="tab"], [role="button"], [role="option"]')) {
+                const text = (el.innerText || el.textContent || '').trim().replace(/\\s+/g, ' ');
+                if (text !== label) continue;
+                if (el.tagName === 'OPTION') {
+                    el.selected = true;
+                    el.parentElement.dispatchEvent(new Event('change', {bubbles: true}));
+                } else {
+                    el.scrollIntoView({block: 'center'});
+                    el.click();
+                }
+                return true;
+            }
+            return false;
+        """, label))
+    except Exception as e:
+        print(f"  > Could not switch to floor '{label}': {e}", flush=True)
+        return False
+
+
+def capture_floor_screenshots(driver):
+    """
+    Screenshot every floor of the map (switching floors through the page's floor
+    selector), or just the current view when there is no selector.
+    Returns [(floor_label or None, image_path)].
+    """
+    captures = []
+    floors = find_floor_controls(driver)
+    if len(floors) > 1:
+        print(f"Found {len(floors)} floors: {', '.join(floors)}", flush=True)
+        for label in floors:
+            if not select_floor(driver, label):
+                continue
+            time.sleep(VISION_FLOOR_SETTLE)
+            slug = "".join(c if c.isalnum() else "_" for c in label.lower())
+            path = os.path.join(os.getcwd(), f"map_capture_{slug}.png")
+            driver.save_screenshot(path)
+            print(f"Screenshot captured ({label}): {path}", flush=True)
+            captures.append((label, path))
+    if not captures:
+        path = os.path.join(os.getcwd(), "map_capture_temp.png")
+        driver.save_screenshot(path)
+        print(f"Screenshot captured: {path}", flush=True)
+        captures.append((None, path))
+    return captures
+
+
 # --- VISION-BASED SCRAPER ---
 def scrape_mall_with_vision(url):
     """
-    Captures a screenshot of the mall map and extracts tenant data using Vision LLM.
+    Captures screenshots of the mall map (one per floor) and extracts tenant data using Vision LLM.
     """
     print(f"Initializing Vision-Based Scraper for: {url}", flush=True)
     driver = create_driver(headless=True)
@@ -286,17 +391,16 @@ def scrape_mall_with_vision(url):
         return None
 
     try:
+        # Large viewport: the capture is tiled, so more pixels means more legible labels
+        driver.set_window_size(*VISION_WINDOW_SIZE)
         print(f"Navigating to target for vision capture...", flush=True)
         driver.get(url)
-        time.sleep(12) # generous wait for map render
+        wait_for_map_render(driver)
         
         # Robust Map Preparation (Cookies & Tabs)
         prepare_map_state(driver)
 
-        # Take full window screenshot
-        screenshot_path = os.path.join(os.getcwd(), "map_capture_temp.png")
-        driver.save_screenshot(screenshot_path)
-        print(f"Screenshot captured: {screenshot_path}", flush=True)
+        captures = capture_floor_screenshots(driver)
         
         # Dynamic import to avoid circular dependencies
         import sys
@@ -307,11 +411,10 @@ def scrape_mall_with_vision(url):
         from Mall_Ai_Dashboard.llm_engine import extract_shops_from_image_via_llm
         
         print("Analyzing map image with AI Vision...", flush=True)
-        data = extract_shops_from_image_via_llm(screenshot_path, url)
+        data = extract_shops_from_image_via_llm(captures, url)
         
         if data:
-            with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            tenant_store.save_tenants(url, data, source="vision")
             print(f"Vision Success: Extracted {len(data)} tenants.")
             return data
         return None
@@ -320,27 +423,13 @@ def scrape_mall_with_vision(url):
         print(f"Vision Scraper Error: {e}")
         return None
     finally:
-        try: driver.quit()
-        except: pass
+        release_driver(driver)
 
-def scrape_mall_data(url, use_vision=False):
+def capture_mappedin_credentials(url):
     """
-    Unified Scraper Entry Point with Robust Session Management and Verification Bypass.
+    Load the mall map in Chrome and intercept the Mappedin API token and venue slug
+    from its network traffic. Returns (token, venue), or None when either is missing.
     """
-    if use_vision:
-        return scrape_mall_with_vision(url)
-
-    # --- SITE-SPECIFIC SCRAPERS ---
-    if "brookefields.com" in url:
-        data = scrape_brookefields(url)
-        if data:
-            with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
-            print(f"\nSuccessfully saved {len(data)} tenants to {OUTPUT_FILE}")
-            return data
-        return None
-
-    # --- GENERIC SELENIUM SCRAPER (FALLBACK) ---
     print(f"Initializing Generic Selenium Scraper for: {url}", flush=True)
     print("This method will attempt to intercept map data (Mappedin) from network traffic.", flush=True)
     
@@ -493,10 +582,8 @@ def scrape_mall_data(url, use_vision=False):
                 if m: captured['venue'] = m.group(1)
             except: pass
             
-        print("Closing browser session...", flush=True)
-        try:
-            driver.quit()
-        except: pass
+        print("Releasing browser session...", flush=True)
+        release_driver(driver)
 
     if not captured['token']:
         print("Error: Could not capture Authorization token.", flush=True)
@@ -506,34 +593,54 @@ def scrape_mall_data(url, use_vision=False):
         print("Error: Could not determine Venue ID.", flush=True)
         return None
 
-    token, target = captured['token'], captured['venue']
+    return captured['token'], captured['venue']
+
+
+def fetch_mappedin_venue(token, target):
+    """
+    Fetch maps, locations and nodes of a Mappedin venue concurrently on the pooled client.
+    When the maps call fails for a bare slug, all three are retried with the "simon-" alias.
+
+    Returns (status, target, data): status is 200 with data = {"maps", "locations",
+    "nodes"} and the slug that answered, else the failing HTTP status (401/403 when the
+    token was rejected, 0 on a connection error) and data None.
+    """
     headers = {"Authorization": f"Bearer {token}"}
-    
+
+    def get_all(slug):
+        with ThreadPoolExecutor(max_workers=len(_MAPPEDIN_ENDPOINTS)) as pool:
+            futures = {
+                key: pool.submit(http_client.get, f"{MAPPEDIN_API_BASE}/{path.format(slug)}",
+                                 headers=headers, timeout=15)
+                for key, path in _MAPPEDIN_ENDPOINTS.items()
+            }
+            return {key: f.result() for key, f in futures.items()}
+
     print(f"Requesting data for: {target}...", flush=True)
     try:
-        r = requests.get(f"https://api-gateway.mappedin.com/public/1/map/{target}?fields=id,name,georeference,elevation,shortName", headers=headers, timeout=15)
-        
-        if r.status_code != 200 and "simon" not in target:
+        responses = get_all(target)
+        if responses["maps"].status_code != 200 and "simon" not in target:
             alt_target = f"simon-{target}"
             print(f"Retrying with Simon alias: {alt_target}")
-            r = requests.get(f"https://api-gateway.mappedin.com/public/1/map/{alt_target}?fields=id,name,georeference,elevation,shortName", headers=headers, timeout=15)
-            if r.status_code == 200: target = alt_target
-
-        if r.status_code != 200:
-            print(f"API Error: Received status {r.status_code} for venue {target}")
-            return None
-        
-        maps_res = r.json()
-        locs_res = requests.get(f"https://api-gateway.mappedin.com/public/1/location/{target}?fields=name,description,externalId,type,nodes,operationHours", headers=headers, timeout=15).json()
-        nodes_res = requests.get(f"https://api-gateway.mappedin.com/public/1/node/{target}?fields=id,x,y,map", headers=headers, timeout=15).json()
-        
+            alt_responses = get_all(alt_target)
+            if alt_responses["maps"].status_code == 200:
+                target, responses = alt_target, alt_responses
+
+        for key, r in responses.items():
+            if r.status_code != 200:
+                print(f"API Error: Received status {r.status_code} for venue {target} ({key})")
+                return r.status_code, target, None
+        return 200, target, {key: r.json() for key, r in responses.items()}
     except Exception as e:
         print(f"Connection error: {e}")
-        return None
+        return 0, target, None
+
 
+def build_mappedin_tenants(maps_res, locs_res, nodes_res):
+    """Turn Mappedin maps/locations/nodes into tenant dicts with floor, hours and lat/lon."""
     map_lookup = {m['id']: m for m in maps_res}
-    node_lookup = {n['id']: n for n in nodes_res}
-    transforms = {m_id: solve_affine(m['georeference'][:3]) for m_id, m in map_lookup.items() if 'georeference' in m and len(m['georeference']) >= 3}
+    # Least-squares fit per floor over all control points, every node projected at once
+    node_coords = georeference_nodes(maps_res, nodes_res)
 
     detailed_tenants = []
     print("\n--- PROCESSING TENANT DATA ---")
@@ -547,17 +654,14 @@ def scrape_mall_data(url, use_vision=False):
         if loc.get('nodes') and len(loc['nodes']) > 0:
             node_id = loc['nodes'][0]['node']
             map_id = loc['nodes'][0]['map']
-            node = node_lookup.get(node_id)
             map_obj = map_lookup.get(map_id)
             
             if map_obj:
                 elevation = map_obj.get('elevation', 0)
                 floor_name = map_obj.get('name', f"Level {int(elevation) if elevation else 1}")
 
-            if node and map_id in transforms:
-                (a, b, c), (d, e, f) = transforms[map_id]
-                lat = a * node['x'] + b * node['y'] + c
-                lon = d * node['x'] + e * node['y'] + f
+            if node_id in node_coords:
+                lat, lon = node_coords[node_id]
 
         tenant_data = {
             "name": name,
@@ -571,10 +675,50 @@ def scrape_mall_data(url, use_vision=False):
         detailed_tenants.append(tenant_data)
         print(f"Found: {name.ljust(35)} | Floor: {floor_name}")
 
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(detailed_tenants, f, indent=2)
+    return detailed_tenants
+
+
+def scrape_mall_data(url, use_vision=False):
+    """
+    Unified Scraper Entry Point with Robust Session Management and Verification Bypass.
+    """
+    if use_vision:
+        return scrape_mall_with_vision(url)
+
+    # --- SITE-SPECIFIC SCRAPERS ---
+    if "brookefields.com" in url:
+        data = scrape_brookefields(url)
+        if data:
+            tenant_store.save_tenants(url, data, source="brookefields")
+            print(f"\nSuccessfully saved {len(data)} tenants to {tenant_store.TENANT_STORE_PATH}")
+            return data
+        return None
+
+    # --- MAPPEDIN API (cached token, else captured from the map page) ---
+    data = None
+    cached = venue_cache.get_venue(url)
+    if cached:
+        token, target = cached
+        print(f"Using cached Mappedin token for venue {target} (skipping browser)", flush=True)
+        status, target, data = fetch_mappedin_venue(token, target)
+        if data is None and status in (401, 403):
+            print("Cached token was rejected, capturing a new one...", flush=True)
+            venue_cache.invalidate(url)
+
+    if data is None:
+        credentials = capture_mappedin_credentials(url)
+        if not credentials:
+            return None
+        token, target = credentials
+        status, target, data = fetch_mappedin_venue(token, target)
+        if data is None:
+            return None
+        venue_cache.put_venue(url, token, target)
+
+    detailed_tenants = build_mappedin_tenants(data["maps"], data["locations"], data["nodes"])
 
-    print(f"\nSuccessfully saved {len(detailed_tenants)} tenants to {OUTPUT_FILE}")
+    tenant_store.save_tenants(url, detailed_tenants, source="mappedin")
+    print(f"\nSuccessfully saved {len(detailed_tenants)} tenants to {tenant_store.TENANT_STORE_PATH}")
     return detailed_tenants
 
 def format_hours(hours_list):
@@ -0,0 +1,230 @@
+"""
+Per-venue store of scraped mall tenants with a spatial index.
+
+Every scrape (Mappedin API, Brookefields, vision) saves its tenants here under
+the mall's map URL, replacing only that venue's previous rows, so scraping a
+second mall no longer overwrites the first one's data. Latitude/longitude go
+into an SQLite R*Tree, which answers "tenants near a point" as an index range
+scan instead of a pass over every row:
+
+    import tenant_store
+
+    tenant_store.save_tenants(url, tenants, source="mappedin")
+    tenant_store.load_tenants(url)                     # all tenants, scrape order
+    tenant_store.load_tenants()                        # most recently saved venue
+    tenant_store.tenants_on_floor(url, "Level 2")
+    tenant_store.tenants_near(url, 39.16, -86.49, radius_m=40, floor="Level 1")
+
+Storage is a single SQLite file beside this module (TENANT_STORE_PATH). Fields
+other than the standard tenant columns (e.g. vision x/y) are kept as JSON.
+"""
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from venue_cache import mall_key
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+TENANT_STORE_PATH = os.getenv("TENANT_STORE_PATH", os.path.join(BASE_DIR, "tenant_store.sqlite"))
+
+COLUMNS = ("name", "description", "location_id", "floor", "hours", "latitude", "longitude")
+
+# Metres per degree of latitude (and of longitude at the equator)
+_M_PER_DEG = 111_320.0
+
+_lock = threading.Lock()
+_initialized = False
+_rtree = True
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized, _rtree
+    conn = sqlite3.connect(TENANT_STORE_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if not _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS venues ("
+            " venue TEXT PRIMARY KEY,"
+            " source_url TEXT NOT NULL,"
+            " source TEXT,"
+            " tenant_count INTEGER NOT NULL,"
+            " saved_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS tenants ("
+            " id INTEGER PRIMARY KEY,"
+            " venue TEXT NOT NULL,"
+            " position INTEGER NOT NULL,"
+            " name TEXT, description TEXT, location_id TEXT, floor TEXT, hours TEXT,"
+            " latitude REAL, longitude REAL, extra TEXT)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS tenants_venue_floor ON tenants (venue, floor COLLATE NOCASE)")
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS tenant_points"
+                " USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+            )
+        except sqlite3.OperationalError:
+            # SQLite built without R*Tree: fall back to a plain index on latitude
+            _rtree = False
+            conn.execute("CREATE INDEX IF NOT EXISTS tenants_venue_lat ON tenants (venue, latitude)")
+        conn.commit()
+        _initialized = True
+    return conn
+
+
+def _to_dict(row: sqlite3.Row) -> Dict:
+    tenant = {c: row[c] for c in COLUMNS}
+    if row["extra"]:
+        tenant.update(json.loads(row["extra"]))
+    return tenant
+
+
+def _coord(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def save_tenants(url: str, tenants: List[Dict], source: str = "") -> None:
+    """Replace the stored tenants of the venue at `url` with `tenants`."""
+    venue = mall_key(url)
+    rows = []
+    for position, t in enumerate(tenants):
+        extra = {k: v for k, v in t.items() if k not in COLUMNS}
+        rows.append((
+            venue, position,
+            *(None if t.get(c) is None else str(t.get(c)) for c in COLUMNS[:5]),
+            _coord(t.get("latitude")), _coord(t.get("longitude")),
+            json.dumps(extra, ensure_ascii=False, default=str) if extra else None,
+        ))
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                if _rtree:
+                    conn.execute(
+                        "DELETE FROM tenant_points WHERE id IN (SELECT id FROM tenants WHERE venue = ?)",
+                        (venue,),
+                    )
+                conn.execute("DELETE FROM tenants WHERE venue = ?", (venue,))
+                conn.executemany(
+                    "INSERT INTO tenants (venue, position, name, description, location_id, floor, hours,"
+                    " latitude, longitude, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                if _rtree:
+                    conn.execute(
+                        "INSERT INTO tenant_points (id, min_lat, max_lat, min_lon, max_lon)"
+                        " SELECT id, latitude, latitude, longitude, longitude FROM tenants"
+                        " WHERE venue = ? AND latitude IS NOT NULL AND longitude IS NOT NULL",
+                        (venue,),
+                    )
+                conn.execute(
+                    "INSERT INTO venues (venue, source_url, source, tenant_count, saved_at) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (venue) DO UPDATE SET source_url = excluded.source_url,"
+                    " source = excluded.source, tenant_count = excluded.tenant_count, saved_at = excluded.saved_at",
+                    (venue, url, source, len(rows), time.time()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: tenant store update failed: {e}")
+
+
+def list_venues() -> List[Dict]:
+    """Stored venues, most recently saved first (venue, source_url, source, tenant_count, saved_at)."""
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                return [dict(r) for r in conn.execute("SELECT * FROM venues ORDER BY saved_at DESC")]
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: tenant store read failed: {e}")
+        return []
+
+
+def _query(sql: str, params: tuple) -> List[sqlite3.Row]:
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                return conn.execute(sql, params).fetchall()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: tenant store read failed: {e}")
+        return []
+
+
+def load_tenants(url: Optional[str] = None) -> List[Dict]:
+    """Tenants of the venue at `url` in scrape order (of the most recently saved venue when `url` is None)."""
+    if url:
+        venue = mall_key(url)
+    else:
+        venues = list_venues()
+        if not venues:
+            return []
+        venue = venues[0]["venue"]
+    return [_to_dict(r) for r in _query("SELECT * FROM tenants WHERE venue = ? ORDER BY position", (venue,))]
+
+
+def tenants_on_floor(url: str, floor: str) -> List[Dict]:
+    """Tenants of the venue at `url` on `floor` (case-insensitive), in scrape order."""
+    rows = _query(
+        "SELECT * FROM tenants WHERE venue = ? AND floor = ? COLLATE NOCASE ORDER BY position",
+        (mall_key(url), floor),
+    )
+    return [_to_dict(r) for r in rows]
+
+
+def distance_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in metres."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((p2 - p1) / 2) ** 2
+         + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * 6_371_000 * math.asin(math.sqrt(min(1.0, a)))
+
+
+def tenants_near(
+    url: str,
+    latitude: float,
+    longitude: float,
+    radius_m: float = 50.0,
+    floor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[Dict]:
+    """Tenants of the venue at `url` within `radius_m` of a point, nearest first, with a distance_m field."""
+    dlat = radius_m / _M_PER_DEG
+    dlon = radius_m / (_M_PER_DEG * max(math.cos(math.radians(latitude)), 1e-6))
+    params = [mall_key(url), latitude - dlat, latitude + dlat, longitude - dlon, longitude + dlon]
+    if _rtree:
+        sql = ("SELECT t.* FROM tenant_points p JOIN tenants t ON t.id = p.id"
+               " WHERE t.venue = ? AND p.max_lat >= ? AND p.min_lat <= ? AND p.max_lon >= ? AND p.min_lon <= ?")
+    else:
+        sql = ("SELECT * FROM tenants t WHERE t.venue = ? AND t.latitude BETWEEN ? AND ?"
+               " AND t.longitude BETWEEN ? AND ?")
+    if floor:
+        sql += " AND t.floor = ? COLLATE NOCASE"
+        params.append(floor)
+
+    found = []
+    for row in _query(sql, tuple(params)):
+        dist = distance_m(latitude, longitude, row["latitude"], row["longitude"])
+        if dist <= radius_m:
+            tenant = _to_dict(row)
+            tenant["distance_m"] = round(dist, 1)
+            found.append(tenant)
+    found.sort(key=lambda t: t["distance_m"])
+    return found[:limit] if limit else found
@@ -0,0 +1,115 @@
+"""
+Cache of Mappedin API credentials (bearer token + venue slug) per mall map URL.
+
+Capturing the token means loading the mall's map page in Chrome, getting past
+its bot check and polling the performance log until the map SDK calls the
+Mappedin API – tens of seconds to two minutes. The token stays valid much
+longer than that, so scrape_mall_data() stores what it captured here and the
+next scrape of the same mall goes straight to the API. When the API rejects a
+cached token (401/403) the entry is invalidated and the browser capture runs
+again.
+
+Storage is a single SQLite file beside this module (MAPPEDIN_CACHE_PATH).
+Entries older than MAPPEDIN_CACHE_TTL_HOURS are ignored; set
+MAPPEDIN_CACHE_ENABLED=0 to always capture a fresh token.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+from urllib.parse import urlparse, urlunparse
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MAPPEDIN_CACHE_ENABLED = os.getenv("MAPPEDIN_CACHE_ENABLED", "1").strip().lower() not in ("0", "false", "no", "off")
+MAPPEDIN_CACHE_PATH = os.getenv("MAPPEDIN_CACHE_PATH", os.path.join(BASE_DIR, "mappedin_cache.sqlite"))
+MAPPEDIN_CACHE_TTL_HOURS = float(os.getenv("MAPPEDIN_CACHE_TTL_HOURS", "168"))
+
+_lock = threading.Lock()
+_initialized = False
+
+
+def mall_key(url: str) -> str:
+    """Cache key of a mall map URL: lowercase host without www., path without trailing slash, no query/fragment."""
+    parsed = urlparse((url or "").strip())
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return urlunparse(("https", host, parsed.path.rstrip("/"), "", "", ""))
+
+
+def _connect() -> sqlite3.Connection:
+    global _initialized
+    conn = sqlite3.connect(MAPPEDIN_CACHE_PATH, timeout=30)
+    if not _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS venues ("
+            " mall_key TEXT PRIMARY KEY,"
+            " token TEXT NOT NULL,"
+            " venue TEXT NOT NULL,"
+            " saved_at REAL NOT NULL)"
+        )
+        conn.commit()
+        _initialized = True
+    return conn
+
+
+def get_venue(url: str) -> Optional[Tuple[str, str]]:
+    """(token, venue) stored for `url`, or None when missing, expired, disabled or unreadable."""
+    if not MAPPEDIN_CACHE_ENABLED:
+        return None
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                row = conn.execute(
+                    "SELECT token, venue, saved_at FROM venues WHERE mall_key = ?",
+                    (mall_key(url),),
+                ).fetchone()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: Mappedin cache read failed: {e}")
+        return None
+    if not row or time.time() - row[2] > MAPPEDIN_CACHE_TTL_HOURS * 3600:
+        return None
+    return row[0], row[1]
+
+
+def put_venue(url: str, token: str, venue: str) -> None:
+    """Remember the token and (resolved) venue slug that worked for `url`."""
+    if not MAPPEDIN_CACHE_ENABLED or not token or not venue:
+        return
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.execute(
+                    "INSERT INTO venues (mall_key, token, venue, saved_at) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT (mall_key) DO UPDATE SET"
+                    " token = excluded.token, venue = excluded.venue, saved_at = excluded.saved_at",
+                    (mall_key(url), token, venue, time.time()),
+                )
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: Mappedin cache update failed: {e}")
+
+
+def invalidate(url: str) -> None:
+    """Forget the entry for `url` (its token was rejected by the API)."""
+    if not MAPPEDIN_CACHE_ENABLED:
+        return
+    try:
+        with _lock:
+            conn = _connect()
+            try:
+                conn.execute("DELETE FROM venues WHERE mall_key = ?", (mall_key(url),))
+                conn.commit()
+            finally:
+                conn.close()
+    except sqlite3.Error as e:
+        print(f"Warning: Mappedin cache update failed: {e}")
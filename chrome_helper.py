@@ -2,14 +2,17 @@
 chrome_helper.py – Shared Chrome/Selenium setup for all scrapers.
 
 Usage:
-    from chrome_helper import make_chrome_driver
+    from chrome_helper import make_chrome_driver, scroll_until_stable
 
     driver = make_chrome_driver()
+    driver.get(url)
+    scroll_until_stable(driver)   # lazy-load everything, exits as soon as the page is quiet
     # ... do scraping ...
     driver.quit()
 """
 import os
 import shutil
+import time
 from typing import Optional
 
 from selenium import webdriver
@@ -45,13 +48,30 @@ def _find_chromedriver() -> Optional[str]:
     return shutil.which("chromedriver")
 
 
+def new_user_data_dir() -> str:
+    """
+    Return a fresh, unique Chrome user-data directory path (not yet created).
+
+    Uses the persistent /data volume when it is writable (Railway), else /tmp.
+    """
+    import uuid
+    instance_id = str(uuid.uuid4())[:8]
+    if os.path.exists("/data") and os.access("/data", os.W_OK):
+        return f"/data/chrome-user-data-{instance_id}"
+    return f"/tmp/chrome-user-data-{instance_id}"
+
+
 def make_chrome_options(
     headless: bool = True,
     user_agent: Optional[str] = None,
     enable_network_logs: bool = False,
+    user_data_dir: Optional[str] = None,
 ) -> Options:
     """
     Build Chrome/Chromium options that work in Docker/Railway containers and locally.
+
+    If `user_data_dir` is given it is used as-is (the caller owns its cleanup);
+    otherwise CHROME_USER_DATA_DIR or a fresh per-instance directory is used.
     """
     opts = Options()
 
@@ -78,16 +98,9 @@ def make_chrome_options(
     # In Railway, we prefer a persistent volume if available (usually /data)
     # However, if multiple Chrome instances share the same user-data-dir, they will crash.
     # We use a subfolder per process/thread if many are running.
-    import uuid
-    instance_id = str(uuid.uuid4())[:8]
-    
-    default_user_data = f"/tmp/chrome-user-data-{instance_id}"
-    if os.path.exists("/data") and os.access("/data", os.W_OK):
-        # Even with persistent /data, we use a unique subfolder to avoid lock errors
-        # if multiple scrapers run at the exact same time.
-        default_user_data = f"/data/chrome-user-data-{instance_id}"
-        
-    chrome_user_data = os.environ.get("CHROME_USER_DATA_DIR", default_user_data)
+    # Even with persistent /data, we use a unique subfolder to avoid lock errors
+    # if multiple scrapers run at the exact same time.
+    chrome_user_data = user_data_dir or os.environ.get("CHROME_USER_DATA_DIR", new_user_data_dir())
     os.makedirs(chrome_user_data, exist_ok=True)
     opts.add_argument(f"--user-data-dir={chrome_user_data}")
 
@@ -116,6 +129,7 @@ def make_chrome_driver(
     headless: bool = True,
     user_agent: Optional[str] = None,
     enable_network_logs: bool = False,
+    user_data_dir: Optional[str] = None,
 ) -> webdriver.Chrome:
     """
     Create a Chrome/Chromium WebDriver that works in Docker/Railway and locally.
@@ -123,11 +137,14 @@ def make_chrome_driver(
     Prefers the system-installed chromedriver (guaranteed version-match when
     chromium + chromium-driver are installed from the same apt repo).
     Falls back to selenium-manager auto-download for local development.
+    For long-running callers prefer chrome_pool.lease_driver(), which reuses
+    warm drivers instead of starting a new Chromium per page.
     """
     opts = make_chrome_options(
         headless=headless,
         user_agent=user_agent,
         enable_network_logs=enable_network_logs,
+        user_data_dir=user_data_dir,
     )
 
     chromedriver_path = _find_chromedriver()
@@ -159,3 +176,127 @@ def make_chrome_driver(
     driver.implicitly_wait(5)
 
     return driver
+
+
+# ---------------------------------------------------------------------------
+# Page-settle detection (replaces fixed time.sleep() waits while scrolling)
+# ---------------------------------------------------------------------------
+
+# Installs (once per document) a MutationObserver, a scroll listener and
+# fetch/XHR wrappers that record the time of the last DOM/network activity,
+# then returns a snapshot of the page state. arguments[0] = ms after which an
+# in-flight request is considered stuck (long-polling, analytics beacons).
+_SETTLE_JS = """
+var staleMs = arguments[0];
+var s = window.__pageSettle;
+if (!s) {
+    s = window.__pageSettle = {inflight: {}, seq: 0, last: Date.now()};
+    var touch = function () { s.last = Date.now(); };
+    var begin = function () { var id = ++s.seq; s.inflight[id] = Date.now(); touch(); return id; };
+    var end = function (id) { delete s.inflight[id]; touch(); };
+    try {
+        new MutationObserver(touch).observe(document.documentElement,
+            {childList: true, subtree: true, characterData: true});
+    } catch (e) {}
+    window.addEventListener('scroll', touch, {passive: true});
+    if (window.fetch) {
+        var origFetch = window.fetch;
+        window.fetch = function () {
+            var id = begin();
+            var p = origFetch.apply(this, arguments);
+            p.then(function () { end(id); }, function () { end(id); });
+            return p;
+        };
+    }
+    if (window.XMLHttpRequest) {
+        var origSend = XMLHttpRequest.prototype.send;
+        XMLHttpRequest.prototype.send = function () {
+            var id = begin();
+            this.addEventListener('loadend', function () { end(id); });
+            return origSend.apply(this, arguments);
+        };
+    }
+}
+var now = Date.now(), pending = 0;
+for (var k in s.inflight) { if (now - s.inflight[k] < staleMs) pending++; }
+return {
+    pending: pending,
+    idle_ms: now - s.last,
+    nodes: document.getElementsByTagName('*').length,
+    height: document.body ? document.body.scrollHeight : 0,
+    ready: document.readyState
+};
+"""
+
+
+def page_settle_state(driver, stale_request_ms: int = 8000) -> dict:
+    """Return {'pending', 'idle_ms', 'nodes', 'height', 'ready'} for the current page."""
+    return driver.execute_script(_SETTLE_JS, stale_request_ms) or {}
+
+
+def wait_for_page_settle(
+    driver,
+    quiet_ms: int = 800,
+    timeout: float = 10.0,
+    poll_interval: float = 0.2,
+    stale_request_ms: int = 8000,
+) -> bool:
+    """
+    Wait until the page is quiescent: document loaded, no fetch/XHR in flight and
+    no DOM mutation or scroll for `quiet_ms`. Returns True when settled, False if
+    `timeout` seconds passed first (the caller just continues in that case).
+    """
+    deadline = time.time() + timeout
+    while True:
+        try:
+            state = page_settle_state(driver, stale_request_ms)
+        except Exception:
+            state = {}
+        if (
+            state.get("ready") == "complete"
+            and state.get("pending", 1) == 0
+            and state.get("idle_ms", 0) >= quiet_ms
+        ):
+            return True
+        if time.time() >= deadline:
+            return False
+        time.sleep(poll_interval)
+
+
+def scroll_until_stable(
+    driver,
+    max_scrolls: int = 30,
+    stable_rounds: int = 2,
+    quiet_ms: int = 800,
+    step_timeout: float = 6.0,
+    total_timeout: float = 90.0,
+) -> int:
+    """
+    Scroll to the bottom repeatedly until lazy loading stops.
+
+    After each scroll we wait for the page to settle (early exit as soon as it is
+    quiet, `step_timeout` at most) and compare scrollHeight and element count with
+    the previous round; `stable_rounds` unchanged rounds in a row end the loop.
+    Returns the number of scrolls performed.
+    """
+    deadline = time.time() + total_timeout
+    last = None
+    stable = 0
+    scrolls = 0
+    while scrolls < max_scrolls and time.time() < deadline:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        scrolls += 1
+        wait_for_page_settle(driver, quiet_ms=quiet_ms, timeout=min(step_timeout, max(0.0, deadline - time.time())))
+        try:
+            state = page_settle_state(driver)
+            current = (state.get("height"), state.get("nodes"))
+        except Exception:
+            break
+        if current == last:
+            stable += 1
+            if stable >= stable_rounds:
+                break
+        else:
+            stable = 0
+            last = current
+    return scrolls
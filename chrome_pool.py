@@ -0,0 +1,424 @@
+"""
+chrome_pool.py – Pool of warm, reusable Chrome drivers built on chrome_helper.
+
+Starting Chromium costs several seconds and a fresh user-data directory per
+driver. The pool keeps drivers alive between scrapes, resets their state
+(cookies, storage, extra tabs, buffered network logs) on every return, and
+recycles a driver after a number of page loads or when its process tree grows
+past an RSS limit. User-data directories created by the pool are deleted when
+the driver that used them is retired.
+
+Usage:
+    from chrome_pool import lease_driver
+
+    with lease_driver(headless=True) as driver:
+        driver.get(url)
+        html = driver.page_source
+
+    # Or, when a context manager does not fit the surrounding try/finally:
+    driver = acquire_for(headless=True, user_agent=DESKTOP_USER_AGENT)
+    try:
+        ...
+    finally:
+        release_driver(driver)
+
+Configuration (environment):
+    CHROME_POOL_SIZE        max drivers alive per pool (default min(4, CPU count))
+    CHROME_POOL_MAX_PAGES   page loads before a driver is recycled (default 50)
+    CHROME_POOL_MAX_RSS_MB  RSS of driver + browser processes before recycling
+                            (default 1500, 0 disables the check)
+"""
+import atexit
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from selenium import webdriver
+
+from chrome_helper import make_chrome_driver, new_user_data_dir
+
+DEFAULT_POOL_SIZE = int(os.getenv("CHROME_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+DEFAULT_MAX_PAGES = int(os.getenv("CHROME_POOL_MAX_PAGES", "50"))
+DEFAULT_MAX_RSS_MB = float(os.getenv("CHROME_POOL_MAX_RSS_MB", "1500"))
+
+# Desktop Chrome user agent the social-media scrapers browse with
+DESKTOP_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/131.0.0.0 Safari/537.36"
+)
+
+
+def _process_tree_rss_mb(root_pid: int) -> Optional[float]:
+    """Return the summed RSS (MB) of `root_pid` and all its descendants, or None if unknown."""
+    try:
+        import psutil
+        try:
+            root = psutil.Process(root_pid)
+            procs = [root] + root.children(recursive=True)
+            total = 0
+            for p in procs:
+                try:
+                    total += p.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total / (1024 * 1024)
+        except psutil.Error:
+            return None
+    except ImportError:
+        pass
+
+    # Linux fallback without psutil: walk /proc for the parent/child tree
+    if not os.path.isdir("/proc"):
+        return None
+    children: Dict[int, List[int]] = {}
+    rss_kb: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        pid = int(entry)
+        try:
+            with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+                ppid, rss = None, 0
+                for line in f:
+                    if line.startswith("PPid:"):
+                        ppid = int(line.split()[1])
+                    elif line.startswith("VmRSS:"):
+                        rss = int(line.split()[1])
+            if ppid is not None:
+                children.setdefault(ppid, []).append(pid)
+            rss_kb[pid] = rss
+        except (OSError, ValueError):
+            continue
+    if root_pid not in rss_kb:
+        return None
+    total_kb = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total_kb += rss_kb.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total_kb / 1024
+
+
+class _PooledDriver:
+    """Book-keeping for one driver owned by the pool."""
+
+    def __init__(self, driver: webdriver.Chrome, user_data_dir: str):
+        self.driver = driver
+        self.user_data_dir = user_data_dir
+        self.pages = 0
+        self.leases = 0
+        self.created_at = time.time()
+
+
+class ChromeDriverPool:
+    """
+    Bounded pool of Chrome drivers sharing one set of launch options.
+
+    At most `size` drivers exist at once; `acquire()` blocks (up to `timeout`)
+    when all of them are leased, so the pool doubles as a cap on concurrent
+    browsers.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULT_POOL_SIZE,
+        headless: bool = True,
+        user_agent: Optional[str] = None,
+        enable_network_logs: bool = False,
+        max_pages: int = DEFAULT_MAX_PAGES,
+        max_rss_mb: float = DEFAULT_MAX_RSS_MB,
+    ):
+        self.size = max(1, int(size))
+        self.headless = headless
+        self.user_agent = user_agent
+        self.enable_network_logs = enable_network_logs
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle: List[_PooledDriver] = []
+        self._leased: Dict[int, _PooledDriver] = {}
+        self._closed = False
+        self.stats = {"created": 0, "reused": 0, "recycled": 0, "unhealthy": 0}
+
+    # ---------- driver lifecycle ----------
+
+    def _create(self) -> _PooledDriver:
+        user_data_dir = new_user_data_dir()
+        try:
+            driver = make_chrome_driver(
+                headless=self.headless,
+                user_agent=self.user_agent,
+                enable_network_logs=self.enable_network_logs,
+                user_data_dir=user_data_dir,
+            )
+        except Exception:
+            shutil.rmtree(user_data_dir, ignore_errors=True)
+            raise
+        entry = _PooledDriver(driver, user_data_dir)
+
+        # Count page loads so the driver can be recycled after max_pages
+        original_get = driver.get
+
+        def counting_get(url):
+            entry.pages += 1
+            return original_get(url)
+
+        driver.get = counting_get
+        with self._lock:
+            self.stats["created"] += 1
+        return entry
+
+    def _retire(self, entry: _PooledDriver) -> None:
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+        shutil.rmtree(entry.user_data_dir, ignore_errors=True)
+
+    def _is_healthy(self, entry: _PooledDriver) -> bool:
+        try:
+            entry.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _needs_recycle(self, entry: _PooledDriver) -> bool:
+        if self.max_pages and entry.pages >= self.max_pages:
+            return True
+        if self.max_rss_mb:
+            try:
+                pid = entry.driver.service.process.pid
+            except Exception:
+                return False
+            rss = _process_tree_rss_mb(pid)
+            if rss is not None and rss >= self.max_rss_mb:
+                print(f"[INFO] Recycling Chrome driver: RSS {rss:.0f} MB >= {self.max_rss_mb:.0f} MB")
+                return True
+        return False
+
+    def _reset(self, entry: _PooledDriver) -> None:
+        """Clear cookies, storage, extra tabs and buffered logs so the next lease starts clean."""
+        driver = entry.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        try:
+            driver.execute_script(
+                "try { window.localStorage.clear(); } catch (e) {}"
+                "try { window.sessionStorage.clear(); } catch (e) {}"
+            )
+        except Exception:
+            pass
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        except Exception:
+            driver.delete_all_cookies()
+        if self.enable_network_logs:
+            try:
+                driver.get_log("performance")  # drain so the next lease doesn't see stale requests
+            except Exception:
+                pass
+        driver.execute_script("window.location.replace('about:blank');")
+
+    # ---------- public API ----------
+
+    def warm(self, count: Optional[int] = None) -> int:
+        """Start up to `count` (default: pool size) idle drivers ahead of time. Returns how many were started."""
+        target = self.size if count is None else min(count, self.size)
+        started = 0
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) + len(self._leased) >= target:
+                    return started
+            entry = self._create()
+            with self._lock:
+                self._idle.append(entry)
+            started += 1
+
+    def acquire(self, timeout: Optional[float] = None) -> webdriver.Chrome:
+        """Lease a healthy driver, starting a new one if none is idle."""
+        if self._closed:
+            raise RuntimeError("ChromeDriverPool is closed")
+        acquired = self._slots.acquire() if timeout is None else self._slots.acquire(timeout=timeout)
+        if not acquired:
+            raise TimeoutError(f"No Chrome driver available within {timeout}s (pool size {self.size})")
+        try:
+            while True:
+                with self._lock:
+                    entry = self._idle.pop() if self._idle else None
+                if entry is None:
+                    entry = self._create()
+                elif not self._is_healthy(entry):
+                    with self._lock:
+                        self.stats["unhealthy"] += 1
+                    self._retire(entry)
+                    continue
+                else:
+                    with self._lock:
+                        self.stats["reused"] += 1
+                entry.leases += 1
+                with self._lock:
+                    self._leased[id(entry.driver)] = entry
+                return entry.driver
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver: Optional[webdriver.Chrome], discard: bool = False) -> None:
+        """
+        Return a leased driver to the pool.
+
+        The driver is retired instead of reused when `discard` is set, when it
+        fails its health check or state reset, or when it has reached the
+        page-count / RSS recycling limits.
+        """
+        if driver is None:
+            return
+        with self._lock:
+            entry = self._leased.pop(id(driver), None)
+        if entry is None:
+            # Not ours (e.g. created directly via make_chrome_driver)
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            return
+        try:
+            keep = not discard and not self._closed and self._is_healthy(entry)
+            if keep and self._needs_recycle(entry):
+                with self._lock:
+                    self.stats["recycled"] += 1
+                keep = False
+            if keep:
+                try:
+                    self._reset(entry)
+                except Exception as e:
+                    print(f"[WARN] Could not reset pooled Chrome driver, retiring it: {e}")
+                    keep = False
+            if keep:
+                with self._lock:
+                    self._idle.append(entry)
+            else:
+                self._retire(entry)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """Context manager around acquire()/release()."""
+        driver = self.acquire(timeout=timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def close(self) -> None:
+        """Quit all idle drivers and refuse new leases. Leased drivers are retired on release."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            self._retire(entry)
+
+
+# ---------- shared pools ----------
+
+_pools: Dict[Tuple[bool, Optional[str], bool], ChromeDriverPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(
+    headless: bool = True,
+    user_agent: Optional[str] = None,
+    enable_network_logs: bool = False,
+) -> ChromeDriverPool:
+    """Return the process-wide pool for this combination of launch options."""
+    key = (headless, user_agent, enable_network_logs)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = ChromeDriverPool(
+                headless=headless,
+                user_agent=user_agent,
+                enable_network_logs=enable_network_logs,
+            )
+            _pools[key] = pool
+        return pool
+
+
+@contextmanager
+def lease_driver(
+    headless: bool = True,
+    user_agent: Optional[str] = None,
+    enable_network_logs: bool = False,
+    timeout: Optional[float] = None,
+):
+    """Lease a driver from the shared pool for these options."""
+    with get_pool(headless, user_agent, enable_network_logs).lease(timeout=timeout) as driver:
+        yield driver
+
+
+def acquire_for(
+    headless: bool = True,
+    user_agent: Optional[str] = None,
+    enable_network_logs: bool = False,
+    timeout: Optional[float] = None,
+    retries: int = 3,
+) -> webdriver.Chrome:
+    """
+    Lease a driver from the shared pool for these options, retrying when Chrome fails to start.
+
+    Waiting for a free slot is not retried: a TimeoutError from `timeout` is raised
+    as is. Return the driver with release_driver().
+    """
+    pool = get_pool(headless, user_agent, enable_network_logs)
+    for attempt in range(retries):
+        try:
+            return pool.acquire(timeout=timeout)
+        except TimeoutError:
+            raise
+        except Exception as e:
+            if attempt < retries - 1:
+                print(f"[WARN] Chrome driver creation failed (attempt {attempt + 1}/{retries}): {e}. Retrying...")
+                time.sleep(2)
+            else:
+                raise RuntimeError(f"Failed to create Chrome driver after {retries} attempts: {e}") from e
+
+
+def release_driver(driver: Optional[webdriver.Chrome], discard: bool = False) -> None:
+    """Return `driver` to whichever shared pool leased it (quits it if no pool owns it)."""
+    if driver is None:
+        return
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        with pool._lock:
+            owned = id(driver) in pool._leased
+        if owned:
+            pool.release(driver, discard=discard)
+            return
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+def shutdown_pools() -> None:
+    """Quit every pooled driver and delete their user-data directories."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+atexit.register(shutdown_pools)
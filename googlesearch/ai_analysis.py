@@ -6,11 +6,21 @@ AI-based analysis of extracted text using OpenAI or Gemini API.
 """
 
 import json
+import os
 import re
+import sys
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from config import OPENAI_API_KEY, OPENAI_MODEL, GEMINI_API_KEY, GEMINI_MODEL, MAX_TEXT_CHUNK_FOR_AI
+from config import (
+    OPENAI_API_KEY, OPENAI_MODEL, GEMINI_API_KEY, GEMINI_MODEL, AI_TEXT_TOKEN_BUDGET,
+    AI_PREFILTER, AI_BATCH_SIZE, AI_BATCH_TOKEN_BUDGET,
+)
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+from text_compact import compact_text, count_tokens, describe_stats
 
 # Current date for prompts (ensures AI focuses on live/upcoming data, not past)
 CURRENT_DATE_STR = datetime.now().strftime("%B %d, %Y")  # e.g. "February 03, 2026"
@@ -80,12 +90,9 @@ Text:
 
 JSON array:"""
 
-# Combined extraction: store openings + vacated tenants + temporary events + latest mall updates
-PROMPT_EXTRACT_COMBINED = """You are extracting retail intelligence from web content about a mall or shopping center.
-
-From the text below, extract FOUR things:
-
-1) store_openings: Array of UPCOMING or PLANNED new store openings (new tenants coming, new shop opening). Each object: mall_name, brand_name, expected_opening, location_context, confidence. Use "Unknown" for missing fields. If none, use [].
+# Field definitions of the combined extraction (store openings, vacated tenants, temporary events,
+# latest mall updates), shared by the single-page and batched prompts. Format with current_date/current_year.
+_COMBINED_FIELDS_SPEC = """1) store_openings: Array of UPCOMING or PLANNED new store openings (new tenants coming, new shop opening). Each object: mall_name, brand_name, expected_opening, location_context, confidence. Use "Unknown" for missing fields. If none, use [].
 
 2) vacated_tenants: Array of stores that have CLOSED, VACATED, or are LEAVING the mall. Each object: mall_name, brand_name, closed_date (e.g. "January 2026", "Closed", "Unknown"), notes (brief reason or context if mentioned). Use "Unknown" for missing fields. If none, use [].
 
@@ -102,7 +109,14 @@ From the text below, extract FOUR things:
 
 Extract ALL of: new tenants/coming soon, vacated/closed tenants, temporary events, and general latest updates. For latest_updates show each piece of information only when present in the text; omit fields with no info (use "").
 
-IMPORTANT: Today is {current_date}. Include ONLY entries with dates in {current_year} or later (e.g. 2025, 2026). EXCLUDE any openings, events, or closures from 2023, 2024, or earlier—that data is outdated.
+IMPORTANT: Today is {current_date}. Include ONLY entries with dates in {current_year} or later (e.g. 2025, 2026). EXCLUDE any openings, events, or closures from 2023, 2024, or earlier—that data is outdated."""
+
+# Combined extraction: store openings + vacated tenants + temporary events + latest mall updates
+PROMPT_EXTRACT_COMBINED = """You are extracting retail intelligence from web content about a mall or shopping center.
+
+From the text below, extract FOUR things:
+
+{spec}
 
 Return ONLY a single valid JSON object, no other text. Example:
 {{"store_openings":[{{"mall_name":"Phoenix Mall","brand_name":"Zara","expected_opening":"March 2026","location_context":"Level 2","confidence":"High"}}],"vacated_tenants":[{{"mall_name":"Midland Park Mall","brand_name":"Sears","closed_date":"2024","notes":"Anchor closed"}}],"temporary_events":[{{"mall_name":"Midland Park Mall","event_name":"Venardos Circus Far Beyond","date_or_range":"March 12–22, 2026","description":"Animal-free circus in parking lot","event_type":"circus"}}],"latest_updates":{{"mall_name":"Midland Park Mall","address":"4511 N. Midkiff Drive, Texas","hours_weather":"Early closures in late January 2026","events":"","key_updates":"Over 90 stores, food court","stores_mentioned":[{{"store_name":"Dillard's","why_mentioned":"Anchor department store operating"}}],"accessibility":"Wheelchair-accessible entrances"}}}}
@@ -115,6 +129,56 @@ Text:
 JSON object:"""
 
 
+# Batched combined extraction: several short pages (tagged with source ids) in one call
+
+PROMPT_EXTRACT_BATCH = """You are extracting retail intelligence from several web pages about malls or shopping centers. Each page below starts with a source id such as [S1].
+
+For EACH source return one object with:
+- "id": the source id
+- "relevant": true if that page contains information about an UPCOMING or PLANNED retail store opening in a mall or shopping center (new store announcements, "coming soon", "opening soon", planned openings, mall tenant news, brand expansion in malls); false for store closures only, general mall news with no specific new store, or unrelated retail news
+- "store_openings", "vacated_tenants", "temporary_events", "latest_updates": as defined below, taken ONLY from that source's text. Never mix information between sources.
+
+{spec}
+
+Return ONLY a single valid JSON object with one entry per source, no other text. Example:
+{{"sources":[{{"id":"S1","relevant":true,"store_openings":[{{"mall_name":"Phoenix Mall","brand_name":"Zara","expected_opening":"March 2026","location_context":"Level 2","confidence":"High"}}],"vacated_tenants":[],"temporary_events":[],"latest_updates":{{"mall_name":"Phoenix Mall","address":"","hours_weather":"","events":"","key_updates":"","stores_mentioned":[],"accessibility":""}}}},{{"id":"S2","relevant":false,"store_openings":[],"vacated_tenants":[],"temporary_events":[],"latest_updates":null}}]}}
+
+{sources}
+
+JSON object:"""
+
+# Local relevance pre-filter: pages with none of these words are not about store openings;
+# pages with several strong phrases are, without asking the AI.
+_STRONG_OPENING_RE = re.compile(
+    r"\b(?:coming\s+soon|opening\s+soon|now\s+open|grand\s+opening|soft\s+opening|ribbon[\s-]+cutting|"
+    r"(?:will|to|set\s+to|plans?\s+to|expected\s+to|slated\s+to)\s+open|opens?\s+(?:in|on|this|next)|"
+    r"new\s+(?:store|location|outpost|tenant)s?|first\s+store)\b",
+    re.IGNORECASE,
+)
+_WEAK_OPENING_RE = re.compile(
+    r"\b(?:open\w*|launch\w*|debut\w*|coming|arriv\w*|expan\w*|lease[sd]?|leasing|tenants?|relocat\w*)\b",
+    re.IGNORECASE,
+)
+# Strong phrases needed to skip the AI relevance check
+PREFILTER_STRONG_HITS = 2
+
+
+def prefilter_relevance(text: str) -> str:
+    """
+    Cheap keyword verdict on whether `text` is about store openings.
+
+    Returns "drop" (no opening-related words at all), "relevant" (at least
+    PREFILTER_STRONG_HITS strong phrases such as "coming soon" / "set to open"),
+    or "unsure" (the AI has to decide).
+    """
+    strong = len(_STRONG_OPENING_RE.findall(text or ""))
+    if strong >= PREFILTER_STRONG_HITS:
+        return "relevant"
+    if strong or _WEAK_OPENING_RE.search(text or ""):
+        return "unsure"
+    return "drop"
+
+
 # Prompt for AI to generate mall/retail intel from user request (no web search)
 PROMPT_GENERATE_MALL_INTEL = """You are a retail and mall intelligence assistant. Today's date is {current_date}.
 
@@ -141,10 +205,15 @@ User request:
 Your detailed response:"""
 
 
-def _truncate_for_ai(text: str, max_chars: int = MAX_TEXT_CHUNK_FOR_AI) -> str:
-    if not text or len(text) <= max_chars:
-        return text or ""
-    return text[:max_chars] + "\n\n[... text truncated for analysis ...]"
+def _truncate_for_ai(text: str, token_budget: int = AI_TEXT_TOKEN_BUDGET) -> str:
+    """Collapse repeated boilerplate and pack the most relevant lines into `token_budget` tokens."""
+    if not text:
+        return ""
+    compacted, stats = compact_text(text, token_budget=token_budget, model=OPENAI_MODEL)
+    if stats["dropped"]:
+        print(f"  [AI] {describe_stats(stats)}")
+        return compacted + "\n\n[... less relevant lines left out for analysis ...]"
+    return compacted
 
 
 def _is_outdated_date(date_str: str) -> bool:
@@ -155,14 +224,14 @@ def _is_outdated_date(date_str: str) -> bool:
     return "2023" in s or "2024" in s
 
 
-def _call_ai(prompt: str, debug_label: str = "AI") -> Optional[str]:
+def _call_ai(prompt: str, debug_label: str = "AI", max_tokens: int = 2048) -> Optional[str]:
     """Call OpenAI (preferred) or Gemini. Returns response text or None."""
     if OPENAI_AVAILABLE and _openai_client:
         try:
             response = _openai_client.chat.completions.create(
                 model=OPENAI_MODEL,
                 messages=[{"role": "user", "content": prompt}],
-                max_tokens=2048,
+                max_tokens=max_tokens,
             )
             if response and response.choices:
                 text = response.choices[0].message.content
@@ -240,19 +309,30 @@ def extract_combined(text: str, source_url: str = "", source_title: str = "", de
         return {"store_openings": [], "vacated_tenants": [], "temporary_events": [], "latest_updates": None}
     truncated = _truncate_for_ai(text)
     prompt = PROMPT_EXTRACT_COMBINED.format(
+        spec=_COMBINED_FIELDS_SPEC.format(current_date=CURRENT_DATE_STR, current_year=CURRENT_YEAR),
         text=truncated,
-        current_date=CURRENT_DATE_STR,
-        current_year=CURRENT_YEAR,
     )
     raw = _call_ai(prompt, debug_label="Extract")
     if not raw:
         if debug:
             print("  [Extract] No response from Gemini -> empty")
-        return {"store_openings": [], "vacated_tenants": [], "temporary_events": [], "latest_updates": None}
+        return _empty_result()
 
     raw = raw.strip()
     if debug:
         print(f"  [Extract] Raw response (first 400 chars): {raw[:400]}...")
+    data = _parse_json_object(raw, debug=debug)
+    if data is None:
+        return _empty_result()
+    return _parse_combined(data, source_url=source_url, source_title=source_title, debug=debug)
+
+
+def _empty_result() -> Dict[str, Any]:
+    return {"store_openings": [], "vacated_tenants": [], "temporary_events": [], "latest_updates": None}
+
+
+def _parse_json_object(raw: str, debug: bool = True) -> Optional[Dict[str, Any]]:
+    """JSON object from a model response (tolerates ```json fences and text around the object)."""
     for prefix in ("```json", "```"):
         if raw.startswith(prefix):
             raw = raw[len(prefix):].strip()
@@ -264,21 +344,24 @@ def extract_combined(text: str, source_url: str = "", source_title: str = "", de
         if debug:
             print(f"  [Extract] JSON parse error: {e}. Trying to find {{...}} in response.")
         match = re.search(r"\{[\s\S]*\}", raw)
-        if match:
-            try:
-                data = json.loads(match.group(0))
-            except json.JSONDecodeError as e2:
-                if debug:
-                    print(f"  [Extract] JSON parse failed: {e2}")
-                return {"store_openings": [], "vacated_tenants": [], "temporary_events": [], "latest_updates": None}
-        else:
-            return {"store_openings": [], "vacated_tenants": [], "temporary_events": [], "latest_updates": None}
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except json.JSONDecodeError as e2:
+            if debug:
+                print(f"  [Extract] JSON parse failed: {e2}")
+            return None
 
     if not isinstance(data, dict):
         if debug:
             print(f"  [Extract] Response is not a dict (type={type(data).__name__})")
-        return {"store_openings": [], "vacated_tenants": [], "temporary_events": [], "latest_updates": None}
+        return None
+    return data
+
 
+def _parse_combined(data: Dict[str, Any], source_url: str = "", source_title: str = "", debug: bool = True) -> Dict[str, Any]:
+    """Turn one combined-extraction JSON object into the analyze_extracted_text() result shape."""
     # Parse store_openings array
     store_openings = data.get("store_openings") or []
     if not isinstance(store_openings, list):
@@ -474,11 +557,171 @@ def analyze_extracted_text(
     Full pipeline: check relevance (optional), then extract store openings + vacated tenants + temporary events + latest updates.
     Returns {"store_openings": [...], "vacated_tenants": [...], "temporary_events": [...], "latest_updates": {...} or None}.
     When skip_relevance_check=True, always runs extraction (new openings, vacated tenants, events, general updates).
+    Otherwise the keyword pre-filter (AI_PREFILTER) drops pages with no opening-related words and
+    skips the AI relevance call for pages that clearly are about openings.
     """
     if not text or not text.strip():
-        return {"store_openings": [], "vacated_tenants": [], "temporary_events": [], "latest_updates": None}
-    if not skip_relevance_check and not is_about_store_opening(text, debug=debug):
-        if debug:
-            print("  [Analyze] Page filtered out by relevance check (not about store opening).")
-        return {"store_openings": [], "vacated_tenants": [], "temporary_events": [], "latest_updates": None}
+        return _empty_result()
+    if not skip_relevance_check:
+        verdict = prefilter_relevance(text) if AI_PREFILTER else "unsure"
+        if verdict == "drop":
+            if debug:
+                print("  [Analyze] Page filtered out by keyword pre-filter (no opening-related words).")
+            return _empty_result()
+        if verdict == "relevant":
+            if debug:
+                print("  [Analyze] Keyword pre-filter: clearly about openings, skipping relevance call.")
+        elif not is_about_store_opening(text, debug=debug):
+            if debug:
+                print("  [Analyze] Page filtered out by relevance check (not about store opening).")
+            return _empty_result()
     return extract_combined(text, source_url=source_url, source_title=source_title, debug=debug)
+
+
+def plan_analysis_batches(
+    items: List[Dict[str, Any]],
+    skip_relevance_check: bool = False,
+    batch_size: int = AI_BATCH_SIZE,
+    token_budget: int = AI_BATCH_TOKEN_BUDGET,
+    debug: bool = True,
+) -> Tuple[Dict[int, Dict[str, Any]], List[List[Dict[str, Any]]]]:
+    """
+    Split pages into AI jobs for analyze_extracted_texts().
+
+    `items` are dicts with "text", "source_url", "source_title" and optionally
+    "skip_relevance_check" (overrides the argument). Returns (done, jobs):
+    `done` maps item index -> result for pages settled without any API call
+    (empty text, dropped by the keyword pre-filter); each job is a list of
+    pages for one call to run_analysis_job(). Short pages (compacted text up to
+    half of `token_budget`) are packed in order, at most `batch_size` and
+    `token_budget` tokens per job; longer pages get a job of their own.
+    """
+    done: Dict[int, Dict[str, Any]] = {}
+    jobs: List[List[Dict[str, Any]]] = []
+    batch: List[Dict[str, Any]] = []
+    batch_tokens = 0
+    for i, item in enumerate(items):
+        text = item.get("text") or ""
+        if not text.strip():
+            done[i] = _empty_result()
+            continue
+        check = not item.get("skip_relevance_check", skip_relevance_check)
+        if check and AI_PREFILTER:
+            verdict = prefilter_relevance(text)
+            if verdict == "drop":
+                if debug:
+                    print(f"  [Analyze] Pre-filter dropped (no opening-related words): {(item.get('source_title') or item.get('source_url') or '')[:60]}")
+                done[i] = _empty_result()
+                continue
+            check = verdict != "relevant"
+        entry = {
+            "index": i,
+            "text": text,
+            "source_url": item.get("source_url") or "",
+            "source_title": item.get("source_title") or "",
+            "check_relevance": check,
+        }
+        if batch_size <= 1:
+            jobs.append([entry])
+            continue
+        compacted = _truncate_for_ai(text)
+        tokens = count_tokens(compacted, model=OPENAI_MODEL)
+        if tokens > token_budget // 2:
+            jobs.append([entry])
+            continue
+        entry["text"] = compacted
+        if batch and (len(batch) >= batch_size or batch_tokens + tokens > token_budget):
+            jobs.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(entry)
+        batch_tokens += tokens
+    if batch:
+        jobs.append(batch)
+    return done, jobs
+
+
+def _extract_combined_batch(entries: List[Dict[str, Any]], debug: bool = True) -> Dict[int, Dict[str, Any]]:
+    """One AI call for several short pages; returns item index -> result for the sources the model answered."""
+    ids = {f"S{n + 1}": e for n, e in enumerate(entries)}
+    sources = "\n\n".join(
+        f"[{sid}] {e['source_title'] or e['source_url']}\n---\n{e['text']}\n---" for sid, e in ids.items()
+    )
+    prompt = PROMPT_EXTRACT_BATCH.format(
+        spec=_COMBINED_FIELDS_SPEC.format(current_date=CURRENT_DATE_STR, current_year=CURRENT_YEAR),
+        sources=sources,
+    )
+    raw = _call_ai(prompt, debug_label=f"Batch x{len(entries)}", max_tokens=min(16000, 1500 * len(entries)))
+    if not raw:
+        if debug:
+            print(f"  [Batch] No response for {len(entries)} source(s)")
+        return {}
+    data = _parse_json_object(raw.strip(), debug=debug)
+    answers = data.get("sources") if data else None
+    if not isinstance(answers, list):
+        if debug:
+            print("  [Batch] Response has no \"sources\" list")
+        return {}
+
+    results: Dict[int, Dict[str, Any]] = {}
+    for answer in answers:
+        if not isinstance(answer, dict):
+            continue
+        entry = ids.get(str(answer.get("id", "")).strip().strip("[]"))
+        if entry is None or entry["index"] in results:
+            continue
+        if entry["check_relevance"] and answer.get("relevant") is False:
+            if debug:
+                print(f"  [Batch] Not about store openings: {(entry['source_title'] or entry['source_url'])[:60]}")
+            results[entry["index"]] = _empty_result()
+            continue
+        results[entry["index"]] = _parse_combined(
+            answer, source_url=entry["source_url"], source_title=entry["source_title"], debug=debug
+        )
+    return results
+
+
+def run_analysis_job(job: List[Dict[str, Any]], debug: bool = True) -> Dict[int, Dict[str, Any]]:
+    """
+    Run one job from plan_analysis_batches(); returns item index -> result.
+
+    A single page goes through analyze_extracted_text(); several pages share one
+    batched call, and any source missing from its answer is retried on its own.
+    """
+    if len(job) > 1:
+        results = _extract_combined_batch(job, debug=debug)
+        missing = [e for e in job if e["index"] not in results]
+        if debug and missing:
+            print(f"  [Batch] {len(missing)} of {len(job)} source(s) missing from the answer, analyzing them one by one")
+    else:
+        results, missing = {}, job
+    for e in missing:
+        results[e["index"]] = analyze_extracted_text(
+            e["text"],
+            source_url=e["source_url"],
+            source_title=e["source_title"],
+            skip_relevance_check=not e["check_relevance"],
+            debug=debug,
+        )
+    return results
+
+
+def analyze_extracted_texts(
+    items: List[Dict[str, Any]],
+    skip_relevance_check: bool = False,
+    batch_size: int = AI_BATCH_SIZE,
+    debug: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    analyze_extracted_text() for many pages with fewer API calls, results in input order.
+
+    Pages without opening-related words are dropped locally, pages that clearly
+    are about openings skip the relevance call, and short pages are analyzed
+    `batch_size` at a time in one request (relevance judged in the same call).
+    """
+    done, jobs = plan_analysis_batches(items, skip_relevance_check=skip_relevance_check,
+                                       batch_size=batch_size, debug=debug)
+    if debug:
+        print(f"  [Analyze] {len(items)} page(s): {len(done)} settled locally, {len(jobs)} AI job(s)")
+    for job in jobs:
+        done.update(run_analysis_job(job, debug=debug))
+    return [done.get(i) or _empty_result() for i in range(len(items))]
@@ -39,6 +39,20 @@ GEMINI_MAX_TOKENS = 2048
 # --- Text extraction ---
 REQUEST_TIMEOUT = 15
 MAX_TEXT_CHUNK_FOR_AI = 12000  # chars per page sent to Gemini (to stay under context)
+# Tokens per page sent to the AI: boilerplate is collapsed, then the most relevant lines are packed in
+AI_TEXT_TOKEN_BUDGET = int(os.environ.get("AI_TEXT_TOKEN_BUDGET", str(MAX_TEXT_CHUNK_FOR_AI // 4)))
+
+# --- Concurrent page stage (pipeline Step 3–5, see page_fetch.py) ---
+FETCH_CONCURRENCY = int(os.environ.get("FETCH_CONCURRENCY", "8"))      # pages downloading at once
+FETCH_PER_HOST = int(os.environ.get("FETCH_PER_HOST", "2"))            # ... of which per host
+PARSE_WORKERS = int(os.environ.get("PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))  # HTML cleaning processes
+AI_CONCURRENCY = int(os.environ.get("AI_CONCURRENCY", "4"))            # AI analysis calls in flight
+AI_CALLS_PER_MINUTE = int(os.environ.get("AI_CALLS_PER_MINUTE", "60")) # 0 disables the rate limit
+
+# --- Batched AI analysis (see ai_analysis.analyze_extracted_texts) ---
+AI_PREFILTER = os.environ.get("AI_PREFILTER", "1").strip().lower() not in ("0", "false", "no", "off")  # keyword pre-filter before the relevance call
+AI_BATCH_SIZE = int(os.environ.get("AI_BATCH_SIZE", "5"))                 # short pages per extraction call (1 = one call per page)
+AI_BATCH_TOKEN_BUDGET = int(os.environ.get("AI_BATCH_TOKEN_BUDGET", "8000"))  # page-text tokens per batched call
 
 # --- Output ---
 EXTRACTED_OUTPUT_DIR = "extracted_output"
@@ -1,15 +1,23 @@
 """
-Extract and clean readable text from web pages using BeautifulSoup.
+Extract and clean readable text from web pages.
 
-Fetches HTML with requests, parses with BeautifulSoup, removes noise
-(nav, ads, scripts, styles), and returns cleaned plain text.
+Fetches HTML with requests, cleans it in a single lxml pass (html_clean.py at
+the repository root) that removes noise (nav, ads, scripts, styles), and
+returns cleaned plain text.
 """
 
+import os
 import re
+import sys
 from typing import Optional
 
 import requests
-from bs4 import BeautifulSoup
+from requests.compat import chardet
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+from html_clean import MARKUP_TAGS, clean_html, make_profile
 
 # Default timeout and headers for requests
 REQUEST_TIMEOUT = 15
@@ -22,6 +30,16 @@ REQUEST_HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
+# Elements that are usually noise: markup, embeds, site chrome, ads, cookie banners, comments
+_NOISE_PROFILE = make_profile(
+    tags=MARKUP_TAGS + ("iframe", "object", "embed", "svg", "path", "head",
+                        "nav", "header", "footer", "aside", "form", "button"),
+    class_tokens=("nav", "navbar", "menu", "sidebar", "footer", "advertisement", "ad", "ads",
+                  "cookie", "consent", "social-share", "comments", "related-posts"),
+    ids=("nav", "navbar", "menu", "footer", "sidebar"),
+    roles=("navigation", "banner", "contentinfo"),
+)
+
 
 def fetch_html(url: str, timeout: int = REQUEST_TIMEOUT) -> Optional[str]:
     """Download HTML from a URL. Returns None on failure."""
@@ -34,9 +52,17 @@ def fetch_html(url: str, timeout: int = REQUEST_TIMEOUT) -> Optional[str]:
         return None
 
 
+def decode_html(content: bytes) -> str:
+    """Decode downloaded HTML bytes with the detected encoding (as fetch_html does via apparent_encoding)."""
+    if not content:
+        return ""
+    encoding = chardet.detect(content).get("encoding") or "utf-8"
+    return content.decode(encoding, errors="replace")
+
+
 def extract_clean_text(html: str, url: str = "") -> str:
     """
-    Extract readable text from HTML and clean it with BeautifulSoup.
+    Extract readable text from HTML and clean it.
 
     - Removes script, style, nav, footer, ads, forms, iframes
     - Extracts text from body, normalizes whitespace
@@ -45,66 +71,9 @@ def extract_clean_text(html: str, url: str = "") -> str:
     if not html or not html.strip():
         return ""
 
-    soup = BeautifulSoup(html, "html.parser")
-
-    # Remove elements that are usually noise
-    for tag in soup.find_all(
-        [
-            "script",
-            "style",
-            "noscript",
-            "iframe",
-            "object",
-            "embed",
-            "svg",
-            "path",
-            "meta",
-            "link",
-            "head",
-        ]
-    ):
-        tag.decompose()
-
-    # Remove common nav/footer/sidebar/ad containers (by tag or class/id patterns)
-    noise_selectors = [
-        "nav",
-        "header",
-        "footer",
-        "aside",
-        "form",
-        "button",
-        "[role='navigation']",
-        "[role='banner']",
-        "[role='contentinfo']",
-        ".nav",
-        ".navbar",
-        ".menu",
-        ".sidebar",
-        ".footer",
-        ".advertisement",
-        ".ad",
-        ".ads",
-        "#nav",
-        "#navbar",
-        "#menu",
-        "#footer",
-        "#sidebar",
-        ".cookie",
-        ".consent",
-        ".social-share",
-        ".comments",
-        ".related-posts",
-    ]
-    for selector in noise_selectors:
-        try:
-            for el in soup.select(selector):
-                el.decompose()
-        except Exception:
-            pass
-
-    # Get text from body, or whole soup if no body
-    body = soup.find("body") or soup
-    text = body.get_text(separator="\n", strip=True)
+    # Drop noise elements, nav/footer/sidebar/ad containers (by tag or class/id patterns)
+    # and head in one pass; what is left is the body text
+    text = clean_html(html, _NOISE_PROFILE)["text"]
 
     # Normalize and clean
     lines = []
@@ -0,0 +1,237 @@
+"""
+Concurrent page stage of the discovery pipeline: fetch → extract text → AI analysis.
+
+Every page runs as its own asyncio task, so a run takes about as long as its
+slowest few pages instead of the sum of all of them:
+  - Downloads use httpx.AsyncClient when installed (requests in worker threads
+    otherwise), capped globally (FETCH_CONCURRENCY) and per host (FETCH_PER_HOST).
+  - HTML is decoded and cleaned (single-pass lxml, html_clean.py) in a process pool
+    (PARSE_WORKERS), so parsing one page does not stall the others.
+  - Pages that yield no text fall back to Selenium one at a time, since the
+    pipeline shares a single driver.
+  - AI analysis calls run concurrently (AI_CONCURRENCY) and their start times
+    are spaced by a rate limiter (AI_CALLS_PER_MINUTE).
+  - With AI_BATCH_SIZE > 1, analysis waits until all pages are fetched; then a
+    keyword pre-filter drops pages with nothing about openings and short pages
+    share one AI call per batch (ai_analysis.plan_analysis_batches), which cuts
+    round-trips by well over half on a typical 20-link run.
+
+Results come back in input order, so the pipeline's "keep first" dedupe gives
+the same rows as a sequential run.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+# Project root holds the shared rate_limit module
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+from rate_limit import RateLimiter
+
+from config import AI_BATCH_SIZE, AI_CALLS_PER_MINUTE, AI_CONCURRENCY, FETCH_CONCURRENCY, FETCH_PER_HOST, PARSE_WORKERS
+from ai_analysis import analyze_extracted_text, plan_analysis_batches, run_analysis_job
+from extract_text import REQUEST_HEADERS, REQUEST_TIMEOUT, decode_html, extract_clean_text
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None
+    HTTPX_AVAILABLE = False
+
+
+def _parse_page(content: bytes, url: str) -> str:
+    """Decode and clean one downloaded page (runs in a worker process)."""
+    return extract_clean_text(decode_html(content), url)
+
+
+def _fetch_bytes_sync(url: str, timeout: int) -> bytes:
+    r = requests.get(url, headers=REQUEST_HEADERS, timeout=timeout)
+    r.raise_for_status()
+    return r.content
+
+
+async def process_pages_async(
+    pages: List[Dict[str, Any]],
+    skip_relevance_check: bool = False,
+    selenium_fetch: Optional[Callable[[str], str]] = None,
+    fetch_concurrency: Optional[int] = None,
+    per_host: Optional[int] = None,
+    parse_workers: Optional[int] = None,
+    ai_concurrency: Optional[int] = None,
+    ai_calls_per_minute: Optional[int] = None,
+    ai_batch_size: Optional[int] = None,
+    timeout: int = REQUEST_TIMEOUT,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch, extract and analyze `pages` concurrently.
+
+    Each page is a dict with "link" and "title"; a page that already carries
+    "text" (e.g. a Google AI Overview) skips the download. A page may also set
+    "skip_relevance_check" to override the argument of the same name.
+
+    Returns one dict per page, in input order:
+        link, title  – as given
+        text         – extracted text ("" when nothing could be fetched)
+        via_selenium – True when the text came from the Selenium fallback
+        result       – analyze_extracted_text() output, or None when text is empty
+        elapsed      – seconds from task start to analysis done
+    """
+    fetch_concurrency = max(1, fetch_concurrency or FETCH_CONCURRENCY)
+    per_host = max(1, per_host or FETCH_PER_HOST)
+    parse_workers = PARSE_WORKERS if parse_workers is None else parse_workers
+    ai_concurrency = max(1, ai_concurrency or AI_CONCURRENCY)
+    ai_calls_per_minute = AI_CALLS_PER_MINUTE if ai_calls_per_minute is None else ai_calls_per_minute
+    ai_batch_size = max(1, AI_BATCH_SIZE if ai_batch_size is None else ai_batch_size)
+
+    loop = asyncio.get_running_loop()
+    fetch_sem = asyncio.Semaphore(fetch_concurrency)
+    host_sems: Dict[str, asyncio.Semaphore] = {}
+    ai_sem = asyncio.Semaphore(ai_concurrency)
+    selenium_lock = asyncio.Lock()
+    limiter = RateLimiter(ai_calls_per_minute)
+    total = len(pages)
+
+    parse_pool = None
+    if parse_workers > 1:
+        try:
+            parse_pool = ProcessPoolExecutor(max_workers=parse_workers)
+        except (OSError, NotImplementedError) as e:
+            print(f"[Fetch] Process pool unavailable, parsing in threads: {e}")
+
+    client = None
+    if HTTPX_AVAILABLE:
+        client = httpx.AsyncClient(
+            headers=REQUEST_HEADERS,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=fetch_concurrency),
+        )
+
+    async def download(url: str) -> Optional[bytes]:
+        host = urlparse(url).netloc.lower()
+        host_sem = host_sems.setdefault(host, asyncio.Semaphore(per_host))
+        async with fetch_sem, host_sem:
+            try:
+                if client is not None:
+                    r = await client.get(url)
+                    r.raise_for_status()
+                    return r.content
+                return await asyncio.to_thread(_fetch_bytes_sync, url, timeout)
+            except Exception:
+                return None
+
+    async def parse(content: bytes, url: str) -> str:
+        nonlocal parse_pool
+        if parse_pool is not None:
+            try:
+                return await loop.run_in_executor(parse_pool, _parse_page, content, url)
+            except BrokenProcessPool as e:
+                print(f"[Fetch] Parser process pool broke, parsing in threads: {e}")
+                parse_pool = None
+        return await asyncio.to_thread(_parse_page, content, url)
+
+    async def run_one(i: int, page: Dict[str, Any]) -> Dict[str, Any]:
+        start = time.monotonic()
+        link = page.get("link") or ""
+        title = page.get("title") or link
+        label = f"[{i + 1}/{total}] {title[:60]}"
+        text = page.get("text") or ""
+        via_selenium = False
+
+        if not text and link:
+            content = await download(link)
+            if content:
+                try:
+                    text = await parse(content, link)
+                except Exception as e:
+                    print(f"  {label}: text extraction failed: {e}")
+            if not text and selenium_fetch is not None:
+                print(f"  {label}: requests empty -> trying Selenium fallback...")
+                async with selenium_lock:
+                    try:
+                        text = await asyncio.to_thread(selenium_fetch, link) or ""
+                    except Exception as e:
+                        print(f"  {label}: Selenium fallback failed: {e}")
+                via_selenium = bool(text)
+        if not text:
+            print(f"  {label}: SKIP: could not fetch or extract text (empty).")
+            return {"link": link, "title": title, "text": "", "via_selenium": False,
+                    "result": None, "elapsed": time.monotonic() - start}
+
+        print(f"  {label}: {len(text)} chars{' (Selenium fallback)' if via_selenium else ''}")
+        if ai_batch_size > 1:
+            # Analyzed together with the other pages once all are fetched (analyze_batched)
+            return {"link": link, "title": title, "text": text, "via_selenium": via_selenium,
+                    "result": None, "elapsed": time.monotonic() - start, "_start": start,
+                    "_skip_relevance_check": page.get("skip_relevance_check", skip_relevance_check)}
+        async with ai_sem:
+            await limiter.wait_async()
+            result = await asyncio.to_thread(
+                analyze_extracted_text,
+                text,
+                source_url=link,
+                source_title=title,
+                skip_relevance_check=page.get("skip_relevance_check", skip_relevance_check),
+                debug=True,
+            )
+        return {"link": link, "title": title, "text": text, "via_selenium": via_selenium,
+                "result": result, "elapsed": time.monotonic() - start}
+
+    async def analyze_batched(processed: List[Dict[str, Any]]) -> None:
+        items = [
+            {"text": p["text"], "source_url": p["link"], "source_title": p["title"],
+             "skip_relevance_check": p.pop("_skip_relevance_check", skip_relevance_check)}
+            for p in processed
+        ]
+        done, jobs = plan_analysis_batches(items, batch_size=ai_batch_size)
+        print(f"  [Analyze] {len(items)} page(s): {len(done)} settled without AI, "
+              f"{len(jobs)} AI job(s) (batches of up to {ai_batch_size})")
+
+        async def run_job(job: List[Dict[str, Any]]) -> None:
+            async with ai_sem:
+                await limiter.wait_async()
+                done.update(await asyncio.to_thread(run_analysis_job, job))
+            now = time.monotonic()
+            for entry in job:
+                p = processed[entry["index"]]
+                p["elapsed"] = now - p["_start"]
+
+        await asyncio.gather(*(run_job(job) for job in jobs))
+        for i, p in enumerate(processed):
+            p.pop("_start", None)
+            if p["text"]:
+                p["result"] = done.get(i)
+
+    try:
+        processed = list(await asyncio.gather(*(run_one(i, p) for i, p in enumerate(pages))))
+        if ai_batch_size > 1:
+            await analyze_batched(processed)
+        return processed
+    finally:
+        if client is not None:
+            await client.aclose()
+        if parse_pool is not None:
+            parse_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def process_pages(pages: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+    """Blocking wrapper around process_pages_async (usable from Streamlit or from inside a running loop)."""
+    if not pages:
+        return []
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(process_pages_async(pages, **kwargs))
+    # Already inside an event loop (e.g. a notebook): run on a helper thread with its own loop
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(lambda: asyncio.run(process_pages_async(pages, **kwargs))).result()
@@ -2,7 +2,7 @@
 Full retail store-opening discovery pipeline.
 
 Flow: Query generation → DuckDuckGo search (browser-free) → Requests (with Selenium fallback)
-      → BeautifulSoup → Gemini AI analysis → Structured output → CSV/Excel export.
+      → lxml text cleaning → Gemini AI analysis → Structured output → CSV/Excel export.
 """
 
 import csv
@@ -19,6 +19,7 @@ from config import (
 
 from ai_analysis import AI_AVAILABLE, AI_SOURCE_NAME, analyze_extracted_text, extract_combined, generate_mall_intel
 from extract_text import extract_clean_text, extract_text_from_url
+from page_fetch import process_pages
 from query_generation import extract_mall_name_from_query, generate_queries
 from search_duckduckgo import search_duckduckgo
 
@@ -177,7 +178,7 @@ def run_pipeline(
     Steps:
     1. Generate search queries from mall_name / brand_name / custom_query.
     2. For each query: DuckDuckGo search (browser-free; no Chrome required).
-    3. For each result link: fetch page with requests, extract text with BeautifulSoup.
+    3. For each result link: fetch page with requests, extract text (html_clean, single lxml pass).
        Selenium is used only as a last-resort fallback for JS-heavy pages.
     4. Optionally save extracted text to files.
     5. Run Gemini AI analysis → structured extraction.
@@ -342,98 +343,73 @@ def run_pipeline(
                 except: pass
             return {"store_openings": [], "vacated_tenants": [], "temporary_events": [], "latest_updates": [], "extracted_text_files": []}
 
-        # Process Google AI Overview text if found
-        file_index = 0 # Initialize file_index for AI overview sources
-        for ai_src in ai_overview_sources:
-            file_index += 1
-            text = ai_src.get("text") or ""
-            link = ai_src.get("source_url") or ""
-            title = ai_src.get("source_title") or "Google AI Overview"
-            if not text: continue
-            
-            print(f"\n  [AI Source {file_index}] {title[:60]}...")
-            result = analyze_extracted_text(text, source_url=link, source_title=title, skip_relevance_check=True, debug=True)
-            
-            # Merge results
-            for row in result.get("store_openings") or []: structured_rows.append(row)
-            for row in result.get("vacated_tenants") or []: vacated_tenants_list.append(row)
-            for row in result.get("temporary_events") or []: temporary_events_list.append(row)
-            if result.get("latest_updates"): latest_updates_list.append(result["latest_updates"])
-            
-            # Save file
-            if save_extracted_text:
-                out_dir.mkdir(exist_ok=True)
-                slug = _sanitize_filename(ai_src.get("query", "ai_overview"))
-                filename = f"extract_ai_{file_index}_{slug}.txt"
-                content = f"URL: {link}\nTitle: {title}\n" + "=" * 70 + "\n\n" + text
-                with open(out_dir / filename, "w", encoding="utf-8") as f:
-                    f.write(content)
-
         # Limit how many pages we fetch
         to_process = all_results[: max_links_per_query * len(queries)]
         to_process = to_process[:20]
 
+        # Google AI Overview text is analyzed alongside the fetched pages (no download needed)
+        pages: List[Dict[str, Any]] = []
+        for ai_src in ai_overview_sources:
+            if not ai_src.get("text"):
+                continue
+            pages.append({
+                "link": ai_src.get("source_url") or "",
+                "title": ai_src.get("source_title") or "Google AI Overview",
+                "text": ai_src["text"],
+                "query": ai_src.get("query", "ai_overview"),
+                "skip_relevance_check": True,
+            })
+        for r in to_process:
+            pages.append({"link": r.get("link") or "", "title": r.get("title") or r.get("link") or ""})
+
+        def selenium_fetch(url: str) -> str:
+            nonlocal driver
+            if driver is None:
+                driver = _try_get_selenium_driver()
+            if not driver:
+                return ""
+            driver.get(url)
+            time.sleep(SELENIUM_FALLBACK_SLEEP)
+            return extract_clean_text(driver.page_source or "")
+
+        print(f"[Step 3–5] Fetching {len(to_process)} page(s) and analyzing {len(pages)} source(s) concurrently...")
+        stage_start = time.time()
+        processed = process_pages(pages, skip_relevance_check=skip_ai_relevance_check, selenium_fetch=selenium_fetch)
+        print(f"[Step 3–5] Done in {time.time() - stage_start:.1f}s")
+
         if save_extracted_text:
             out_dir.mkdir(exist_ok=True)
-        extracted_text_files: List[Dict[str, str]] = []
-        file_index = 0
-
-        print("[Step 3–5] Fetching pages, extracting text, running AI analysis...")
-        for i, r in enumerate(to_process):
-            link = r.get("link") or ""
-            title = r.get("title") or link
-            file_index += 1
-            print(f"\n  [{file_index}/{len(to_process)}] {title[:60]}...")
-            print(f"      URL: {link[:70]}...")
-            text = extract_text_from_url(link)
-            if not text:
-                print(f"      Requests empty -> trying Selenium fallback...")
-                if driver is None:
-                    driver = _try_get_selenium_driver()
-                if driver:
-                    try:
-                        driver.get(link)
-                        time.sleep(SELENIUM_FALLBACK_SLEEP)
-                        text = extract_clean_text(driver.page_source or "")
-                    except Exception as e:
-                        print(f"      Selenium fallback failed: {e}")
-                if not text:
-                    print(f"      SKIP: Could not fetch or extract text (empty).")
-                    continue
-                print(f"      (Selenium fallback) Text length: {len(text)} chars")
+        ai_index = 0
+        page_index = 0
+        for page, done in zip(pages, processed):
+            if "query" in page:
+                ai_index += 1
+                filename = f"extract_ai_{ai_index}_{_sanitize_filename(page['query'])}.txt"
             else:
-                print(f"      Text length: {len(text)} chars")
-        if save_extracted_text:
-            slug = _sanitize_filename(title or link)
-            fpath = out_dir / f"extract_{file_index}_{slug}.txt"
-            with open(fpath, "w", encoding="utf-8") as f:
-                f.write(f"URL: {link}\nTitle: {title}\n")
-                f.write("=" * 70 + "\n\n")
-                f.write(text)
-            print(f"      Saved text: {fpath.name}")
-
-        result = analyze_extracted_text(
-            text,
-            source_url=link,
-            source_title=title,
-            skip_relevance_check=skip_ai_relevance_check,
-            debug=True,
-        )
-        rows = result.get("store_openings") or []
-        vacated = result.get("vacated_tenants") or []
-        update = result.get("latest_updates")
-        if rows:
-            print(f"      -> {len(rows)} store-opening row(s) extracted")
-        if vacated:
-            print(f"      -> {len(vacated)} vacated tenant(s) extracted")
-        for row in rows:
-            structured_rows.append(row)
-        for row in vacated:
-            vacated_tenants_list.append(row)
-        for row in result.get("temporary_events") or []:
-            temporary_events_list.append(row)
-        if update:
-            latest_updates_list.append(update)
+                page_index += 1
+                filename = f"extract_{page_index}_{_sanitize_filename(done['title'] or done['link'])}.txt"
+            if not done["text"]:
+                continue
+            if save_extracted_text:
+                with open(out_dir / filename, "w", encoding="utf-8") as f:
+                    f.write(f"URL: {done['link']}\nTitle: {done['title']}\n")
+                    f.write("=" * 70 + "\n\n")
+                    f.write(done["text"])
+
+            result = done["result"] or {}
+            rows = result.get("store_openings") or []
+            vacated = result.get("vacated_tenants") or []
+            update = result.get("latest_updates")
+            if rows or vacated:
+                print(f"  -> {done['title'][:60]}: {len(rows)} store-opening row(s), {len(vacated)} vacated tenant(s)")
+            for row in rows:
+                structured_rows.append(row)
+            for row in vacated:
+                vacated_tenants_list.append(row)
+            for row in result.get("temporary_events") or []:
+                temporary_events_list.append(row)
+            if update:
+                latest_updates_list.append(update)
 
     finally:
         if driver is not None:
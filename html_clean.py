@@ -0,0 +1,217 @@
+"""
+html_clean.py – Single-pass HTML cleaning shared by Mall_Ai_Dashboard and googlesearch.
+
+Rendered mall directories are often 2–5 MB of markup. Cleaning them with
+BeautifulSoup meant building a full tree, then walking it once per noise
+selector and once more for attribute names. Here the page is fed in chunks to
+lxml's pull parser, and every element is handled once as it streams past:
+
+  - noise subtrees (by tag, class/id pattern or ARIA role) are skipped whole
+  - visible text is collected in document order, as get_text("\\n", strip=True) would
+  - shop-like names in alt / aria-label / title / data-* attributes are collected
+  - text inside nav/header/footer is recorded separately, so callers can tell
+    site chrome from page content
+
+Finished elements are cleared as soon as their text has been taken, so memory
+stays flat no matter how large the page is.
+
+Usage:
+    from html_clean import clean_html, make_profile
+
+    profile = make_profile(tags=("script", "style", "nav"), class_substrings=("cookie", "popup"))
+    page = clean_html(html, profile, collect_attr_names=True)
+    page["text"]          # newline-separated visible text
+    page["attr_names"]    # unique names from alt/aria-label/title/...
+    page["chrome_lines"]  # set of text lines inside nav/header/footer
+"""
+import re
+from typing import Dict, Iterable, List, Optional
+
+from lxml import etree
+
+# Elements that never hold visible text
+MARKUP_TAGS = ("script", "style", "noscript", "meta", "link", "template")
+CHROME_TAGS = frozenset({"nav", "header", "footer"})
+NAME_ATTRIBUTES = ("alt", "aria-label", "title", "data-store-name", "data-name", "data-title")
+
+_FEED_CHUNK = 64 * 1024
+
+_SKIP_PREFIXES = ("http", "www.", "data:", "javascript:", "button", "link", "close", "menu", "search")
+_SKIP_WORDS = ("logo", "icon", "image", "photo", "thumbnail", "placeholder")
+_TLD_RE = re.compile(r"\.[a-z]{2,}$")
+
+
+def _alternation(words: Iterable[str]) -> str:
+    return "|".join(re.escape(w) for w in words)
+
+
+def make_profile(
+    tags: Iterable[str] = MARKUP_TAGS,
+    class_substrings: Iterable[str] = (),
+    class_tokens: Iterable[str] = (),
+    id_substrings: Iterable[str] = (),
+    ids: Iterable[str] = (),
+    roles: Iterable[str] = (),
+) -> Dict:
+    """
+    Compile a noise profile for clean_html().
+
+    An element is dropped with its whole subtree when its tag is in `tags`, its
+    class attribute contains one of `class_substrings` (CSS [class*='x']) or has a
+    class token in `class_tokens` (CSS .x), its id contains one of `id_substrings`
+    or equals one of `ids`, or its role is in `roles`.
+    """
+    class_parts = []
+    if class_substrings:
+        class_parts.append(f"(?:{_alternation(class_substrings)})")
+    if class_tokens:
+        class_parts.append(rf"(?:^|\s)(?:{_alternation(class_tokens)})(?:\s|$)")
+    id_parts = []
+    if id_substrings:
+        id_parts.append(f"(?:{_alternation(id_substrings)})")
+    if ids:
+        id_parts.append(rf"^(?:{_alternation(ids)})$")
+    return {
+        "tags": frozenset(t.lower() for t in tags),
+        "class_re": re.compile("|".join(class_parts)) if class_parts else None,
+        "id_re": re.compile("|".join(id_parts)) if id_parts else None,
+        "roles": frozenset(r.lower() for r in roles),
+    }
+
+
+DEFAULT_PROFILE = make_profile()
+
+
+def _is_domain(val: str) -> bool:
+    """Check if value looks like a domain/URL.
+
+    Conservative filtering - only filters CLEAR domains, not shop names with .com branding.
+    """
+    val_lower = val.lower()
+    if val_lower.startswith(("http://", "https://", "www.")):
+        return True
+    # All-lowercase, no spaces, ends with a TLD and longer than 8 chars = likely a domain.
+    # Shop names with .com branding usually have capitals (e.g. "Shop.com"), so keep those.
+    if "." in val_lower and " " not in val_lower and _TLD_RE.search(val_lower):
+        return val == val_lower and len(val_lower) > 8
+    return False
+
+
+def _attribute_name(val) -> Optional[str]:
+    """`val` stripped if it looks like a shop/store name, else None."""
+    if not val or not isinstance(val, str):
+        return None
+    val = val.strip()
+    if len(val) < 3 or len(val) > 80:
+        return None
+    lowered = val.lower()
+    if lowered.startswith(_SKIP_PREFIXES):
+        return None
+    if len(val) < 15 and any(w in lowered for w in _SKIP_WORDS):
+        return None
+    if _is_domain(val):
+        return None
+    return val
+
+
+def _is_noise(el, tag: str, profile: Dict) -> bool:
+    if tag in profile["tags"]:
+        return True
+    if profile["class_re"] is not None:
+        cls = el.get("class")
+        if cls and profile["class_re"].search(cls):
+            return True
+    if profile["id_re"] is not None:
+        el_id = el.get("id")
+        if el_id and profile["id_re"].search(el_id):
+            return True
+    if profile["roles"]:
+        role = el.get("role")
+        if role and role.strip().lower() in profile["roles"]:
+            return True
+    return False
+
+
+def clean_html(html, profile: Optional[Dict] = None, collect_attr_names: bool = False) -> Dict:
+    """
+    Clean `html` (str or bytes) in one streaming pass.
+
+    Returns {"text", "attr_names", "chrome_lines"}: the visible text outside noise
+    subtrees, one stripped text node per line; the unique names found in
+    NAME_ATTRIBUTES outside noise subtrees (only when `collect_attr_names`); and
+    the set of text lines that sit inside nav/header/footer (these are also part
+    of "text" unless the profile drops those tags).
+    """
+    profile = profile or DEFAULT_PROFILE
+    pieces: List[str] = []
+    chrome_lines = set()
+    attr_names: List[str] = []
+    seen_names = set()
+    result = {"text": "", "attr_names": attr_names, "chrome_lines": chrome_lines}
+    if not html:
+        return result
+
+    # Open elements: [element, dropped, in_chrome, text_taken]
+    stack: List[list] = []
+
+    def emit(text, dropped, in_chrome):
+        if dropped or not text:
+            return
+        text = text.strip()
+        if not text:
+            return
+        pieces.append(text)
+        if in_chrome:
+            chrome_lines.update(line.strip() for line in text.split("\n"))
+
+    def handle(event, el):
+        # Text is only final once the parser has moved past it: an element's own text
+        # when its first child starts (or it ends), a child's tail when the next
+        # sibling starts (or the parent ends). Emit each piece at that point.
+        if event == "start":
+            tag = el.tag.lower() if isinstance(el.tag, str) else ""
+            if stack:
+                parent = stack[-1]
+                if not parent[3]:
+                    emit(parent[0].text, parent[1], parent[2])
+                    parent[3] = True
+                else:
+                    prev = el.getprevious()
+                    if prev is not None:
+                        emit(prev.tail, parent[1], parent[2])
+                        parent[0].remove(prev)
+                dropped, in_chrome = parent[1], parent[2]
+            else:
+                dropped, in_chrome = False, False
+            if not dropped and _is_noise(el, tag, profile):
+                dropped = True
+            if not dropped and collect_attr_names:
+                for attr in NAME_ATTRIBUTES:
+                    name = _attribute_name(el.get(attr))
+                    if name and name.lower() not in seen_names:
+                        seen_names.add(name.lower())
+                        attr_names.append(name)
+            stack.append([el, dropped, in_chrome or tag in CHROME_TAGS, False])
+        else:
+            entry = stack.pop()
+            if not entry[3]:
+                emit(el.text, entry[1], entry[2])
+            elif len(el):
+                emit(el[-1].tail, entry[1], entry[2])
+            # Keep the tail: the parent emits it once the next sibling (or its own end) arrives
+            el.clear(keep_tail=True)
+
+    parser = etree.HTMLPullParser(events=("start", "end"), remove_comments=True, remove_pis=True)
+    try:
+        for i in range(0, len(html), _FEED_CHUNK):
+            parser.feed(html[i:i + _FEED_CHUNK])
+            for event, el in parser.read_events():
+                handle(event, el)
+        parser.close()
+        for event, el in parser.read_events():
+            handle(event, el)
+    except etree.LxmlError as e:
+        print(f"Warning: HTML cleaning stopped early: {e}")
+
+    result["text"] = "\n".join(pieces)
+    return result
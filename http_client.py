@@ -0,0 +1,167 @@
+"""
+http_client.py – Shared pooled HTTP client for API calls (OpenAI, SerpApi, Mappedin).
+
+One keep-alive requests.Session per host, so repeated calls reuse TLS
+connections instead of handshaking every time. Requests are retried with
+exponential backoff and jitter on 429/5xx and connection errors, honoring the
+server's Retry-After header. Latency, retries and errors are recorded per host.
+
+Usage:
+    import http_client
+
+    r = http_client.post(url, json=body, headers=headers, timeout=120)
+    r.raise_for_status()
+
+    http_client.latency_stats()   # {'api.openai.com': {'calls': 12, 'avg_ms': ..., ...}}
+
+Configuration (environment):
+    HTTP_POOL_SIZE        connections kept per host (default 10)
+    HTTP_MAX_RETRIES      retries after the first attempt (default 3)
+    HTTP_BACKOFF_SECONDS  base backoff, doubled every retry (default 1.0)
+    HTTP_MAX_BACKOFF      cap for a single wait, including Retry-After (default 60)
+"""
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_SECONDS = float(os.getenv("HTTP_BACKOFF_SECONDS", "1.0"))
+HTTP_MAX_BACKOFF = float(os.getenv("HTTP_MAX_BACKOFF", "60"))
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+_stats: Dict[str, dict] = {}
+_stats_lock = threading.Lock()
+
+
+def get_session(url: str) -> requests.Session:
+    """Return the shared keep-alive session for the host of `url`."""
+    host = urlparse(url).netloc.lower()
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return session
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff_seconds(attempt: int, backoff: float) -> float:
+    """Exponential backoff with full jitter in [0.5x, 1.5x]."""
+    return min(HTTP_MAX_BACKOFF, backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+
+def _record(host: str, elapsed: float, retries: int, error: bool) -> None:
+    with _stats_lock:
+        s = _stats.setdefault(host, {"calls": 0, "errors": 0, "retries": 0, "total_s": 0.0, "max_s": 0.0})
+        s["calls"] += 1
+        s["retries"] += retries
+        s["total_s"] += elapsed
+        s["max_s"] = max(s["max_s"], elapsed)
+        if error:
+            s["errors"] += 1
+
+
+def request(
+    method: str,
+    url: str,
+    max_retries: Optional[int] = None,
+    backoff: Optional[float] = None,
+    retry_on_timeout: bool = False,
+    **kwargs,
+) -> requests.Response:
+    """
+    Send a request through the pooled session for the URL's host.
+
+    Retries on RETRY_STATUSES and connection errors (and timeouts when
+    `retry_on_timeout` is set). After the last attempt the final response is
+    returned as-is, so callers keep using raise_for_status(); exceptions from
+    the last attempt propagate unchanged.
+    """
+    max_retries = HTTP_MAX_RETRIES if max_retries is None else max_retries
+    backoff = HTTP_BACKOFF_SECONDS if backoff is None else backoff
+    host = urlparse(url).netloc.lower()
+    session = get_session(url)
+    start = time.time()
+    attempt = 0
+    while True:
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            is_timeout = isinstance(e, requests.exceptions.Timeout)
+            if attempt >= max_retries or (is_timeout and not retry_on_timeout):
+                _record(host, time.time() - start, attempt, error=True)
+                raise
+            wait = _backoff_seconds(attempt, backoff)
+            print(f"[HTTP] {type(e).__name__} for {host}, retrying in {wait:.1f}s ({attempt + 1}/{max_retries})")
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                _record(host, time.time() - start, attempt, error=response.status_code >= 400)
+                return response
+            retry_after = _retry_after_seconds(response)
+            wait = min(HTTP_MAX_BACKOFF, retry_after) if retry_after is not None else _backoff_seconds(attempt, backoff)
+            print(f"[HTTP] {response.status_code} from {host}, retrying in {wait:.1f}s ({attempt + 1}/{max_retries})")
+            response.close()
+        time.sleep(wait)
+        attempt += 1
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """GET via request()."""
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """POST via request()."""
+    return request("POST", url, **kwargs)
+
+
+def latency_stats() -> Dict[str, dict]:
+    """Per-host call counts, errors, retries and latency (avg/max in ms, including retry waits)."""
+    with _stats_lock:
+        out = {}
+        for host, s in _stats.items():
+            out[host] = {
+                "calls": s["calls"],
+                "errors": s["errors"],
+                "retries": s["retries"],
+                "avg_ms": round(1000 * s["total_s"] / s["calls"], 1) if s["calls"] else 0.0,
+                "max_ms": round(1000 * s["max_s"], 1),
+            }
+        return out
+
+
+def close_sessions() -> None:
+    """Close all pooled sessions (their connections are reopened on next use)."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
@@ -0,0 +1,52 @@
+"""
+rate_limit.py – Shared call-rate limiter for threads and asyncio tasks.
+
+RateLimiter spaces call start times at least 60 / calls_per_minute seconds
+apart. Each caller reserves the next free start time under a short lock and
+then sleeps until it outside the lock, so concurrent callers queue up in order
+instead of all firing at once. The same limiter serves blocking code (wait(),
+e.g. Instagram worker threads) and coroutines (wait_async(), e.g. the AI calls
+of googlesearch/page_fetch.py); the reservation never blocks, so taking the
+thread lock inside a coroutine does not stall the event loop.
+
+Usage:
+    from rate_limit import RateLimiter
+
+    limiter = RateLimiter(calls_per_minute=30)
+    limiter.wait()                 # in a thread
+    await limiter.wait_async()     # in a coroutine
+"""
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """Spaces call start times at least 60 / calls_per_minute seconds apart (0 or less: no limit)."""
+
+    def __init__(self, calls_per_minute: int):
+        self.interval = 60.0 / calls_per_minute if calls_per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Claim the next start time; returns the seconds to wait before starting."""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        return max(0.0, delay)
+
+    def wait(self) -> None:
+        """Block the calling thread until its turn."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self) -> None:
+        """Suspend the calling coroutine until its turn."""
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
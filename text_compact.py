@@ -0,0 +1,186 @@
+"""
+text_compact.py – Token-budget text compaction before LLM calls.
+
+Page text sent to the LLM is full of repetition that costs tokens and carries
+nothing: "View Store" under every card, the same opening-hours block per shop,
+category labels, consecutive duplicate lines. compact_text():
+
+  1. drops consecutive duplicate lines
+  2. collapses boilerplate: lines whose template (lowercased, numbers masked in
+     hours/date-like lines) occurs COMPACT_REPEAT_MIN or more times keep only
+     their first occurrence – but only UI labels ("View Store", "Directions"),
+     hours/date lines and long non-name lines. Short name-like lines are per-card
+     data (a tenant listed six times, each card's category) and are never collapsed
+  3. when the result is still over `token_budget`, keeps the most valuable lines
+     that fit – priority lines (SUITE/unit/kiosk, "coming soon", "now open" ...),
+     then tenant-like short lines, floors and phone numbers, then the rest – in
+     their original order, instead of cutting off the tail
+
+Priority, floor and phone lines are never removed by steps 1–2, so per-shop
+floors and phone numbers survive even when they repeat. Tokens are counted with
+tiktoken when it is installed, else estimated at ~4 characters per token.
+
+Usage:
+    from text_compact import compact_text, describe_stats
+
+    text, stats = compact_text(page_text, token_budget=25000, model="gpt-4.1-mini")
+    print(describe_stats(stats))   # "Compacted text: 41,200 -> 18,950 tokens (54% saved, ...)"
+"""
+import os
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+# Occurrences of one line template before it counts as boilerplate
+COMPACT_REPEAT_MIN = int(os.getenv("COMPACT_REPEAT_MIN", "4"))
+
+# Lines that carry tenant locations or opening news; never collapsed, packed first
+PRIORITY_RE = re.compile(
+    r"\b(?:suite|unit|shop\s*(?:no|#)|store\s*#|kiosk|"
+    r"coming\s+soon|opening\s+soon|now\s+open|grand\s+opening|opening\s+(?:in|on|this|next|date)|"
+    r"new\s+store|relocat\w*|closing|temporarily\s+closed|under\s+construction)\b",
+    re.IGNORECASE,
+)
+# Per-shop details (floor, phone number); never collapsed, packed with tenant-like lines
+_DETAIL_RE = re.compile(r"\b(?:level|floor|lvl)\b|\(?\+?\d[\d\s\-().]{6,}\d", re.IGNORECASE)
+_TENANT_LINE_RE = re.compile(r"^[A-Za-z0-9&'][^\n]{1,59}$")
+# Per-card call-to-action labels that never name a tenant
+_UI_LABEL_RE = re.compile(
+    r"^(?:view|visit|see|shop|learn|read|find|get|show)"
+    r"(?:\s+(?:the|our|all|store|shop|details|more|website|menu|map|on|deals|offers|now|info|directions|location|hours))+$"
+    r"|^(?:more(?:\s+info(?:rmation)?)?|details|directions|website|menu|call|map|open now)$",
+    re.IGNORECASE,
+)
+_DIGITS_RE = re.compile(r"\d+")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except (KeyError, ValueError):
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Tokens in `text` for `model` (tiktoken), or an estimate of ~4 characters per token."""
+    return sum(_line_tokens([text], model)) if text else 0
+
+
+def _line_tokens(lines: List[str], model: Optional[str]) -> List[int]:
+    if TIKTOKEN_AVAILABLE:
+        try:
+            return [len(t) for t in _encoding(model or "gpt-4o").encode_ordinary_batch(lines)]
+        except Exception as e:
+            print(f"Warning: tiktoken failed ({e}), estimating tokens from length")
+    return [len(line) // 4 + 1 for line in lines]
+
+
+def _template(line: str) -> str:
+    """Boilerplate key: lowercased, and with digits masked when there are several numbers
+    (hours, dates, price ranges), so "Store 12"-style names still compare exactly."""
+    line = line.lower()
+    if len(_DIGITS_RE.findall(line)) >= 2:
+        line = _DIGITS_RE.sub("0", line)
+    return _SPACE_RE.sub(" ", line).strip()
+
+
+def _line_score(line: str) -> int:
+    if PRIORITY_RE.search(line):
+        return 3
+    if _DETAIL_RE.search(line) or (_TENANT_LINE_RE.match(line) and len(line.split()) <= 6):
+        return 2
+    return 1
+
+
+def _collapsible(line: str) -> bool:
+    """Whether a repeated line is boilerplate: a UI label, an hours/date line, or a long non-name line."""
+    return bool(_UI_LABEL_RE.match(line)) or len(_DIGITS_RE.findall(line)) >= 2 or _line_score(line) == 1
+
+
+def compact_text(
+    text: str,
+    token_budget: Optional[int] = None,
+    model: Optional[str] = None,
+    repeat_min: int = COMPACT_REPEAT_MIN,
+) -> Tuple[str, Dict]:
+    """
+    Compact `text` and, when `token_budget` is set, pack it into that many tokens.
+
+    Returns (compacted_text, stats); stats has tokens_before, tokens_after,
+    lines_before, lines_after, collapsed (duplicate/boilerplate lines removed),
+    dropped (lines left out to fit the budget) and budget.
+    """
+    lines = [line.strip() for line in (text or "").split("\n")]
+    lines = [line for line in lines if line]
+    tokens = _line_tokens(lines, model) if lines else []
+    # +1 per line for the newline joining them
+    stats = {
+        "tokens_before": sum(tokens) + len(lines),
+        "lines_before": len(lines),
+        "collapsed": 0,
+        "dropped": 0,
+        "budget": token_budget,
+    }
+
+    protected = [bool(PRIORITY_RE.search(line) or _DETAIL_RE.search(line)) for line in lines]
+    template_counts: Dict[str, int] = {}
+    templates = [_template(line) for line in lines]
+    for t in templates:
+        template_counts[t] = template_counts.get(t, 0) + 1
+
+    kept: List[int] = []
+    seen_boilerplate = set()
+    for i, line in enumerate(lines):
+        if not protected[i]:
+            if kept and lines[kept[-1]] == line:
+                continue
+            if template_counts[templates[i]] >= repeat_min and _collapsible(line):
+                if templates[i] in seen_boilerplate:
+                    continue
+                seen_boilerplate.add(templates[i])
+        kept.append(i)
+    stats["collapsed"] = len(lines) - len(kept)
+
+    total = sum(tokens[i] + 1 for i in kept)
+    if token_budget and total > token_budget:
+        # Best lines first (ties keep page order), then restore page order
+        ranked = sorted(kept, key=lambda i: (-_line_score(lines[i]), i))
+        packed = []
+        used = 0
+        for i in ranked:
+            if used + tokens[i] + 1 <= token_budget:
+                packed.append(i)
+                used += tokens[i] + 1
+        stats["dropped"] = len(kept) - len(packed)
+        if not packed:
+            # Not even one line fits (e.g. a page that is one long paragraph): keep the start of the best one
+            best = ranked[0]
+            lines[best] = lines[best][: max(1, token_budget - 1) * len(lines[best]) // max(1, tokens[best])]
+            packed, used = [best], token_budget
+            stats["dropped"] -= 1
+        kept = sorted(packed)
+        total = used
+
+    stats["tokens_after"] = total
+    stats["lines_after"] = len(kept)
+    return "\n".join(lines[i] for i in kept), stats
+
+
+def describe_stats(stats: Dict) -> str:
+    """One-line summary of a compact_text() result for logs."""
+    before, after = stats["tokens_before"], stats["tokens_after"]
+    saved = 100 * (before - after) // before if before else 0
+    msg = (f"Compacted text: {before:,} -> {after:,} tokens ({saved}% saved, "
+           f"{stats['collapsed']} duplicate/boilerplate lines collapsed")
+    if stats["dropped"]:
+        msg += f", {stats['dropped']} low-value lines dropped to fit {stats['budget']:,}-token budget"
+    return msg + ")"